@@ -24,7 +24,7 @@ import logging
 import time
 import os
 
-from client_manager.client_manager import ClientManager, ClientManagerResponseStatus
+from client_manager.client_manager import ClientManager, ClientManagerResponseStatus, orchestrator_target
 from api.schemas import (
     CreateClientGroupRequest,
     RegisterObserverRequest,
@@ -106,6 +106,41 @@ async def create_client_group(
                     "max_tokens": 200,
                     "time_limit": 20
                 }
+            },
+            "vector_search": {
+                "summary": "Vector DB benchmark",
+                "description": "Recall/QPS/latency sweep over HNSW ef on a Qdrant service",
+                "value": {
+                    "service_id": "3732801",
+                    "workload": "vector_search",
+                    "num_clients": 8,
+                    "requests_per_second": 200.0,
+                    "vector_benchmark": {
+                        "dataset": {"type": "synthetic", "num_vectors": 100000, "num_queries": 500, "dim": 128},
+                        "k": 10,
+                        "ef_values": [16, 32, 64, 128, 256]
+                    },
+                    "time_limit": 30
+                }
+            },
+            "rag": {
+                "summary": "RAG pipeline benchmark",
+                "description": "Per-stage latency of RAG prompts across retrieved context sizes",
+                "value": {
+                    "service_id": "3732769",
+                    "workload": "rag",
+                    "num_clients": 4,
+                    "requests_per_second": 2.0,
+                    "max_tokens": 128,
+                    "rag_benchmark": {
+                        "qdrant_service_id": "3732801",
+                        "collection": "docs",
+                        "questions": ["How do I reset my password?", "Which ports does the gateway use?"],
+                        "top_k_values": [0, 1, 3, 5, 10],
+                        "requests_per_top_k": 100
+                    },
+                    "time_limit": 30
+                }
             }
         }
     ),
@@ -121,12 +156,36 @@ async def create_client_group(
     - `service_id`: Service ID of the vLLM service to test (the client service will resolve the data-plane endpoint)
     - `num_clients`: Number of concurrent clients (1-10000)
     - `requests_per_second`: Target RPS across all clients (e.g., 10.0)
+    - `arrival_process`: `poisson` (default), `constant`, `custom` or `closed`
+    - `inter_arrival_seconds`: Gaps to sample arrivals from (required for `custom`)
     - `duration_seconds`: Load test duration (e.g., 60)
     - `prompts`: List of prompts to randomly select from
     - `max_tokens`: Maximum tokens per request (default: 100)
     - `temperature`: Sampling temperature (default: 0.7)
+    - `stream`: Stream generations to measure TTFT, inter-token latency and tokens/s (default: false)
+    - `trace_sample_ratio`: Fraction of requests traced end to end (default: 0.01)
     - `model`: Model name (optional, uses server default)
     - `time_limit`: SLURM job time limit in minutes (default: 30)
+    - `workload`: `prompt` (default), `vector_search` or `rag`
+    - `vector_benchmark`: Vector DB benchmark settings for `vector_search` (dataset, `k`, `ef_values`, ...)
+    - `rag_benchmark`: RAG benchmark settings for `rag` (`qdrant_service_id`, `collection`, questions, `top_k_values`)
+    
+    **Arrivals:** requests are sent open-loop at their scheduled times (Poisson, constant or
+    custom gaps), regardless of outstanding responses, and latency is measured from the scheduled
+    time, so queueing under overload is reported rather than hidden. `closed` keeps `num_clients`
+    workers that wait for each response before sending the next request.
+    
+    **Vector DB benchmark:** with `workload: vector_search`, `service_id` is a Qdrant
+    service. The job loads the dataset (synthetic Gaussian clusters or `.fvecs`/`.ivecs`
+    files with ground truth), ingests it through the orchestrator, then sends the queries at
+    `requests_per_second` with up to `num_clients` in flight for every `ef` in `ef_values`.
+    The results file holds recall@k, QPS and p50/p95/p99 latency per `ef` under
+    `vector_benchmark.sweep`. `duration_seconds`, `prompts` and `max_tokens` are not used.
+    
+    **RAG benchmark:** with `workload: rag`, the questions are replayed through the
+    orchestrator's RAG endpoint for every `top_k` in `top_k_values`. Each request records embed,
+    search, augment, TTFT, generation and total time; `rag_benchmark.sweep` in the results file
+    summarizes them per `top_k` with prompt tokens (prefill) and throughput.
     
         **Returns (Success):**
         ```json
@@ -166,6 +225,12 @@ async def create_client_group(
     """
     logger.debug(f"Creating client group for service {payload.service_id}")
     
+    if payload.arrival_process == "custom" and not payload.inter_arrival_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="arrival_process 'custom' requires inter_arrival_seconds"
+        )
+    
     # Convert payload to dict for storage
     load_config = payload.dict()
     
@@ -175,9 +240,9 @@ async def create_client_group(
     
     service_id = load_config.get('service_id')
     if service_id and client_manager._orchestrator_url:
-        prompt_url = f"{client_manager._orchestrator_url.rstrip('/')}/api/services/vllm/{service_id}/prompt"
-        load_config['prompt_url'] = prompt_url
-        logger.info(f"Using orchestrator prompt endpoint for service {service_id}: {prompt_url}")
+        key, url = orchestrator_target(client_manager._orchestrator_url, load_config)
+        load_config[key] = url
+        logger.info(f"Using orchestrator endpoint for service {service_id}: {url}")
     
     # Import ClientGroup to create it directly and get job ID
     from client_manager.client_group import ClientGroup
@@ -237,7 +302,8 @@ async def create_client_group(
             detail=f"Failed to create client group: {str(e)}"
         )
     
-    target_msg = load_config.get('prompt_url') or f"service {payload.service_id}"
+    target_msg = (load_config.get('prompt_url') or load_config.get('vector_db_url')
+                  or load_config.get('rag_url') or f"service {payload.service_id}")
     logger.info(f"Created client group {group_id}: {payload.num_clients} clients @ {payload.requests_per_second} RPS")
     return {
         "status": "created",
@@ -9,11 +9,121 @@ and manage client groups as needed for benchmark runs.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Literal
 
 
 # ==================== Request Schemas ====================
 
+class VectorBenchmarkConfig(BaseModel):
+    """Vector database benchmark run by a `vector_search` client group."""
+    dataset: Dict[str, Any] = Field(
+        default_factory=lambda: {"type": "synthetic"},
+        description=(
+            "Dataset: {'type': 'synthetic', 'num_vectors', 'num_queries', 'dim', 'clusters', 'seed'} "
+            "or {'type': 'files', 'base', 'queries', 'ground_truth'} (.fvecs/.ivecs or JSON, "
+            "relative to the remote logs directory)"
+        ),
+        example={"type": "synthetic", "num_vectors": 10000, "num_queries": 200, "dim": 128}
+    )
+    collection: Optional[str] = Field(
+        default=None,
+        description="Collection to create and query (default: bench-<job id>)",
+        example="bench-sift"
+    )
+    distance: Literal["Cosine", "Euclid", "Dot"] = Field(
+        default="Cosine",
+        description="Distance metric of the collection",
+        example="Cosine"
+    )
+    k: int = Field(
+        default=10,
+        gt=0,
+        le=1000,
+        description="Neighbours requested per query (recall@k)",
+        example=10
+    )
+    ef_values: List[int] = Field(
+        default=[16, 32, 64, 128, 256],
+        min_length=1,
+        description="HNSW search beam widths to sweep",
+        example=[16, 64, 256]
+    )
+    queries_per_ef: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Queries sent per ef value (default: every query of the dataset once)",
+        example=1000
+    )
+    warmup_queries: int = Field(
+        default=10,
+        ge=0,
+        description="Unmeasured queries sent before each ef value",
+        example=10
+    )
+    hnsw_config: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="HNSW settings of the collection (m, ef_construct, ...)",
+        example={"m": 16, "ef_construct": 100}
+    )
+    quantization: Optional[Union[str, Dict[str, Any]]] = Field(
+        default=None,
+        description="Quantization of the collection (scalar, product, binary)",
+        example="scalar"
+    )
+    skip_ingest: bool = Field(
+        default=False,
+        description="Query an already loaded collection (e.g. restored from a snapshot) instead of creating it",
+        example=False
+    )
+    snapshot: bool = Field(
+        default=False,
+        description="Snapshot the collection to the shared workspace after ingesting it",
+        example=False
+    )
+    index_timeout_seconds: int = Field(
+        default=600,
+        gt=0,
+        description="How long to wait for Qdrant to index the ingested vectors",
+        example=600
+    )
+
+
+class RagBenchmarkConfig(BaseModel):
+    """RAG pipeline benchmark run by a `rag` client group."""
+    qdrant_service_id: str = Field(
+        ...,
+        description="Service ID of the Qdrant service to retrieve context from",
+        example="3732801"
+    )
+    collection: str = Field(
+        ...,
+        description="Collection holding the documents (text in the 'text' payload field)",
+        example="docs"
+    )
+    questions: Optional[List[str]] = Field(
+        default=None,
+        description="Questions to replay (default: questions_file, else prompts)",
+        example=["How do I reset my password?"]
+    )
+    questions_file: Optional[str] = Field(
+        default=None,
+        description="JSON list or one-question-per-line file, relative to the remote logs directory",
+        example="questions.txt"
+    )
+    top_k_values: List[int] = Field(
+        default=[0, 1, 3, 5, 10],
+        min_length=1,
+        description="Retrieved context chunks to sweep (0 sends the bare question)",
+        example=[0, 3, 10]
+    )
+    requests_per_top_k: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Requests sent per top_k value (default: every question once)",
+        example=200
+    )
+
+
 class CreateClientGroupRequest(BaseModel):
     """Request to create a new client group for load testing."""
     
@@ -23,13 +133,13 @@ class CreateClientGroupRequest(BaseModel):
     # internally when available.
     service_id: str = Field(
         ...,
-        description="Service ID of the vLLM service to test",
+        description="Service ID of the vLLM (or, for vector_search, vector DB) service to test",
         example="3732769"
     )
     num_clients: int = Field(
         ...,
         gt=0,
-        description="Number of concurrent clients to spawn",
+        description="Number of concurrent connections (workers with arrival_process 'closed')",
         example=10
     )
     requests_per_second: float = Field(
@@ -44,6 +154,25 @@ class CreateClientGroupRequest(BaseModel):
         description="Load test duration in seconds",
         example=60
     )
+    arrival_process: Literal["poisson", "constant", "custom", "closed"] = Field(
+        default="poisson",
+        description=(
+            "Open-loop arrivals with exponential, fixed or custom gaps (latency measured from the scheduled "
+            "send time), or 'closed' workers that wait for each response before sending the next request"
+        ),
+        example="poisson"
+    )
+    inter_arrival_seconds: Optional[List[float]] = Field(
+        default=None,
+        min_length=1,
+        description="Gaps between arrivals to sample from (arrival_process 'custom')",
+        example=[0.01, 0.01, 0.5]
+    )
+    arrival_seed: Optional[int] = Field(
+        default=None,
+        description="Seed of the arrival schedule, for reproducible runs",
+        example=42
+    )
     prompts: List[str] = Field(
         default=["Tell me a story about AI."],
         min_length=1,
@@ -67,6 +196,46 @@ class CreateClientGroupRequest(BaseModel):
         example=0.7
     )
     
+    stream: bool = Field(
+        default=False,
+        description="Stream generations and record time to first token, inter-token latency and tokens/s",
+        example=False
+    )
+    
+    # Workload
+    workload: Literal["prompt", "vector_search", "rag"] = Field(
+        default="prompt",
+        description=(
+            "'prompt' load-tests a vLLM service, 'vector_search' benchmarks a vector DB service, "
+            "'rag' benchmarks retrieval-augmented prompts to a vLLM service"
+        ),
+        example="prompt"
+    )
+    vector_benchmark: Optional[VectorBenchmarkConfig] = Field(
+        default=None,
+        description="Vector database benchmark settings (workload 'vector_search')"
+    )
+    rag_benchmark: Optional[RagBenchmarkConfig] = Field(
+        default=None,
+        description="RAG benchmark settings (workload 'rag')"
+    )
+    
+    # Orchestrator scheduling
+    priority: Literal["interactive", "benchmark", "background"] = Field(
+        default="benchmark",
+        description="Scheduling class of the generated requests on the orchestrator",
+        example="benchmark"
+    )
+    
+    # Distributed tracing
+    trace_sample_ratio: float = Field(
+        default=0.01,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of requests traced end to end (W3C traceparent sampled flag)",
+        example=0.01
+    )
+    
     # SLURM parameters
     time_limit: int = Field(
         default=5,
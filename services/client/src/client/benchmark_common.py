@@ -0,0 +1,89 @@
+"""
+Helpers shared by the load generator and its benchmark workloads.
+
+Bound next to `loadgen_template.py` in the container (see client_dispatcher),
+so the scripts import it as a top-level module.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+DATA_DIR = "/app/logs"
+
+
+def request_headers(config):
+    """Scheduling context for the orchestrator: priority class and client group (tenant)."""
+    headers = {"X-Request-Priority": config.get("priority", "benchmark")}
+    tenant = config.get("tenant") or os.environ.get("SLURM_JOB_ID")
+    if tenant:
+        headers["X-Client-Group-Id"] = str(tenant)
+    return headers
+
+
+def latency_summary(latencies):
+    """Avg/p50/p95/p99 of the measured values (None are skipped), indexed like the prompt load test."""
+    latencies = sorted(v for v in latencies if v is not None)
+    if not latencies:
+        return {"avg": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "avg": sum(latencies) / len(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "p99": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def count_errors(results):
+    """Failed results counted by (truncated) error message."""
+    errors = {}
+    for r in results:
+        if not r.success:
+            key = str(r.error)[:100]
+            errors[key] = errors.get(key, 0) + 1
+    return errors
+
+
+def merge_errors(sweep):
+    """Error counts summed over the entries of a sweep."""
+    errors = {}
+    for entry in sweep:
+        for err, count in entry["errors"].items():
+            errors[err] = errors.get(err, 0) + count
+    return errors
+
+
+async def run_paced(count, rate, concurrency, send):
+    """Call `send(n, scheduled)` for n in range(count), paced at `rate` per second with at most `concurrency` in flight.
+
+    `scheduled` is the request's planned arrival on the `time.perf_counter()`
+    clock: measuring latency from it keeps the wait for a free slot in the
+    numbers when the target is slower than the offered rate.
+    Returns the results in order and the elapsed wall time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def one(n):
+        scheduled = start + n / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with semaphore:
+            return await send(n, scheduled)
+
+    results = await asyncio.gather(*(one(n) for n in range(count)))
+    return list(results), time.perf_counter() - start
+
+
+def save_results(config, summary):
+    """Write the results file the client service collects; exits on failure."""
+    results_file = config.get("results_file", "/app/logs/loadgen-results.json")
+    try:
+        with open(results_file, "w") as f:
+            json.dump({**summary, "config": config}, f, indent=2)
+        print(f"Results saved to: {results_file}")
+    except Exception as e:
+        print(f"Error saving results: {e}")
+        sys.exit(1)
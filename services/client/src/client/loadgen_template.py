@@ -1,9 +1,25 @@
 """
 Load generator template for SLURM jobs.
 This script is configured via environment variables and runs load tests.
+
+Requests arrive open-loop by default: an arrival schedule (`arrival_process`
+"poisson", "constant" or "custom" inter-arrival times) is generated up front
+and every request is sent at its scheduled time, whether or not earlier ones
+have completed. Latency is measured from the scheduled send time, so time a
+request spends waiting because the service (or the client's `num_clients`
+connections) is saturated is part of its latency instead of being omitted.
+`arrival_process: "closed"` keeps the previous behaviour of `num_clients`
+workers that each wait for their response before sending the next request.
+
+With `"stream": true` generations are streamed as server-sent events and
+every event is timestamped on arrival, giving per request the time to first
+token (TTFT), the inter-token latencies (ITL), the time per output token
+after the first (TPOT) and the token counts. Their distributions are printed
+with the progress lines and saved under `streaming` in the results file.
 """
 import asyncio
 import aiohttp
+import itertools
 import time
 import json
 import random
@@ -11,6 +27,8 @@ import os
 import sys
 from dataclasses import dataclass
 
+from benchmark_common import request_headers
+
 @dataclass
 class RequestMetrics:
     timestamp: float
@@ -18,16 +36,59 @@ class RequestMetrics:
     status_code: int
     success: bool
     error: str = None
+    trace_id: str = None  # Set for sampled (traced) requests
+    send_lag_ms: float = 0.0  # How late the request left compared to its schedule (open-loop)
+    # Streaming only
+    ttft_ms: float = None
+    tpot_ms: float = None
+    itl_ms: list = None  # Gaps between consecutive token events
+    output_tokens: int = None
+    prompt_tokens: int = None
+
+def make_traceparent(config):
+    """Start a W3C trace for one request: (traceparent header, trace_id if sampled).
+
+    `trace_sample_ratio` (default 0.01) controls how many requests are recorded
+    end to end by the server, orchestrator and vLLM; the others still carry a
+    trace ID so each hop can correlate its logs, flagged as not sampled.
+    """
+    trace_id = f"{random.getrandbits(128):032x}"
+    span_id = f"{random.getrandbits(64) or 1:016x}"
+    sampled = random.random() < float(config.get("trace_sample_ratio", 0.01))
+    return f"00-{trace_id}-{span_id}-{'01' if sampled else '00'}", trace_id if sampled else None
+
+def send_time_trace():
+    """aiohttp trace hook stamping when a request's headers hit the wire.
+
+    `send_request` passes a dict as `trace_request_ctx`; its "sent" key is set
+    once a connection was acquired and the request written, so queueing for a
+    connector slot counts as send lag.
+    """
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_headers_sent(session, ctx, params):
+        if isinstance(ctx.trace_request_ctx, dict):
+            ctx.trace_request_ctx["sent"] = time.time()
+
+    trace.on_request_headers_sent.append(on_request_headers_sent)
+    return trace
 
-async def send_request(session, prompt, config):
+async def send_request(session, prompt, config, scheduled=None):
     """Send request to load balancer or vLLM endpoint.
 
     Endpoint selection order:
     - `prompt_url` (orchestrator data-plane)
     - `direct_url` (direct vLLM endpoint)
     - `target_url` (legacy)
+
+    With `scheduled` (open-loop arrivals) latency is measured from that time
+    rather than from when the request actually left. Send lag runs until the
+    request is written (see `send_time_trace`); a request that never left
+    counts its whole wait.
     """
-    start = time.time()
+    start = scheduled if scheduled is not None else time.time()
+    dispatched = time.time()
+    sent = {}
     try:
         endpoint = config.get("prompt_url") or config.get("direct_url") or config.get("target_url")
         if not endpoint:
@@ -39,56 +100,163 @@ async def send_request(session, prompt, config):
             "max_tokens": config.get("max_tokens", 100),
             "temperature": config.get("temperature", 0.7)
         }
+        if config.get("stream"):
+            payload["stream"] = True
+            # Final usage chunk with the exact token counts (vLLM OpenAI API)
+            payload["stream_options"] = {"include_usage": True}
+
+        # Scheduling context for the orchestrator: load tests are tagged with a
+        # lower priority class and their client group (SLURM job) as tenant
+        headers = request_headers(config)
+        headers["traceparent"], trace_id = make_traceparent(config)
 
-        async with session.post(endpoint, json=payload, timeout=60) as resp:
-            latency = (time.time() - start) * 1000
-            if resp.status == 200:
-                # Try to parse JSON but tolerate plain text responses
-                try:
-                    data = await resp.json()
-                except Exception:
-                    data = None
-
-                # If using direct_url assume standard OpenAI-style success
-                if config.get("direct_url"):
-                    return RequestMetrics(start, latency, resp.status, True)
-
-                # For orchestrator/proxy, look for success flag if present
-                if data and isinstance(data, dict):
-                    success = data.get("success", True)
-                    if not success:
-                        return RequestMetrics(start, latency, resp.status, False, data.get("error", "Unknown error"))
-                    return RequestMetrics(start, latency, resp.status, True)
-
-                # Default to success if we got HTTP 200 and can't parse body
-                return RequestMetrics(start, latency, resp.status, True)
+        async with session.post(endpoint, json=payload, headers=headers, timeout=60,
+                                trace_request_ctx=sent) as resp:
+            if resp.status == 200 and resp.content_type == "text/event-stream":
+                metric = await _read_stream(resp, start)
             else:
-                text = await resp.text()
-                return RequestMetrics(start, latency, resp.status, False, f"HTTP {resp.status}: {text[:100]}")
+                latency = (time.time() - start) * 1000
+                metric = await _classify_response(resp, start, latency, config)
+            metric.trace_id = trace_id
+            # Sessions without the trace hook fall back to the dispatch time
+            metric.send_lag_ms = (sent.get("sent", dispatched) - start) * 1000
+            return metric
     except Exception as e:
-        latency = (time.time() - start) * 1000
+        now = time.time()
+        latency = (now - start) * 1000
         error_msg = str(e) or repr(e)
-        return RequestMetrics(start, latency, 0, False, error_msg)
+        return RequestMetrics(start, latency, 0, False, error_msg, send_lag_ms=(sent.get("sent", now) - start) * 1000)
+
+async def _classify_response(resp, start, latency, config):
+    """Turn an HTTP response into a RequestMetrics record."""
+    if resp.status != 200:
+        text = await resp.text()
+        return RequestMetrics(start, latency, resp.status, False, f"HTTP {resp.status}: {text[:100]}")
+
+    # Try to parse JSON but tolerate plain text responses
+    try:
+        data = await resp.json()
+    except Exception:
+        data = None
+
+    # If using direct_url assume standard OpenAI-style success
+    if config.get("direct_url"):
+        return RequestMetrics(start, latency, resp.status, True)
+
+    # For orchestrator/proxy, look for success flag if present
+    if data and isinstance(data, dict):
+        success = data.get("success", True)
+        if not success:
+            return RequestMetrics(start, latency, resp.status, False, data.get("error", "Unknown error"))
+        return RequestMetrics(start, latency, resp.status, True)
+
+    # Default to success if we got HTTP 200 and can't parse body
+    return RequestMetrics(start, latency, resp.status, True)
+
+async def _read_stream(resp, start):
+    """Read a streamed (SSE) generation, timestamping every token event.
+
+    Understands vLLM's chat (`delta.content`) and completions (`text`) chunks,
+    the final `usage` chunk and the orchestrator's closing `result` event.
+    """
+    token_times = []
+    usage = {}
+    result = {}
+    async for line in resp.content:
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        now = time.time()
+        chunk = json.loads(data)
+        usage = chunk.get("usage") or usage
+        result = chunk.get("result") or result
+        for choice in chunk.get("choices") or []:
+            if (choice.get("delta") or {}).get("content") or choice.get("text"):
+                token_times.append(now)
+                break
+    latency = (time.time() - start) * 1000
+
+    if not result.get("success", True):
+        return RequestMetrics(start, latency, resp.status, False, result.get("error", "Unknown error"))
+    if not token_times:
+        return RequestMetrics(start, latency, resp.status, False, "Stream ended without tokens")
+    usage = usage or result.get("usage") or {}
+    output_tokens = usage.get("completion_tokens") or len(token_times)
+    decode_ms = (token_times[-1] - token_times[0]) * 1000
+    return RequestMetrics(
+        start, latency, resp.status, True,
+        ttft_ms=(token_times[0] - start) * 1000,
+        tpot_ms=decode_ms / (output_tokens - 1) if output_tokens > 1 else None,
+        itl_ms=[(b - a) * 1000 for a, b in zip(token_times, token_times[1:])],
+        output_tokens=output_tokens,
+        prompt_tokens=usage.get("prompt_tokens"),
+    )
+
+def distribution(values):
+    """Avg/p50/p90/p95/p99 of the values that were measured (None are skipped)."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return {
+        "avg": sum(values) / len(values),
+        "p50": values[len(values) // 2],
+        "p90": values[int(len(values) * 0.90)],
+        "p95": values[int(len(values) * 0.95)],
+        "p99": values[int(len(values) * 0.99)],
+    }
+
+def streaming_summary(results, elapsed):
+    """TTFT, ITL and TPOT distributions and token throughput of the streamed requests."""
+    streamed = [r for r in results if r.success and r.ttft_ms is not None]
+    output_tokens = sum(r.output_tokens or 0 for r in streamed)
+    prompt_tokens = [r.prompt_tokens for r in streamed if r.prompt_tokens is not None]
+    return {
+        "requests": len(streamed),
+        "ttft_ms": distribution(r.ttft_ms for r in streamed),
+        "itl_ms": distribution(gap for r in streamed for gap in r.itl_ms or []),
+        "tpot_ms": distribution(r.tpot_ms for r in streamed),
+        "output_tokens": output_tokens,
+        "avg_output_tokens": output_tokens / len(streamed) if streamed else None,
+        "avg_prompt_tokens": sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else None,
+        "output_tokens_per_second": output_tokens / elapsed if elapsed > 0 else 0.0,
+    }
+
+def _record(metric, results, state):
+    """Store a finished request and print progress (first few errors of a streak, every 50 requests)."""
+    results.append(metric)
+    if not metric.success:
+        state["consecutive_errors"] += 1
+        if state["consecutive_errors"] <= 5:  # Print first few errors
+            print(f"Request failed: {metric.error}", flush=True)
+    else:
+        state["consecutive_errors"] = 0
+
+    if len(results) % 50 == 0:
+        recent = [r for r in results[-50:] if r.success and r.ttft_ms is not None]
+        if recent:
+            ttft = distribution(r.ttft_ms for r in recent)
+            itl = distribution(gap for r in recent for gap in r.itl_ms or []) or {}
+            tokens_per_second = sum(r.output_tokens for r in recent) / (sum(r.latency_ms for r in recent) / 1000)
+            print(
+                f"Sent {len(results)} requests (last 50: TTFT p50={ttft['p50']:.1f}ms p99={ttft['p99']:.1f}ms, "
+                f"ITL p50={itl.get('p50') or 0:.1f}ms p99={itl.get('p99') or 0:.1f}ms, "
+                f"{tokens_per_second:.1f} tokens/s per request)",
+                flush=True,
+            )
+        else:
+            print(f"Sent {len(results)} requests", flush=True)
 
 async def worker(worker_id, session, config, end_time, results, semaphore):
     prompts = config.get("prompts", ["Hello"])
-    consecutive_errors = 0
+    state = {"consecutive_errors": 0}
 
     while time.time() < end_time:
         async with semaphore:
             prompt = random.choice(prompts)
             metric = await send_request(session, prompt, config)
-            results.append(metric)
-
-            if not metric.success:
-                consecutive_errors += 1
-                if consecutive_errors <= 5:  # Print first few errors
-                    print(f"Request failed: {metric.error}", flush=True)
-            else:
-                consecutive_errors = 0
-
-            if len(results) and len(results) % 50 == 0:
-                print(f"Sent {len(results)} requests", flush=True)
+            _record(metric, results, state)
 
 async def rate_limiter_task(semaphore, rps, end_time):
     interval = 1.0 / rps
@@ -96,6 +264,63 @@ async def rate_limiter_task(semaphore, rps, end_time):
         semaphore.release()
         await asyncio.sleep(interval)
 
+def inter_arrival_times(config, rng=None):
+    """Endless iterator of gaps (seconds) between scheduled request arrivals.
+
+    - `poisson`: exponential gaps with mean 1/`requests_per_second`
+    - `constant`: exactly 1/`requests_per_second`
+    - `custom`: drawn at random from `inter_arrival_seconds` (e.g. gaps
+      measured in a production trace)
+    """
+    rng = rng or random.Random(config.get("arrival_seed"))
+    process = config.get("arrival_process", "poisson")
+    rps = config.get("requests_per_second", 1.0)
+    if process == "poisson":
+        return (rng.expovariate(rps) for _ in itertools.count())
+    if process == "constant":
+        return itertools.repeat(1.0 / rps)
+    if process == "custom":
+        gaps = config.get("inter_arrival_seconds")
+        if not gaps or min(gaps) < 0 or max(gaps) == 0:
+            raise ValueError("arrival_process 'custom' needs non-negative, not all zero inter_arrival_seconds")
+        return (rng.choice(gaps) for _ in itertools.count())
+    raise ValueError(f"Unknown arrival_process: {process}")
+
+async def open_loop(session, config, start_time, end_time, results, rng=None):
+    """Send requests at their scheduled arrival times, independently of outstanding responses.
+
+    Gaps and prompts are drawn from the same generator, so `arrival_seed`
+    reproduces both the schedule and the request mix.
+    Returns the number of scheduled arrivals.
+    """
+    rng = rng or random.Random(config.get("arrival_seed"))
+    prompts = config.get("prompts", ["Hello"])
+    state = {"consecutive_errors": 0}
+    in_flight = set()
+
+    async def dispatch(prompt, scheduled):
+        _record(await send_request(session, prompt, config, scheduled), results, state)
+
+    scheduled = 0
+    next_arrival = start_time
+    for gap in inter_arrival_times(config, rng):
+        next_arrival += gap
+        if next_arrival >= end_time:
+            break
+        delay = next_arrival - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # When the loop falls behind, late arrivals go out at once but keep
+        # their schedule: the delay shows up as latency and send lag
+        task = asyncio.create_task(dispatch(rng.choice(prompts), next_arrival))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        scheduled += 1
+
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    return scheduled
+
 async def run_load_test(config_dict=None):
     # Load configuration from environment, file, or argument
     if config_dict:
@@ -111,30 +336,47 @@ async def run_load_test(config_dict=None):
         except json.JSONDecodeError as e:
             print(f"Error: Invalid JSON in config file: {e}")
             sys.exit(1)
+
+    # Benchmark workloads are bound next to this script in the container (see client_dispatcher)
+    if config.get("workload") == "vector_search":
+        from vector_benchmark import run_vector_benchmark
+        await run_vector_benchmark(config)
+        return
+    if config.get("workload") == "rag":
+        from rag_benchmark import run_rag_benchmark
+        await run_rag_benchmark(config)
+        return
     
     print(f"Starting load test with {config['num_clients']} clients")
     print(f"Target: {config['prompt_url']}")
     print(f"Service ID: {config['service_id']}")
     print(f"Target RPS: {config['requests_per_second']}")
+    arrival_process = config.get("arrival_process", "poisson")
+    print(f"Arrivals: {arrival_process}")
     
     start_time = time.time()
     end_time = start_time + config["duration_seconds"]
     results = []
-    semaphore = asyncio.Semaphore(0)
+    scheduled = None
     
     connector = aiohttp.TCPConnector(limit=config["num_clients"])
-    async with aiohttp.ClientSession(connector=connector) as session:
-        rate_task = asyncio.create_task(rate_limiter_task(semaphore, config["requests_per_second"], end_time))
-        workers = [
-            asyncio.create_task(worker(i, session, config, end_time, results, semaphore))
-            for i in range(config["num_clients"])
-        ]
-        await asyncio.gather(*workers, return_exceptions=True)
-        rate_task.cancel()
-        try:
-            await rate_task
-        except asyncio.CancelledError:
-            pass
+    async with aiohttp.ClientSession(connector=connector, trace_configs=[send_time_trace()]) as session:
+        if arrival_process == "closed":
+            semaphore = asyncio.Semaphore(0)
+            rate_task = asyncio.create_task(rate_limiter_task(semaphore, config["requests_per_second"], end_time))
+            workers = [
+                asyncio.create_task(worker(i, session, config, end_time, results, semaphore))
+                for i in range(config["num_clients"])
+            ]
+            await asyncio.gather(*workers, return_exceptions=True)
+            rate_task.cancel()
+            try:
+                await rate_task
+            except asyncio.CancelledError:
+                pass
+        else:
+            scheduled = await open_loop(session, config, start_time, end_time, results)
+    elapsed = time.time() - start_time
     
     # Calculate results
     total = len(results)
@@ -164,7 +406,20 @@ async def run_load_test(config_dict=None):
         print(f"P50 Latency: {latencies[len(latencies)//2]:.2f}ms")
         print(f"P95 Latency: {latencies[int(len(latencies)*0.95)]:.2f}ms")
         print(f"P99 Latency: {latencies[int(len(latencies)*0.99)]:.2f}ms")
-    print(f"Actual RPS: {total/(time.time()-start_time):.2f}")
+    print(f"Actual RPS: {total/elapsed:.2f}")
+    send_lags = sorted(r.send_lag_ms for r in results)
+    if scheduled is not None:
+        print(f"Offered RPS: {scheduled/config['duration_seconds']:.2f}")
+        if send_lags:
+            print(f"P99 Send Lag: {send_lags[int(len(send_lags)*0.99)]:.2f}ms")
+    
+    streaming = streaming_summary(results, elapsed) if config.get("stream") else None
+    if streaming and streaming["requests"]:
+        for name in ("ttft_ms", "itl_ms", "tpot_ms"):
+            dist = streaming[name]
+            if dist:
+                print(f"{name[:-3].upper()}: avg={dist['avg']:.2f}ms p50={dist['p50']:.2f}ms p99={dist['p99']:.2f}ms")
+        print(f"Output Tokens/s: {streaming['output_tokens_per_second']:.1f}")
     
     if errors:
         print("\nTop Errors:")
@@ -183,6 +438,22 @@ async def run_load_test(config_dict=None):
                 "failed": total - successful,
                 "latencies": latencies,
                 "errors": errors,
+                "arrivals": {
+                    "process": arrival_process,
+                    "target_rps": config["requests_per_second"],
+                    # Open-loop only: requests put on the schedule and how late they left
+                    "scheduled": scheduled,
+                    "offered_rps": scheduled / config["duration_seconds"] if scheduled is not None else None,
+                    "achieved_rps": total / elapsed if elapsed > 0 else 0.0,
+                    "max_send_lag_ms": send_lags[-1] if send_lags and scheduled is not None else None,
+                },
+                "streaming": streaming,
+                # Sampled requests, slowest first: look these trace IDs up in the trace backend
+                "traces": sorted(
+                    ({"trace_id": r.trace_id, "latency_ms": r.latency_ms, "success": r.success}
+                     for r in results if r.trace_id),
+                    key=lambda t: -t["latency_ms"],
+                )[:100],
                 "config": config
             }, f, indent=2)
         print(f"Results saved to: {results_file}")
@@ -0,0 +1,212 @@
+"""
+RAG pipeline benchmark for SLURM load generator jobs.
+
+Run by the load generator (`loadgen_template.py`) when the config has
+`"workload": "rag"`. It replays a question set against the orchestrator's
+RAG endpoint (`POST /api/services/vllm/{service_id}/rag`), which retrieves
+context from a Qdrant collection and generates the answer on a vLLM service.
+
+For every `top_k` in `top_k_values` the questions are sent at the target
+rate, and each request records the orchestrator's per-stage timing (embed,
+search, augment, time to first token, generation, total), the client-side
+latency and the token usage. The summary per `top_k` shows how the size of
+the retrieved context drives prefill cost (prompt tokens, TTFT) and overall
+throughput. `top_k` 0 sends the bare question and serves as a baseline.
+
+Questions come from `rag_benchmark.questions`, a `questions_file` (a JSON
+list, or one question per line; relative paths are resolved against
+`/app/logs`) or else the load test `prompts`.
+"""
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:  # Only needed to run the benchmark, not to summarize results
+    AIOHTTP_AVAILABLE = False
+
+from benchmark_common import (
+    DATA_DIR,
+    count_errors,
+    latency_summary,
+    merge_errors,
+    request_headers,
+    run_paced,
+    save_results,
+)
+
+DEFAULT_TOP_K_VALUES = [0, 1, 3, 5, 10]
+STAGES = ("embed_ms", "search_ms", "augment_ms", "ttft_ms", "generation_ms", "total_ms")
+
+
+@dataclass
+class RagMetrics:
+    timestamp: float
+    latency_ms: float
+    success: bool
+    top_k: int
+    question: int
+    error: str = None
+    rag_enabled: bool = False
+    timing: Dict = field(default_factory=dict)
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+def load_questions(config) -> List[str]:
+    bench = config.get("rag_benchmark") or {}
+    if bench.get("questions"):
+        return list(bench["questions"])
+    if bench.get("questions_file"):
+        path = Path(bench["questions_file"])
+        if not path.is_absolute():
+            path = Path(DATA_DIR) / path
+        text = path.read_text()
+        if path.suffix == ".json":
+            return list(json.loads(text))
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    return list(config.get("prompts") or ["Hello"])
+
+
+def summarize_top_k(top_k, results, elapsed, target_rps):
+    """Sweep entry for one `top_k`: stage latency distributions, tokens and throughput."""
+    successful = [r for r in results if r.success]
+    prompt_tokens = [r.prompt_tokens for r in successful if r.prompt_tokens is not None]
+    completion_tokens = sum(r.completion_tokens or 0 for r in successful)
+    stages = {stage: latency_summary([r.timing.get(stage) for r in successful]) for stage in STAGES}
+    stages["client_ms"] = latency_summary([r.latency_ms for r in successful])
+    return {
+        "top_k": top_k,
+        "requests": len(results),
+        "successful": len(successful),
+        "failed": len(results) - len(successful),
+        # Answered without context because retrieval failed
+        "degraded": sum(1 for r in successful if not r.rag_enabled),
+        "target_rps": target_rps,
+        "throughput_rps": len(successful) / elapsed if elapsed > 0 else 0.0,
+        "output_tokens_per_second": completion_tokens / elapsed if elapsed > 0 else 0.0,
+        "avg_prompt_tokens": sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else None,
+        "avg_context_chunks": (
+            sum(r.timing.get("context_chunks", 0) for r in successful) / len(successful) if successful else None
+        ),
+        "stages": stages,
+        "errors": count_errors(results),
+    }
+
+
+async def send_rag_request(session, config, question, index, top_k, scheduled=None):
+    """One RAG request; latency runs from `scheduled` (a `time.perf_counter()` value) when given."""
+    bench = config.get("rag_benchmark") or {}
+    payload = {
+        "prompt": question,
+        "qdrant_service_id": bench.get("qdrant_service_id"),
+        "collection": bench.get("collection"),
+        "top_k": top_k,
+        "max_tokens": config.get("max_tokens", 100),
+        "temperature": config.get("temperature", 0.7),
+        "measure_ttft": True,
+        # Every request must reach the model to measure prefill
+        "cache": False,
+        "semantic_cache": False,
+    }
+    timestamp = time.time()
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        async with session.post(config["rag_url"], json=payload, headers=request_headers(config), timeout=120) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                latency = (time.perf_counter() - start) * 1000
+                return RagMetrics(timestamp, latency, False, top_k, index, f"HTTP {resp.status}: {text[:100]}")
+            data = await resp.json()
+        latency = (time.perf_counter() - start) * 1000
+        if not data.get("success", True):
+            return RagMetrics(timestamp, latency, False, top_k, index, data.get("error", "Unknown error"))
+        usage = data.get("usage") or {}
+        return RagMetrics(
+            timestamp, latency, True, top_k, index,
+            rag_enabled=bool(data.get("rag_enabled")),
+            timing=data.get("rag_timing") or {},
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+    except Exception as e:
+        latency = (time.perf_counter() - start) * 1000
+        return RagMetrics(timestamp, latency, False, top_k, index, str(e) or repr(e))
+
+
+async def run_top_k(session, config, questions, top_k, num_requests, rps, concurrency):
+    """Replay the questions for one `top_k`, paced at `rps` with at most `concurrency` in flight."""
+    async def send(n, scheduled):
+        index = n % len(questions)
+        return await send_rag_request(session, config, questions[index], index, top_k, scheduled)
+
+    return await run_paced(num_requests, rps, concurrency, send)
+
+
+async def run_rag_benchmark(config):
+    """Run the RAG benchmark described by `config` and save the results file."""
+    bench = config.get("rag_benchmark") or {}
+    if not config.get("rag_url"):
+        print("Error: No endpoint configured (rag_url)")
+        sys.exit(1)
+    if not bench.get("qdrant_service_id") or not bench.get("collection"):
+        print("Error: rag_benchmark needs qdrant_service_id and collection")
+        sys.exit(1)
+    questions = load_questions(config)
+    top_k_values = bench.get("top_k_values") or DEFAULT_TOP_K_VALUES
+    num_requests = bench.get("requests_per_top_k") or len(questions)
+    rps = config.get("requests_per_second", 1.0)
+    concurrency = config.get("num_clients", 1)
+
+    print(f"Starting RAG benchmark on {config['rag_url']}")
+    print(f"Collection: {bench['collection']} on Qdrant service {bench['qdrant_service_id']}")
+    print(f"{len(questions)} questions, top_k sweep {top_k_values}, target RPS {rps}, {concurrency} clients")
+
+    sweep = []
+    all_results = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for top_k in top_k_values:
+            results, elapsed = await run_top_k(session, config, questions, top_k, num_requests, rps, concurrency)
+            entry = summarize_top_k(top_k, results, elapsed, rps)
+            sweep.append(entry)
+            all_results.extend(results)
+            ttft = entry["stages"]["ttft_ms"]
+            total = entry["stages"]["total_ms"]
+            print(
+                f"top_k={top_k}: prompt_tokens={entry['avg_prompt_tokens'] or 0:.0f} "
+                f"TTFT p50={ttft.get('p50') or 0:.1f}ms total p50={total.get('p50') or 0:.1f}ms "
+                f"throughput={entry['throughput_rps']:.2f} req/s failed={entry['failed']}",
+                flush=True,
+            )
+
+    successful = sum(1 for r in all_results if r.success)
+    save_results(config, {
+        "total_requests": len(all_results),
+        "successful": successful,
+        "failed": len(all_results) - successful,
+        "latencies": sorted(r.latency_ms for r in all_results),
+        "errors": merge_errors(sweep),
+        "rag_benchmark": {
+            "num_questions": len(questions),
+            "sweep": sweep,
+            "requests": [
+                {
+                    "top_k": r.top_k,
+                    "question": r.question,
+                    "success": r.success,
+                    "latency_ms": r.latency_ms,
+                    "rag_enabled": r.rag_enabled,
+                    "prompt_tokens": r.prompt_tokens,
+                    "completion_tokens": r.completion_tokens,
+                    **{stage: r.timing.get(stage) for stage in STAGES},
+                }
+                for r in all_results
+            ],
+        },
+    })
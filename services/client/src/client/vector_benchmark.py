@@ -0,0 +1,449 @@
+"""
+Vector database benchmark for SLURM load generator jobs.
+
+Run by the load generator (`loadgen_template.py`) when the config has
+`"workload": "vector_search"`. The benchmark:
+
+1. loads a dataset: base vectors, query vectors and ground-truth neighbours
+2. creates a collection on the Qdrant service and bulk-loads the base vectors
+   through the orchestrator data plane (binary float32 body, point ID = row)
+3. waits until Qdrant has indexed every point
+4. for each HNSW search beam width in `ef_values`, sends the queries at the
+   target QPS and measures recall@k, achieved QPS and latency percentiles
+
+With `"snapshot": true` the loaded collection is snapshotted to the shared
+workspace, so later Qdrant services started with `QDRANT_RESTORE_SNAPSHOTS`
+have it at startup; runs against those set `"skip_ingest": true` and only
+check that every point is there.
+
+Datasets (`vector_benchmark.dataset` in the config):
+
+- `{"type": "synthetic", "num_vectors": 10000, "num_queries": 100, "dim": 128,
+  "clusters": 16, "seed": 42}`: Gaussian clusters generated in the job
+- `{"type": "files", "base": "base.fvecs", "queries": "query.fvecs",
+  "ground_truth": "groundtruth.ivecs"}`: texmex `.fvecs`/`.ivecs` files (the
+  SIFT/GIST benchmark format) or JSON lists of lists; relative paths are
+  resolved against `/app/logs`
+
+Without ground-truth neighbours (synthetic data, or no `ground_truth` file)
+they are taken from exact, brute-force searches on Qdrant before the sweep.
+Large synthetic datasets can be generated offline, ground truth included:
+
+    python vector_benchmark.py generate --out ./sift-like --num-vectors 100000 --dim 128
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:  # Only needed to run the benchmark, not to generate datasets
+    AIOHTTP_AVAILABLE = False
+
+from benchmark_common import (
+    DATA_DIR,
+    count_errors,
+    latency_summary,
+    merge_errors,
+    request_headers,
+    run_paced,
+    save_results,
+)
+
+DEFAULT_EF_VALUES = [16, 32, 64, 128, 256]
+FLOAT32_CONTENT_TYPE = "application/x-float32-vectors"
+# Rows per chunk of the streamed ingest body
+INGEST_CHUNK_ROWS = 1024
+
+
+@dataclass
+class Dataset:
+    base: List[List[float]]
+    queries: List[List[float]]
+    ground_truth: Optional[List[List[int]]] = None
+    source: Dict = field(default_factory=dict)
+
+    @property
+    def dim(self) -> int:
+        return len(self.base[0])
+
+
+@dataclass
+class QueryMetrics:
+    timestamp: float
+    latency_ms: float
+    success: bool
+    ids: List[int] = field(default_factory=list)
+    error: str = None
+
+
+# ==================== Datasets ====================
+
+def gaussian_clusters(num_vectors, num_queries, dim, clusters=16, spread=0.1, seed=42):
+    """Base and query vectors drawn from the same mixture of Gaussian clusters."""
+    rng = random.Random(seed)
+    centers = [[rng.uniform(-1.0, 1.0) for _ in range(dim)] for _ in range(clusters)]
+
+    def sample(count):
+        points = []
+        for _ in range(count):
+            center = rng.choice(centers)
+            points.append([c + rng.gauss(0.0, spread) for c in center])
+        return points
+
+    return sample(num_vectors), sample(num_queries)
+
+
+def _score(distance):
+    """Similarity function of a Qdrant distance (larger is closer)."""
+    if distance == "Euclid":
+        return lambda q, v: -sum((a - b) * (a - b) for a, b in zip(q, v))
+    if distance == "Dot":
+        return lambda q, v: sum(a * b for a, b in zip(q, v))
+    # Cosine: the ranking only depends on the base vector's norm
+    return lambda q, v: sum(a * b for a, b in zip(q, v)) / (math.sqrt(sum(b * b for b in v)) or 1.0)
+
+
+def exact_neighbours(base, queries, k, distance="Cosine"):
+    """Brute-force top-k base row indices of every query (slow, meant for offline use)."""
+    score = _score(distance)
+    return [
+        heapq.nlargest(k, range(len(base)), key=lambda i: score(query, base[i]))
+        for query in queries
+    ]
+
+
+def read_vecs(path, typecode="f"):
+    """Read a texmex `.fvecs` (typecode "f") or `.ivecs` (typecode "i") file."""
+    rows = []
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(4)
+            if not header:
+                break
+            (dim,) = struct.unpack("<i", header)
+            row = array(typecode)
+            row.frombytes(f.read(4 * dim))
+            if len(row) != dim:
+                raise ValueError(f"{path}: truncated row {len(rows)}")
+            if sys.byteorder == "big":
+                row.byteswap()
+            rows.append(row.tolist())
+    return rows
+
+
+def write_vecs(path, rows, typecode="f"):
+    with open(path, "wb") as f:
+        for row in rows:
+            values = array(typecode, row)
+            if sys.byteorder == "big":
+                values.byteswap()
+            f.write(struct.pack("<i", len(row)) + values.tobytes())
+
+
+def _read_rows(path, typecode):
+    path = Path(path)
+    if not path.is_absolute():
+        path = Path(DATA_DIR) / path
+    if path.suffix in (".fvecs", ".ivecs"):
+        return read_vecs(path, "i" if path.suffix == ".ivecs" else "f")
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_dataset(spec) -> Dataset:
+    """Load the dataset described by `spec` (see the module docstring)."""
+    kind = spec.get("type", "synthetic")
+    if kind == "synthetic":
+        base, queries = gaussian_clusters(
+            spec.get("num_vectors", 10000), spec.get("num_queries", 100), spec.get("dim", 128),
+            clusters=spec.get("clusters", 16), spread=spec.get("spread", 0.1), seed=spec.get("seed", 42),
+        )
+        return Dataset(base, queries, source=dict(spec))
+    if kind == "files":
+        if not spec.get("base") or not spec.get("queries"):
+            raise ValueError("File datasets need 'base' and 'queries' paths")
+        base = _read_rows(spec["base"], "f")
+        queries = _read_rows(spec["queries"], "f")
+        ground_truth = _read_rows(spec["ground_truth"], "i") if spec.get("ground_truth") else None
+        if ground_truth is not None and len(ground_truth) < len(queries):
+            raise ValueError(f"Ground truth covers {len(ground_truth)} of {len(queries)} queries")
+        return Dataset(base, queries, ground_truth, source=dict(spec))
+    raise ValueError(f"Unknown dataset type '{kind}' (use synthetic or files)")
+
+
+# ==================== Metrics ====================
+
+def recall_at_k(ids, truth, k):
+    """Fraction of the true k nearest neighbours among the returned IDs."""
+    if not truth or not k:
+        return 0.0
+    return len(set(ids[:k]) & set(truth[:k])) / min(k, len(truth))
+
+
+def summarize_run(ef, results, query_indices, ground_truth, k, elapsed, target_qps):
+    """Sweep entry for one `ef`: recall@k over successful queries, QPS and latency."""
+    successful = [(r, q) for r, q in zip(results, query_indices) if r.success]
+    recalls = [recall_at_k(r.ids, ground_truth[q], k) for r, q in successful]
+    return {
+        "ef": ef,
+        "queries": len(results),
+        "successful": len(successful),
+        "failed": len(results) - len(successful),
+        "recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+        "target_qps": target_qps,
+        "qps": len(successful) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": latency_summary([r.latency_ms for r, _ in successful]),
+        "errors": count_errors(results),
+    }
+
+
+# ==================== Orchestrator data plane ====================
+
+def encode_vectors(rows):
+    """`application/x-float32-vectors` body: b"VF32", dim as uint32, then float32 rows."""
+    yield struct.pack("<4sI", b"VF32", len(rows[0]))
+    for start in range(0, len(rows), INGEST_CHUNK_ROWS):
+        values = array("f")
+        for row in rows[start:start + INGEST_CHUNK_ROWS]:
+            values.extend(row)
+        if sys.byteorder == "big":
+            values.byteswap()
+        yield values.tobytes()
+
+
+async def _call(session, method, url, config, timeout=60, **kwargs):
+    """JSON request to the orchestrator; raises RuntimeError on HTTP or data-plane errors."""
+    async with session.request(method, url, headers=request_headers(config), timeout=timeout, **kwargs) as resp:
+        text = await resp.text()
+        if resp.status != 200:
+            raise RuntimeError(f"{method} {url}: HTTP {resp.status}: {text[:200]}")
+    data = json.loads(text) if text else {}
+    if isinstance(data, dict) and data.get("success") is False:
+        raise RuntimeError(f"{method} {url}: {data.get('error') or data.get('message')}")
+    return data
+
+
+async def ingest(session, collection_url, dataset, bench, config):
+    """Create the collection, bulk-load the base vectors and wait until they are indexed."""
+    body = {"vector_size": dataset.dim, "distance": bench.get("distance", "Cosine")}
+    for key in ("hnsw_config", "quantization", "on_disk"):
+        if bench.get(key) is not None:
+            body[key] = bench[key]
+    await _call(session, "PUT", collection_url, config, json=body)
+
+    start = time.time()
+    params = {"batch_size": bench.get("batch_size", 512), "parallelism": bench.get("parallelism", 4)}
+    headers = {**request_headers(config), "Content-Type": FLOAT32_CONTENT_TYPE}
+
+    async def body_chunks():
+        for chunk in encode_vectors(dataset.base):
+            yield chunk
+
+    async with session.post(f"{collection_url}/points/bulk", params=params, headers=headers,
+                            data=body_chunks(), timeout=None) as resp:
+        text = await resp.text()
+        if resp.status != 200:
+            raise RuntimeError(f"Bulk ingest failed: HTTP {resp.status}: {text[:200]}")
+    result = json.loads(text)
+    if not result.get("success") or result.get("num_points") != len(dataset.base):
+        raise RuntimeError(f"Bulk ingest failed: {result.get('error') or result.get('errors')}")
+    upload_seconds = time.time() - start
+    print(f"Uploaded {len(dataset.base)} vectors in {upload_seconds:.1f}s", flush=True)
+
+    await wait_until_indexed(session, collection_url, len(dataset.base), bench.get("index_timeout_seconds", 600), config)
+    stats = {
+        "num_points": len(dataset.base),
+        "upload_seconds": upload_seconds,
+        "points_per_second": result.get("points_per_second"),
+        "index_seconds": time.time() - start,
+    }
+    if bench.get("snapshot"):
+        snapshot_start = time.time()
+        snapshot = await _call(session, "POST", f"{collection_url}/snapshots", config, timeout=None)
+        stats["snapshot"] = {"path": snapshot.get("path"), "seconds": time.time() - snapshot_start}
+        print(f"Snapshot written to {snapshot.get('path')}", flush=True)
+    return stats
+
+
+async def check_loaded(session, collection_url, dataset, bench, config):
+    """Wait for an already loaded (e.g. restored from a snapshot) collection to hold the dataset."""
+    start = time.time()
+    await wait_until_indexed(session, collection_url, len(dataset.base), bench.get("index_timeout_seconds", 600), config)
+    return {"num_points": len(dataset.base), "skipped": True, "ready_seconds": time.time() - start}
+
+
+async def wait_until_indexed(session, collection_url, num_points, timeout, config):
+    """Poll the collection until Qdrant reports it green with every point counted."""
+    deadline = time.time() + timeout
+    while True:
+        info = (await _call(session, "GET", collection_url, config)).get("collection_info", {})
+        if info.get("status") == "green" and info.get("points_count") == num_points:
+            return
+        if time.time() > deadline:
+            raise RuntimeError(
+                f"Collection not indexed after {timeout}s (status {info.get('status')}, "
+                f"{info.get('points_count')}/{num_points} points)"
+            )
+        await asyncio.sleep(2)
+
+
+async def search(session, search_url, vector, k, params, config, scheduled=None):
+    """One search; latency runs from `scheduled` (a `time.perf_counter()` value) when given."""
+    timestamp = time.time()
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        payload = {"query_vector": vector, "limit": k, "params": params}
+        async with session.post(search_url, json=payload, headers=request_headers(config), timeout=60) as resp:
+            latency = (time.perf_counter() - start) * 1000
+            if resp.status != 200:
+                text = await resp.text()
+                return QueryMetrics(timestamp, latency, False, error=f"HTTP {resp.status}: {text[:100]}")
+            data = await resp.json()
+        if not data.get("success", True):
+            return QueryMetrics(timestamp, latency, False, error=data.get("error", "Unknown error"))
+        return QueryMetrics(timestamp, latency, True, [int(r["id"]) for r in data.get("results", [])])
+    except Exception as e:
+        latency = (time.perf_counter() - start) * 1000
+        return QueryMetrics(timestamp, latency, False, error=str(e) or repr(e))
+
+
+async def exact_ground_truth(session, search_url, dataset, k, config):
+    """Ground truth from brute-force Qdrant searches (ignoring any quantization)."""
+    params = {"exact": True, "quantization": {"ignore": True}}
+    truth = []
+    for i, query in enumerate(dataset.queries):
+        metric = await search(session, search_url, query, k, params, config)
+        if not metric.success:
+            raise RuntimeError(f"Exact search for query {i} failed: {metric.error}")
+        truth.append(metric.ids)
+    return truth
+
+
+async def run_queries(session, search_url, dataset, query_indices, k, params, qps, concurrency, config):
+    """Send the queries paced at `qps` with at most `concurrency` in flight."""
+    async def send(n, scheduled):
+        return await search(session, search_url, dataset.queries[query_indices[n]], k, params, config, scheduled)
+
+    return await run_paced(len(query_indices), qps, concurrency, send)
+
+
+# ==================== Benchmark ====================
+
+async def run_vector_benchmark(config):
+    """Run the benchmark described by `config` and save the results file."""
+    bench = config.get("vector_benchmark") or {}
+    base_url = config.get("vector_db_url")
+    if not base_url:
+        print("Error: No endpoint configured (vector_db_url)")
+        sys.exit(1)
+    collection = bench.get("collection") or f"bench-{os.environ.get('SLURM_JOB_ID', int(time.time()))}"
+    collection_url = f"{base_url.rstrip('/')}/collections/{collection}"
+    search_url = f"{collection_url}/search"
+    k = bench.get("k", 10)
+    ef_values = bench.get("ef_values") or DEFAULT_EF_VALUES
+    qps = config.get("requests_per_second", 10.0)
+    concurrency = config.get("num_clients", 1)
+
+    dataset = load_dataset(bench.get("dataset") or {"type": "synthetic"})
+    num_queries = bench.get("queries_per_ef") or len(dataset.queries)
+    query_indices = [n % len(dataset.queries) for n in range(num_queries)]
+    warmup = [n % len(dataset.queries) for n in range(bench.get("warmup_queries", 10))]
+
+    print(f"Starting vector benchmark on {collection_url}")
+    print(f"Dataset: {len(dataset.base)} vectors, {len(dataset.queries)} queries, dim {dataset.dim}")
+    print(f"ef sweep: {ef_values}, k={k}, target QPS {qps}, {concurrency} clients")
+
+    sweep = []
+    all_latencies = []
+    connector = aiohttp.TCPConnector(limit=concurrency + 1)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        if bench.get("skip_ingest"):
+            ingest_stats = await check_loaded(session, collection_url, dataset, bench, config)
+        else:
+            ingest_stats = await ingest(session, collection_url, dataset, bench, config)
+        ground_truth = dataset.ground_truth
+        if ground_truth is None:
+            print("Computing ground truth with exact searches...", flush=True)
+            ground_truth = await exact_ground_truth(session, search_url, dataset, k, config)
+
+        for ef in ef_values:
+            params = {"hnsw_ef": ef}
+            if warmup:
+                await run_queries(session, search_url, dataset, warmup, k, params, qps, concurrency, config)
+            results, elapsed = await run_queries(
+                session, search_url, dataset, query_indices, k, params, qps, concurrency, config
+            )
+            entry = summarize_run(ef, results, query_indices, ground_truth, k, elapsed, qps)
+            sweep.append(entry)
+            all_latencies.extend(r.latency_ms for r in results)
+            latency = entry["latency_ms"]
+            print(
+                f"ef={ef}: recall@{k}={entry['recall_at_k'] or 0:.4f} QPS={entry['qps']:.1f} "
+                f"p50={latency['p50'] or 0:.2f}ms p95={latency['p95'] or 0:.2f}ms "
+                f"p99={latency['p99'] or 0:.2f}ms failed={entry['failed']}",
+                flush=True,
+            )
+
+    successful = sum(entry["successful"] for entry in sweep)
+    total = sum(entry["queries"] for entry in sweep)
+    save_results(config, {
+        "total_requests": total,
+        "successful": successful,
+        "failed": total - successful,
+        "latencies": sorted(all_latencies),
+        "errors": merge_errors(sweep),
+        "vector_benchmark": {
+            "collection": collection,
+            "k": k,
+            "dataset": {
+                **dataset.source,
+                "num_vectors": len(dataset.base),
+                "num_queries": len(dataset.queries),
+                "dim": dataset.dim,
+                "ground_truth": "file" if dataset.ground_truth is not None else "exact_search",
+            },
+            "ingest": ingest_stats,
+            "sweep": sweep,
+        },
+    })
+
+
+def generate(args):
+    """Write a synthetic dataset with exact ground truth as .fvecs/.ivecs files."""
+    base, queries = gaussian_clusters(args.num_vectors, args.num_queries, args.dim,
+                                      clusters=args.clusters, spread=args.spread, seed=args.seed)
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    write_vecs(out / "base.fvecs", base)
+    write_vecs(out / "query.fvecs", queries)
+    write_vecs(out / "groundtruth.ivecs", exact_neighbours(base, queries, args.k, args.distance), "i")
+    print(f"Wrote {len(base)} base and {len(queries)} query vectors to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    gen = subparsers.add_parser("generate", help="Generate a synthetic dataset with ground truth")
+    gen.add_argument("--out", required=True)
+    gen.add_argument("--num-vectors", type=int, default=10000)
+    gen.add_argument("--num-queries", type=int, default=100)
+    gen.add_argument("--dim", type=int, default=128)
+    gen.add_argument("--clusters", type=int, default=16)
+    gen.add_argument("--spread", type=float, default=0.1)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--k", type=int, default=100)
+    gen.add_argument("--distance", choices=["Cosine", "Euclid", "Dot"], default="Cosine")
+    generate(parser.parse_args())
@@ -17,6 +17,17 @@ class ClientManagerResponseStatus:
     ALREADY_EXISTS = 2
 
 
+def orchestrator_target(orchestrator_url: str, load_config: Dict[str, Any]):
+    """(config key, URL) of the orchestrator data-plane endpoint the load generator should call."""
+    base = f"{orchestrator_url.rstrip('/')}/api/services"
+    service_id = load_config['service_id']
+    if load_config.get('workload') == 'vector_search':
+        return 'vector_db_url', f"{base}/vector-db/{service_id}"
+    if load_config.get('workload') == 'rag':
+        return 'rag_url', f"{base}/vllm/{service_id}/rag"
+    return 'prompt_url', f"{base}/vllm/{service_id}/prompt"
+
+
 class CMResponse:
     """Simple response object returned by some ClientManager helper methods."""
     def __init__(self, status: int, body=None):
@@ -137,9 +148,9 @@ class ClientManager:
                 service_id = load_config.get('service_id')
                 if service_id:
                     if self._orchestrator_url:
-                        prompt_url = f"{self._orchestrator_url.rstrip('/')}/api/services/vllm/{service_id}/prompt"
-                        load_config['prompt_url'] = prompt_url
-                        self._logger.info(f"Using orchestrator prompt endpoint for service {service_id}: {prompt_url}")
+                        key, url = orchestrator_target(self._orchestrator_url, load_config)
+                        load_config[key] = url
+                        self._logger.info(f"Using orchestrator endpoint for service {service_id}: {url}")
                     else:
                         self._logger.warning(f"Service {service_id} requested but _orchestrator_url is not set; leaving load_config unchanged")
 
@@ -154,7 +165,7 @@ class ClientManager:
                 self._logger.info(
                     f"Added client group {group_id}: {load_config['num_clients']} clients, "
                     f"{load_config['requests_per_second']} RPS, "
-                    f"targeting {load_config.get('prompt_url') }"
+                    f"targeting {load_config.get('prompt_url') or load_config.get('vector_db_url') or load_config.get('rag_url')}"
                 )
                 return ClientManagerResponseStatus.OK
             except Exception as e:
@@ -221,11 +221,29 @@ class SlurmClientDispatcher(AbstractClientDispatcher):
             "service_id": self._load_config.get('service_id'),
             "num_clients": self._load_config.get('num_clients'),
             "requests_per_second": self._load_config.get('requests_per_second'),
+            "arrival_process": self._load_config.get('arrival_process', 'poisson'),
+            "inter_arrival_seconds": self._load_config.get('inter_arrival_seconds'),
+            "arrival_seed": self._load_config.get('arrival_seed'),
             "duration_seconds": self._load_config.get('duration_seconds'),
             "prompts": self._load_config.get('prompts'),
             "max_tokens": self._load_config.get('max_tokens', 100),
             "temperature": self._load_config.get('temperature', 0.7),
+            "stream": self._load_config.get('stream', False),
+            "priority": self._load_config.get('priority', 'benchmark'),
+            "trace_sample_ratio": self._load_config.get('trace_sample_ratio', 0.01),
         }
+        if self._load_config.get('workload') == 'vector_search':
+            load_config.update({
+                "workload": "vector_search",
+                "vector_db_url": self._load_config.get('vector_db_url'),
+                "vector_benchmark": self._load_config.get('vector_benchmark') or {},
+            })
+        elif self._load_config.get('workload') == 'rag':
+            load_config.update({
+                "workload": "rag",
+                "rag_url": self._load_config.get('rag_url'),
+                "rag_benchmark": self._load_config.get('rag_benchmark') or {},
+            })
         # Generate JSON without results_file - we'll add it in bash where $SLURM_JOB_ID is resolved
         prompts_json_config = json.dumps(load_config, indent=2)
         # Remove the closing brace so we can append results_file in bash
@@ -240,6 +258,7 @@ class SlurmClientDispatcher(AbstractClientDispatcher):
 
 echo "Starting load test at $(date)"
 echo "Configuration:"
+echo "  Workload: {self._load_config.get('workload', 'prompt')}"
 echo "  Prompt URL: {self._load_config.get('prompt_url')}"
 echo "  Service ID: {self._load_config.get('service_id')}"
 echo "  Clients: {self._load_config.get('num_clients')}"
@@ -339,6 +358,9 @@ apptainer run \
     --bind {log_dir}:/app/logs \
     --bind "$CONFIG_FILE":/app/config.json:ro \
     --bind {self._remote_base_path}/src/client/loadgen_template.py:/app/main.py:ro \
+    --bind {self._remote_base_path}/src/client/vector_benchmark.py:/app/vector_benchmark.py:ro \
+    --bind {self._remote_base_path}/src/client/rag_benchmark.py:/app/rag_benchmark.py:ro \
+    --bind {self._remote_base_path}/src/client/benchmark_common.py:/app/benchmark_common.py:ro \
     --env LOADGEN_CONFIG=/app/config.json \
     {sif_path} > "$CONTAINER_LOG" 2>&1
 container_exit_code=$?
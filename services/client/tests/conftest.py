@@ -16,6 +16,9 @@ from main import app
 
 # Add src to path so tests can import modules
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# The load generator scripts import their shared helpers as top-level modules,
+# as they are bound side by side in the container
+sys.path.append(str(Path(__file__).parent.parent / "src" / "client"))
 
 
 @pytest.fixture(autouse=True)
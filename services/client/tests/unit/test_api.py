@@ -98,6 +98,17 @@ class TestAPIEndpoints:
 
             assert response.status_code == 502
     
+    def test_create_client_group_requires_custom_inter_arrival_times(self, client, mock_ssh_manager):
+        """A custom arrival process needs the gaps to draw arrivals from."""
+        with patch('client_manager.client_group.ClientGroup') as mock_group_cls:
+            response = client.post(
+                "/api/v1/client-groups",
+                json={"service_id": "sg-test", "num_clients": 10, "arrival_process": "custom"}
+            )
+
+            assert response.status_code == 400
+            mock_group_cls.assert_not_called()
+
     def test_list_client_groups(self, client):
         """Test listing all client groups."""
         response = client.get("/api/v1/client-groups")
@@ -92,6 +92,38 @@ def test_add_client_group_injects_prompt_url(monkeypatch):
     assert created["load_config"]["prompt_url"] == load_config["prompt_url"]
 
 
+def test_add_client_group_injects_vector_db_url_for_vector_search(monkeypatch):
+    manager = ClientManager()
+    manager._orchestrator_url = "http://orch:9000/"  # type: ignore[attr-defined]
+
+    monkeypatch.setattr("client_manager.client_manager.ClientGroup", lambda *args, **kwargs: None)
+
+    load_config = {
+        "service_id": "qd-7",
+        "workload": "vector_search",
+        "num_clients": 4,
+        "requests_per_second": 100.0,
+    }
+
+    status = manager.add_client_group(43, load_config)
+
+    assert status == ClientManagerResponseStatus.OK
+    assert load_config["vector_db_url"] == "http://orch:9000/api/services/vector-db/qd-7"
+    assert "prompt_url" not in load_config
+
+
+def test_add_client_group_injects_rag_url_for_rag(monkeypatch):
+    manager = ClientManager()
+    manager._orchestrator_url = "http://orch:9000"  # type: ignore[attr-defined]
+
+    monkeypatch.setattr("client_manager.client_manager.ClientGroup", lambda *args, **kwargs: None)
+
+    load_config = {"service_id": "sg-5", "workload": "rag", "num_clients": 1, "requests_per_second": 1.0}
+
+    assert manager.add_client_group(44, load_config) == ClientManagerResponseStatus.OK
+    assert load_config["rag_url"] == "http://orch:9000/api/services/vllm/sg-5/rag"
+
+
 def test_add_client_group_without_orchestrator_keeps_config(monkeypatch):
     manager = ClientManager()
     manager._server_addr = "http://server:8001"  # type: ignore[attr-defined]
@@ -0,0 +1,191 @@
+"""
+Unit tests for the load generator's arrival scheduling and streaming metrics.
+
+The end-to-end tests run against in-process aiohttp servers standing in for
+the orchestrator's prompt endpoint.
+"""
+
+import asyncio
+import json
+import random
+import time
+from itertools import islice
+
+import pytest
+from aiohttp import web
+
+from client import loadgen_template
+from client.loadgen_template import RequestMetrics, inter_arrival_times, open_loop, run_load_test, streaming_summary
+
+
+def test_constant_and_custom_inter_arrival_times():
+    assert list(islice(inter_arrival_times({"arrival_process": "constant", "requests_per_second": 4.0}), 3)) == [0.25] * 3
+
+    custom = list(islice(inter_arrival_times({"arrival_process": "custom", "inter_arrival_seconds": [0.1, 2.0],
+                                              "arrival_seed": 1}), 50))
+    assert set(custom) == {0.1, 2.0}
+
+    with pytest.raises(ValueError, match="inter_arrival_seconds"):
+        inter_arrival_times({"arrival_process": "custom"})
+    with pytest.raises(ValueError, match="Unknown arrival_process"):
+        inter_arrival_times({"arrival_process": "bursty"})
+
+
+def test_poisson_gaps_average_to_target_rate():
+    gaps = list(islice(inter_arrival_times({"requests_per_second": 50.0}, random.Random(3)), 5000))
+
+    assert sum(gaps) / len(gaps) == pytest.approx(1 / 50.0, rel=0.05)
+    assert len(set(gaps)) == len(gaps)
+
+
+def _serve(handler, config):
+    async def run():
+        app = web.Application()
+        app.router.add_post("/api/services/vllm/7/prompt", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            await run_load_test({
+                "prompt_url": f"http://127.0.0.1:{port}/api/services/vllm/7/prompt",
+                "service_id": "7",
+                "trace_sample_ratio": 0.0,
+                **config,
+            })
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_open_loop_keeps_sending_while_responses_are_outstanding(tmp_path):
+    in_flight = {"now": 0, "max": 0}
+    results_file = tmp_path / "results.json"
+
+    async def generate(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.3)
+        in_flight["now"] -= 1
+        return web.json_response({"success": True})
+
+    _serve(generate, {
+        "num_clients": 50,
+        "requests_per_second": 40.0,
+        "duration_seconds": 0.49,
+        "arrival_process": "constant",
+        "results_file": str(results_file),
+    })
+
+    results = json.loads(results_file.read_text())
+    # Arrivals every 25 ms keep going out although each response takes 300 ms
+    assert results["arrivals"]["scheduled"] == 19
+    assert results["total_requests"] == 19 and results["failed"] == 0
+    assert in_flight["max"] >= 10
+    assert min(results["latencies"]) >= 300
+    assert results["arrivals"]["process"] == "constant"
+
+
+def test_send_lag_includes_waiting_for_a_connection(tmp_path):
+    results_file = tmp_path / "results.json"
+
+    async def generate(request):
+        await asyncio.sleep(0.2)
+        return web.json_response({"success": True})
+
+    _serve(generate, {
+        "num_clients": 1,
+        "requests_per_second": 20.0,
+        "duration_seconds": 0.19,
+        "arrival_process": "constant",
+        "results_file": str(results_file),
+    })
+
+    results = json.loads(results_file.read_text())
+    # Three arrivals share one connection: the last leaves after two 200 ms responses
+    assert results["arrivals"]["scheduled"] == 3 and results["failed"] == 0
+    assert results["arrivals"]["max_send_lag_ms"] >= 300
+
+
+
+def test_arrival_seed_reproduces_request_mix(monkeypatch):
+    sent = []
+
+    async def send_request(session, prompt, config, scheduled=None):
+        sent.append(prompt)
+        return RequestMetrics(time.time(), 1.0, 200, True)
+
+    monkeypatch.setattr(loadgen_template, "send_request", send_request)
+    config = {"arrival_process": "constant", "requests_per_second": 200.0, "arrival_seed": 7,
+              "prompts": ["a", "b", "c", "d", "e"], "trace_sample_ratio": 0.0}
+
+    def run(seed):
+        sent.clear()
+        start = time.time()
+        asyncio.run(open_loop(None, {**config, "arrival_seed": seed}, start, start + 0.1, []))
+        return list(sent)
+
+    first = run(7)
+    random.seed(123)  # the global generator must not influence the mix
+
+    assert len(first) >= 10
+    assert run(7) == first
+    assert run(8) != first
+
+
+def test_streaming_summary():
+    results = [
+        RequestMetrics(0, 100.0, 200, True, ttft_ms=20.0, tpot_ms=10.0, itl_ms=[8.0, 12.0],
+                       output_tokens=3, prompt_tokens=5),
+        RequestMetrics(0, 80.0, 200, True, ttft_ms=40.0, itl_ms=[], output_tokens=1),
+        RequestMetrics(0, 5.0, 503, False, "HTTP 503"),
+    ]
+
+    summary = streaming_summary(results, elapsed=2.0)
+
+    assert summary["requests"] == 2
+    assert summary["ttft_ms"]["avg"] == 30.0
+    assert summary["itl_ms"]["p50"] == 12.0
+    assert summary["tpot_ms"]["p99"] == 10.0
+    assert (summary["output_tokens"], summary["output_tokens_per_second"]) == (4, 2.0)
+    assert summary["avg_prompt_tokens"] == 5
+
+
+def test_streamed_generations_are_timed_per_token(tmp_path):
+    requests = []
+    results_file = tmp_path / "results.json"
+
+    async def generate(request):
+        requests.append(await request.json())
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        await asyncio.sleep(0.05)
+        for text in ("Once", " upon", " a time"):
+            await resp.write(f"data: {json.dumps({'choices': [{'text': text}]})}\n\n".encode())
+            await asyncio.sleep(0.02)
+        usage = {"prompt_tokens": 6, "completion_tokens": 4}
+        await resp.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode())
+        await resp.write(f"data: {json.dumps({'result': {'success': True}})}\n\n".encode())
+        await resp.write(b"data: [DONE]\n\n")
+        return resp
+
+    _serve(generate, {
+        "num_clients": 4,
+        "requests_per_second": 20.0,
+        "duration_seconds": 0.19,
+        "arrival_process": "constant",
+        "stream": True,
+        "results_file": str(results_file),
+    })
+
+    results = json.loads(results_file.read_text())
+    streaming = results["streaming"]
+    assert requests[0]["stream"] is True
+    assert results["failed"] == 0 and streaming["requests"] == results["total_requests"] == 3
+    assert streaming["ttft_ms"]["p50"] >= 50
+    assert 15 <= streaming["itl_ms"]["p50"] < 100
+    assert streaming["output_tokens"] == 12
+    # 3 events carried 4 tokens: TPOT spreads the decode time over the 3 tokens after the first
+    assert streaming["tpot_ms"]["p50"] < streaming["itl_ms"]["p50"]
@@ -0,0 +1,112 @@
+"""
+Unit tests for the RAG pipeline benchmark of the load generator.
+
+The end-to-end test runs the benchmark against an in-process aiohttp server
+standing in for the orchestrator's RAG endpoint.
+"""
+
+import asyncio
+import json
+
+from aiohttp import web
+
+from client.benchmark_common import latency_summary
+from client.rag_benchmark import RagMetrics, load_questions, run_rag_benchmark, summarize_top_k
+
+
+def test_questions_come_from_list_file_or_prompts(tmp_path):
+    questions_file = tmp_path / "questions.txt"
+    questions_file.write_text("What is RAG?\n\nWhy retrieve?\n")
+
+    assert load_questions({"rag_benchmark": {"questions": ["Q1"]}}) == ["Q1"]
+    assert load_questions({"rag_benchmark": {"questions_file": str(questions_file)}}) == ["What is RAG?", "Why retrieve?"]
+    assert load_questions({"prompts": ["Hello there"]}) == ["Hello there"]
+
+
+def test_latency_summary_skips_unmeasured_values():
+    assert latency_summary([None, 2.0, 1.0]) == {"avg": 1.5, "p50": 2.0, "p95": 2.0, "p99": 2.0}
+    assert latency_summary([None]) == {"avg": None, "p50": None, "p95": None, "p99": None}
+
+
+def test_summarize_top_k():
+    results = [
+        RagMetrics(0, 110.0, True, 3, 0, rag_enabled=True,
+                   timing={"ttft_ms": 40.0, "total_ms": 100.0, "context_chunks": 3},
+                   prompt_tokens=400, completion_tokens=20),
+        RagMetrics(0, 90.0, True, 3, 1, rag_enabled=False, timing={"total_ms": 80.0},
+                   prompt_tokens=200, completion_tokens=30),
+        RagMetrics(0, 5.0, False, 3, 2, "HTTP 503: busy"),
+    ]
+
+    entry = summarize_top_k(3, results, elapsed=2.0, target_rps=2.0)
+
+    assert (entry["requests"], entry["successful"], entry["failed"], entry["degraded"]) == (3, 2, 1, 1)
+    assert entry["throughput_rps"] == 1.0
+    assert entry["output_tokens_per_second"] == 25.0
+    assert entry["avg_prompt_tokens"] == 300
+    assert entry["avg_context_chunks"] == 1.5
+    assert entry["stages"]["ttft_ms"]["p50"] == 40.0
+    assert entry["stages"]["embed_ms"]["p50"] is None
+    assert entry["stages"]["client_ms"]["avg"] == 100.0
+    assert entry["errors"] == {"HTTP 503: busy": 1}
+
+
+def test_run_rag_benchmark_sweeps_top_k(tmp_path):
+    requests = []
+    results_file = tmp_path / "results.json"
+
+    async def rag(request):
+        data = await request.json()
+        requests.append(data)
+        top_k = data["top_k"]
+        return web.json_response({
+            "success": True,
+            "rag_enabled": True,
+            "usage": {"prompt_tokens": 20 + 100 * top_k, "completion_tokens": 10},
+            "rag_timing": {
+                "embed_ms": 0.5 if top_k else None, "search_ms": 2.0 if top_k else None,
+                "augment_ms": 0.01, "ttft_ms": 10.0 + 5 * top_k, "generation_ms": 50.0,
+                "total_ms": 53.0, "context_chunks": top_k,
+            },
+        })
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/api/services/vllm/7/rag", rag)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            await run_rag_benchmark({
+                "workload": "rag",
+                "rag_url": f"http://127.0.0.1:{port}/api/services/vllm/7/rag",
+                "num_clients": 2,
+                "requests_per_second": 200.0,
+                "max_tokens": 32,
+                "results_file": str(results_file),
+                "rag_benchmark": {
+                    "qdrant_service_id": "qd-1",
+                    "collection": "docs",
+                    "questions": ["What is RAG?", "Why retrieve?"],
+                    "top_k_values": [0, 4],
+                    "requests_per_top_k": 3,
+                },
+            })
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+    results = json.loads(results_file.read_text())
+    sweep = results["rag_benchmark"]["sweep"]
+    assert len(requests) == 6
+    assert requests[0]["measure_ttft"] is True and requests[0]["cache"] is False
+    assert (requests[0]["qdrant_service_id"], requests[0]["collection"], requests[0]["max_tokens"]) == ("qd-1", "docs", 32)
+    assert [entry["top_k"] for entry in sweep] == [0, 4]
+    assert [entry["avg_prompt_tokens"] for entry in sweep] == [20, 420]
+    assert [entry["stages"]["ttft_ms"]["p50"] for entry in sweep] == [10.0, 30.0]
+    assert sweep[0]["stages"]["search_ms"]["p50"] is None
+    assert results["total_requests"] == 6 and results["failed"] == 0
+    assert [r["question"] for r in results["rag_benchmark"]["requests"][:3]] == [0, 1, 0]
@@ -0,0 +1,202 @@
+"""
+Unit tests for the vector database benchmark of the load generator.
+
+The end-to-end test runs the benchmark against a small in-process aiohttp
+server standing in for the orchestrator's vector-db data plane.
+"""
+
+import asyncio
+import json
+import struct
+import time
+from array import array
+
+import pytest
+from aiohttp import web
+
+from client.vector_benchmark import (
+    exact_neighbours,
+    gaussian_clusters,
+    latency_summary,
+    load_dataset,
+    read_vecs,
+    recall_at_k,
+    run_paced,
+    run_vector_benchmark,
+    write_vecs,
+)
+
+
+def test_gaussian_clusters_are_seeded():
+    base, queries = gaussian_clusters(50, 5, 4, clusters=3, seed=7)
+
+    assert len(base) == 50 and len(queries) == 5
+    assert all(len(v) == 4 for v in base + queries)
+    assert gaussian_clusters(50, 5, 4, clusters=3, seed=7) == (base, queries)
+
+
+@pytest.mark.parametrize("distance, expected", [
+    ("Euclid", [[1, 0]]),
+    ("Dot", [[2, 1]]),
+    ("Cosine", [[1, 2]]),
+])
+def test_exact_neighbours(distance, expected):
+    base = [[-1.0, 0.0], [1.0, 0.1], [3.0, 1.0]]
+
+    assert exact_neighbours(base, [[1.0, 0.0]], 2, distance) == expected
+
+
+def test_recall_at_k():
+    assert recall_at_k([1, 2, 3], [3, 2, 9], 3) == pytest.approx(2 / 3)
+    assert recall_at_k([1, 2, 3, 4], [1, 2, 3, 4], 2) == 1.0
+    assert recall_at_k([], [1], 1) == 0.0
+
+
+def test_latency_summary():
+    summary = latency_summary([float(i) for i in range(100, 0, -1)])
+
+    assert summary == {"avg": 50.5, "p50": 51.0, "p95": 96.0, "p99": 100.0}
+    assert latency_summary([])["p50"] is None
+
+
+def test_file_dataset_round_trip(tmp_path):
+    base = [[0.5, -1.0], [2.0, 0.25]]
+    write_vecs(tmp_path / "base.fvecs", base)
+    write_vecs(tmp_path / "gt.ivecs", [[1, 0]], "i")
+    (tmp_path / "queries.json").write_text(json.dumps([[1.0, 1.0]]))
+
+    dataset = load_dataset({
+        "type": "files",
+        "base": str(tmp_path / "base.fvecs"),
+        "queries": str(tmp_path / "queries.json"),
+        "ground_truth": str(tmp_path / "gt.ivecs"),
+    })
+
+    assert read_vecs(tmp_path / "base.fvecs") == base
+    assert (dataset.base, dataset.queries, dataset.ground_truth) == (base, [[1.0, 1.0]], [[1, 0]])
+    assert dataset.dim == 2
+
+
+def test_unknown_dataset_type_is_rejected():
+    with pytest.raises(ValueError, match="Unknown dataset type"):
+        load_dataset({"type": "hdf5"})
+
+
+def test_paced_latency_counts_the_wait_for_a_free_slot():
+    async def send(n, scheduled):
+        await asyncio.sleep(0.05)
+        return (time.perf_counter() - scheduled) * 1000
+
+    # 100/s offered to a single 20/s slot: the fifth request waits behind four others
+    latencies, elapsed = asyncio.run(run_paced(5, 100.0, 1, send))
+
+    assert elapsed >= 0.25
+    assert latencies[0] < latencies[-1]
+    assert latencies[-1] >= 200
+
+
+class FakeVectorDb:
+    """Exact-search Qdrant stand-in; an `hnsw_ef` below 32 drops the best hit."""
+
+    def __init__(self):
+        self.points = []
+        self.search_params = []
+        self.snapshots = 0
+
+    async def create(self, request):
+        self.vector_size = (await request.json())["vector_size"]
+        return web.json_response({"success": True})
+
+    async def bulk(self, request):
+        body = await request.read()
+        _, dim = struct.unpack_from("<4sI", body)
+        values = array("f", body[8:]).tolist()
+        self.points = [values[i:i + dim] for i in range(0, len(values), dim)]
+        return web.json_response({"success": True, "num_points": len(self.points), "points_per_second": 1.0})
+
+    async def snapshot(self, request):
+        self.snapshots += 1
+        return web.json_response({"success": True, "path": "/workspace/qdrant_snapshots/bench/bench-1.snapshot"})
+
+    async def info(self, request):
+        return web.json_response({
+            "success": True, "collection_info": {"status": "green", "points_count": len(self.points)},
+        })
+
+    async def search(self, request):
+        data = await request.json()
+        params = data.get("params") or {}
+        self.search_params.append(params)
+        ids = exact_neighbours(self.points, [data["query_vector"]], data["limit"] + 1, "Cosine")[0]
+        ids = ids[1:] if params.get("hnsw_ef", 1000) < 32 else ids[:-1]
+        return web.json_response({"success": True, "results": [{"id": i, "score": 0.0} for i in ids]})
+
+
+def _run_against(db, results_file, **bench):
+    async def run():
+        app = web.Application()
+        prefix = "/api/services/vector-db/qd-1/collections/bench"
+        app.router.add_put(prefix, db.create)
+        app.router.add_get(prefix, db.info)
+        app.router.add_post(prefix + "/points/bulk", db.bulk)
+        app.router.add_post(prefix + "/snapshots", db.snapshot)
+        app.router.add_post(prefix + "/search", db.search)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            await run_vector_benchmark({
+                "workload": "vector_search",
+                "vector_db_url": f"http://127.0.0.1:{port}/api/services/vector-db/qd-1",
+                "num_clients": 4,
+                "requests_per_second": 500.0,
+                "results_file": str(results_file),
+                "vector_benchmark": {
+                    "collection": "bench",
+                    "dataset": {"type": "synthetic", "num_vectors": 60, "num_queries": 8, "dim": 4},
+                    "k": 5,
+                    "ef_values": [16, 64],
+                    "warmup_queries": 2,
+                    **bench,
+                },
+            })
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    return json.loads(results_file.read_text())
+
+
+def test_run_vector_benchmark_sweeps_ef(tmp_path):
+    db = FakeVectorDb()
+
+    results = _run_against(db, tmp_path / "results.json")
+    bench = results["vector_benchmark"]
+    assert len(db.points) == 60
+    assert bench["ingest"]["num_points"] == 60
+    assert bench["dataset"]["ground_truth"] == "exact_search"
+    assert db.search_params[0] == {"exact": True, "quantization": {"ignore": True}}
+    assert [entry["ef"] for entry in bench["sweep"]] == [16, 64]
+    assert bench["sweep"][0]["recall_at_k"] == pytest.approx(0.8)
+    assert bench["sweep"][1]["recall_at_k"] == 1.0
+    assert all(entry["failed"] == 0 and entry["latency_ms"]["p99"] is not None for entry in bench["sweep"])
+    assert results["total_requests"] == 16
+    assert len(results["latencies"]) == 16
+
+
+def test_snapshotted_collection_is_reused_without_ingest(tmp_path):
+    db = FakeVectorDb()
+    first = _run_against(db, tmp_path / "first.json", snapshot=True, ef_values=[64])
+    async def reject(request):
+        return web.json_response({"success": False, "error": "already loaded"}, status=409)
+
+    db.create = db.bulk = reject
+
+    second = _run_against(db, tmp_path / "second.json", skip_ingest=True, ef_values=[64])
+
+    assert db.snapshots == 1
+    assert first["vector_benchmark"]["ingest"]["snapshot"]["path"].endswith("bench-1.snapshot")
+    assert second["vector_benchmark"]["ingest"]["skipped"] is True
+    assert second["vector_benchmark"]["sweep"][0]["recall_at_k"] == 1.0
@@ -7,15 +7,21 @@ import logging
 import os
 import time
 import threading
-from fastapi import APIRouter, HTTPException, Body, Depends, Query, Request
+from fastapi import APIRouter, HTTPException, Body, Depends, Header, Query, Request
 from typing import List, Dict, Any, Optional, Tuple
 
 from api.schemas import ServiceRequest, ServiceResponse, RecipeResponse
+from orchestrator_proxy import OrchestratorHTTPError
 from service_orchestration.services.inference.vllm_models_config import (
     get_architecture_info,
     search_hf_models,
     get_model_info as get_hf_model_info,
 )
+from service_orchestration.services.vector_db.vector_codec import (
+    BINARY_VECTOR_CONTENT_TYPES,
+    is_binary_vector_content,
+    media_type,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -57,6 +63,9 @@ _SERVICE_TARGETS_CACHE_TTL_SECONDS = float(
 )
 _SERVICE_TARGETS_CACHE: Optional[Tuple[float, List[Dict[str, Any]]]] = None
 
+# Bulk vector uploads are kept in memory up to this size, then spooled to disk
+_BULK_SPOOL_MAX_MEMORY = int(os.environ.get("BULK_SPOOL_MAX_MEMORY_BYTES", str(64 * 1024 * 1024)))
+
 
 def _clear_service_metrics_cache() -> None:
     """Test helper to reset cached metrics between test cases."""
@@ -683,6 +692,22 @@ async def get_service_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/services/{service_id}/stats")
+async def get_service_stats(
+    service_id: str,
+    window_seconds: Optional[float] = None,
+    orchestrator=Depends(get_orchestrator_proxy),
+):
+    """**[Proxy]** Get orchestrator-observed request statistics (p50/p95/p99 latency, tokens, errors).
+    
+    This endpoint proxies to the orchestrator's request statistics API.
+    
+    For detailed documentation and the response format, see the orchestrator API documentation at:
+    **GET /api/services/{service_id}/stats** on the orchestrator service.
+    """
+    return orchestrator.get_service_stats(service_id, window_seconds=window_seconds)
+
+
 @router.delete("/services/{service_id}")
 async def stop_service(service_id: str, orchestrator = Depends(get_orchestrator_proxy)):
     """**[Proxy]** DEPRECATED - Stop a service (use POST /services/{service_id}/status instead).
@@ -1217,6 +1242,15 @@ async def create_collection(
         "euclidean": {
             "summary": "Create collection with Euclidean distance",
             "value": {"vector_size": 768, "distance": "Euclid"}
+        },
+        "tuned": {
+            "summary": "Create collection with HNSW, quantization and payload index settings",
+            "value": {
+                "vector_size": 768,
+                "hnsw_config": {"m": 32, "ef_construct": 200},
+                "quantization": {"type": "scalar", "quantile": 0.99},
+                "payload_indexes": {"category": "keyword"}
+            }
         }
     }),
     orchestrator = Depends(get_orchestrator_proxy)
@@ -1234,7 +1268,11 @@ async def create_collection(
             raise HTTPException(status_code=400, detail="vector_size is required")
         
         distance = request.get("distance", "Cosine")
-        result = orchestrator.create_collection(service_id, collection_name, vector_size, distance)
+        tuning = {
+            key: request[key] for key in ("hnsw_config", "quantization", "on_disk", "payload_indexes")
+            if request.get(key) is not None
+        }
+        result = orchestrator.create_collection(service_id, collection_name, vector_size, distance, **tuning)
         return result
     except HTTPException:
         raise
@@ -1242,6 +1280,59 @@ async def create_collection(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.patch("/vector-db/{service_id}/collections/{collection_name}")
+async def update_collection(
+    service_id: str,
+    collection_name: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "hnsw": {
+            "summary": "Rebuild the HNSW graph with more links",
+            "value": {"hnsw_config": {"m": 48, "ef_construct": 256}}
+        },
+        "quantization": {
+            "summary": "Switch to binary quantization",
+            "value": {"quantization": {"type": "binary", "always_ram": True}}
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Change the index, quantization or storage settings of an existing collection.
+    
+    For the accepted settings, see the orchestrator API documentation at:
+    **PATCH /api/vector-db/{service_id}/collections/{collection_name}** on the orchestrator service.
+    """
+    try:
+        return orchestrator.update_collection(service_id, collection_name, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/vector-db/{service_id}/collections/{collection_name}/index")
+async def create_payload_index(
+    service_id: str,
+    collection_name: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "keyword": {
+            "summary": "Index a keyword field",
+            "value": {"field_name": "category", "field_schema": "keyword"}
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Index a payload field so filtered searches do not scan payloads.
+    
+    See **PUT /api/vector-db/{service_id}/collections/{collection_name}/index** on the orchestrator service.
+    """
+    field_name = request.get("field_name")
+    field_schema = request.get("field_schema")
+    if not field_name or not field_schema:
+        raise HTTPException(status_code=400, detail="field_name and field_schema are required")
+    try:
+        return orchestrator.create_payload_index(service_id, collection_name, field_name, field_schema)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/vector-db/{service_id}/collections/{collection_name}")
 async def delete_collection(
     service_id: str,
@@ -1262,6 +1353,63 @@ async def delete_collection(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/vector-db/{service_id}/collections/{collection_name}/snapshots")
+async def create_snapshot(
+    service_id: str,
+    collection_name: str,
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Snapshot a collection to the shared workspace.
+    
+    Later Qdrant services started with `QDRANT_RESTORE_SNAPSHOTS=<collection>` restore the
+    collection at startup instead of re-ingesting it.
+    
+    See **POST /api/vector-db/{service_id}/collections/{collection_name}/snapshots** on the orchestrator service.
+    """
+    try:
+        return await asyncio.to_thread(orchestrator.create_snapshot, service_id, collection_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/vector-db/{service_id}/collections/{collection_name}/snapshots")
+async def list_snapshots(
+    service_id: str,
+    collection_name: str,
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** List the snapshots of a collection."""
+    try:
+        return orchestrator.list_snapshots(service_id, collection_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/vector-db/{service_id}/collections/{collection_name}/snapshots/recover")
+async def recover_snapshot(
+    service_id: str,
+    collection_name: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "snapshot": {
+            "summary": "Restore a snapshot on a running service",
+            "value": {"snapshot": "bench-2026-10-18-09-12-44.snapshot"}
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Replace a collection with one of its snapshots.
+    
+    See **PUT /api/vector-db/{service_id}/collections/{collection_name}/snapshots/recover** on the orchestrator service.
+    """
+    snapshot = request.get("snapshot")
+    if not snapshot:
+        raise HTTPException(status_code=400, detail="snapshot is required")
+    try:
+        return await asyncio.to_thread(orchestrator.recover_snapshot, service_id, collection_name, snapshot)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/vector-db/{service_id}/collections/{collection_name}/points")
 async def upsert_points(
     service_id: str,
@@ -1311,6 +1459,55 @@ async def upsert_points(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/vector-db/{service_id}/collections/{collection_name}/points/bulk")
+async def bulk_upsert_points(
+    service_id: str,
+    collection_name: str,
+    request: Request,
+    batch_size: int = Query(512, ge=1, le=10000, description="Points per upsert request"),
+    parallelism: int = Query(4, ge=1, le=64, description="Concurrent upsert requests"),
+    timeout: int = Query(60, ge=1, description="Per-batch timeout in seconds"),
+    id_offset: int = Query(0, ge=0, description="ID of the first vector of a binary body"),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Bulk-load points from an NDJSON body (one `{"id", "vector", "payload"}` object per line).
+    
+    Vectors without payloads can be sent about 10x smaller as `application/x-float32-vectors`
+    or `application/x-npy` (e.g. `np.save`), with IDs counting up from `id_offset`.
+    
+    The upload is spooled to disk on the gateway and streamed to the orchestrator in a
+    single request; the orchestrator upserts it in parallel batches next to Qdrant, so the
+    SSH tunnel carries each point once instead of one request per batch.
+    
+    ```bash
+    curl -X POST -H "Content-Type: application/x-ndjson" --data-binary @corpus.ndjson \
+      "http://localhost:8001/api/v1/vector-db/3642875/collections/corpus/points/bulk?batch_size=1000"
+    ```
+    
+    For the response format and ingestion metrics, see
+    **POST /api/services/vector-db/{service_id}/collections/{collection_name}/points/bulk** on the orchestrator service.
+    """
+    import tempfile
+
+    with tempfile.SpooledTemporaryFile(max_size=_BULK_SPOOL_MAX_MEMORY) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        if not spool.tell():
+            raise HTTPException(status_code=400, detail="Request body must contain NDJSON points or vectors")
+        spool.seek(0)
+        params = {"batch_size": batch_size, "parallelism": parallelism, "timeout": timeout}
+        content_type = request.headers.get("content-type", "")
+        if is_binary_vector_content(content_type):
+            params["id_offset"] = id_offset
+            args = (service_id, collection_name, spool, params, media_type(content_type))
+        else:
+            args = (service_id, collection_name, spool, params)
+        try:
+            return await asyncio.to_thread(orchestrator.bulk_upsert_points, *args)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/vector-db/{service_id}/collections/{collection_name}/points/search")
 async def search_points(
     service_id: str,
@@ -1339,7 +1536,8 @@ async def search_points(
             raise HTTPException(status_code=400, detail="query_vector must be a non-empty list")
         
         limit = request.get("limit", 10)
-        result = orchestrator.search_points(service_id, collection_name, query_vector, limit)
+        search_params = {key: request[key] for key in ("ef", "exact", "params") if request.get(key) is not None}
+        result = orchestrator.search_points(service_id, collection_name, query_vector, limit, **search_params)
         return result
     except HTTPException:
         raise
@@ -1347,6 +1545,124 @@ async def search_points(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/vector-db/{service_id}/collections/{collection_name}/points/search/text")
+async def search_with_text(
+    service_id: str,
+    collection_name: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "basic": {
+            "summary": "Text similarity search",
+            "value": {"query_text": "How do I reset my password?", "limit": 3}
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Search a collection with a text query, embedded on the orchestrator.
+    
+    This endpoint proxies to the orchestrator's text search API (the retrieval step of RAG).
+    
+    For the embedder configuration and the per-stage timing fields, see the orchestrator API documentation at:
+    **POST /api/vector-db/{service_id}/collections/{collection_name}/search/text** on the orchestrator service.
+    """
+    try:
+        query_text = request.get("query_text")
+        if not query_text or not isinstance(query_text, str):
+            raise HTTPException(status_code=400, detail="query_text must be a non-empty string")
+        
+        return await asyncio.to_thread(
+            orchestrator.search_with_text, service_id, collection_name, query_text,
+            request.get("limit", 10), request.get("timeout", 10)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/vector-db/{service_id}/collections/{collection_name}/points/search/batch")
+async def search_points_batch(
+    service_id: str,
+    collection_name: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "shared": {
+            "summary": "Several queries with shared parameters",
+            "value": {
+                "query_vectors": [[0.1, 0.2, 0.3, 0.4], [0.4, 0.3, 0.2, 0.1]],
+                "limit": 5
+            }
+        },
+        "per_query": {
+            "summary": "Per-query limits and filters",
+            "value": {
+                "searches": [
+                    {"vector": [0.1, 0.2, 0.3, 0.4], "limit": 3},
+                    {"vector": [0.4, 0.3, 0.2, 0.1], "filter": {"must": [{"key": "category", "match": {"value": "docs"}}]},
+                     "ef": 256}
+                ]
+            }
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Run many similarity searches in one call.
+    
+    This endpoint proxies to the orchestrator's batch search API, which maps to Qdrant's
+    `points/search/batch`. Results are returned per query, in request order, with batch timing.
+    
+    For detailed documentation, see the orchestrator API documentation at:
+    **POST /api/vector-db/{service_id}/collections/{collection_name}/search/batch** on the orchestrator service.
+    """
+    try:
+        searches = request.get("searches")
+        if searches is None:
+            searches = [{"vector": vector} for vector in request.get("query_vectors") or []]
+        if not searches or not isinstance(searches, list):
+            raise HTTPException(status_code=400, detail="query_vectors or searches must be a non-empty list")
+        # Shared filter and search params, applied by the orchestrator to searches without their own
+        search_params = {key: request[key] for key in ("filter", "ef", "exact", "params") if request.get(key) is not None}
+        
+        return await asyncio.to_thread(
+            orchestrator.search_points_batch, service_id, collection_name, searches,
+            request.get("limit", 10), request.get("timeout", 30), **search_params
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/vector-db/{service_id}/collections/{collection_name}/points/search/binary")
+async def search_points_binary(
+    service_id: str,
+    collection_name: str,
+    request: Request,
+    limit: int = Query(10, ge=1, description="Maximum number of results"),
+    timeout: int = Query(10, ge=1, description="Request timeout in seconds"),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Search with the query vector sent as a binary body instead of a JSON list.
+    
+    The body is one vector as `application/x-float32-vectors` (`VF32`, dimension as
+    little-endian uint32, then little-endian float32 values) or `application/x-npy`.
+    It is forwarded to the orchestrator without being decoded on the gateway.
+    
+    For the response format, see
+    **POST /api/vector-db/{service_id}/collections/{collection_name}/search** on the orchestrator service.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not is_binary_vector_content(content_type):
+        raise HTTPException(status_code=415, detail=f"Content-Type must be one of {', '.join(BINARY_VECTOR_CONTENT_TYPES)}")
+    body = await request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Request body must contain the query vector")
+    try:
+        return await asyncio.to_thread(
+            orchestrator.search_points_binary, service_id, collection_name, body, media_type(content_type), limit, timeout
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/orchestrator/endpoint")
 async def get_orchestrator_endpoint(orchestrator = Depends(get_orchestrator_proxy)):
     """Get the internal endpoint of the orchestrator service.
@@ -1367,6 +1683,75 @@ async def get_orchestrator_endpoint(orchestrator = Depends(get_orchestrator_prox
     return {"endpoint": endpoint}
 
 
+@router.get("/orchestrator/metrics")
+async def get_orchestrator_prometheus_metrics(orchestrator = Depends(get_orchestrator_proxy)):
+    """**[Proxy]** Get the orchestrator's own performance metrics in Prometheus format.
+    
+    Combines the orchestrator's self-instrumentation (per-stage latencies of the
+    prompt, metrics and health paths, endpoint resolution, SLURM REST calls,
+    API handler latencies and event-loop lag) with the gateway's view of the
+    calls it proxies (`orchestrator_proxy_request_duration_seconds`, split into
+    `remote` handler time and `tunnel` overhead).
+    
+    For the orchestrator side, see **GET /api/metrics/prometheus** on the orchestrator service.
+    """
+    from fastapi.responses import PlainTextResponse
+    from orchestrator_proxy import PROXY_METRICS
+
+    try:
+        orchestrator_text = orchestrator.get_prometheus_metrics()
+    except Exception as e:
+        logger.warning(f"Failed to fetch orchestrator self-metrics: {e}")
+        orchestrator_text = ""
+    if orchestrator_text and not orchestrator_text.endswith("\n"):
+        orchestrator_text += "\n"
+    return PlainTextResponse(
+        content=orchestrator_text + PROXY_METRICS.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/orchestrator/profile/{kind}")
+async def get_orchestrator_profile(
+    kind: str,
+    seconds: float = Query(10.0, gt=0, le=60, description="Profiling window in seconds"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="CPU sampling interval (cpu only)"),
+    x_profiling_token: Optional[str] = Header(None),
+    orchestrator = Depends(get_orchestrator_proxy),
+):
+    """**[Proxy]** Capture a CPU or memory profile of the orchestrator process.
+    
+    `kind` is `cpu` (sampled thread stacks, weight = samples) or `memory`
+    (tracemalloc allocations, weight = bytes). The response is a folded-stack
+    file for flamegraph.pl, speedscope or Grafana's flame graph panel.
+    
+    Profiling must be enabled on the orchestrator (`PROFILING_ENABLED=true`) and
+    the `X-Profiling-Token` header must match its `PROFILING_TOKEN`; it is
+    forwarded as-is. The gateway's own process is profiled via
+    **GET /api/v1/admin/profile/{kind}**.
+    """
+    from fastapi.responses import PlainTextResponse
+
+    if kind not in ("cpu", "memory"):
+        raise HTTPException(status_code=404, detail=f"Unknown profile kind '{kind}' (use 'cpu' or 'memory')")
+    params = {"seconds": seconds}
+    if kind == "cpu":
+        params["interval_ms"] = interval_ms
+    try:
+        folded = await asyncio.to_thread(orchestrator.get_profile, kind, params, x_profiling_token)
+    except OrchestratorHTTPError as e:
+        # Disabled (404), bad token (403) or a profile already running (409)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logger.error(f"Failed to profile orchestrator: {e}")
+        raise HTTPException(status_code=502, detail=str(e))
+    filename = f"orchestrator-{kind}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    return PlainTextResponse(
+        content=folded,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post("/vllm/{service_id}/prompt", summary="Send a prompt to a running vLLM service")
 async def prompt_vllm_service(
     service_id: str,
@@ -1412,6 +1797,44 @@ async def prompt_vllm_service(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/vllm/{service_id}/rag", summary="Answer a prompt with retrieval-augmented generation")
+async def rag_prompt_vllm_service(
+    service_id: str,
+    request: Dict[str, Any] = Body(..., examples={
+        "rag": {
+            "summary": "RAG prompt with per-stage timing",
+            "value": {
+                "prompt": "How do I reset my password?",
+                "qdrant_service_id": "3732801",
+                "collection": "docs",
+                "top_k": 3,
+                "max_tokens": 128,
+                "measure_ttft": True
+            }
+        }
+    }),
+    orchestrator = Depends(get_orchestrator_proxy)
+):
+    """**[Proxy]** Retrieve context from a Qdrant collection and send the augmented prompt to vLLM.
+    
+    The response carries `rag_timing` (embed, search, augment, TTFT, generation and total milliseconds).
+    
+    For detailed documentation, see the orchestrator API documentation at:
+    **POST /api/services/vllm/{service_id}/rag** on the orchestrator service.
+    """
+    prompt = request.get("prompt")
+    if not prompt or not request.get("qdrant_service_id") or not request.get("collection"):
+        raise HTTPException(status_code=400, detail="prompt, qdrant_service_id and collection are required")
+    kwargs = {k: v for k, v in request.items() if k not in ("prompt", "qdrant_service_id", "collection")}
+    try:
+        return await asyncio.to_thread(
+            orchestrator.rag_prompt_vllm_service, service_id, prompt,
+            request["qdrant_service_id"], request["collection"], **kwargs
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/vllm/{service_id}/models")
 async def get_vllm_models(service_id: str, orchestrator = Depends(get_orchestrator_proxy)):
     """**[Proxy]** Get the list of models served by a running vLLM service.
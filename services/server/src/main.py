@@ -13,13 +13,15 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Clean package imports
 from api.routes import router, set_orchestrator_proxy, start_batch_metrics_fetcher, stop_batch_metrics_fetcher
 from api.orchestrator_routes import router as orchestrator_router, set_orchestrator_control_functions
 from logging_setup import setup_logging
+from service_orchestration.api.routes.admin import create_profiling_router
+from service_orchestration.tracing import TRACEPARENT_HEADER, TRACER
 from orchestrator_initializer import (
     initialize_orchestrator_proxy,
     load_orchestrator_settings,
@@ -396,6 +398,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Export gateway spans as "server"; TRACING_* variables configure sampling and the collector
+TRACER.configure(service_name="server")
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Continue the caller's trace (W3C traceparent) or start one, and echo it back."""
+    with TRACER.start_trace(
+        f"{request.method} {request.url.path}", traceparent=request.headers.get(TRACEPARENT_HEADER),
+        attributes={"http.method": request.method, "http.target": request.url.path},
+    ) as span:
+        response = await call_next(request)
+        context = TRACER.current_context()
+        if span is not None:
+            route = getattr(request.scope.get("route"), "path", request.url.path)
+            span.name = f"{request.method} {route}"
+            span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", response.status_code)
+    if context is not None:
+        response.headers[TRACEPARENT_HEADER] = context.to_traceparent()
+    return response
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -461,6 +485,8 @@ async def ready():
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 app.include_router(orchestrator_router, prefix="/api/v1")
+# On-demand profiling of the gateway process itself (disabled unless PROFILING_ENABLED=true)
+app.include_router(create_profiling_router("server"), prefix="/api/v1/admin", tags=["Admin"])
 
 @app.on_event("startup")
 async def on_startup():
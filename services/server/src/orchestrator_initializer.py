@@ -234,7 +234,10 @@ def submit_orchestrator_job(ssh_manager, remote_base_path: str, settings: Orches
                     "PATH": "/bin:/usr/bin:/usr/local/bin",
                     "USER": ssh_manager.ssh_user,
                     "BASH_ENV": "/etc/profile",
-                    "LOG_LEVEL": os.environ.get("LOG_LEVEL")
+                    "LOG_LEVEL": os.environ.get("LOG_LEVEL"),
+                    # On-demand profiling endpoints share the gateway's switch and token
+                    "PROFILING_ENABLED": os.environ.get("PROFILING_ENABLED", "false"),
+                    "PROFILING_TOKEN": os.environ.get("PROFILING_TOKEN", "")
                 }
             },
             "script": script_content
@@ -5,11 +5,38 @@ Server communicates with it via SSH API calls.
 
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from typing import IO, Dict, Any, Optional, List
+from service_orchestration.instrumentation import Histogram, Registry, normalize_path
+from service_orchestration.profiling import PROFILING_TOKEN_HEADER
+from service_orchestration.tracing import TRACER
 from ssh_manager import SSHManager
 
 logger = logging.getLogger(__name__)
 
+# Gateway-side timing of orchestrator calls: "total" as seen by the gateway,
+# "remote" as reported by the orchestrator (Server-Timing) and "tunnel", the
+# difference (SSH/SOCKS transport and serialization).
+PROXY_METRICS = Registry()
+PROXY_REQUEST_SECONDS = PROXY_METRICS.register(Histogram(
+    "orchestrator_proxy_request_duration_seconds",
+    "Gateway-observed latency of orchestrator API calls, split into remote handler time and tunnel overhead.",
+    ("method", "endpoint", "segment"),
+))
+
+# Bulk ingest uploads can run for a long time; requests applies the timeout to
+# each connect/read rather than to the whole call, so this bounds a stalled
+# tunnel or an orchestrator that stops answering, not the upload itself.
+BULK_INGEST_TIMEOUT = 3600
+
+
+class OrchestratorHTTPError(RuntimeError):
+    """The orchestrator answered with an HTTP error status (its ``detail`` is kept for the caller)."""
+
+    def __init__(self, status_code: int, detail: Any):
+        self.status_code = status_code
+        self.detail = detail.get("detail", detail) if isinstance(detail, dict) else detail
+        super().__init__(f"SSH HTTP request failed: {detail if detail else 'No error details'}")
+
 
 class OrchestratorProxy:
     """
@@ -46,7 +73,7 @@ class OrchestratorProxy:
         
         # Build the full path with query parameters for GET requests
         full_path = endpoint
-        if method == "GET" and kwargs.get("params"):
+        if kwargs.get("params") and (method == "GET" or kwargs.get("data") is not None):
             query_string = urlencode(kwargs["params"])
             full_path = f"{endpoint}?{query_string}"
         
@@ -64,20 +91,29 @@ class OrchestratorProxy:
 
                 # Only send json_data for non-GET methods
                 json_data = None
-                if method != "GET":
+                if method != "GET" and kwargs.get("data") is None:
                     json_data = kwargs.get("json") or kwargs.get("params")
 
-                success, status, body = self.ssh_manager.http_request_via_ssh(
-                    remote_host=host,
-                    remote_port=port,
-                    method=method,
-                    path=full_path,
-                    headers=kwargs.get("headers"),
-                    json_data=json_data,
-                    timeout=kwargs.get("timeout", 30),
-                    json_body=kwargs.get("json_body"),
-                )
+                timing: Dict[str, float] = {}
+                with TRACER.span(f"orchestrator {method} {normalize_path(endpoint)}", kind="client",
+                                 attributes={"attempt": attempt}) as span:
+                    success, status, body = self.ssh_manager.http_request_via_ssh(
+                        remote_host=host,
+                        remote_port=port,
+                        method=method,
+                        path=full_path,
+                        headers=TRACER.inject(kwargs.get("headers")),
+                        json_data=json_data,
+                        timeout=kwargs.get("timeout", 30),
+                        json_body=kwargs.get("json_body"),
+                        timing=timing,
+                        data=kwargs.get("data"),
+                    )
+                    if span is not None:
+                        span.set_attribute("http.status_code", status)
+                        span.set_attribute("tunnel_ms", round((timing.get("total_s", 0.0) - timing.get("remote_s", 0.0)) * 1000, 3))
                 logger.debug(f"Got return code={status} body={body}")
+                self._record_timing(method, endpoint, timing)
 
                 if not success:
                     logger.error(
@@ -92,6 +128,8 @@ class OrchestratorProxy:
                         logger.warning("Transient SSH failure detected, retrying orchestrator request...")
                         continue
 
+                    if status:
+                        raise OrchestratorHTTPError(status, body)
                     raise RuntimeError(
                         f"SSH HTTP request failed: {body if body else 'No error details'}"
                     )
@@ -125,6 +163,19 @@ class OrchestratorProxy:
                 # error at the HTTP layer instead of an opaque 500.
                 logger.error(f"Request to orchestrator failed: {e}")
                 raise
+
+    @staticmethod
+    def _record_timing(method: str, endpoint: str, timing: Dict[str, float]) -> None:
+        """Record total/remote/tunnel time of one orchestrator call (no-op if the request failed)."""
+        total = timing.get("total_s")
+        if total is None:
+            return
+        labels = {"method": method, "endpoint": normalize_path(endpoint)}
+        PROXY_REQUEST_SECONDS.observe(total, segment="total", **labels)
+        remote = timing.get("remote_s")
+        if remote is not None:
+            PROXY_REQUEST_SECONDS.observe(remote, segment="remote", **labels)
+            PROXY_REQUEST_SECONDS.observe(max(0.0, total - remote), segment="tunnel", **labels)
     
     def register_service(self, service_id: str, host: str, port: int, model: str) -> Dict[str, Any]:
         """Register a vLLM service with the orchestrator"""
@@ -146,7 +197,21 @@ class OrchestratorProxy:
     def get_metrics(self) -> Dict[str, Any]:
         """Get orchestrator metrics"""
         return self._make_request("GET", "/api/metrics", json_body=False)
+
+    def get_prometheus_metrics(self) -> str:
+        """Get the orchestrator's self-instrumentation in Prometheus text format"""
+        body = self._make_request("GET", "/api/metrics/prometheus", json_body=False)
+        return body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body)
     
+    def get_profile(self, kind: str, params: Dict[str, Any], token: Optional[str]) -> bytes:
+        """Capture a CPU or memory profile of the orchestrator process (folded stacks)"""
+        headers = {PROFILING_TOKEN_HEADER: token} if token else None
+        body = self._make_request(
+            "GET", f"/api/admin/profile/{kind}", params=params, headers=headers,
+            json_body=False, timeout=params.get("seconds", 10) + 30, _retries=0,
+        )
+        return body if isinstance(body, bytes) else str(body).encode("utf-8")
+
     def configure_load_balancer(self, strategy: str) -> Dict[str, Any]:
         """Configure load balancing strategy"""
         return self._make_request("POST", "/api/configure", params={"strategy": strategy})
@@ -260,6 +325,13 @@ class OrchestratorProxy:
         data = {"prompt": prompt, **kwargs}
         return self._make_request("POST", f"/api/services/vllm/{service_id}/prompt", json=data)
 
+    def rag_prompt_vllm_service(self, service_id: str, prompt: str, qdrant_service_id: str,
+                                collection: str, top_k: int = 3, **kwargs) -> Dict[str, Any]:
+        """Answer a prompt with context retrieved from a Qdrant collection"""
+        data = {"prompt": prompt, "qdrant_service_id": qdrant_service_id,
+                "collection": collection, "top_k": top_k, **kwargs}
+        return self._make_request("POST", f"/api/services/vllm/{service_id}/rag", json=data)
+
     # ===== Data Plane Operations (Vector DB) =====
 
     def find_vector_db_services(self) -> List[Dict[str, Any]]:
@@ -274,25 +346,87 @@ class OrchestratorProxy:
         """Get collection info"""
         return self._make_request("GET", f"/api/services/vector-db/{service_id}/collections/{collection_name}", params={"timeout": timeout})
 
-    def create_collection(self, service_id: str, collection_name: str, vector_size: int, distance: str = "Cosine", timeout: int = 10) -> Dict[str, Any]:
-        """Create a collection"""
-        data = {"vector_size": vector_size, "distance": distance, "timeout": timeout}
+    def create_collection(self, service_id: str, collection_name: str, vector_size: int, distance: str = "Cosine", timeout: int = 10,
+                          **tuning) -> Dict[str, Any]:
+        """Create a collection (tuning: hnsw_config, quantization, on_disk, payload_indexes)"""
+        data = {"vector_size": vector_size, "distance": distance, "timeout": timeout, **tuning}
         return self._make_request("PUT", f"/api/services/vector-db/{service_id}/collections/{collection_name}", json=data)
 
+    def update_collection(self, service_id: str, collection_name: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Change a collection's hnsw_config, quantization, on_disk or optimizers_config"""
+        return self._make_request("PATCH", f"/api/services/vector-db/{service_id}/collections/{collection_name}", json=settings)
+
+    def create_payload_index(self, service_id: str, collection_name: str, field_name: str, field_schema: str) -> Dict[str, Any]:
+        """Index a payload field"""
+        data = {"field_name": field_name, "field_schema": field_schema}
+        return self._make_request("PUT", f"/api/services/vector-db/{service_id}/collections/{collection_name}/index", json=data)
+
     def delete_collection(self, service_id: str, collection_name: str, timeout: int = 10) -> Dict[str, Any]:
         """Delete a collection"""
         return self._make_request("DELETE", f"/api/services/vector-db/{service_id}/collections/{collection_name}", params={"timeout": timeout})
 
+    def create_snapshot(self, service_id: str, collection_name: str) -> Dict[str, Any]:
+        """Snapshot a collection to the shared workspace"""
+        return self._make_request("POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/snapshots",
+                                  timeout=600, _retries=0)
+
+    def list_snapshots(self, service_id: str, collection_name: str) -> Dict[str, Any]:
+        """List the snapshots of a collection"""
+        return self._make_request("GET", f"/api/services/vector-db/{service_id}/collections/{collection_name}/snapshots")
+
+    def recover_snapshot(self, service_id: str, collection_name: str, snapshot: str) -> Dict[str, Any]:
+        """Replace a collection with one of its snapshots"""
+        return self._make_request("PUT", f"/api/services/vector-db/{service_id}/collections/{collection_name}/snapshots/recover",
+                                  json={"snapshot": snapshot}, timeout=600, _retries=0)
+
     def upsert_points(self, service_id: str, collection_name: str, points: List[Dict[str, Any]], timeout: int = 30) -> Dict[str, Any]:
         """Upsert points to a collection"""
         data = {"points": points, "timeout": timeout}
         return self._make_request("PUT", f"/api/services/vector-db/{service_id}/collections/{collection_name}/points", json=data)
 
-    def search_points(self, service_id: str, collection_name: str, query_vector: List[float], limit: int = 10, timeout: int = 10) -> Dict[str, Any]:
-        """Search for similar points"""
-        data = {"query_vector": query_vector, "limit": limit, "timeout": timeout}
+    def bulk_upsert_points(self, service_id: str, collection_name: str, body: IO[bytes],
+                           params: Dict[str, Any], content_type: str = "application/x-ndjson") -> Dict[str, Any]:
+        """Stream an NDJSON (or binary vector) file of points to the orchestrator's bulk ingestion endpoint"""
+        body_text = self._make_request(
+            "POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/points/bulk",
+            params=params, data=body, headers={"Content-Type": content_type},
+            json_body=True, timeout=BULK_INGEST_TIMEOUT, _retries=0,
+        )
+        if isinstance(body_text, (bytes, str)):
+            return json.loads(body_text)
+        return body_text
+
+    def search_points(self, service_id: str, collection_name: str, query_vector: List[float], limit: int = 10, timeout: int = 10,
+                      **search_params) -> Dict[str, Any]:
+        """Search for similar points (search_params: ef, exact or params)"""
+        data = {"query_vector": query_vector, "limit": limit, "timeout": timeout, **search_params}
         return self._make_request("POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/search", json=data)
 
+    def search_with_text(self, service_id: str, collection_name: str, query_text: str,
+                         limit: int = 10, timeout: int = 10) -> Dict[str, Any]:
+        """Search with a text query embedded by the orchestrator"""
+        data = {"query_text": query_text, "limit": limit, "timeout": timeout}
+        return self._make_request("POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/search/text", json=data)
+
+    def search_points_batch(self, service_id: str, collection_name: str, searches: List[Dict[str, Any]],
+                            limit: int = 10, timeout: int = 30, **search_params) -> Dict[str, Any]:
+        """Run many searches in one call (each search has a vector and optional limit/filter/ef/exact/params;
+        search_params: shared filter, ef, exact or params)"""
+        data = {"searches": searches, "limit": limit, "timeout": timeout, **search_params}
+        return self._make_request("POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/search/batch", json=data, timeout=timeout + 10)
+
+    def search_points_binary(self, service_id: str, collection_name: str, body: bytes, content_type: str,
+                             limit: int = 10, timeout: int = 10) -> Dict[str, Any]:
+        """Search with a query vector sent as a binary vector body (forwarded unparsed)"""
+        body_text = self._make_request(
+            "POST", f"/api/services/vector-db/{service_id}/collections/{collection_name}/search",
+            params={"limit": limit, "timeout": timeout}, data=body, headers={"Content-Type": content_type},
+            json_body=True,
+        )
+        if isinstance(body_text, (bytes, str)):
+            return json.loads(body_text)
+        return body_text
+
     def get_service_metrics(self, service_id: str, timeout: int = 10) -> Dict[str, Any]:
         """Get metrics from any service (auto-detects service type).
         
@@ -324,6 +458,11 @@ class OrchestratorProxy:
             _retries=3,
         )
 
+    def get_service_stats(self, service_id: str, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Get orchestrator-observed request statistics for a service"""
+        params = {"window_seconds": window_seconds} if window_seconds else None
+        return self._make_request("GET", f"/api/services/{service_id}/stats", params=params)
+
     def get_batch_metrics(self, service_ids: List[str], timeout: int = 5) -> Dict[str, Dict[str, Any]]:
         """Get metrics for multiple services in a single request.
         
@@ -2,12 +2,27 @@
 Main FastAPI application factory for ServiceOrchestrator
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 import logging
+import time
+
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
+from service_orchestration.tracing import TRACEPARENT_HEADER, TRACER
 
 logger = logging.getLogger(__name__)
 
 
+def _route_label(request: Request) -> str:
+    """Path template of the matched route (e.g. ``/api/services/{service_id}/stats``), bounded in cardinality."""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Recent FastAPI versions keep included routes un-prefixed and record the include separately
+    included = (request.scope.get("fastapi") or {}).get("included_router")
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "") or ""
+    return prefix + route.path
+
+
 def create_app(orchestrator) -> FastAPI:
     """
     Create and configure the FastAPI application
@@ -35,8 +50,27 @@ def create_app(orchestrator) -> FastAPI:
         await orchestrator.stop()
         logger.info("ServiceOrchestrator stopped")
     
+    @app.middleware("http")
+    async def time_requests(request: Request, call_next):
+        """Time and trace each request; report handler time to the gateway via Server-Timing."""
+        start = time.perf_counter()
+        with TRACER.start_trace(
+            f"{request.method} {request.url.path}", traceparent=request.headers.get(TRACEPARENT_HEADER),
+            attributes={"http.method": request.method, "http.target": request.url.path},
+        ) as span:
+            response = await call_next(request)
+            route = _route_label(request)
+            if span is not None:
+                span.name = f"{request.method} {route}"
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", response.status_code)
+        elapsed = time.perf_counter() - start
+        ORCHESTRATOR_METRICS.http_seconds.observe(elapsed, method=request.method, route=route)
+        response.headers["Server-Timing"] = f"orchestrator;dur={elapsed * 1000:.3f}"
+        return response
+    
     # Register route modules
-    from .routes import management, jobs, services, service_groups, recipes, data_plane, client
+    from .routes import management, jobs, services, service_groups, recipes, data_plane, client, admin
     
     app.include_router(management.create_router(orchestrator), prefix="/api", tags=["Management"])
     app.include_router(jobs.create_router(orchestrator), prefix="/api/jobs", tags=["Jobs"])
@@ -47,5 +81,6 @@ def create_app(orchestrator) -> FastAPI:
     app.include_router(service_groups.create_router(orchestrator), prefix="/api/service-groups", tags=["Service Groups"])
     app.include_router(recipes.create_router(orchestrator), prefix="/api/recipes", tags=["Recipes"])
     app.include_router(client.create_router(orchestrator), tags=["Client"])
+    app.include_router(admin.create_router(orchestrator), prefix="/api/admin", tags=["Admin"])
     
     return app
@@ -0,0 +1,71 @@
+"""
+Admin API routes
+On-demand CPU / memory profiling of the running process (off by default, token-guarded)
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from service_orchestration.profiling import (
+    MAX_PROFILE_SECONDS,
+    ProfilerBusyError,
+    ProfilingDisabledError,
+    ProfilingForbiddenError,
+    authorize,
+    profile_cpu,
+    profile_filename,
+    profile_memory,
+)
+
+
+async def run_profile(process: str, kind: str, token: Optional[str], seconds: float, **options) -> PlainTextResponse:
+    """Check access, run the profiler in a worker thread and return a downloadable folded-stack file.
+
+    Errors map to 404 (profiling disabled), 403 (bad token) and 409 (another profile running).
+    """
+    try:
+        authorize(token)
+        profiler = profile_cpu if kind == "cpu" else profile_memory
+        folded = await asyncio.to_thread(profiler, seconds, **options)
+    except ProfilingDisabledError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ProfilingForbiddenError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": f'attachment; filename="{profile_filename(process, kind)}"'},
+    )
+
+
+def create_profiling_router(process: str) -> APIRouter:
+    """Create the profiling routes for ``process`` (also mounted by the gateway for its own process)"""
+    router = APIRouter()
+
+    @router.get("/profile/cpu", response_class=PlainTextResponse)
+    async def cpu_profile(
+        seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+        interval_ms: float = Query(10.0, ge=1, le=1000),
+        x_profiling_token: Optional[str] = Header(None),
+    ):
+        """Sample this process's thread stacks and return them as a folded flamegraph file (weight = samples)"""
+        return await run_profile(process, "cpu", x_profiling_token, seconds, interval=interval_ms / 1000.0)
+
+    @router.get("/profile/memory", response_class=PlainTextResponse)
+    async def memory_profile(
+        seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+        x_profiling_token: Optional[str] = Header(None),
+    ):
+        """Trace this process's allocations and return them as a folded flamegraph file (weight = bytes)"""
+        return await run_profile(process, "memory", x_profiling_token, seconds)
+
+    return router
+
+
+def create_router(orchestrator):
+    """Create admin routes"""
+    return create_profiling_router("orchestrator")
@@ -4,13 +4,72 @@ Service-specific operations (vLLM, Qdrant)
 Direct communication with running services
 """
 
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from service_orchestration.networking.request_scheduler import CONTEXT_FIELDS, classify_request
+from service_orchestration.services.vector_db.ingestion import DEFAULT_BATCH_SIZE, DEFAULT_PARALLELISM, LineTooLongError
+from service_orchestration.services.vector_db.qdrant_tuning import search_params
+from service_orchestration.services.vector_db.vector_codec import decode_vectors, is_binary_vector_content
+
+
+def _search_params_from(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Qdrant search params from a request: `params` as-is, or the `ef` / `exact` shortcuts."""
+    if data.get("params"):
+        return data["params"]
+    return search_params(ef=data.get("ef"), exact=data.get("exact"))
 
 
 def create_router(orchestrator):
     """Create data plane routes"""
     router = APIRouter()
     
+    async def stream_prompt(service_id: str, prompt: str, kwargs: Dict[str, Any], tenant, priority):
+        """Relay vLLM's SSE events for a prompt while the blocking prompt path runs in a worker thread.
+
+        The scheduler slot is held by the generation task itself, so it is
+        released when generation ends even if the client disconnects or the
+        response body is never iterated.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        # Cached responses cannot be streamed
+        kwargs = {**kwargs, "cache": False, "semantic_cache": False,
+                  "relay": lambda event: loop.call_soon_threadsafe(events.put_nowait, event)}
+
+        async def generate():
+            async with orchestrator.request_scheduler.slot(tenant, priority):
+                return await run_in_threadpool(orchestrator.vllm_service.prompt, service_id, prompt, **kwargs)
+
+        task = asyncio.ensure_future(generate())
+        # Relayed events are queued before the thread's result, so None marks the end of the stream
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            first = await events.get()
+        except BaseException:
+            # Request cancelled before anything was streamed: stop waiting for a slot
+            task.cancel()
+            raise
+        if first is None:
+            # Nothing was streamed (service not found, not ready, ...): answer like a non-streamed prompt
+            return task.result()
+        
+        async def relay():
+            event = first
+            while event is not None:
+                yield event
+                event = await events.get()
+            result = {k: v for k, v in task.result().items() if k != "response"}
+            yield f"data: {json.dumps({'result': result})}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+        
+        return StreamingResponse(relay(), media_type="text/event-stream")
+    
     # ===== vLLM Operations =====
     
     @router.get("/vllm")
@@ -127,6 +186,15 @@ def create_router(orchestrator):
         - `top_p` (optional): Nucleus sampling parameter (default: 1.0)
         - `frequency_penalty` (optional): Penalize repeated tokens (default: 0.0)
         - `presence_penalty` (optional): Penalize already mentioned tokens (default: 0.0)
+        - `priority` (optional): Scheduling class: "interactive" (default), "benchmark" or "background"
+        - `tenant` / `client_group_id` (optional): Tenant used for fair queuing between users
+        - `cache` (optional): Opt in/out of the exact-match response cache (only used when `temperature` is 0)
+        - `semantic_cache` (optional): Set to false to bypass the semantic cache
+        - `stream` (optional): Stream the generation as server-sent events (see below)
+
+        **Headers (optional, take precedence over body fields):**
+        - `X-Request-Priority`: Scheduling class
+        - `X-Tenant-Id` or `X-Client-Group-Id`: Tenant identifier
 
         **Returns (Success):**
         ```json
@@ -168,15 +236,153 @@ def create_router(orchestrator):
 
         **Note:** The vLLM service must be fully initialized (status="running") before it can accept prompts.
         Check service status or model endpoint first if unsure.
+
+        **Response cache:** Responses served from the cache carry `"cached": true` and
+        `cache_age_seconds`; exclude them when measuring GPU performance.
+
+        **Scheduling:** When the orchestrator is saturated, waiting prompts are served by
+        priority class first, then fairly across tenants (weighted by `ORCHESTRATOR_TENANT_WEIGHTS`).
+        Per-class queueing delay is reported under `scheduler` in `GET /api/metrics`.
+
+        **Streaming:** With `"stream": true` the response is `text/event-stream`: vLLM's
+        OpenAI-style chunks (`choices[].delta.content` for chat models, `choices[].text` for
+        base models, then a `usage` chunk) are relayed as they are generated, followed by
+        `data: {"result": {...}}` (the usual response without `response`) and `data: [DONE]`.
+        Caches are bypassed. If generation cannot start, the usual JSON error is returned.
         """
         data = await request.json()
         prompt = data.get("prompt")
         if not prompt:
             raise HTTPException(status_code=400, detail="prompt required")
-        kwargs = {k: v for k, v in data.items() if k != "prompt"}
-        return orchestrator.vllm_service.prompt(service_id, prompt, **kwargs)
+        tenant, priority = classify_request(request.headers, data)
+        kwargs = {k: v for k, v in data.items() if k not in ("prompt", "stream") and k not in CONTEXT_FIELDS}
+        if data.get("stream"):
+            return await stream_prompt(service_id, prompt, kwargs, tenant, priority)
+        async with orchestrator.request_scheduler.slot(tenant, priority):
+            # The prompt path is blocking; run it off the event loop so queued requests can be scheduled
+            return await run_in_threadpool(orchestrator.vllm_service.prompt, service_id, prompt, **kwargs)
+    
+    @router.post("/vllm/{service_id}/rag")
+    async def rag_prompt_vllm_service(service_id: str, request: Request):
+        """Answer a question with retrieval-augmented generation (RAG).
+
+        The question is embedded and searched in a Qdrant collection (see
+        `POST /vector-db/{service_id}/collections/{collection_name}/search/text`), the
+        `top_k` best chunks are prepended to it as context, and the augmented prompt is sent
+        to the vLLM service like `POST /vllm/{service_id}/prompt`. If retrieval fails the
+        question is answered without context (`rag_enabled: false`, `rag_error`).
+
+        **Path Parameters:**
+        - `service_id`: SLURM job ID of the vLLM service (or service group)
+
+        **Request Body:**
+        - `prompt` (required): The question
+        - `qdrant_service_id` (required): SLURM job ID of the Qdrant service
+        - `collection` (required): Collection holding the documents (text in the `text`,
+          `content`, `chunk` or `document` payload field)
+        - `top_k` (optional): Context chunks to retrieve (default: 3, 0 sends the bare question)
+        - `measure_ttft` (optional): Stream the generation from vLLM to time the first token
+        - Other fields as for `/prompt` (`max_tokens`, `temperature`, `cache`, `priority`, ...)
+
+        **Returns (Success):**
+        ```json
+        {
+          "success": true,
+          "response": "Open Settings > Security and choose Reset password.",
+          "usage": {"prompt_tokens": 412, "completion_tokens": 38, "total_tokens": 450},
+          "rag_enabled": true,
+          "rag_context": [{"text": "...", "score": 0.82, "id": 17}],
+          "rag_timing": {
+            "embedder": "hashing", "embed_ms": 0.4, "search_ms": 3.2, "augment_ms": 0.02,
+            "ttft_ms": 61.5, "generation_ms": 402.7, "total_ms": 407.1,
+            "top_k": 3, "context_chunks": 3, "prompt_chars": 1650
+          }
+        }
+        ```
+
+        `ttft_ms` is only set with `measure_ttft`. `usage.prompt_tokens` grows with `top_k`
+        and shows the prefill cost of the retrieved context.
+        """
+        data = await request.json()
+        prompt = data.get("prompt")
+        qdrant_service_id = data.get("qdrant_service_id")
+        collection = data.get("collection")
+        if not prompt or not qdrant_service_id or not collection:
+            raise HTTPException(status_code=400, detail="prompt, qdrant_service_id and collection required")
+        tenant, priority = classify_request(request.headers, data)
+        rag_fields = ("prompt", "qdrant_service_id", "collection", "top_k")
+        kwargs = {k: v for k, v in data.items() if k not in rag_fields and k not in CONTEXT_FIELDS}
+        async with orchestrator.request_scheduler.slot(tenant, priority):
+            return await run_in_threadpool(
+                orchestrator.vllm_service.rag_prompt, service_id, prompt, orchestrator.qdrant_service,
+                qdrant_service_id, collection, top_k=int(data.get("top_k", 3)), **kwargs
+            )
+    
+    @router.get("/vllm/semantic-cache")
+    async def get_semantic_cache():
+        """Get the semantic response cache configuration and statistics.
+
+        **Returns:**
+        ```json
+        {
+          "active": true,
+          "qdrant_service_id": "3713500",
+          "collection_name": "semantic_cache",
+          "threshold": 0.92,
+          "ttl_seconds": 3600,
+          "embedder": "hashing",
+          "lookups": 120,
+          "hits": 84,
+          "misses": 36,
+          "hit_ratio": 0.7,
+          "lookup_ms_avg": 6.1,
+          "latency_saved_ms_total": 95210.4,
+          "similarity_buckets": {"0.5": 3, "0.6": 1, "...": 0, "1.0": 70}
+        }
+        ```
+
+        `similarity_buckets` counts the best-match score of each lookup (non-cumulative,
+        keyed by bucket upper bound). `latency_saved_ms_total` sums the original generation
+        time of each hit minus the lookup cost.
+        """
+        return orchestrator.vllm_service.semantic_cache.get_stats()
+
+    @router.put("/vllm/semantic-cache")
+    async def configure_semantic_cache(request: Request):
+        """Enable, reconfigure or disable the semantic response cache.
+
+        Prompts are embedded and looked up in a dedicated Qdrant collection. If a previous
+        prompt sent to the same vLLM service is similar enough (cosine similarity >= `threshold`),
+        its completion is returned with `"cached": true, "cache_type": "semantic"` and the
+        vLLM call is skipped. Individual prompts can bypass it with `"semantic_cache": false`.
+
+        **Request Body:**
+        - `qdrant_service_id` (required): Qdrant service holding the cache (`null` disables the cache)
+        - `collection_name` (optional): Collection to use (default: "semantic_cache", created on first use)
+        - `threshold` (optional): Minimum similarity for a hit (default: 0.92)
+        - `ttl` (optional): Entry lifetime in seconds (default: 3600)
+        - `embedding_service_id` (optional): vLLM service serving an embedding model;
+          the built-in hashing embedder is used otherwise
+        - `embedding_model` (optional): Embedding model name (auto-discovered if omitted)
+
+        **Note:** Statistics are reset on reconfiguration. Use a new collection when
+        switching to an embedder with a different vector size.
+        """
+        data = await request.json()
+        if "qdrant_service_id" not in data:
+            raise HTTPException(status_code=400, detail="qdrant_service_id required")
+        return orchestrator.configure_semantic_cache(
+            data.get("qdrant_service_id"),
+            collection_name=data.get("collection_name"),
+            threshold=data.get("threshold"),
+            ttl=data.get("ttl"),
+            embedding_service_id=data.get("embedding_service_id"),
+            embedding_model=data.get("embedding_model"),
+        )
     
     # ===== Vector DB (Qdrant) Operations =====
+    # Collection and point operations use QdrantService's pooled async client
+    # (or gRPC with QDRANT_TRANSPORT=grpc) and never block the event loop.
     
     @router.get("/vector-db")
     async def find_vector_db_services():
@@ -219,7 +425,8 @@ def create_router(orchestrator):
 
         **Note:** Only services with status "running" are ready for collection and point operations.
         """
-        services = orchestrator.qdrant_service.find_services()
+        # Readiness probes call SLURM and every Qdrant node; keep them off the event loop
+        services = await run_in_threadpool(orchestrator.qdrant_service.find_services)
         return {"vector_db_services": services}
     
     @router.get("/vector-db/{service_id}/collections")
@@ -257,7 +464,7 @@ def create_router(orchestrator):
         **Note:** Empty array means no collections exist yet (not an error).
         Create collections using PUT /vector-db/{service_id}/collections/{collection_name}
         """
-        return orchestrator.qdrant_service.get_collections(service_id, timeout)
+        return await orchestrator.qdrant_service.get_collections_async(service_id, timeout)
     
     @router.get("/vector-db/{service_id}/collections/{collection_name}")
     async def get_collection_info(service_id: str, collection_name: str, timeout: int = 5):
@@ -315,7 +522,7 @@ def create_router(orchestrator):
 
         **Note:** Use this to verify collection configuration before inserting points.
         """
-        return orchestrator.qdrant_service.get_collection_info(service_id, collection_name, timeout)
+        return await orchestrator.qdrant_service.get_collection_info_async(service_id, collection_name, timeout)
     
     @router.put("/vector-db/{service_id}/collections/{collection_name}")
     async def create_collection(service_id: str, collection_name: str, request: Request):
@@ -336,8 +543,17 @@ def create_router(orchestrator):
             - **Cosine**: Most common, normalized similarity (0-2 range)
             - **Euclid**: Euclidean distance (good for spatial data)
             - **Dot**: Dot product (for pre-normalized vectors)
+        - `hnsw_config` (optional): HNSW index settings - `m`, `ef_construct`, `full_scan_threshold`, `on_disk`
+        - `quantization` (optional): `"scalar"`, `"product"`, `"binary"` or an object with `type` and
+          options (`quantile` for scalar, `compression` "x4".."x64" for product, `always_ram`)
+        - `on_disk` (optional): Keep original vectors on disk instead of in RAM
+        - `payload_indexes` (optional): Payload fields to index, e.g. `{"category": "keyword"}`
+          (keyword, integer, float, bool, geo, text, datetime)
         - `timeout` (optional): Request timeout in seconds (default: 10)
 
+        `quantization` and `on_disk` default to the Qdrant deployment's `QDRANT_COLLECTION_QUANTIZATION`
+        and `QDRANT_COLLECTION_ON_DISK` (see the `vector-db/qdrant` recipe parameters).
+
         **Returns (Success):**
         ```json
         {
@@ -361,7 +577,10 @@ def create_router(orchestrator):
         ```json
         {
           "vector_size": 384,
-          "distance": "Cosine"
+          "distance": "Cosine",
+          "hnsw_config": {"m": 32, "ef_construct": 200},
+          "quantization": {"type": "scalar", "quantile": 0.99, "always_ram": true},
+          "payload_indexes": {"category": "keyword"}
         }
         ```
 
@@ -378,7 +597,67 @@ def create_router(orchestrator):
         timeout = data.get("timeout", 10)
         if not vector_size:
             raise HTTPException(status_code=400, detail="vector_size required")
-        return orchestrator.qdrant_service.create_collection(service_id, collection_name, vector_size, distance, timeout)
+        tuning = {
+            key: data[field] for key, field in (
+                ("hnsw", "hnsw_config"), ("quantization", "quantization"),
+                ("on_disk", "on_disk"), ("payload_indexes", "payload_indexes"),
+            ) if data.get(field) is not None
+        }
+        try:
+            return await orchestrator.qdrant_service.create_collection_async(
+                service_id, collection_name, vector_size, distance, timeout, **tuning
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @router.patch("/vector-db/{service_id}/collections/{collection_name}")
+    async def update_collection(service_id: str, collection_name: str, request: Request):
+        """Change the index, quantization or storage settings of an existing collection.
+
+        Qdrant re-optimizes the affected segments in the background; the collection stays
+        searchable meanwhile (status "yellow" in the collection info until done).
+
+        **Request Body** (at least one of):
+        - `hnsw_config`: HNSW settings to change (`m`, `ef_construct`, `full_scan_threshold`, `on_disk`)
+        - `quantization`: New quantization (as for creation); `"none"` removes it
+        - `on_disk`: Move original vectors to disk (`true`) or RAM (`false`)
+        - `optimizers_config`: Qdrant optimizer settings (e.g. `{"indexing_threshold": 20000}`)
+        - `timeout` (optional): Request timeout in seconds (default: 30)
+
+        **Example Request:**
+        ```json
+        {"hnsw_config": {"m": 48}, "quantization": "binary"}
+        ```
+
+        **Errors:**
+        - 400: Invalid or no settings
+        """
+        data = await request.json()
+        try:
+            return await orchestrator.qdrant_service.update_collection_async(
+                service_id, collection_name, hnsw=data.get("hnsw_config"), quantization=data.get("quantization"),
+                on_disk=data.get("on_disk"), optimizers=data.get("optimizers_config"), timeout=data.get("timeout", 30)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @router.put("/vector-db/{service_id}/collections/{collection_name}/index")
+    async def create_payload_index(service_id: str, collection_name: str, request: Request):
+        """Index a payload field so filtered searches use the index instead of scanning payloads.
+
+        **Request Body:**
+        - `field_name` (required): Payload field (dotted paths allowed, e.g. `meta.lang`)
+        - `field_schema` (required): keyword, integer, float, bool, geo, text or datetime
+        - `timeout` (optional): Request timeout in seconds (default: 30)
+        """
+        data = await request.json()
+        try:
+            return await orchestrator.qdrant_service.create_payload_index_async(
+                service_id, collection_name, data.get("field_name"), data.get("field_schema"),
+                timeout=data.get("timeout", 30)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     @router.delete("/vector-db/{service_id}/collections/{collection_name}")
     async def delete_collection(service_id: str, collection_name: str, timeout: int = 10):
@@ -415,7 +694,56 @@ def create_router(orchestrator):
         curl -X DELETE "http://orchestrator:8000/api/data-plane/vector-db/3642875/collections/my_docs"
         ```
         """
-        return orchestrator.qdrant_service.delete_collection(service_id, collection_name, timeout)
+        return await orchestrator.qdrant_service.delete_collection_async(service_id, collection_name, timeout)
+    
+    @router.post("/vector-db/{service_id}/collections/{collection_name}/snapshots")
+    async def create_snapshot(service_id: str, collection_name: str, timeout: int = 600):
+        """Snapshot a collection to the shared workspace.
+
+        Snapshots are written to `qdrant_snapshots/<collection>/` in the remote workspace,
+        which outlives the Qdrant job. Ingest a benchmark collection once, snapshot it, and
+        start later Qdrant services with `QDRANT_RESTORE_SNAPSHOTS=<collection>` to have it
+        restored at startup instead of re-ingesting it.
+
+        **Query Parameters:**
+        - `timeout`: Request timeout in seconds (default: 600)
+
+        **Returns (Success):**
+        ```json
+        {
+          "success": true,
+          "message": "Snapshot of collection 'bench' created",
+          "snapshot": {"name": "bench-2026-10-18-09-12-44.snapshot", "size": 52430848,
+                       "creation_time": "2026-10-18T09:12:44"},
+          "path": "/workspace/qdrant_snapshots/bench/bench-2026-10-18-09-12-44.snapshot"
+        }
+        ```
+        """
+        return await orchestrator.qdrant_service.create_snapshot_async(service_id, collection_name, timeout)
+    
+    @router.get("/vector-db/{service_id}/collections/{collection_name}/snapshots")
+    async def list_snapshots(service_id: str, collection_name: str, timeout: int = 10):
+        """List the snapshots of a collection (name, size, creation time), oldest first."""
+        return await orchestrator.qdrant_service.list_snapshots_async(service_id, collection_name, timeout)
+    
+    @router.put("/vector-db/{service_id}/collections/{collection_name}/snapshots/recover")
+    async def recover_snapshot(service_id: str, collection_name: str, request: Request):
+        """Replace a collection on a running service with one of its snapshots.
+
+        **Request Body:**
+        - `snapshot` (required): File name of the snapshot (as returned when it was created)
+        - `timeout` (optional): Request timeout in seconds (default: 600)
+
+        **Errors:**
+        - 400: Missing or invalid snapshot name
+        """
+        data = await request.json()
+        try:
+            return await orchestrator.qdrant_service.recover_snapshot_async(
+                service_id, collection_name, data.get("snapshot"), timeout=data.get("timeout", 600)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     @router.put("/vector-db/{service_id}/collections/{collection_name}/points")
     async def upsert_points(service_id: str, collection_name: str, request: Request):
@@ -478,10 +806,87 @@ def create_router(orchestrator):
         timeout = data.get("timeout", 30)
         if not points:
             raise HTTPException(status_code=400, detail="points required")
-        return orchestrator.qdrant_service.upsert_points(service_id, collection_name, points, timeout)
+        return await orchestrator.qdrant_service.upsert_points_async(service_id, collection_name, points, timeout)
+    
+    @router.post("/vector-db/{service_id}/collections/{collection_name}/points/bulk")
+    async def bulk_upsert_points(service_id: str, collection_name: str, request: Request,
+                                 batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+                                 parallelism: int = Query(DEFAULT_PARALLELISM, ge=1, le=64),
+                                 timeout: int = Query(60, ge=1),
+                                 id_offset: int = Query(0, ge=0)):
+        """Bulk-load points from a streamed NDJSON or binary vector body.
+
+        The body is consumed as it arrives, split into batches of `batch_size` points and
+        upserted with up to `parallelism` batches in flight using Qdrant's `wait=false`
+        (acknowledged once written to the WAL). Memory use is bounded by the batches in
+        flight, so a million-vector corpus can be loaded in one call.
+
+        **Path Parameters:**
+        - `service_id`: SLURM job ID of the vector DB service
+        - `collection_name`: Name of the (existing) collection
+
+        **Query Parameters:**
+        - `batch_size`: Points per upsert request (default: 512)
+        - `parallelism`: Concurrent upsert requests (default: 4)
+        - `timeout`: Per-batch timeout in seconds (default: 60)
+        - `id_offset`: ID of the first vector of a binary body (default: 0)
+
+        **Request Body** (`Content-Type: application/x-ndjson`):
+        ```
+        {"id": 1, "vector": [0.1, 0.2, ...], "payload": {"text": "..."}}
+        {"id": 2, "vector": [0.3, 0.4, ...]}
+        ```
+
+        **Binary Request Body** (vectors only, about 10x smaller than JSON):
+        - `Content-Type: application/x-float32-vectors`: `VF32` + dimension as little-endian
+          uint32, then row-major little-endian float32 values
+        - `Content-Type: application/x-npy`: a NumPy `.npy` file with a 2-D `float32`/`float64` array
+          (e.g. `np.save(f, embeddings.astype(np.float32))`)
+
+        Row `i` becomes point `id_offset + i` without payload. A malformed body stops the
+        ingest with `success: false`; rows before the error are reported in `num_points`.
+
+        **Returns (Success):**
+        ```json
+        {
+          "success": true,
+          "message": "Ingested 1000000 points into collection 'corpus'",
+          "num_points": 1000000,
+          "failed_points": 0,
+          "batches": 1954,
+          "failed_batches": 0,
+          "invalid_lines": 0,
+          "errors": [],
+          "duration_seconds": 212.4,
+          "points_per_second": 4708.1
+        }
+        ```
+
+        Lines without `id` and `vector` are skipped and counted in `invalid_lines`; a line
+        longer than 16 MiB rejects the request with 400. Progress
+        is exported while the ingest runs as `orchestrator_vector_ingest_points_total`,
+        `orchestrator_vector_ingest_batch_duration_seconds` and
+        `orchestrator_vector_ingest_points_per_second` on `/api/metrics/prometheus`.
+        """
+        content_type = request.headers.get("content-type")
+        if is_binary_vector_content(content_type):
+            return await orchestrator.qdrant_service.ingest_vectors_async(
+                service_id, collection_name, request.stream(), content_type, id_offset=id_offset,
+                batch_size=batch_size, parallelism=parallelism, timeout=timeout
+            )
+        try:
+            return await orchestrator.qdrant_service.ingest_ndjson_async(
+                service_id, collection_name, request.stream(),
+                batch_size=batch_size, parallelism=parallelism, timeout=timeout
+            )
+        except LineTooLongError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     @router.post("/vector-db/{service_id}/collections/{collection_name}/search")
-    async def search_points(service_id: str, collection_name: str, request: Request):
+    async def search_points(service_id: str, collection_name: str, request: Request,
+                            limit: int = Query(10, ge=1),
+                            timeout: int = Query(10, ge=1),
+                            ef: Optional[int] = Query(None, ge=1)):
         """Search for similar vectors in a collection (nearest neighbor search).
 
         Performs semantic similarity search to find vectors most similar to the query vector.
@@ -496,6 +901,10 @@ def create_router(orchestrator):
             - Must be array of floats matching collection's vector_size
         - `limit` (optional): Maximum number of results (default: 10)
         - `timeout` (optional): Request timeout in seconds (default: 10)
+        - `ef` (optional): HNSW search beam width (higher = better recall, slower);
+          defaults to the deployment's `QDRANT_SEARCH_HNSW_EF`, else Qdrant's default
+        - `exact` (optional): Brute-force search, for ground truth
+        - `params` (optional): Raw Qdrant search params (overrides `ef` / `exact`)
 
         **Example Request:**
         ```json
@@ -505,6 +914,10 @@ def create_router(orchestrator):
         }
         ```
 
+        **Binary Request:** the query vector may instead be sent as an `application/x-float32-vectors`
+        or `application/x-npy` body holding exactly one vector (see the bulk endpoint), with
+        `limit`, `timeout` and `ef` as query parameters (ignored for JSON bodies).
+
         **Returns (Success):**
         ```json
         {
@@ -542,12 +955,156 @@ def create_router(orchestrator):
 
         **Note:** Returns fewer results if collection has fewer than `limit` points.
         """
-        data = await request.json()
-        query_vector = data.get("query_vector")
-        limit = data.get("limit", 10)
-        timeout = data.get("timeout", 10)
+        content_type = request.headers.get("content-type")
+        if is_binary_vector_content(content_type):
+            try:
+                vectors = decode_vectors(await request.body(), content_type)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if len(vectors) != 1:
+                raise HTTPException(status_code=400, detail=f"Expected exactly one query vector, got {len(vectors)}")
+            query_vector = vectors[0]
+            params = _search_params_from({"ef": ef})
+        else:
+            data = await request.json()
+            query_vector = data.get("query_vector")
+            limit = data.get("limit", 10)
+            timeout = data.get("timeout", 10)
+            params = _search_params_from(data)
         if not query_vector:
             raise HTTPException(status_code=400, detail="query_vector required")
-        return orchestrator.qdrant_service.search_points(service_id, collection_name, query_vector, limit, timeout)
+        return await orchestrator.qdrant_service.search_points_async(
+            service_id, collection_name, query_vector, limit, timeout, params=params
+        )
+    
+    @router.post("/vector-db/{service_id}/collections/{collection_name}/search/text")
+    async def search_text(service_id: str, collection_name: str, request: Request):
+        """Search a collection with a text query (embedded on the orchestrator).
+
+        The query is embedded with the orchestrator's text search embedder
+        (`TEXT_SEARCH_EMBEDDER`: `hashing` by default, `vllm` or `local`), which caches
+        embeddings by text and batches concurrent queries. The collection must hold
+        vectors from the same embedder. This is the retrieval step of RAG prompts.
+
+        **Path Parameters:**
+        - `service_id`: SLURM job ID of the vector DB service
+        - `collection_name`: Name of the collection to search
+
+        **Request Body:**
+        - `query_text` (required): Text to search for
+        - `limit` (optional): Maximum number of results (default: 10)
+        - `filter` (optional): Qdrant payload filter
+        - `timeout` (optional): Request timeout in seconds (default: 10)
+
+        **Returns (Success):**
+        ```json
+        {
+          "success": true,
+          "results": [{"id": 42, "score": 0.83, "payload": {"text": "..."}}],
+          "num_results": 1,
+          "embedder": "hashing",
+          "embedding_ms": 0.21,
+          "search_ms": 3.4
+        }
+        ```
+
+        `embedding_ms` and `search_ms` time the two retrieval stages separately
+        (a cached embedding takes a few microseconds).
+        """
+        data = await request.json()
+        query_text = data.get("query_text")
+        if not query_text:
+            raise HTTPException(status_code=400, detail="query_text required")
+        return await orchestrator.qdrant_service.search_with_text_async(
+            service_id, collection_name, query_text,
+            limit=data.get("limit", 10), timeout=data.get("timeout", 10), query_filter=data.get("filter")
+        )
+    
+    @router.post("/vector-db/{service_id}/collections/{collection_name}/search/batch")
+    async def search_batch(service_id: str, collection_name: str, request: Request,
+                           limit: int = Query(10, ge=1),
+                           timeout: int = Query(30, ge=1),
+                           ef: Optional[int] = Query(None, ge=1)):
+        """Run many nearest neighbor searches in one call (Qdrant `points/search/batch`).
+
+        Validation, readiness and endpoint resolution happen once per batch and all
+        queries share one request to Qdrant, so query throughput grows with the batch size.
+
+        **Path Parameters:**
+        - `service_id`: SLURM job ID of the vector DB service
+        - `collection_name`: Name of the collection to search
+
+        **Request Body** (one of):
+        - `query_vectors`: List of query vectors sharing `limit` and `filter`
+        - `searches`: List of queries, each with `vector` and optional `limit` / `filter` /
+          `ef` / `exact` / `params` (falling back to the shared values)
+
+        Shared fields:
+        - `limit` (optional): Results per query (default: 10)
+        - `filter` (optional): Qdrant payload filter
+        - `ef` / `exact` / `params` (optional): Search params, as for single searches
+          (per-query search params take precedence)
+        - `timeout` (optional): Request timeout in seconds (default: 30)
+
+        The query vectors may also be sent as an `application/x-float32-vectors` or
+        `application/x-npy` body (one row per query) with `limit`, `timeout` and `ef` as query
+        parameters (ignored for JSON bodies).
+
+        **Example Request:**
+        ```json
+        {
+          "query_vectors": [[0.1, 0.2, ...], [0.3, 0.4, ...]],
+          "limit": 5
+        }
+        ```
+
+        **Returns (Success):**
+        ```json
+        {
+          "success": true,
+          "results": [
+            [{"id": 42, "score": 0.95, "payload": {...}}],
+            [{"id": 13, "score": 0.91, "payload": {...}}]
+          ],
+          "num_queries": 2,
+          "qdrant_time_ms": 1.8,
+          "duration_ms": 4.2,
+          "queries_per_second": 476.2
+        }
+        ```
+
+        `results[i]` holds the hits of query `i`. `qdrant_time_ms` is Qdrant's own processing
+        time (REST only); `duration_ms` also covers the orchestrator-to-Qdrant round trip.
+
+        **Errors:**
+        - 400: No queries, or a query without a vector
+        """
+        content_type = request.headers.get("content-type")
+        if is_binary_vector_content(content_type):
+            try:
+                vectors = decode_vectors(await request.body(), content_type)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            searches = [{"vector": vector} for vector in vectors]
+            data = {"limit": limit, "timeout": timeout, "ef": ef}
+        else:
+            data = await request.json()
+            searches = data.get("searches")
+            if searches is None:
+                searches = [{"vector": vector} for vector in data.get("query_vectors") or []]
+        if not searches:
+            raise HTTPException(status_code=400, detail="query_vectors or searches required")
+        if not all(isinstance(search, dict) and search.get("vector") for search in searches):
+            raise HTTPException(status_code=400, detail="every search needs a vector")
+        searches = [
+            {**search, "params": _search_params_from(search)}
+            if any(search.get(key) is not None for key in ("ef", "exact", "params")) else search
+            for search in searches
+        ]
+        return await orchestrator.qdrant_service.search_batch_async(
+            service_id, collection_name, searches,
+            limit=int(data.get("limit", 10)), timeout=int(data.get("timeout", 30)), query_filter=data.get("filter"),
+            params=_search_params_from(data)
+        )
     
     return router
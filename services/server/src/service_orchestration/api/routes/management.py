@@ -4,6 +4,9 @@ Handles service registration, metrics, and configuration
 """
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
 
 
 def create_router(orchestrator):
@@ -25,6 +28,11 @@ def create_router(orchestrator):
         """Get metrics"""
         return orchestrator.get_metrics()
     
+    @router.get("/metrics/prometheus", response_class=PlainTextResponse)
+    async def get_orchestrator_prometheus_metrics():
+        """Orchestrator self-instrumentation (stage latencies, SLURM calls, event-loop lag) in Prometheus format"""
+        return PlainTextResponse(ORCHESTRATOR_METRICS.render(), media_type="text/plain; version=0.0.4")
+    
     @router.post("/configure")
     async def configure(strategy: str):
         """Configure load balancer strategy"""
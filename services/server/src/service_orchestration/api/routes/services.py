@@ -3,6 +3,8 @@ Service Management API routes
 High-level service and service group operations
 """
 
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Request
 
 
@@ -372,6 +374,51 @@ def create_router(orchestrator):
             # Return error info (service not ready, not found, etc.)
             return result
     
+    @router.get("/{service_id}/stats")
+    async def get_service_stats(service_id: str, window_seconds: Optional[float] = None):
+        """Get orchestrator-observed request statistics for a service, group or replica.
+
+        Every prompt the orchestrator forwards to vLLM is recorded (latency,
+        tokens from `usage`, outcome, replica it was routed to) in fixed-size
+        ring buffers, so these numbers are available without scraping vLLM.
+
+        **Path Parameters:**
+        - `service_id`: Service ID, service group ID (`sg-...`), bare group job ID or replica ID (`job_id:port`)
+
+        **Query Parameters:**
+        - `window_seconds` (optional): Only summarize requests from the last N seconds
+
+        **Returns:**
+        - `count`, `success`, `errors`, `error_rate`
+        - `latency_ms`: `p50`, `p95`, `p99`, `mean`, `max` of successful requests (null if none)
+        - `ttft_ms`: same for time to first token, when requests report it (null otherwise)
+        - `prompt_tokens`, `completion_tokens`, `completion_tokens_per_second`
+        - `replicas`: per-replica summaries (service groups only)
+        - `window_size`: number of most recent requests kept per service/replica
+
+        **Example Response:**
+        ```json
+        {
+          "service_id": "sg-3713478",
+          "window_size": 1024,
+          "count": 200,
+          "success": 198,
+          "errors": 2,
+          "error_rate": 0.01,
+          "latency_ms": {"p50": 812.4, "p95": 1460.2, "p99": 2011.7, "mean": 874.9, "max": 2304.1},
+          "ttft_ms": null,
+          "prompt_tokens": 5400,
+          "completion_tokens": 25344,
+          "completion_tokens_per_second": 412.7,
+          "replicas": {"3713478:8001": {"count": 100, "...": "..."}}
+        }
+        ```
+
+        The same data is exported in Prometheus format by `GET /{service_id}/metrics`
+        (`orchestrator_request_latency_seconds`, `orchestrator_requests_total`, ...).
+        """
+        return orchestrator.get_service_request_stats(service_id, window_seconds=window_seconds)
+    
     @router.post("/metrics/batch")
     async def get_batch_metrics(request: Request):
         """Get Prometheus metrics for multiple services in a single request.
@@ -0,0 +1,193 @@
+"""
+Filtering and cardinality control for scraped Prometheus metrics.
+
+Recipes can declare a ``metrics`` section (see RecipeMetricsConfig) to cut
+down what is forwarded from vLLM / Qdrant / the GPU exporter to Prometheus:
+
+- ``include`` / ``exclude``: glob patterns on metric names. A pattern matches
+  either the sample name or its family name (``x_bucket`` -> ``x``), so
+  ``vllm:time_to_first_token_seconds`` covers the whole histogram.
+- ``histogram_buckets``: bucket bounds (``le``) to keep, either one list for
+  every histogram or a mapping of family-name globs to lists. Histogram
+  buckets are cumulative, so dropping some keeps the rest valid; ``+Inf``
+  is always kept.
+- ``max_series``: maximum number of samples forwarded per scrape; the rest
+  is dropped and reported with a warning metric.
+
+A MetricsFilter is created per scrape (it counts what it forwarded); the
+compiled patterns are shared between scrapes.
+"""
+
+import fnmatch
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+INF_BOUND = b"+Inf"
+
+# Suffixes of the samples that make up a histogram / summary / counter family
+_FAMILY_SUFFIXES = (b"_bucket", b"_count", b"_sum", b"_total", b"_created")
+
+_LE_LABEL = re.compile(rb'[{,]\s*le="([^"]*)"')
+
+
+@lru_cache(maxsize=64)
+def _compile_globs(patterns: Tuple[str, ...]) -> Optional["re.Pattern[bytes]"]:
+    """Compile glob patterns into a single bytes regex (None when there are none)."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns).encode("utf-8"))
+
+
+def _family_name(name: bytes) -> bytes:
+    for suffix in _FAMILY_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class MetricsFilter:
+    """Allow/deny lists, bucket downsampling and a series limit for one scrape."""
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = (),
+                 histogram_buckets: Optional[Any] = None, max_series: Optional[int] = None):
+        """
+        Args:
+            include: Metric name globs to keep (empty keeps everything)
+            exclude: Metric name globs to drop (applied after include)
+            histogram_buckets: Bounds to keep for all histograms, or {family glob: bounds}
+            max_series: Maximum number of samples to forward
+        """
+        self._include = _compile_globs(tuple(include))
+        self._exclude = _compile_globs(tuple(exclude))
+        if histogram_buckets is None:
+            self._bucket_rules: List[Tuple["re.Pattern[bytes]", Tuple[float, ...]]] = []
+        elif isinstance(histogram_buckets, dict):
+            self._bucket_rules = [
+                (_compile_globs((pattern,)), tuple(sorted(float(b) for b in bounds)))
+                for pattern, bounds in histogram_buckets.items()
+            ]
+        else:
+            self._bucket_rules = [(_compile_globs(("*",)), tuple(sorted(float(b) for b in histogram_buckets)))]
+        self.max_series = max_series
+
+        self._keep_name: Dict[bytes, bool] = {}
+        self._bucket_bounds: Dict[bytes, Optional[Tuple[float, ...]]] = {}
+        self._keep_bound: Dict[Tuple[bytes, Tuple[float, ...]], bool] = {}
+
+        self.series = 0
+        self.dropped_by_name = 0
+        self.dropped_buckets = 0
+        self.dropped_over_limit = 0
+
+    @classmethod
+    def from_config(cls, config) -> Optional["MetricsFilter"]:
+        """Build a filter from a recipe's RecipeMetricsConfig; None when it filters nothing."""
+        if config is None:
+            return None
+        if not (config.include or config.exclude or config.histogram_buckets or config.max_series):
+            return None
+        return cls(config.include, config.exclude, config.histogram_buckets, config.max_series)
+
+    @property
+    def limit_exceeded(self) -> bool:
+        return self.dropped_over_limit > 0
+
+    # ========== Decisions ==========
+
+    def keeps(self, name: bytes) -> bool:
+        """Whether the allow/deny lists keep a metric (sample or family name)."""
+        keep = self._keep_name.get(name)
+        if keep is None:
+            family = _family_name(name)
+            keep = True
+            if self._include is not None:
+                keep = bool(self._include.match(name) or self._include.match(family))
+            if keep and self._exclude is not None:
+                keep = not (self._exclude.match(name) or self._exclude.match(family))
+            self._keep_name[name] = keep
+        return keep
+
+    def _bounds_for(self, name: bytes) -> Optional[Tuple[float, ...]]:
+        if name in self._bucket_bounds:
+            return self._bucket_bounds[name]
+        family = name[:-len(b"_bucket")]
+        bounds = next((b for pattern, b in self._bucket_rules if pattern.match(family)), None)
+        self._bucket_bounds[name] = bounds
+        return bounds
+
+    def _keeps_bucket(self, le: bytes, bounds: Tuple[float, ...]) -> bool:
+        key = (le, bounds)
+        keep = self._keep_bound.get(key)
+        if keep is None:
+            if le == INF_BOUND:
+                keep = True
+            else:
+                try:
+                    value = float(le)
+                except ValueError:
+                    keep = True
+                else:
+                    keep = any(math.isclose(value, bound, rel_tol=1e-9, abs_tol=1e-12) for bound in bounds)
+            self._keep_bound[key] = keep
+        return keep
+
+    # ========== Lines ==========
+
+    def filter_lines(self, lines: List[bytes]) -> List[bytes]:
+        """Return the lines that survive filtering (comments of dropped families are dropped too)."""
+        out: List[bytes] = []
+        append = out.append
+        keeps = self.keeps
+        for line in lines:
+            if not line:
+                append(line)
+                continue
+            if line[0] == 0x23:  # '#'
+                parts = line.split(b" ", 3)
+                if len(parts) >= 3 and parts[1] in (b"HELP", b"TYPE") and not keeps(parts[2]):
+                    continue
+                append(line)
+                continue
+
+            end = line.find(b"{")
+            space = line.find(b" ")
+            if end == -1 or (space != -1 and space < end):
+                end = space
+            name = line if end == -1 else line[:end]
+            if not keeps(name):
+                self.dropped_by_name += 1
+                continue
+            if self._bucket_rules and name.endswith(b"_bucket"):
+                bounds = self._bounds_for(name)
+                if bounds is not None:
+                    match = _LE_LABEL.search(line)
+                    if match is not None and not self._keeps_bucket(match.group(1), bounds):
+                        self.dropped_buckets += 1
+                        continue
+            if self.max_series is not None and self.series >= self.max_series:
+                self.dropped_over_limit += 1
+                continue
+            self.series += 1
+            append(line)
+        return out
+
+    def render_warning(self) -> bytes:
+        """Warning metric for a scrape that hit ``max_series`` (empty when the limit was not exceeded)."""
+        if not self.limit_exceeded:
+            return b""
+        return (
+            b"# HELP service_metrics_series_limit_exceeded Samples dropped because the scrape exceeded "
+            b"the recipe's metrics.max_series limit.\n"
+            b"# TYPE service_metrics_series_limit_exceeded gauge\n"
+            b'service_metrics_series_limit_exceeded{limit="%d"} %d\n' % (self.max_series, self.dropped_over_limit)
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "series": self.series,
+            "dropped_by_name": self.dropped_by_name,
+            "dropped_buckets": self.dropped_buckets,
+            "dropped_over_limit": self.dropped_over_limit,
+        }
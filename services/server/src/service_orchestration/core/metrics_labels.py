@@ -0,0 +1,150 @@
+"""
+Streaming label injection for scraped Prometheus metrics.
+
+Metrics scraped from vLLM / Qdrant / the GPU exporter are relabelled with
+``service_id`` (and ``replica_id`` for group replicas) before being served.
+vLLM exposes large histograms, so this runs on hundreds of kilobytes per
+replica per scrape: the injector works on raw bytes, precomputes the label
+suffix once and relabels the response chunk by chunk while it is being read,
+so the raw body is never held in full.
+
+Parsing follows the Prometheus text format closely enough to be safe on
+real payloads:
+- label values may contain escaped quotes (``\\"``), backslashes and ``}``;
+- OpenMetrics exemplars (``... 1.0 # {trace_id="..."} 0.5``) are left intact,
+  only the sample's own label set is extended;
+- empty label sets (``metric{} 1``) and unlabelled samples are handled.
+
+An optional MetricsFilter (recipe ``metrics`` section) drops lines before
+they are relabelled.
+"""
+
+import re
+import time
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from service_orchestration.core.metrics_filter import MetricsFilter
+
+METRICS_CHUNK_SIZE = 64 * 1024
+
+# Sample label block, honouring quoted values with backslash escapes
+_LABEL_BLOCK = re.compile(rb'\{((?:[^"}]|"(?:[^"\\]|\\.)*")*)\}')
+
+# Deleting everything but braces, quotes, '#' and newlines leaves a skeleton
+# about a tenth of the payload's size. When each of its lines is either a plain
+# label set ('{""..""}'), a comment without '}' or empty (unlabelled sample),
+# every '}' in the payload closes a non-empty label set and the whole block can
+# be relabelled with one bytes.replace. Escaped quotes, braces or '#' in label
+# values, empty label sets and exemplars all break the pattern and take the
+# quote-aware per-line scan instead, as do harmless look-alikes such as a '}'
+# in HELP text.
+_SKELETON_DELETE = bytes(b for b in range(256) if b not in b'{}"#\n')
+_SIMPLE_SKELETON = re.compile(rb'(?:(?:\{(?:"")+\}|#[^}\n]*)?\n)*(?:\{(?:"")+\}|#[^}\n]*)?')
+
+
+def escape_label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LabelInjector:
+    """Appends a fixed set of labels to every sample of a Prometheus text payload.
+
+    Comments (``# HELP``/``# TYPE``) and blank lines pass through unchanged.
+    Malformed samples (unterminated label block, no value) are kept as-is.
+    """
+
+    def __init__(self, labels: Dict[str, Optional[str]], metrics_filter: Optional[MetricsFilter] = None):
+        """
+        Args:
+            labels: Label names and values to add, in order; None values are skipped
+            metrics_filter: Optional per-scrape filter applied before relabelling
+        """
+        self.metrics_filter = metrics_filter
+        self.suffix = ",".join(
+            f'{name}="{escape_label_value(str(value))}"' for name, value in labels.items() if value is not None
+        ).encode("utf-8")
+        self._braced = b"{" + self.suffix + b"}"
+        self._append = b"," + self.suffix + b"}"
+        self._close = self.suffix + b"}"
+        # Time spent relabelling (excludes waiting for chunks), for orchestrator self-instrumentation
+        self.busy_seconds = 0.0
+
+    # ========== Lines ==========
+
+    def _inject_unlabelled(self, line: bytes) -> bytes:
+        name, space, rest = line.partition(b" ")
+        if not space or not name:
+            return line
+        return b"".join((name, self._braced, space, rest))
+
+    def inject_line(self, line: bytes) -> bytes:
+        """Relabel a single line (without its trailing newline), quote- and exemplar-aware."""
+        if not line or line[0] == 0x23:  # '#'
+            return line
+        name, brace, _ = line.partition(b"{")
+        if not brace or b" " in name:
+            # No label set; a "{" after the name belongs to an exemplar
+            return self._inject_unlabelled(line)
+        match = _LABEL_BLOCK.match(line, len(name))
+        if match is None:
+            return line
+        labels = match.group(1)
+        return b"".join((name, b"{", labels, self._append if labels else self._close, line[match.end():]))
+
+    def _inject_block(self, block: bytes, filtered: bool = True) -> bytes:
+        """Relabel a block of complete lines (no trailing newline); the result is newline-terminated."""
+        if filtered and self.metrics_filter is not None:
+            lines = self.metrics_filter.filter_lines(block.split(b"\n"))
+            if not lines:
+                return b""
+            block = b"\n".join(lines)
+        skeleton = block.translate(None, _SKELETON_DELETE)
+        if _SIMPLE_SKELETON.fullmatch(skeleton) is None:
+            return b"\n".join([self.inject_line(line) for line in block.split(b"\n")]) + b"\n"
+        block = block.replace(b"}", self._append)
+        if not skeleton or skeleton[0] == 0x0A or skeleton[-1] == 0x0A or b"\n\n" in skeleton:
+            # Some lines have no label set: unlabelled samples (or blank lines)
+            inject = self._inject_unlabelled
+            block = b"\n".join([
+                inject(line) if line and line[0] != 0x23 and b"{" not in line else line
+                for line in block.split(b"\n")
+            ])
+        return block + b"\n"
+
+    # ========== Streams ==========
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Relabel a chunked payload (e.g. ``response.iter_content()``), yielding relabelled chunks.
+
+        Partial lines are carried over to the next chunk; each yielded chunk
+        ends on a line boundary except possibly the last one, which preserves
+        a missing trailing newline.
+        """
+        carry = b""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer = carry + chunk
+            end = buffer.rfind(b"\n")
+            if end == -1:
+                carry = buffer
+                continue
+            carry = buffer[end + 1:]
+            start = time.perf_counter()
+            block = self._inject_block(buffer[:end])
+            self.busy_seconds += time.perf_counter() - start
+            yield block
+        if carry and (self.metrics_filter is None or self.metrics_filter.filter_lines([carry])):
+            yield self.inject_line(carry)
+        else:
+            carry = b""
+        if self.metrics_filter is not None and self.metrics_filter.limit_exceeded:
+            warning = self._inject_block(self.metrics_filter.render_warning().rstrip(b"\n"), filtered=False)
+            yield b"\n" + warning if carry else warning
+
+    def inject(self, payload: Union[bytes, str]) -> bytes:
+        """Relabel a whole payload at once."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return b"".join(self.stream((payload,)))
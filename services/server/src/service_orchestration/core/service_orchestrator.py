@@ -20,18 +20,25 @@ import time
 import os
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 from collections import defaultdict
 import httpx
 
 from service_orchestration.core.slurm_client import SlurmClient
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
+from service_orchestration.core.metrics_filter import MetricsFilter
+from service_orchestration.core.metrics_labels import LabelInjector, METRICS_CHUNK_SIZE
 from service_orchestration.builders import JobBuilder
-from service_orchestration.recipes import RecipeLoader, Recipe, InferenceRecipe
-from service_orchestration.managers import ServiceManager
-from service_orchestration.networking import EndpointResolver
+from service_orchestration.recipes import RecipeLoader, Recipe, InferenceRecipe, RecipeMetricsConfig
+from service_orchestration.managers import ServiceManager, StateStore
+from service_orchestration.managers.state_store import default_state_path
+from service_orchestration.networking import EndpointResolver, RequestScheduler
 
 logger = logging.getLogger().getChild("service_orchestrator")
 
+# SLURM job states in which a job still holds (or waits for) its allocation
+ACTIVE_SLURM_STATES = ("pending", "configuring", "running", "completing", "suspended")
+
 
 class ServiceOrchestrator:
     """
@@ -58,6 +65,12 @@ class ServiceOrchestrator:
         self.recipe_loader = RecipeLoader(recipes_dir)
         self.endpoint_resolver = EndpointResolver(self.slurm_client, self.service_manager, self.recipe_loader)
         
+        # Restore the service registry of a previous orchestrator run (if persistence is enabled)
+        self._restore_state()
+        
+        # Admission control for the prompt path (priority classes + per-tenant fair queuing)
+        self.request_scheduler = RequestScheduler()
+        
         # Initialize service handlers (lazy-loaded for data plane operations)
         self._vllm_service = None
         self._qdrant_service = None
@@ -69,6 +82,7 @@ class ServiceOrchestrator:
             "requests_per_service": defaultdict(int)
         }
         self._health_check_task: Optional[asyncio.Task] = None
+        self._loop_monitor_task: Optional[asyncio.Task] = None
         self._http_client = httpx.AsyncClient(timeout=300.0)
     
     @property
@@ -76,12 +90,18 @@ class ServiceOrchestrator:
         """Lazy-load vLLM service handler."""
         if self._vllm_service is None:
             from service_orchestration.services.inference.vllm_service import VllmService
+            from service_orchestration.services.inference.semantic_cache import SemanticCache
             self._vllm_service = VllmService(
                 self.slurm_client, 
                 self.service_manager, 
                 self.endpoint_resolver, 
                 logger
             )
+            self._vllm_service.semantic_cache = SemanticCache(
+                lambda: self.qdrant_service,
+                self._create_semantic_cache_embedder(),
+                logger
+            )
         return self._vllm_service
     
     @property
@@ -95,8 +115,124 @@ class ServiceOrchestrator:
                 self.endpoint_resolver,
                 logger
             )
+            self._qdrant_service.text_embedder = self._create_text_search_embedder()
         return self._qdrant_service
     
+    def _create_semantic_cache_embedder(self):
+        """Embedder for the semantic cache: a vLLM embedding service if configured, else feature hashing."""
+        from service_orchestration.services.embedding import HashingEmbedder, VllmEmbedder
+        embedding_service_id = os.getenv("VLLM_SEMANTIC_CACHE_EMBEDDING_SERVICE_ID")
+        if embedding_service_id:
+            return VllmEmbedder(self.endpoint_resolver, embedding_service_id,
+                                model=os.getenv("VLLM_SEMANTIC_CACHE_EMBEDDING_MODEL"))
+        return HashingEmbedder()
+    
+    def _create_text_search_embedder(self):
+        """Cached embedder for text search / RAG retrieval, selected by TEXT_SEARCH_EMBEDDER.
+        
+        - ``hashing`` (default): feature hashing, dimension TEXT_SEARCH_EMBEDDING_DIM (384)
+        - ``vllm``: vLLM embedding service TEXT_SEARCH_EMBEDDING_SERVICE_ID (model TEXT_SEARCH_EMBEDDING_MODEL)
+        - ``local``: sentence-transformers model TEXT_SEARCH_EMBEDDING_MODEL on the orchestrator's CPU
+        
+        Falls back to hashing if the selected backend cannot be created.
+        """
+        from service_orchestration.services.embedding import CachedEmbedder, HashingEmbedder, LocalEmbedder, VllmEmbedder
+        backend = os.getenv("TEXT_SEARCH_EMBEDDER", "hashing").lower()
+        model = os.getenv("TEXT_SEARCH_EMBEDDING_MODEL") or None
+        embedder = None
+        try:
+            if backend == "vllm":
+                embedding_service_id = os.getenv("TEXT_SEARCH_EMBEDDING_SERVICE_ID")
+                if not embedding_service_id:
+                    raise RuntimeError("TEXT_SEARCH_EMBEDDING_SERVICE_ID is not set")
+                embedder = VllmEmbedder(self.endpoint_resolver, embedding_service_id, model=model)
+            elif backend == "local":
+                embedder = LocalEmbedder(model) if model else LocalEmbedder()
+        except RuntimeError as e:
+            logger.warning(f"Cannot use the {backend} text search embedder ({e}); falling back to hashing")
+        if embedder is None:
+            embedder = HashingEmbedder(int(os.getenv("TEXT_SEARCH_EMBEDDING_DIM", "384")))
+        return CachedEmbedder(
+            embedder,
+            max_entries=int(os.getenv("TEXT_SEARCH_EMBEDDING_CACHE_SIZE", "10000")),
+            max_wait_ms=float(os.getenv("TEXT_SEARCH_EMBEDDING_MAX_WAIT_MS", "0")),
+        )
+    
+    def _restore_state(self):
+        """Attach the persistent state store and reconcile restored entries with SLURM."""
+        state_path = default_state_path()
+        if not state_path or self.service_manager.get_store_stats() is not None:
+            return
+        try:
+            restored = self.service_manager.attach_store(StateStore(state_path))
+        except Exception as e:
+            logger.error(f"Failed to open state store {state_path}, continuing without persistence: {e}")
+            return
+        if restored["service"] or restored["group"]:
+            self._reconcile_with_slurm()
+    
+    def _reconcile_with_slurm(self) -> Dict[str, int]:
+        """Bring restored services and groups up to date with a single bulk SLURM query.
+        
+        Jobs that ended while the orchestrator was down are marked terminal (and
+        their health timestamps dropped); jobs that started are moved to
+        "starting" so the health check loop verifies them before routing.
+        """
+        terminal = ("completed", "failed", "cancelled")
+        services = [s for s in self.service_manager.list_services() if s.get("status") not in terminal]
+        groups = [g for g in self.service_manager.list_groups() if g.get("status") not in terminal]
+        job_ids = [s["id"] for s in services]
+        job_ids += [nj["job_id"] for g in groups for nj in g.get("node_jobs", []) if nj.get("job_id")]
+        
+        start = time.time()
+        slurm_statuses = self.slurm_client.get_jobs_status(job_ids)
+        if not slurm_statuses:
+            logger.warning("Could not reconcile restored services with SLURM; statuses will be refreshed lazily")
+            return {"services": 0, "groups": 0}
+        
+        updated = {"services": 0, "groups": 0}
+        for service in services:
+            service_id = service["id"]
+            slurm_status = slurm_statuses.get(service_id.split(":", 1)[0], "unknown")
+            new_status = self._reconciled_status(service.get("status"), slurm_status)
+            if new_status != service.get("status"):
+                self.service_manager.update_service_status(service_id, new_status)
+                if new_status not in ACTIVE_SLURM_STATES and new_status != "starting":
+                    self.service_manager.invalidate_service_health(service_id)
+                updated["services"] += 1
+        
+        for group in groups:
+            group_job_ids = {nj["job_id"] for nj in group.get("node_jobs", []) if nj.get("job_id")}
+            group_statuses = [slurm_statuses.get(job_id, "unknown") for job_id in group_job_ids]
+            if not group_statuses or any(status in ACTIVE_SLURM_STATES for status in group_statuses):
+                continue
+            # Every job of the group ended while the orchestrator was down
+            new_status = self._reconciled_status(group.get("status"), group_statuses[0])
+            for replica_id in self.service_manager.get_all_replica_ids(group["id"]):
+                self.service_manager.update_replica_status(replica_id, new_status)
+                self.service_manager.invalidate_service_health(replica_id)
+            self.service_manager.update_group_status(group["id"], new_status)
+            updated["groups"] += 1
+        
+        logger.info(
+            f"Reconciled {len(services)} services and {len(groups)} groups with SLURM in "
+            f"{(time.time() - start) * 1000:.0f}ms ({updated['services']} services, {updated['groups']} groups changed)"
+        )
+        return updated
+    
+    @staticmethod
+    def _reconciled_status(current_status: Optional[str], slurm_status: str) -> str:
+        """Map a restored status and the current SLURM job state to the new status."""
+        if slurm_status == "unknown":
+            # Job no longer known to SLURM: it finished while we were down
+            return "completed"
+        if slurm_status == "running":
+            # Keep readiness information, but never trust a stale "pending"
+            return current_status if current_status in ("running", "starting") else "starting"
+        if slurm_status in ACTIVE_SLURM_STATES:
+            return "pending" if slurm_status in ("pending", "configuring") else current_status
+        return slurm_status
+    
     def _get_service_handler(self, recipe_name: str):
         """Get the appropriate service handler based on recipe name."""
         recipe_lower = recipe_name.lower()
@@ -110,13 +246,20 @@ class ServiceOrchestrator:
     async def start(self):
         """Start background tasks"""
         self._health_check_task = asyncio.create_task(self._health_check_loop())
+        self._loop_monitor_task = asyncio.create_task(ORCHESTRATOR_METRICS.monitor_event_loop())
         logger.info("ServiceOrchestrator started")
     
     async def stop(self):
         """Stop background tasks"""
         if self._health_check_task:
             self._health_check_task.cancel()
+        if self._loop_monitor_task:
+            self._loop_monitor_task.cancel()
         await self._http_client.aclose()
+        if self._qdrant_service is not None:
+            await self._qdrant_service.aclose()
+        # Flush pending state writes so the next orchestrator run starts from the latest registry
+        self.service_manager.detach_store()
         logger.info("ServiceOrchestrator stopped")
     
     # ===== Management API (called by Server via SSH) =====
@@ -253,6 +396,7 @@ class ServiceOrchestrator:
             success = self.slurm_client.cancel_job(service_id)
             if success:
                 self.service_manager.update_service_status(service_id, "cancelled")
+                self._invalidate_cached_responses(service_id)
                 # Also remove from registered endpoints if present
                 if service_id in self.registered_endpoints:
                     self.registered_endpoints.pop(service_id)
@@ -286,8 +430,16 @@ class ServiceOrchestrator:
         # Register with endpoint resolver for discovery
         self.endpoint_resolver.register(service_id, host, port)
         
+        # A (re-)registered endpoint may be a restarted service: drop stale responses
+        self._invalidate_cached_responses(service_id)
+        
         return {"status": "registered", "service_id": service_id, "url": url}
     
+    def _invalidate_cached_responses(self, service_id: str):
+        """Drop cached prompt responses for a service that stopped or restarted."""
+        if self._vllm_service is not None:
+            self._vllm_service.invalidate_service(service_id)
+    
     def unregister_endpoint(self, service_id: str) -> Dict[str, Any]:
         """Unregister a service endpoint"""
         if service_id in self.registered_endpoints:
@@ -329,11 +481,30 @@ class ServiceOrchestrator:
         
         return {
             "global": metrics_copy,
-            "services": service_metrics
+            "services": service_metrics,
+            "scheduler": self.request_scheduler.get_stats(),
+            "response_cache": self._vllm_service.response_cache.get_stats() if self._vllm_service else None,
+            "semantic_cache": self._vllm_service.semantic_cache.get_stats() if self._vllm_service else None,
+            "state_store": self.service_manager.get_store_stats()
         }
     
+    def configure_semantic_cache(self, qdrant_service_id: Optional[str], collection_name: Optional[str] = None,
+                                 threshold: Optional[float] = None, ttl: Optional[float] = None,
+                                 embedding_service_id: Optional[str] = None,
+                                 embedding_model: Optional[str] = None) -> Dict[str, Any]:
+        """Configure (or disable, with qdrant_service_id=None) the semantic response cache."""
+        from service_orchestration.services.embedding import VllmEmbedder
+        embedder = None
+        if embedding_service_id:
+            embedder = VllmEmbedder(self.endpoint_resolver, embedding_service_id, model=embedding_model)
+        config = self.vllm_service.semantic_cache.configure(
+            qdrant_service_id, collection_name=collection_name, threshold=threshold, ttl=ttl, embedder=embedder
+        )
+        logger.info(f"Semantic cache configured: {config}")
+        return config
+    
     def get_service(self, service_id: str) -> Optional[Dict[str, Any]]:
-        """Get details of a specific service or service group"""
+        """Get details of a specific service or service group (groups are read-only views)"""
         # Check if it's a group
         if self.service_manager.is_group(service_id):
             return self.service_manager.get_group_info(service_id)
@@ -410,6 +581,7 @@ class ServiceOrchestrator:
             logger.error(f"Failed to get logs for {service_id}: {e}")
             return {"logs": f"Error fetching logs: {str(e)}"}
     
+    @ORCHESTRATOR_METRICS.stage("metrics", "total")
     def get_service_metrics(self, service_id: str, timeout: int = 10) -> Dict[str, Any]:
         """Get Prometheus metrics for a service by auto-detecting service type"""
         import requests
@@ -431,6 +603,7 @@ class ServiceOrchestrator:
                 replicas = self.service_manager.get_all_replicas_flat(service_id)
                 recipe_name = group.get("recipe_name", "").lower()
                 
+                metrics_config = self._recipe_metrics_config(recipe_name)
                 all_metrics = []
                 
                 # 1. Add group-level synthetic metrics (no replica_id)
@@ -472,7 +645,8 @@ class ServiceOrchestrator:
                         replica_port = 8001
                     
                     # Resolve endpoint for this replica
-                    endpoint = self.endpoint_resolver.resolve(replica_id, default_port=replica_port)
+                    with ORCHESTRATOR_METRICS.stage("metrics", "resolve_endpoint"):
+                        endpoint = self.endpoint_resolver.resolve(replica_id, default_port=replica_port)
                     
                     if not endpoint or replica_status.lower() in ["pending", "starting"]:
                         # Generate synthetic metrics for pending/starting replicas
@@ -497,38 +671,42 @@ class ServiceOrchestrator:
                         
                         # 1. Fetch App Metrics
                         try:
-                            response = requests.get(
+                            with requests.get(
                                 f"http://{host}:{port}/metrics",
-                                timeout=replica_timeout
-                            )
-                            if response.status_code == 200:
-                                enriched = self._enrich_metrics_with_labels(
-                                    response.text,
-                                    service_id=service_id,
-                                    status=replica_status,
-                                    replica_id=replica_id
-                                )
-                                all_metrics.append(enriched)
-                            else:
-                                all_metrics.append(f"# Failed to fetch app metrics for {replica_id}: HTTP {response.status_code}")
+                                timeout=replica_timeout,
+                                stream=True
+                            ) as response:
+                                if response.status_code == 200:
+                                    enriched = self._enrich_metrics_with_labels(
+                                        response.iter_content(METRICS_CHUNK_SIZE),
+                                        service_id=service_id,
+                                        status=replica_status,
+                                        replica_id=replica_id,
+                                        metrics_config=metrics_config
+                                    )
+                                    all_metrics.append(enriched)
+                                else:
+                                    all_metrics.append(f"# Failed to fetch app metrics for {replica_id}: HTTP {response.status_code}")
                         except Exception as e:
                             all_metrics.append(f"# Error fetching app metrics for {replica_id}: {e}")
 
                         # 2. Fetch GPU Metrics (Sidecar)
                         try:
                             gpu_port = port + 10000
-                            response = requests.get(
+                            with requests.get(
                                 f"http://{host}:{gpu_port}/metrics",
-                                timeout=2  # Short timeout for sidecar
-                            )
-                            if response.status_code == 200:
-                                enriched_gpu = self._enrich_metrics_with_labels(
-                                    response.text,
-                                    service_id=service_id,
-                                    status=replica_status,
-                                    replica_id=replica_id
-                                )
-                                all_metrics.append(enriched_gpu)
+                                timeout=2,  # Short timeout for sidecar
+                                stream=True
+                            ) as response:
+                                if response.status_code == 200:
+                                    enriched_gpu = self._enrich_metrics_with_labels(
+                                        response.iter_content(METRICS_CHUNK_SIZE),
+                                        service_id=service_id,
+                                        status=replica_status,
+                                        replica_id=replica_id,
+                                        metrics_config=metrics_config
+                                    )
+                                    all_metrics.append(enriched_gpu)
                         except Exception:
                             # Ignore GPU metrics failures (might be CPU-only or sidecar not ready)
                             pass
@@ -546,6 +724,9 @@ class ServiceOrchestrator:
                         all_metrics.append(self._generate_status_gauge(service_id, replica_status, replica_id=replica_id))
                     all_metrics.append("")
                 
+                # 3. Orchestrator-observed request histograms (group aggregate + per replica)
+                all_metrics.append(self._request_stats_metrics(service_id))
+                
                 return {
                     "success": True,
                     "metrics": "\n".join(all_metrics),
@@ -626,7 +807,8 @@ class ServiceOrchestrator:
                 }
             
             # Resolve endpoint using endpoint_resolver
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=default_port)
+            with ORCHESTRATOR_METRICS.stage("metrics", "resolve_endpoint"):
+                endpoint = self.endpoint_resolver.resolve(service_id, default_port=default_port)
             if not endpoint:
                 logger.debug(f"No endpoint found for service {service_id} when querying metrics")
                 return {
@@ -647,39 +829,45 @@ class ServiceOrchestrator:
             logger.debug(f"Querying metrics: http://{remote_host}:{remote_port}{path}")
             
             # Direct HTTP request to compute node
+            metrics_config = self._recipe_metrics_config(recipe_name)
             metrics_parts = []
             
             # 1. Fetch App Metrics
             try:
-                response = requests.get(
+                with requests.get(
                     f"http://{remote_host}:{remote_port}{path}",
-                    timeout=timeout
-                )
-                if 200 <= response.status_code < 300:
-                    logger.debug(f"Metrics retrieved for {service_id} (size: {len(response.text)} bytes)")
-                    metrics_parts.append(self._enrich_metrics_with_labels(
-                        response.text,
-                        service_id=service_id,
-                        status=status
-                    ))
-                else:
-                    logger.warning(f"Metrics endpoint for {service_id} returned {response.status_code}")
+                    timeout=timeout,
+                    stream=True
+                ) as response:
+                    if 200 <= response.status_code < 300:
+                        enriched = self._enrich_metrics_with_labels(
+                            response.iter_content(METRICS_CHUNK_SIZE),
+                            service_id=service_id,
+                            status=status,
+                            metrics_config=metrics_config
+                        )
+                        logger.debug(f"Metrics retrieved for {service_id} (size: {len(enriched)} bytes)")
+                        metrics_parts.append(enriched)
+                    else:
+                        logger.warning(f"Metrics endpoint for {service_id} returned {response.status_code}")
             except Exception as e:
                 logger.warning(f"Metrics retrieval for {service_id} failed: {e}")
 
             # 2. Fetch GPU Metrics
             try:
                 gpu_port = remote_port + 10000
-                response = requests.get(
+                with requests.get(
                     f"http://{remote_host}:{gpu_port}/metrics",
-                    timeout=2
-                )
-                if 200 <= response.status_code < 300:
-                    metrics_parts.append(self._enrich_metrics_with_labels(
-                        response.text,
-                        service_id=service_id,
-                        status=status
-                    ))
+                    timeout=2,
+                    stream=True
+                ) as response:
+                    if 200 <= response.status_code < 300:
+                        metrics_parts.append(self._enrich_metrics_with_labels(
+                            response.iter_content(METRICS_CHUNK_SIZE),
+                            service_id=service_id,
+                            status=status,
+                            metrics_config=metrics_config
+                        ))
             except Exception:
                 pass
             
@@ -695,6 +883,7 @@ class ServiceOrchestrator:
                     "metrics_format": "prometheus_text_format"
                 }
             
+            metrics_parts.append(self._request_stats_metrics(service_id))
             enriched_metrics = "\n".join(metrics_parts)
             
             return {
@@ -714,6 +903,25 @@ class ServiceOrchestrator:
                 "metrics": ""
             }
     
+    def _request_stats_metrics(self, service_id: str) -> str:
+        """Prometheus text of the request statistics recorded for a service (empty if none)."""
+        if self._vllm_service is None:
+            return ""
+        return self._vllm_service.request_stats.render_prometheus(service_id)
+    
+    def get_service_request_stats(self, service_id: str, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize orchestrator-observed requests to a service, group or replica.
+        
+        A bare job ID is mapped to its service group when one exists, like prompts are.
+        """
+        if not self.service_manager.is_group(service_id) and ":" not in service_id:
+            if self.service_manager.get_group_info(f"sg-{service_id}"):
+                service_id = f"sg-{service_id}"
+        if self._vllm_service is None:
+            from service_orchestration.services.inference.request_stats import RequestStats
+            return RequestStats(1).summary(service_id)
+        return self._vllm_service.request_stats.summary(service_id, window_seconds=window_seconds)
+    
     def get_batch_metrics(self, service_ids: List[str], timeout: int = 5) -> Dict[str, Dict[str, Any]]:
         """Get Prometheus metrics for multiple services in a single call.
         
@@ -840,7 +1048,21 @@ class ServiceOrchestrator:
             f'service_status_info{{{labels}}} {status_value}'
         ])
 
-    def _enrich_metrics_with_labels(self, metrics_text: str, service_id: str, status: str, replica_id: Optional[str] = None) -> str:
+    def _recipe_metrics_config(self, recipe_name: str) -> Optional[RecipeMetricsConfig]:
+        """Scrape filtering declared in the recipe's ``metrics`` section, if any."""
+        if not recipe_name:
+            return None
+        try:
+            recipe = self.recipe_loader.load(recipe_name)
+        except Exception as e:
+            logger.debug(f"Could not load recipe {recipe_name} for metrics filtering: {e}")
+            return None
+        config = getattr(recipe, "metrics", None)
+        return config if isinstance(config, RecipeMetricsConfig) else None
+
+    def _enrich_metrics_with_labels(self, metrics: Union[str, bytes, Iterable[bytes]], service_id: str, status: str,
+                                    replica_id: Optional[str] = None,
+                                    metrics_config: Optional[RecipeMetricsConfig] = None) -> str:
         """Inject service_id label and prepend status gauge metric.
         
         Key change: Status is NO LONGER a label on all metrics (prevents series churn).
@@ -849,44 +1071,40 @@ class ServiceOrchestrator:
         2. Add only service_id label to all other metrics for filtering
         
         This ensures Grafana can track status changes as VALUE changes, not series changes.
+        ``metrics`` may be the full text or an iterable of byte chunks
+        (``response.iter_content()``), which is relabelled as it is read so the
+        raw body is never buffered; the relabelled text is returned whole.
+        ``metrics_config`` (the recipe's ``metrics`` section) filters it first.
         """
-        # Generate status gauge metric first
-        status_gauge = self._generate_status_gauge(service_id, status, replica_id=replica_id)
-        
-        enriched_lines = []
-        labels_str = f'service_id="{service_id}"'  # Only service_id, no status!
-        if replica_id:
-            labels_str += f',replica_id="{replica_id}"'
-        
-        for line in metrics_text.split('\n'):
-            # Skip empty lines and comments
-            if not line.strip() or line.startswith('#'):
-                enriched_lines.append(line)
-                continue
-            
-            # Parse metric line: metric_name{existing_labels} value timestamp
-            # We need to inject our labels
-            if '{' in line:
-                # Metric already has labels: metric{label1="val1"} value
-                # Insert our labels: metric{label1="val1",service_id="..."} value
-                metric_name, rest = line.split('{', 1)
-                existing_labels, value_part = rest.split('}', 1)
-                enriched_line = f'{metric_name}{{{existing_labels},{labels_str}}}{value_part}'
-            else:
-                # Metric has no labels: metric_name value timestamp
-                # Add our labels: metric_name{service_id="..."} value
-                parts = line.split(' ', 1)
-                if len(parts) == 2:
-                    metric_name, value_part = parts
-                    enriched_line = f'{metric_name}{{{labels_str}}} {value_part}'
-                else:
-                    # Malformed line, keep as-is
-                    enriched_line = line
-            
-            enriched_lines.append(enriched_line)
-        
-        # Prepend status gauge to all metrics
-        return status_gauge + '\n' + '\n'.join(enriched_lines)
+        chunks = self._stream_enriched_metrics(
+            metrics, service_id, status, replica_id=replica_id, metrics_config=metrics_config
+        )
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    def _stream_enriched_metrics(self, metrics: Union[str, bytes, Iterable[bytes]], service_id: str, status: str,
+                                 replica_id: Optional[str] = None,
+                                 metrics_config: Optional[RecipeMetricsConfig] = None) -> Iterator[bytes]:
+        """Yield the status gauge followed by the relabelled metrics, chunk by chunk (see LabelInjector).
+
+        Records the ``scrape`` stage (reading and relabelling the body) and the
+        ``relabel`` stage (time spent in the injector alone).
+        """
+        if isinstance(metrics, str):
+            metrics = metrics.encode("utf-8")
+        if isinstance(metrics, bytes):
+            metrics = (metrics,)
+        yield (self._generate_status_gauge(service_id, status, replica_id=replica_id) + "\n").encode("utf-8")
+        metrics_filter = MetricsFilter.from_config(metrics_config)
+        injector = LabelInjector({"service_id": service_id, "replica_id": replica_id}, metrics_filter=metrics_filter)
+        start = time.perf_counter()
+        yield from injector.stream(metrics)
+        ORCHESTRATOR_METRICS.stage_seconds.observe(time.perf_counter() - start, path="metrics", stage="scrape")
+        ORCHESTRATOR_METRICS.stage_seconds.observe(injector.busy_seconds, path="metrics", stage="relabel")
+        if metrics_filter is not None and metrics_filter.limit_exceeded:
+            logger.warning(
+                f"Metrics for {replica_id or service_id} exceeded max_series={metrics_filter.max_series}, "
+                f"dropped {metrics_filter.dropped_over_limit} samples"
+            )
     
     def list_recipes(self) -> List[Dict[str, Any]]:
         """List all available service recipes with simplified API format"""
@@ -907,27 +1125,16 @@ class ServiceOrchestrator:
         if not group_info:
             return None
         
-        # Count replicas by status
-        all_replicas = self.service_manager.get_all_replicas_flat(group_id)
+        # Bucket the group's incremental replica status counters
+        replica_counts = self.service_manager.get_group_status_counts(group_id)
         status_counts = {
-            "healthy": 0,
-            "starting": 0,
-            "pending": 0,
-            "failed": 0
+            "healthy": replica_counts.get("running", 0),
+            "starting": replica_counts.get("starting", 0),
+            "pending": replica_counts.get("pending", 0) + replica_counts.get("building", 0),
+            "failed": replica_counts.get("failed", 0) + replica_counts.get("cancelled", 0)
         }
         
-        for replica in all_replicas:
-            status = replica.get("status", "unknown")
-            if status == "running":
-                status_counts["healthy"] += 1
-            elif status == "starting":
-                status_counts["starting"] += 1
-            elif status in ["pending", "building"]:
-                status_counts["pending"] += 1
-            elif status in ["failed", "cancelled"]:
-                status_counts["failed"] += 1
-        
-        total = len(all_replicas)
+        total = sum(replica_counts.values())
         if status_counts["healthy"] == total:
             overall_status = "healthy"
         elif status_counts["failed"] == total:
@@ -959,7 +1166,7 @@ class ServiceOrchestrator:
         job_ids = set()
         node_jobs = group_info.get("node_jobs", [])
         
-        if isinstance(node_jobs, list):
+        if isinstance(node_jobs, (list, tuple)):
             for node_data in node_jobs:
                 job_id = node_data.get("job_id")
                 if job_id:
@@ -983,6 +1190,7 @@ class ServiceOrchestrator:
         
         # Update group status
         self.service_manager.update_group_status(group_id, "cancelled")
+        self._invalidate_cached_responses(group_id)
         
         # Also update all replicas to cancelled to ensure UI reflects this immediately
         # and prevents race conditions with SLURM polling (which might report 'completed' if purged)
@@ -1032,7 +1240,7 @@ class ServiceOrchestrator:
         job_ids = set()
         node_jobs = group_info.get("node_jobs", [])
         
-        if isinstance(node_jobs, list):
+        if isinstance(node_jobs, (list, tuple)):
             for node_data in node_jobs:
                 job_id = node_data.get("job_id")
                 if job_id:
@@ -1058,6 +1266,7 @@ class ServiceOrchestrator:
         
         # Update group status
         self.service_manager.update_group_status(group_id, "cancelled")
+        self._invalidate_cached_responses(group_id)
         
         # Update all replica statuses
         replica_ids = self.service_manager.get_all_replica_ids(group_id)
@@ -1122,7 +1331,8 @@ class ServiceOrchestrator:
         while True:
             try:
                 await asyncio.sleep(10)  # Check every 10 seconds
-                await self._check_all_replica_groups()
+                with ORCHESTRATOR_METRICS.stage("health", "cycle"):
+                    await self._check_all_replica_groups()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -1170,7 +1380,8 @@ class ServiceOrchestrator:
         
         try:
             # First check if the SLURM job is running
-            job_status = self.slurm_client.get_job_status(job_id)
+            with ORCHESTRATOR_METRICS.stage("health", "slurm_status"):
+                job_status = self.slurm_client.get_job_status(job_id)
             if job_status not in ["running", "RUNNING"]:
                 # SLURM has not allocated resources yet -> group should remain pending.
                 if replica.get("status") != "pending":
@@ -1182,7 +1393,8 @@ class ServiceOrchestrator:
                 self.service_manager.update_replica_status(replica_id, "starting")
             
             # Get the node where the job is running
-            job_details = self.slurm_client.get_job_details(job_id)
+            with ORCHESTRATOR_METRICS.stage("health", "slurm_details"):
+                job_details = self.slurm_client.get_job_details(job_id)
             if not job_details or "nodes" not in job_details:
                 return
             
@@ -1201,14 +1413,17 @@ class ServiceOrchestrator:
             # Determine health check endpoint based on service type
             if "vllm" in recipe_name.lower() or "inference" in recipe_name.lower():
                 health_url = f"http://{node}:{port}/v1/models"
-                is_ready = await self._check_vllm_health(health_url)
+                with ORCHESTRATOR_METRICS.stage("health", "http_check"):
+                    is_ready = await self._check_vllm_health(health_url)
             elif "qdrant" in recipe_name.lower() or "vector-db" in recipe_name.lower():
                 health_url = f"http://{node}:{port}/collections"
-                is_ready = await self._check_qdrant_health(health_url)
+                with ORCHESTRATOR_METRICS.stage("health", "http_check"):
+                    is_ready = await self._check_qdrant_health(health_url)
             else:
                 # Generic health check - try /health endpoint
                 health_url = f"http://{node}:{port}/health"
-                is_ready = await self._check_generic_health(health_url)
+                with ORCHESTRATOR_METRICS.stage("health", "http_check"):
+                    is_ready = await self._check_generic_health(health_url)
             
             if is_ready:
                 # Replica is ready!
@@ -1230,6 +1445,8 @@ class ServiceOrchestrator:
                     })
                     # Register the endpoint
                     self.endpoint_resolver.register(replica_id, node, port)
+                    # Replica (re)started: responses cached from a previous run are stale
+                    self._invalidate_cached_responses(replica_id)
                     logger.debug(f"Registered endpoint for replica {replica_id}: http://{node}:{port}")
                 
                 logger.info(f"Replica {replica_id} in group {group_id} is now ready on {node}:{port}")
@@ -7,9 +7,12 @@ import os
 import json
 import logging
 import subprocess
+import time
 import requests
 from typing import Dict, Any, Optional, List
 
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS, normalize_path
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,6 +101,32 @@ def _expand_slurm_hostlist(value: str) -> List[str]:
         results.extend(expand_token(tok))
     return [r for r in results if r]
 
+class _InstrumentedSession(requests.Session):
+    """requests.Session that records SLURM REST call counts and latencies.
+
+    Calls are labelled by method and normalized path relative to the REST
+    base URL (job IDs collapse to ``{id}``) and by outcome: the status class
+    (``2xx``, ``4xx``...) or ``error`` when no response was received.
+    """
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self._base_url = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        path = url[len(self._base_url):] if url.startswith(self._base_url) else url
+        labels = {"method": method.upper(), "endpoint": normalize_path(path)}
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            outcome = f"{response.status_code // 100}xx"
+            return response
+        finally:
+            ORCHESTRATOR_METRICS.slurm_seconds.observe(time.perf_counter() - start, **labels)
+            ORCHESTRATOR_METRICS.slurm_requests.inc(outcome=outcome, **labels)
+
+
 class SlurmClient:
     """
     Client for interacting with SLURM REST API via SOCKS5 proxy.
@@ -117,7 +146,7 @@ class SlurmClient:
         
         # Configure session - only use SOCKS proxy if explicitly enabled
         # (Orchestrator runs ON MeluXina, so it can reach SLURM REST directly)
-        self.session = requests.Session()
+        self.session = _InstrumentedSession(self.base_url)
         logger.info(f"Initialized SlurmClient for user {self.username} at {self.base_url} (direct connection, no proxy)")
 
     def _get_token(self) -> str:
@@ -263,3 +292,33 @@ class SlurmClient:
             logger.error(f"Failed to get details for {job_id}: {e}")
             logger.exception(e)
             return {}
+
+    def get_jobs_status(self, job_ids: List[str]) -> Dict[str, str]:
+        """Get the status of many jobs with a single /jobs query.
+
+        Jobs SLURM no longer reports (finished and purged) are returned as "unknown".
+        Returns an empty dict if the query itself fails.
+        """
+        wanted = {job_id.split(':', 1)[0] for job_id in job_ids}
+        if not wanted:
+            return {}
+        try:
+            response = self.session.get(
+                f"{self.base_url}/jobs",
+                headers=self.headers,
+                timeout=10
+            )
+            response.raise_for_status()
+            statuses = {job_id: "unknown" for job_id in wanted}
+            for job in response.json().get('jobs', []):
+                job_id = str(job.get('job_id'))
+                if job_id not in wanted:
+                    continue
+                state = job.get('job_state', 'unknown')
+                if isinstance(state, list):
+                    state = state[0] if state else 'unknown'
+                statuses[job_id] = str(state).lower()
+            return statuses
+        except Exception as e:
+            logger.error(f"Failed to get status for {len(wanted)} jobs: {e}")
+            return {}
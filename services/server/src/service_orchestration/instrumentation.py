@@ -0,0 +1,269 @@
+"""
+Self-instrumentation of the orchestrator and of the gateway's orchestrator proxy.
+
+Minimal thread-safe Prometheus primitives rendered in the text exposition
+format, like the rest of the orchestrator's metrics (the orchestrator image
+does not ship prometheus_client):
+
+- ``Histogram``: labelled, fixed buckets, ``time(...)`` context manager
+- ``Counter`` / ``Gauge``: labelled values
+- ``Registry``: a named set of metrics rendered together
+
+``ORCHESTRATOR_METRICS`` holds the orchestrator's hot-path metrics (prompt,
+metrics and health paths per stage, endpoint resolution, SLURM REST calls,
+HTTP handlers, bulk vector ingestion, embedding cache and event-loop lag); it is served on ``/api/metrics/prometheus``.
+Stages are also recorded as tracing spans when the request is traced.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from service_orchestration.tracing import TRACER
+
+# Upper bounds (seconds) for in-process stages: sub-millisecond lookups up to upstream generations
+STAGE_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(r"(?<=/)[^/?]*\d[^/?]*")
+
+
+def normalize_path(path: str) -> str:
+    """Collapse path segments containing digits (job/service/replica IDs) to ``{id}``, drop the query."""
+    return _ID_SEGMENT.sub("{id}", path.split("?", 1)[0])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric(ABC):
+    """Base class of the metric types: name, help text and label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Exposition-format lines of the metric, HELP/TYPE header included."""
+        pass
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = STAGE_BUCKETS_S):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value_s: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value_s <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value_s
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self._header()
+        for key, series in items:
+            cumulative = 0
+            labels = _format_labels(self.labelnames, key)
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append("%s_bucket%s %d" % (self.name, _format_labels(self.labelnames, key, 'le="%s"' % bound),
+                                                 cumulative))
+            cumulative += series[len(self.buckets)]
+            lines.append("%s_bucket%s %d" % (self.name, _format_labels(self.labelnames, key, 'le="+Inf"'), cumulative))
+            lines.append(f"{self.name}_sum{labels} {round(series[-1], 6)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class OrchestratorMetrics(Registry):
+    """The orchestrator's own hot-path metrics."""
+
+    def __init__(self):
+        super().__init__()
+        self.stage_seconds = self.register(Histogram(
+            "orchestrator_stage_duration_seconds",
+            "Time spent per stage of the orchestrator's prompt, metrics and health paths.",
+            ("path", "stage"),
+        ))
+        self.resolve_seconds = self.register(Histogram(
+            "orchestrator_endpoint_resolve_duration_seconds",
+            "EndpointResolver.resolve latency by where the endpoint came from.",
+            ("source",),
+        ))
+        self.slurm_requests = self.register(Counter(
+            "orchestrator_slurm_requests_total",
+            "SLURM REST API calls by endpoint and outcome.",
+            ("method", "endpoint", "outcome"),
+        ))
+        self.slurm_seconds = self.register(Histogram(
+            "orchestrator_slurm_request_duration_seconds",
+            "SLURM REST API call latency.",
+            ("method", "endpoint"),
+        ))
+        self.http_seconds = self.register(Histogram(
+            "orchestrator_http_request_duration_seconds",
+            "Orchestrator API handler latency by route.",
+            ("method", "route"),
+        ))
+        self.vector_ingest_points = self.register(Counter(
+            "orchestrator_vector_ingest_points_total",
+            "Points sent to vector DB collections by bulk ingestion, by outcome.",
+            ("collection", "outcome"),
+        ))
+        self.vector_ingest_batch_seconds = self.register(Histogram(
+            "orchestrator_vector_ingest_batch_duration_seconds",
+            "Latency of one bulk ingestion upsert batch.",
+            ("collection",),
+        ))
+        self.vector_ingest_rate = self.register(Gauge(
+            "orchestrator_vector_ingest_points_per_second",
+            "Throughput of the most recent (or running) bulk ingestion into a collection.",
+            ("collection",),
+        ))
+        self.embedding_cache_lookups = self.register(Counter(
+            "orchestrator_embedding_cache_lookups_total",
+            "Texts looked up in the embedding cache, by embedder and hit/miss.",
+            ("embedder", "result"),
+        ))
+        self.event_loop_lag = self.register(Gauge(
+            "orchestrator_event_loop_lag_seconds",
+            "Delay of the most recent event-loop heartbeat beyond its scheduled time.",
+        ))
+        self.event_loop_lag_max = self.register(Gauge(
+            "orchestrator_event_loop_lag_max_seconds",
+            "Largest event-loop heartbeat delay since the orchestrator started.",
+        ))
+
+    @contextmanager
+    def stage(self, path: str, stage: str) -> Iterator[None]:
+        """Time one stage of a hot path (and record it as a span of the current trace, if any)."""
+        start = time.perf_counter()
+        try:
+            with TRACER.span(f"{path}.{stage}"):
+                yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - start, path=path, stage=stage)
+
+    async def monitor_event_loop(self, interval: float = 0.5) -> None:
+        """Heartbeat task: measures how late the event loop wakes up (blocking calls show up as lag)."""
+        loop = asyncio.get_running_loop()
+        worst = 0.0
+        while True:
+            scheduled = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - scheduled)
+            worst = max(worst, lag)
+            self.event_loop_lag.set(round(lag, 6))
+            self.event_loop_lag_max.set(round(worst, 6))
+
+
+ORCHESTRATOR_METRICS = OrchestratorMetrics()
@@ -1,4 +1,5 @@
 """Service management module."""
 from .service_manager import ServiceManager
+from .state_store import StateStore
 
-__all__ = ['ServiceManager']
+__all__ = ['ServiceManager', 'StateStore']
@@ -3,15 +3,89 @@ In-memory service manager for managing service and job information.
 Provides better organization, querying, and lifecycle management within a single server run.
 
 Now includes service group management (previously in ServiceGroupManager).
+State can optionally be persisted to a StateStore so it survives orchestrator restarts.
+
+Writers serialize on a lock and publish an immutable, versioned snapshot
+after every change; readers use the current snapshot without locking.
 """
 
 import logging
 import threading
 import time
 import uuid
-from typing import Dict, List, Optional, Any
+import weakref
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Any, Tuple
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a record: dicts become mapping proxies and lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _freeze_group(group: Dict[str, Any], previous: Optional[Mapping[str, Any]],
+                  changed_replicas: Tuple[str, ...]) -> Mapping[str, Any]:
+    """Freeze a group record, reusing the frozen replicas of ``previous`` that did not change."""
+    reusable = {}
+    if previous is not None:
+        reusable = {
+            replica["id"]: replica
+            for node_job in previous.get("node_jobs", ())
+            for replica in node_job.get("replicas", ())
+            if replica["id"] not in changed_replicas
+        }
+    node_jobs = tuple(
+        MappingProxyType({
+            **{key: _freeze(value) for key, value in node_job.items() if key != "replicas"},
+            "replicas": tuple(reusable.get(replica["id"]) or _freeze(replica) for replica in node_job.get("replicas", [])),
+        })
+        for node_job in group.get("node_jobs", [])
+    )
+    return MappingProxyType({
+        **{key: _freeze(value) for key, value in group.items() if key != "node_jobs"},
+        "node_jobs": node_jobs,
+    })
+
+
+def _replace_buckets(published: Mapping[str, Tuple[str, ...]], index: Dict[str, List[str]],
+                     keys: Tuple[str, ...]) -> Mapping[str, Tuple[str, ...]]:
+    """Copy of a published index in which only the given buckets are rebuilt from the live index."""
+    if not keys:
+        return published
+    buckets = published.copy()
+    for key in keys:
+        ids = index.get(key)
+        if ids:
+            buckets[key] = tuple(ids)
+        else:
+            buckets.pop(key, None)
+    return MappingProxyType(buckets)
+
+
+class RegistrySnapshot(NamedTuple):
+    """Copy-on-write view of the service registry.
+    
+    Published by writers as a whole. Each write copies the top-level
+    mappings and replaces only the records that changed, so unchanged
+    records are shared between consecutive snapshots. Group and replica
+    records are frozen (mapping proxies and tuples); service records are
+    never mutated after publication and must be treated as read-only.
+    """
+    version: int
+    services: Mapping[str, Dict[str, Any]]
+    services_by_recipe: Mapping[str, Tuple[str, ...]]
+    services_by_status: Mapping[str, Tuple[str, ...]]
+    groups: Mapping[str, Mapping[str, Any]]
+    # replica_id -> (replica record, node_job record, group_id)
+    replicas: Mapping[str, Tuple[Mapping[str, Any], Mapping[str, Any], str]]
 
 
 class ServiceManager:
@@ -21,6 +95,12 @@ class ServiceManager:
     - Individual service registration and status tracking
     - Service groups (replica groups for data-parallel workloads)
     - Health tracking for recently-used services
+    - Optional persistence to a StateStore (see attach_store)
+    
+    Mutations hold ``_instance_lock`` and end by publishing a new
+    RegistrySnapshot (see get_snapshot); query methods read the current
+    snapshot reference and never take the lock, so request-path readers do
+    not contend with health-check writers.
     """
     
     _instance = None
@@ -49,6 +129,181 @@ class ServiceManager:
         # Service group tracking (merged from ServiceGroupManager)
         self._groups: Dict[str, Dict[str, Any]] = {}
         self._replica_to_group: Dict[str, str] = {}
+        # Replica index: replica_id -> (replica record, node_job record); records are shared with _groups
+        self._replica_index: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        # Per-group replica IDs and replica status counters, updated incrementally
+        self._group_replica_ids: Dict[str, List[str]] = {}
+        self._group_status_counts: Dict[str, Counter] = {}
+        
+        # Optional persistent backing store (write-behind)
+        self._store = None
+        
+        # Weak references to status listeners (see add_status_listener)
+        self._status_listeners: List[weakref.WeakMethod] = []
+        
+        # Lock-free read view, replaced (never mutated) by writers
+        self._snapshot = RegistrySnapshot(0, _EMPTY, _EMPTY, _EMPTY, _EMPTY, _EMPTY)
+
+    # ========== Snapshots ==========
+
+    def get_snapshot(self) -> RegistrySnapshot:
+        """Get the current registry snapshot (its version increases with every change)."""
+        return self._snapshot
+
+    def _publish_service(self, service_id: str, recipe_names: Tuple[str, ...] = (),
+                         statuses: Tuple[str, ...] = ()) -> None:
+        """Publish a snapshot in which only one service (and the given index buckets) changed; caller must hold the lock."""
+        snapshot = self._snapshot
+        services = snapshot.services.copy()
+        service_data = self._services.get(service_id)
+        if service_data is None:
+            services.pop(service_id, None)
+        else:
+            services[service_id] = dict(service_data)
+        self._snapshot = snapshot._replace(
+            version=snapshot.version + 1,
+            services=MappingProxyType(services),
+            services_by_recipe=_replace_buckets(snapshot.services_by_recipe, self._services_by_recipe, recipe_names),
+            services_by_status=_replace_buckets(snapshot.services_by_status, self._services_by_status, statuses),
+        )
+
+    def _publish_group(self, group_id: str, changed_replicas: Tuple[str, ...] = (),
+                       removed_replicas: Tuple[str, ...] = ()) -> None:
+        """Publish a snapshot in which only one group changed; caller must hold the lock.
+        
+        Replicas listed in ``changed_replicas`` (and new ones) are frozen again;
+        the others keep their previously published records.
+        """
+        snapshot = self._snapshot
+        groups = snapshot.groups.copy()
+        replicas = snapshot.replicas.copy()
+        for replica_id in removed_replicas:
+            replicas.pop(replica_id, None)
+        group = self._groups.get(group_id)
+        if group is None:
+            groups.pop(group_id, None)
+        else:
+            frozen = _freeze_group(group, snapshot.groups.get(group_id), changed_replicas)
+            groups[group_id] = frozen
+            for node_job in frozen.get("node_jobs", ()):
+                for replica in node_job.get("replicas", ()):
+                    replicas[replica["id"]] = (replica, node_job, group_id)
+        self._snapshot = snapshot._replace(
+            version=snapshot.version + 1,
+            groups=MappingProxyType(groups),
+            replicas=MappingProxyType(replicas),
+        )
+
+    def _commit_service(self, service_id: str, recipe_names: Tuple[str, ...] = (),
+                        statuses: Tuple[str, ...] = ()) -> None:
+        """Publish and persist a service change; caller must hold the lock."""
+        self._publish_service(service_id, recipe_names, statuses)
+        self._persist_service(service_id)
+
+    def _commit_group(self, group_id: str, changed_replicas: Tuple[str, ...] = (),
+                      removed_replicas: Tuple[str, ...] = ()) -> None:
+        """Publish and persist a group change; caller must hold the lock."""
+        self._publish_group(group_id, changed_replicas, removed_replicas)
+        self._persist_group(group_id)
+
+    # ========== Status listeners ==========
+
+    def add_status_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Call the bound method ``listener(service_id, status)`` after every registration and status change.
+
+        Removed services and replicas are reported with the status ``"removed"``.
+        Listeners run while the registry lock is held, so they must be quick and
+        must not mutate the registry. Only a weak reference is kept.
+        """
+        with self._instance_lock:
+            self._status_listeners.append(weakref.WeakMethod(listener))
+
+    def _notify_status(self, service_id: str, status: str) -> None:
+        """Notify status listeners; caller must hold the lock."""
+        for ref in list(self._status_listeners):
+            listener = ref()
+            if listener is None:
+                self._status_listeners.remove(ref)
+                continue
+            try:
+                listener(service_id, status)
+            except Exception as e:
+                self.logger.warning(f"Status listener failed for {service_id}: {e}")
+
+    # ========== Persistence ==========
+
+    def attach_store(self, store) -> Dict[str, int]:
+        """Restore state from a StateStore and persist every later change to it.
+        
+        Indexes (by recipe, by status, replica index, group status counters)
+        are rebuilt from the stored documents. Returns the number of restored services, groups and
+        health timestamps.
+        """
+        state = store.load()
+        with self._instance_lock:
+            for service_id, service_data in state.get("service", {}).items():
+                if service_id not in self._services:
+                    self.register_service(service_data)
+            for group_id, group in state.get("group", {}).items():
+                if group_id in self._groups:
+                    continue
+                self._groups[group_id] = group
+                self._group_replica_ids[group_id] = []
+                self._group_status_counts[group_id] = Counter()
+                for node_job in group.get("node_jobs", []):
+                    for replica in node_job.get("replicas", []):
+                        self._index_replica(group_id, node_job, replica)
+            for service_id, timestamp in state.get("health", {}).items():
+                self._last_successful_prompt.setdefault(service_id, timestamp)
+            for group_id in state.get("group", {}):
+                self._publish_group(group_id)
+            self._store = store
+        
+        restored = {kind: len(state.get(kind, {})) for kind in ("service", "group", "health")}
+        self.logger.info(f"Restored state from {store.path}: {restored}")
+        return restored
+
+    def detach_store(self) -> None:
+        """Stop persisting changes and close the store (flushing pending writes)."""
+        with self._instance_lock:
+            store, self._store = self._store, None
+        if store is not None:
+            store.close()
+
+    def get_store_stats(self) -> Optional[Dict[str, Any]]:
+        """Return persistence statistics, or None if no store is attached."""
+        store = self._store
+        return store.get_stats() if store is not None else None
+
+    def _persist_service(self, service_id: str) -> None:
+        """Queue the current state of a service for persistence; caller must hold the lock."""
+        if self._store is None:
+            return
+        service_data = self._services.get(service_id)
+        if service_data is None:
+            self._store.delete("service", service_id)
+        else:
+            self._store.put("service", service_id, service_data)
+
+    def _persist_group(self, group_id: str) -> None:
+        """Queue the current state of a group for persistence; caller must hold the lock."""
+        if self._store is None:
+            return
+        group = self._groups.get(group_id)
+        if group is None:
+            self._store.delete("group", group_id)
+        else:
+            self._store.put("group", group_id, group)
+
+    def _persist_health(self, service_id: str) -> None:
+        """Queue a health timestamp for persistence; caller must hold the lock."""
+        if self._store is None:
+            return
+        timestamp = self._last_successful_prompt.get(service_id)
+        if timestamp is None:
+            self._store.delete("health", service_id)
+        else:
+            self._store.put("health", service_id, timestamp)
 
     # ========== Individual Service Methods ==========
 
@@ -63,6 +318,8 @@ class ServiceManager:
 
             self._services_by_recipe[recipe_name].append(service_id)
             self._services_by_status[status].append(service_id)
+            self._commit_service(service_id, (recipe_name,), (status,))
+            self._notify_status(service_id, status)
 
     def update_service_status(self, service_id: str, new_status: str) -> bool:
         """Update the status of a service."""
@@ -71,6 +328,9 @@ class ServiceManager:
                 return False
 
             old_status = self._services[service_id].get('status', 'unknown')
+            if old_status == new_status:
+                # Health checks and prompts re-report the current status; nothing to publish
+                return True
             self._services[service_id]['status'] = new_status
             self._services[service_id]['last_updated'] = datetime.now()
 
@@ -78,29 +338,31 @@ class ServiceManager:
                 self._services_by_status[old_status].remove(service_id)
 
             self._services_by_status[new_status].append(service_id)
+            self._commit_service(service_id, statuses=(old_status, new_status))
+            self._notify_status(service_id, new_status)
             return True
 
     def get_service(self, service_id: str) -> Optional[Dict[str, Any]]:
-        """Get service information by ID."""
-        with self._instance_lock:
-            return self._services.get(service_id)
+        """Get service information by ID (a copy; lock-free)."""
+        service_data = self._snapshot.services.get(service_id)
+        return dict(service_data) if service_data is not None else None
 
     def list_services(self, status_filter: Optional[str] = None,
                      recipe_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-        """List services with optional filtering."""
-        with self._instance_lock:
-            if status_filter and recipe_filter:
-                status_services = set(self._services_by_status.get(status_filter, []))
-                recipe_services = set(self._services_by_recipe.get(recipe_filter, []))
-                service_ids = status_services & recipe_services
-            elif status_filter:
-                service_ids = self._services_by_status.get(status_filter, [])
-            elif recipe_filter:
-                service_ids = self._services_by_recipe.get(recipe_filter, [])
-            else:
-                service_ids = list(self._services.keys())
-
-            return [self._services[sid].copy() for sid in service_ids if sid in self._services]
+        """List services with optional filtering (lock-free)."""
+        snapshot = self._snapshot
+        if status_filter and recipe_filter:
+            status_services = set(snapshot.services_by_status.get(status_filter, ()))
+            recipe_services = set(snapshot.services_by_recipe.get(recipe_filter, ()))
+            service_ids = status_services & recipe_services
+        elif status_filter:
+            service_ids = snapshot.services_by_status.get(status_filter, ())
+        elif recipe_filter:
+            service_ids = snapshot.services_by_recipe.get(recipe_filter, ())
+        else:
+            service_ids = snapshot.services.keys()
+
+        return [snapshot.services[sid].copy() for sid in service_ids if sid in snapshot.services]
 
     def remove_service(self, service_id: str) -> bool:
         """Remove a service from the manager."""
@@ -118,6 +380,8 @@ class ServiceManager:
                 self._services_by_status[status].remove(service_id)
 
             del self._services[service_id]
+            self._commit_service(service_id, (recipe_name,), (status,))
+            self._notify_status(service_id, "removed")
             return True
 
     def get_services_by_recipe(self, recipe_name: str) -> List[Dict[str, Any]]:
@@ -140,14 +404,13 @@ class ServiceManager:
     def find_services_by_pattern(self, name_pattern: str = None,
                                recipe_pattern: str = None) -> List[Dict[str, Any]]:
         """Find services by name or recipe pattern (case-insensitive substring match)."""
-        with self._instance_lock:
-            matches = []
-            for service_data in self._services.values():
-                name_match = not name_pattern or name_pattern.lower() in service_data.get('name', '').lower()
-                recipe_match = not recipe_pattern or recipe_pattern.lower() in service_data.get('recipe_name', '').lower()
-                if name_match and recipe_match:
-                    matches.append(service_data.copy())
-            return matches
+        matches = []
+        for service_data in self._snapshot.services.values():
+            name_match = not name_pattern or name_pattern.lower() in service_data.get('name', '').lower()
+            recipe_match = not recipe_pattern or recipe_pattern.lower() in service_data.get('recipe_name', '').lower()
+            if name_match and recipe_match:
+                matches.append(service_data.copy())
+        return matches
 
     # ========== Health Tracking Methods ==========
     
@@ -155,19 +418,21 @@ class ServiceManager:
         """Mark a service as healthy after successful prompt response."""
         with self._instance_lock:
             self._last_successful_prompt[service_id] = time.time()
+            self._persist_health(service_id)
     
     def is_service_recently_healthy(self, service_id: str, max_age_seconds: int = 300) -> bool:
         """Check if a service was successfully used recently (default: 5 minutes)."""
-        with self._instance_lock:
-            if service_id not in self._last_successful_prompt:
-                return False
-            age = time.time() - self._last_successful_prompt[service_id]
-            return age < max_age_seconds
+        # Single dict lookup is atomic; no lock needed on this hot path
+        last_success = self._last_successful_prompt.get(service_id)
+        if last_success is None:
+            return False
+        return time.time() - last_success < max_age_seconds
     
     def invalidate_service_health(self, service_id: str) -> None:
         """Invalidate health status for a service (e.g., after an error)."""
         with self._instance_lock:
-            self._last_successful_prompt.pop(service_id, None)
+            if self._last_successful_prompt.pop(service_id, None) is not None:
+                self._persist_health(service_id)
 
     # ========== Service Group Methods ==========
     
@@ -209,6 +474,9 @@ class ServiceManager:
                 # Group starts as pending until the SLURM job is RUNNING.
                 "status": "pending"
             }
+            self._group_replica_ids[group_id] = []
+            self._group_status_counts[group_id] = Counter()
+            self._commit_group(group_id)
             
             self.logger.info(f"Created replica group {group_id}: {num_nodes} nodes × {replicas_per_node} replicas = {total_replicas} total")
             return group_id
@@ -246,34 +514,33 @@ class ServiceManager:
                 "added_at": datetime.now().isoformat()
             }
             node_job["replicas"].append(replica_info)
-            self._replica_to_group[replica_id] = group_id
+            self._index_replica(group_id, node_job, replica_info)
 
             # Keep the group status in sync as replicas are added.
             self._update_group_status(group_id)
+            self._commit_group(group_id)
             
             self.logger.debug(f"Added replica {replica_id} (GPU {gpu_id}, port {port}) to group {group_id}")
     
     def get_all_replicas_flat(self, group_id: str) -> List[Dict[str, Any]]:
-        """Get all replicas in a group as a flat list."""
-        with self._instance_lock:
-            group = self._groups.get(group_id)
-            if not group:
-                return []
-            
-            all_replicas = []
-            for node_job in group.get("node_jobs", []):
-                all_replicas.extend(node_job["replicas"])
-            return all_replicas
+        """Get all replicas in a group as a flat list of copies (lock-free)."""
+        group = self._snapshot.groups.get(group_id)
+        if not group:
+            return []
+        
+        all_replicas = []
+        for node_job in group.get("node_jobs", []):
+            all_replicas.extend(dict(replica) for replica in node_job["replicas"])
+        return all_replicas
     
     def get_group_info(self, group_id: str) -> Optional[Dict[str, Any]]:
-        """Get group metadata by ID."""
-        with self._instance_lock:
-            return self._groups.get(group_id)
+        """Get group metadata by ID (lock-free; a read-only view with tuples for node_jobs and replicas)."""
+        return self._snapshot.groups.get(group_id)
     
     def get_group_for_replica(self, replica_id: str) -> Optional[str]:
         """Get the group ID for a given replica ID."""
-        with self._instance_lock:
-            return self._replica_to_group.get(replica_id)
+        entry = self._snapshot.replicas.get(replica_id)
+        return entry[2] if entry else None
     
     def get_replica_info(self, replica_id: str) -> Optional[Dict[str, Any]]:
         """Get replica information including parent group's recipe_name.
@@ -281,28 +548,23 @@ class ServiceManager:
         Returns a dict with replica info plus 'recipe_name' from the parent group,
         or None if the replica is not found.
         """
-        with self._instance_lock:
-            group_id = self._replica_to_group.get(replica_id)
-            if not group_id:
-                return None
-            
-            group = self._groups.get(group_id)
-            if not group:
-                return None
-            
-            # Find the replica in the group
-            for node_job in group.get("node_jobs", []):
-                for replica in node_job["replicas"]:
-                    if replica["id"] == replica_id:
-                        # Return replica info with parent group's recipe_name
-                        return {
-                            **replica,
-                            "group_id": group_id,
-                            "recipe_name": group.get("recipe_name", "unknown"),
-                            "node_index": node_job.get("node_index"),
-                            "node": node_job.get("node")
-                        }
+        snapshot = self._snapshot
+        entry = snapshot.replicas.get(replica_id)
+        if not entry:
+            return None
+        replica, node_job, group_id = entry
+        group = snapshot.groups.get(group_id)
+        if not group:
             return None
+        
+        # Return replica info with parent group's recipe_name
+        return {
+            **replica,
+            "group_id": group_id,
+            "recipe_name": group.get("recipe_name", "unknown"),
+            "node_index": node_job.get("node_index"),
+            "node": node_job.get("node")
+        }
     
     def update_replica_status(self, replica_id: str, status: str) -> None:
         """Update the status of a specific replica."""
@@ -311,22 +573,24 @@ class ServiceManager:
             self.update_service_status(replica_id, status)
             
             # Update in group tracking
-            group_id = self._replica_to_group.get(replica_id)
-            if not group_id:
+            entry = self._replica_index.get(replica_id)
+            if not entry:
                 self.logger.warning(f"Replica {replica_id} not found in any group")
                 return
             
-            group = self._groups.get(group_id)
-            if not group:
+            replica, _ = entry
+            if replica.get("status") == status:
+                # Every successful prompt reports "running"; skip the snapshot, store and listeners
                 return
-            
-            for node_job in group.get("node_jobs", []):
-                for replica in node_job["replicas"]:
-                    if replica["id"] == replica_id:
-                        replica["status"] = status
-                        replica["updated_at"] = datetime.now().isoformat()
-                        self._update_group_status(group_id)
-                        return
+            group_id = self._replica_to_group[replica_id]
+            counts = self._group_status_counts[group_id]
+            counts[replica.get("status", "unknown")] -= 1
+            counts[status] += 1
+            replica["status"] = status
+            replica["updated_at"] = datetime.now().isoformat()
+            self._update_group_status(group_id)
+            self._commit_group(group_id, changed_replicas=(replica_id,))
+            self._notify_status(replica_id, status)
     
     def update_node_info(self, group_id: str, job_id: str, node: str, node_index: Optional[int] = None) -> None:
         """Update the node hostname for a job in a group."""
@@ -344,30 +608,44 @@ class ServiceManager:
 
                 if not node_job.get("node"):
                     node_job["node"] = node
+                    self._commit_group(group_id)
                     self.logger.debug(f"Updated node info for job {job_id} in group {group_id}: {node}")
                     return
     
+    def _index_replica(self, group_id: str, node_job: Dict[str, Any], replica: Dict[str, Any]) -> None:
+        """Add a replica to the replica index and group counters; caller must hold the lock."""
+        self._replica_index[replica["id"]] = (replica, node_job)
+        self._replica_to_group[replica["id"]] = group_id
+        self._group_replica_ids[group_id].append(replica["id"])
+        self._group_status_counts[group_id][replica.get("status", "unknown")] += 1
+    
+    def get_group_status_counts(self, group_id: str) -> Dict[str, int]:
+        """Get the number of replicas per status for a group (O(number of distinct statuses))."""
+        with self._instance_lock:
+            counts = self._group_status_counts.get(group_id)
+            return {status: n for status, n in counts.items() if n > 0} if counts else {}
+    
     def _update_group_status(self, group_id: str) -> None:
-        """Update the overall group status based on replica statuses."""
+        """Update the overall group status from the group's replica status counters."""
         group = self._groups.get(group_id)
         if not group:
             return
         
-        all_replicas = self.get_all_replicas_flat(group_id)
-        replica_statuses = [r["status"] for r in all_replicas]
+        counts = self._group_status_counts.get(group_id, Counter())
+        total = sum(counts.values())
         
-        if not replica_statuses:
+        if not total:
             group["status"] = "pending"
             return
         
-        ready_or_running = sum(1 for s in replica_statuses if s in ["running", "ready"])
-        starting = sum(1 for s in replica_statuses if s == "starting")
-        completed = sum(1 for s in replica_statuses if s in ["completed", "failed", "cancelled"])
+        ready_or_running = counts["running"] + counts["ready"]
+        starting = counts["starting"]
+        completed = counts["completed"] + counts["failed"] + counts["cancelled"]
         
-        if completed == len(replica_statuses):
+        if completed == total:
             group["status"] = "completed"
         # Only mark the group as fully running once ALL replicas are ready/running.
-        elif ready_or_running == len(replica_statuses):
+        elif ready_or_running == total:
             group["status"] = "running"
         # Otherwise, the group is still starting up (even if some replicas are ready).
         elif starting > 0 or ready_or_running > 0:
@@ -384,22 +662,26 @@ class ServiceManager:
                 return
             group["status"] = status
             group["updated_at"] = datetime.now().isoformat()
+            self._commit_group(group_id)
     
     def get_healthy_replicas(self, group_id: str) -> List[str]:
         """Get list of healthy replica IDs for a group."""
-        with self._instance_lock:
-            all_replicas = self.get_all_replicas_flat(group_id)
-            return [r["id"] for r in all_replicas if r.get("status") in ["ready", "running", "healthy"]]
+        return [r["id"] for r in self._snapshot_replicas(group_id) if r.get("status") in ["ready", "running", "healthy"]]
     
     def get_all_replica_ids(self, group_id: str) -> List[str]:
         """Get all replica IDs for a group."""
-        with self._instance_lock:
-            return [r["id"] for r in self.get_all_replicas_flat(group_id)]
+        return [r["id"] for r in self._snapshot_replicas(group_id)]
+    
+    def _snapshot_replicas(self, group_id: str) -> List[Dict[str, Any]]:
+        """Replica records of a group from the current snapshot (read-only, not copied)."""
+        group = self._snapshot.groups.get(group_id)
+        if not group:
+            return []
+        return [replica for node_job in group.get("node_jobs", []) for replica in node_job["replicas"]]
     
     def list_groups(self) -> List[Dict[str, Any]]:
-        """List all service groups."""
-        with self._instance_lock:
-            return list(self._groups.values())
+        """List all service groups (lock-free; read-only views, see get_group_info)."""
+        return list(self._snapshot.groups.values())
     
     def delete_group(self, group_id: str) -> bool:
         """Delete a service group."""
@@ -407,9 +689,15 @@ class ServiceManager:
             if group_id not in self._groups:
                 return False
             
-            for replica in self.get_all_replicas_flat(group_id):
-                self._replica_to_group.pop(replica["id"], None)
+            removed = tuple(self._group_replica_ids.pop(group_id, ()))
+            for replica_id in removed:
+                self._replica_to_group.pop(replica_id, None)
+                self._replica_index.pop(replica_id, None)
             
             del self._groups[group_id]
+            self._group_status_counts.pop(group_id, None)
+            self._commit_group(group_id, removed_replicas=removed)
+            for replica_id in removed:
+                self._notify_status(replica_id, "removed")
             self.logger.info(f"Deleted service group {group_id}")
             return True
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Persistent state store for the ServiceManager.
+
+The orchestrator runs as a time-limited SLURM job; when it restarts, the
+in-memory service registry would otherwise be lost. StateStore keeps a copy
+of it in SQLite (WAL mode) on the shared filesystem.
+
+Writes are write-behind: mutations are queued in memory (coalesced per key)
+and flushed by a background thread in a single transaction, so the request
+path never waits on the filesystem.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+
+def default_state_path() -> Optional[str]:
+    """Resolve the state database path from the environment.
+
+    ``ORCHESTRATOR_STATE_DB`` takes precedence ("" or "none" disables
+    persistence); otherwise the database lives under ``REMOTE_BASE_PATH``.
+    Returns None when persistence is disabled.
+    """
+    path = os.getenv("ORCHESTRATOR_STATE_DB")
+    if path is not None:
+        return None if path.strip().lower() in ("", "none", "off") else path
+    base_path = os.getenv("REMOTE_BASE_PATH")
+    if base_path:
+        return str(Path(base_path) / "state" / "orchestrator_state.db")
+    return None
+
+
+class StateStore:
+    """SQLite key-value store with write-behind batching.
+
+    Values are JSON documents grouped by ``kind`` (e.g. "service", "group",
+    "health"). ``put``/``delete`` only touch an in-memory queue; the latest
+    value per key is written by the flusher thread every ``flush_interval``
+    seconds, or immediately via ``flush()``.
+    """
+
+    def __init__(self, path: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.flush_interval = flush_interval
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        journal_mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            self.logger.warning(f"SQLite WAL mode unavailable for {path}, using {journal_mode} journal")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # (kind, key) -> serialized value, or None for a pending delete
+        self._pending: Dict[Tuple[str, str], Optional[str]] = {}
+        self._pending_lock = threading.Lock()
+        self._stats = {"flushes": 0, "rows_written": 0, "rows_deleted": 0, "errors": 0, "last_flush_ms": 0.0}
+
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="state-store-flusher", daemon=True)
+        self._flusher.start()
+
+    # ========== Write path ==========
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Queue a value for persistence (serialized immediately, written later)."""
+        serialized = json.dumps(value, default=str)
+        with self._pending_lock:
+            self._pending[(kind, key)] = serialized
+
+    def delete(self, kind: str, key: str) -> None:
+        """Queue the removal of a value."""
+        with self._pending_lock:
+            self._pending[(kind, key)] = None
+
+    def flush(self) -> int:
+        """Write all queued changes in one transaction. Returns the number of rows touched."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        now = time.time()
+        upserts = [(kind, key, value, now) for (kind, key), value in pending.items() if value is not None]
+        deletes = [(kind, key) for (kind, key), value in pending.items() if value is None]
+        start = time.perf_counter()
+        try:
+            with self._db_lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO state (kind, key, value, updated_at) VALUES (?, ?, ?, ?)", upserts
+                    )
+                    self._conn.executemany("DELETE FROM state WHERE kind = ? AND key = ?", deletes)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            self.logger.error(f"Failed to flush {len(pending)} state changes to {self.path}: {e}")
+            self._stats["errors"] += 1
+            # Re-queue what failed unless newer values arrived in the meantime
+            with self._pending_lock:
+                for item, value in pending.items():
+                    self._pending.setdefault(item, value)
+            return 0
+
+        self._stats["flushes"] += 1
+        self._stats["rows_written"] += len(upserts)
+        self._stats["rows_deleted"] += len(deletes)
+        self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return len(pending)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    # ========== Read path ==========
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load every stored value as ``{kind: {key: value}}``."""
+        state: Dict[str, Dict[str, Any]] = {}
+        with self._db_lock:
+            rows = self._conn.execute("SELECT kind, key, value FROM state").fetchall()
+        for kind, key, value in rows:
+            try:
+                state.setdefault(kind, {})[key] = json.loads(value)
+            except ValueError:
+                self.logger.warning(f"Skipping corrupt state entry {kind}/{key}")
+        return state
+
+    def close(self) -> None:
+        """Stop the flusher, write outstanding changes and close the database."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return flush counters and the current queue depth."""
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"path": self.path, "pending": pending, **self._stats}
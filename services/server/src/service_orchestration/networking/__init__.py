@@ -1,5 +1,6 @@
 """Networking and service discovery modules."""
 from .endpoint_resolver import EndpointResolver
 from .load_balancer import LoadBalancer
+from .request_scheduler import RequestScheduler
 
-__all__ = ['EndpointResolver', 'LoadBalancer']
+__all__ = ['EndpointResolver', 'LoadBalancer', 'RequestScheduler']
@@ -1,13 +1,24 @@
 """Endpoint resolver utility for determining service endpoints.
 
 Unifies the logic for resolving HTTP endpoints of services running on SLURM.
+
+The node of a running job does not change for the lifetime of its allocation,
+so nodes looked up from SLURM are cached per service/replica and dropped when
+the ServiceManager reports that the job left the running states. Recipe ports
+are looked up once per job, on its first resolve.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
+import threading
+import time
 
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
 from service_orchestration.recipes import RecipeLoader
 
+# Service/replica statuses during which the job holds its node allocation
+ALLOCATED_STATUSES = ("starting", "running", "ready", "healthy")
+
 
 class EndpointResolver:
     """Resolves HTTP endpoints for services running on SLURM compute nodes."""
@@ -30,6 +41,16 @@ class EndpointResolver:
         # Keyed by service_id/replica_id (including composite ids like "job:port").
         self._registered_endpoints: Dict[str, Dict[str, Any]] = {}
 
+        # Nodes resolved from SLURM for running jobs: replica_id -> (job_id, node)
+        self._nodes: Dict[str, Tuple[str, str]] = {}
+        # Recipe port per job, filled on first resolve: job_id -> port
+        self._job_ports: Dict[str, Optional[int]] = {}
+        self._cache_lock = threading.Lock()
+
+        add_listener = getattr(service_manager, "add_status_listener", None)
+        if callable(add_listener):
+            add_listener(self._on_status_change)
+
     def register(self, replica_id: str, host: str, port: int) -> None:
         """Register an endpoint for a service/replica.
 
@@ -40,6 +61,25 @@ class EndpointResolver:
     def unregister(self, replica_id: str) -> None:
         """Remove an endpoint from the local cache."""
         self._registered_endpoints.pop(replica_id, None)
+
+    def invalidate(self, job_id: str) -> None:
+        """Forget the cached nodes of every service/replica of a SLURM job."""
+        job_id = job_id.split(":", 1)[0]
+        with self._cache_lock:
+            for replica_id in [rid for rid, (jid, _) in self._nodes.items() if jid == job_id]:
+                del self._nodes[replica_id]
+
+    def _on_status_change(self, service_id: str, status: str) -> None:
+        """ServiceManager listener: drop cached ports of removed jobs and nodes of jobs that stopped running.
+
+        Runs under the registry lock, so it only touches in-memory caches; recipe
+        ports are loaded lazily by _endpoint_on_node.
+        """
+        job_id = service_id.split(":", 1)[0]
+        if status == "removed":
+            self._job_ports.pop(job_id, None)
+        if status not in ALLOCATED_STATUSES:
+            self.invalidate(job_id)
     
     def resolve(self, replica_id: str, default_port: Optional[int] = None) -> Optional[str]:
         """
@@ -51,8 +91,9 @@ class EndpointResolver:
         
         This method:
         1. Parses the replica_id to extract job_id and optional port
-        2. Gets the SLURM job details to find which node it's running on
-        3. Uses specified port if provided, otherwise looks up recipe port
+        2. Finds the node the job runs on (cached while the job is running,
+           otherwise from the SLURM job details)
+        3. Uses specified port if provided, otherwise the recipe port
         4. Falls back to default_port if no port found
         5. Returns the full HTTP endpoint URL
         
@@ -63,25 +104,56 @@ class EndpointResolver:
         Returns:
             HTTP endpoint string (e.g., "http://mel0343:8002"), or None if resolution fails
         """
-        try:
-            # Prefer explicitly registered endpoints.
-            cached = self._registered_endpoints.get(replica_id)
-            if cached:
-                return f"http://{cached['host']}:{cached['port']}"
+        start = time.perf_counter()
+        # Prefer explicitly registered endpoints.
+        cached = self._registered_endpoints.get(replica_id)
+        if cached:
+            endpoint = f"http://{cached['host']}:{cached['port']}"
+            ORCHESTRATOR_METRICS.resolve_seconds.observe(time.perf_counter() - start, source="registered")
+            return endpoint
+
+        cached_node = self._nodes.get(replica_id)
+        if cached_node:
+            endpoint = self._endpoint_on_node(replica_id, cached_node[1], default_port)
+            ORCHESTRATOR_METRICS.resolve_seconds.observe(time.perf_counter() - start, source="cache")
+            return endpoint
+
+        endpoint = self._resolve_from_slurm(replica_id, default_port)
+        ORCHESTRATOR_METRICS.resolve_seconds.observe(time.perf_counter() - start, source="slurm")
+        return endpoint
+
+    def _endpoint_on_node(self, replica_id: str, node: str, default_port: Optional[int]) -> Optional[str]:
+        """Build the endpoint of a replica on a known node (port from the ID, the recipe or the default)."""
+        job_id, _, port_str = replica_id.partition(":")
+        if port_str:
+            port = int(port_str)
+        else:
+            port = self._job_ports.get(job_id)
+            if port is None:
+                port = self._get_port_for_job(job_id)
+                if port is not None:
+                    self._job_ports[job_id] = port
+                else:
+                    port = default_port
+        if port is None:
+            self.logger.warning("No port found for replica %s (job %s)", replica_id, job_id)
+            return None
+        return f"http://{node}:{port}"
 
+    def _resolve_from_slurm(self, replica_id: str, default_port: Optional[int]) -> Optional[str]:
+        """Resolve an endpoint that is not registered or cached from the SLURM job's node list."""
+        try:
             # Parse replica_id to extract job_id and optional port
             if ":" in replica_id:
                 # Composite format: "job_id:port"
                 job_id, port_str = replica_id.split(":", 1)
-                specified_port = int(port_str)
-                self.logger.debug(f"Parsed composite replica_id {replica_id}: job={job_id}, port={specified_port}")
+                self.logger.debug(f"Parsed composite replica_id {replica_id}: job={job_id}, port={port_str}")
 
                 replica_info = self.service_manager.get_replica_info(replica_id)
                 node_index = replica_info.get("node_index") if isinstance(replica_info, dict) else None
             else:
                 # Simple format: just job_id
                 job_id = replica_id
-                specified_port = None
                 self.logger.debug(f"Simple job ID: {job_id}")
 
                 node_index = None
@@ -110,23 +182,12 @@ class EndpointResolver:
                 self.logger.warning("Empty node name for job %s", job_id)
                 return None
             
-            # Determine the port
-            if specified_port is not None:
-                # Use port from composite replica_id
-                port = specified_port
-            else:
-                # Look up port from recipe
-                port = self._get_port_for_job(job_id)
-                
-                # Fallback to default port if needed
-                if port is None:
-                    port = default_port
-            
-            if port is None:
-                self.logger.warning("No port found for replica %s (job %s)", replica_id, job_id)
-                return None
+            # The node stays assigned while the job runs; later lookups skip SLURM
+            if _normalize_state(job_details.get("state")) == "running":
+                with self._cache_lock:
+                    self._nodes[replica_id] = (job_id, node)
             
-            endpoint = f"http://{node}:{port}"
+            endpoint = self._endpoint_on_node(replica_id, node, default_port)
             self.logger.debug("Resolved endpoint for replica %s: %s (from nodes: %s)", replica_id, endpoint, nodes)
             return endpoint
             
@@ -167,3 +228,10 @@ class EndpointResolver:
         except Exception as e:
             self.logger.exception("Error getting port for job %s: %s", job_id, e)
             return None
+
+
+def _normalize_state(state: Any) -> str:
+    """SLURM REST reports job_state as a string or a list of flags (first one is the state)."""
+    if isinstance(state, list):
+        state = state[0] if state else "unknown"
+    return str(state or "unknown").lower()
@@ -0,0 +1,257 @@
+"""
+Request Scheduler
+
+Admission control for the orchestrator's prompt path. Limits the number of
+prompts in flight towards vLLM and decides who goes next when that limit is
+reached:
+
+- Across priority classes: strict priority (interactive > benchmark > background)
+- Within a class: weighted fair queuing across tenants (client groups, users)
+
+Queueing delay is tracked per class so it can be exposed through the
+orchestrator metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from collections import defaultdict
+
+
+PRIORITY_CLASSES = ("interactive", "benchmark", "background")
+DEFAULT_PRIORITY = "interactive"
+DEFAULT_TENANT = "default"
+DEFAULT_MAX_CONCURRENT = 32
+
+# Request fields carrying scheduling context (never forwarded to vLLM)
+CONTEXT_FIELDS = ("priority", "tenant", "client_group_id")
+
+# Upper bounds (ms) of the queueing delay histogram buckets
+QUEUE_DELAY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+
+
+def parse_tenant_weights(spec: Optional[str]) -> Dict[str, float]:
+    """Parse a tenant weight spec like ``"grafana=4,3713478=1"``.
+
+    Invalid entries are ignored.
+    """
+    weights: Dict[str, float] = {}
+    if not spec:
+        return weights
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            weight = float(value)
+        except ValueError:
+            continue
+        if name.strip() and weight > 0:
+            weights[name.strip()] = weight
+    return weights
+
+
+def classify_request(headers: Mapping[str, str], body: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    """Extract (tenant, priority) from request headers and body.
+
+    Tenant precedence: ``X-Tenant-Id`` header, ``X-Client-Group-Id`` header,
+    ``tenant`` body field, ``client_group_id`` body field.
+    Priority precedence: ``X-Request-Priority`` header, ``priority`` body field.
+    """
+    body = body or {}
+    tenant = (
+        headers.get("x-tenant-id")
+        or headers.get("x-client-group-id")
+        or body.get("tenant")
+        or body.get("client_group_id")
+        or DEFAULT_TENANT
+    )
+    priority = headers.get("x-request-priority") or body.get("priority") or DEFAULT_PRIORITY
+    return str(tenant), normalize_priority(priority)
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    """Map a priority string to a known class (unknown values fall back to the default)."""
+    if not priority:
+        return DEFAULT_PRIORITY
+    priority = str(priority).strip().lower()
+    return priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+
+class RequestScheduler:
+    """Priority + weighted fair queuing scheduler for upstream requests.
+
+    Each request acquires a slot via ``async with scheduler.slot(tenant, priority)``.
+    While fewer than ``max_concurrent`` slots are in use, requests pass
+    straight through. Otherwise they wait in a per-class queue ordered by a
+    virtual finish tag (``max(V, last_finish[tenant]) + 1 / weight``), so a
+    tenant flooding the queue cannot starve others in the same class.
+
+    All state is touched only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, tenant_weights: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(__name__)
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("ORCHESTRATOR_MAX_CONCURRENT_PROMPTS", DEFAULT_MAX_CONCURRENT))
+        self.max_concurrent = max(1, max_concurrent)
+        if tenant_weights is None:
+            tenant_weights = parse_tenant_weights(os.getenv("ORCHESTRATOR_TENANT_WEIGHTS"))
+        self.tenant_weights = tenant_weights
+
+        self._inflight = 0
+        self._seq = itertools.count()
+        # Per class heap of (finish_tag, seq, future)
+        self._queues: Dict[str, List[Tuple[float, int, asyncio.Future]]] = {c: [] for c in PRIORITY_CLASSES}
+        self._virtual_time: Dict[str, float] = {c: 0.0 for c in PRIORITY_CLASSES}
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+
+        self._class_stats: Dict[str, Dict[str, Any]] = {c: self._empty_class_stats() for c in PRIORITY_CLASSES}
+        # Per tenant state is kept only while the tenant has queued or in-flight
+        # requests: tenants are mostly SLURM job IDs, one more with every job
+        self._tenant_active: Dict[str, int] = defaultdict(int)
+        self._tenant_dispatched: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _empty_class_stats() -> Dict[str, Any]:
+        return {
+            "dispatched": 0,
+            "queued_total": 0,
+            "queue_delay_ms_sum": 0.0,
+            "queue_delay_ms_max": 0.0,
+            "queue_delay_ms_buckets": [0] * (len(QUEUE_DELAY_BUCKETS_MS) + 1),
+        }
+
+    def get_weight(self, tenant: str) -> float:
+        """Get the fair-share weight of a tenant (default 1.0)."""
+        return self.tenant_weights.get(tenant, 1.0)
+
+    @asynccontextmanager
+    async def slot(self, tenant: Optional[str] = None, priority: Optional[str] = None):
+        """Wait for an upstream slot and hold it for the duration of the block.
+
+        Yields the queueing delay in seconds.
+        """
+        tenant = tenant or DEFAULT_TENANT
+        priority = normalize_priority(priority)
+        enqueued_at = time.monotonic()
+        queued = False
+
+        self._tenant_active[tenant] += 1
+        try:
+            if self._inflight < self.max_concurrent and not self._has_waiters():
+                self._inflight += 1
+            else:
+                queued = True
+                future = asyncio.get_running_loop().create_future()
+                heapq.heappush(self._queues[priority], (self._finish_tag(tenant, priority), next(self._seq), future))
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    # Slot was granted right before cancellation: hand it back
+                    if future.done() and not future.cancelled():
+                        self._release()
+                    raise
+
+            delay = time.monotonic() - enqueued_at
+            self._record(tenant, priority, delay * 1000, queued)
+            try:
+                yield delay
+            finally:
+                self._release()
+        finally:
+            self._tenant_left(tenant)
+
+    def _finish_tag(self, tenant: str, priority: str) -> float:
+        start = max(self._virtual_time[priority], self._last_finish.get((priority, tenant), 0.0))
+        finish = start + 1.0 / self.get_weight(tenant)
+        self._last_finish[(priority, tenant)] = finish
+        return finish
+
+    def _tenant_left(self, tenant: str) -> None:
+        """Forget a tenant once its last queued or in-flight request is done.
+
+        Its last finish tag has then been reached by the class's virtual time
+        (unless a waiter gave up), so dropping it leaves its next tag unchanged.
+        """
+        self._tenant_active[tenant] -= 1
+        if self._tenant_active[tenant] > 0:
+            return
+        del self._tenant_active[tenant]
+        self._tenant_dispatched.pop(tenant, None)
+        for priority in PRIORITY_CLASSES:
+            self._last_finish.pop((priority, tenant), None)
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues[c] for c in PRIORITY_CLASSES)
+
+    def _release(self) -> None:
+        self._inflight -= 1
+        self._dispatch_next()
+
+    def _dispatch_next(self) -> None:
+        """Grant free slots to waiters in priority, then fair-share order."""
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue and self._inflight < self.max_concurrent:
+                finish, _, future = heapq.heappop(queue)
+                if future.done():
+                    # Waiter gave up (client disconnected)
+                    continue
+                self._virtual_time[priority] = finish
+                self._inflight += 1
+                future.set_result(None)
+            if self._inflight >= self.max_concurrent:
+                return
+
+    def _record(self, tenant: str, priority: str, delay_ms: float, queued: bool) -> None:
+        stats = self._class_stats[priority]
+        stats["dispatched"] += 1
+        if queued:
+            stats["queued_total"] += 1
+        stats["queue_delay_ms_sum"] += delay_ms
+        stats["queue_delay_ms_max"] = max(stats["queue_delay_ms_max"], delay_ms)
+        for i, bound in enumerate(QUEUE_DELAY_BUCKETS_MS):
+            if delay_ms <= bound:
+                stats["queue_delay_ms_buckets"][i] += 1
+                break
+        else:
+            stats["queue_delay_ms_buckets"][-1] += 1
+        self._tenant_dispatched[tenant] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return scheduler state and per-class queueing delay statistics."""
+        classes = {}
+        for priority in PRIORITY_CLASSES:
+            stats = self._class_stats[priority]
+            dispatched = stats["dispatched"]
+            cumulative = list(itertools.accumulate(stats["queue_delay_ms_buckets"]))
+            buckets = {str(bound): cumulative[i] for i, bound in enumerate(QUEUE_DELAY_BUCKETS_MS)}
+            buckets["+Inf"] = cumulative[-1]
+            classes[priority] = {
+                "waiting": sum(1 for _, _, f in self._queues[priority] if not f.done()),
+                "dispatched": dispatched,
+                "queued_total": stats["queued_total"],
+                "queue_delay_ms_avg": round(stats["queue_delay_ms_sum"] / dispatched, 3) if dispatched else 0.0,
+                "queue_delay_ms_max": round(stats["queue_delay_ms_max"], 3),
+                "queue_delay_ms_buckets": buckets,
+            }
+        return {
+            "max_concurrent": self.max_concurrent,
+            "inflight": self._inflight,
+            "classes": classes,
+            # Active tenants only: requests dispatched since they last had nothing queued or in flight
+            "tenants": {
+                tenant: {
+                    "active": active,
+                    "dispatched": self._tenant_dispatched.get(tenant, 0),
+                    "weight": self.get_weight(tenant),
+                }
+                for tenant, active in self._tenant_active.items()
+            },
+        }
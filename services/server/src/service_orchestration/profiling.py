@@ -0,0 +1,142 @@
+"""
+On-demand CPU and memory profiling of the running process.
+
+Both profilers are built on the standard library so they work inside the
+orchestrator's Apptainer image and the gateway container alike:
+
+- ``profile_cpu``: samples the stacks of all threads (``sys._current_frames``)
+  at a fixed interval for a bounded duration.
+- ``profile_memory``: traces allocations with ``tracemalloc`` for a bounded
+  duration (or snapshots the live heap if tracemalloc is already running,
+  e.g. with ``PYTHONTRACEMALLOC=25``).
+
+Results are rendered in the folded-stack ("collapsed") format, one
+``frame;frame;frame weight`` line per stack, which flamegraph.pl, speedscope
+and Grafana's flame graph panel read directly.
+
+Access (environment):
+- ``PROFILING_ENABLED``: must be ``true`` for the endpoints to exist (default off)
+- ``PROFILING_TOKEN``: shared secret expected in the ``X-Profiling-Token`` header;
+  without it the endpoints stay closed even when enabled
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+PROFILING_TOKEN_HEADER = "X-Profiling-Token"
+MAX_PROFILE_SECONDS = 60.0
+MIN_INTERVAL_S = 0.001
+
+# One profile at a time per process: profiling has its own overhead
+_profile_lock = threading.Lock()
+
+
+class ProfilingDisabledError(Exception):
+    """Profiling endpoints are turned off in this process."""
+
+
+class ProfilingForbiddenError(Exception):
+    """The request did not present the profiling token."""
+
+
+class ProfilerBusyError(Exception):
+    """Another profile is being captured."""
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def authorize(token: Optional[str]) -> None:
+    """Check that profiling is enabled and ``token`` matches ``PROFILING_TOKEN``."""
+    if not profiling_enabled():
+        raise ProfilingDisabledError("Profiling is disabled (set PROFILING_ENABLED=true)")
+    expected = os.getenv("PROFILING_TOKEN", "")
+    if not expected or not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise ProfilingForbiddenError("Missing or invalid profiling token")
+
+
+def _bounded(seconds: float) -> float:
+    return max(0.1, min(float(seconds), MAX_PROFILE_SECONDS))
+
+
+def _render_folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {weight}\n" for stack, weight in stacks.most_common())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def profile_cpu(seconds: float = 10.0, interval: float = 0.01) -> str:
+    """Sample all thread stacks for ``seconds`` and return folded stacks weighted by sample count.
+
+    Each stack is rooted at its thread name, so the event loop thread and
+    worker threads show up as separate towers. Blocking; run it in a thread.
+    """
+    seconds, interval = _bounded(seconds), max(MIN_INTERVAL_S, float(interval))
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already being captured")
+    try:
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame))
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(frames))] += 1
+            time.sleep(interval)
+        return _render_folded(stacks)
+    finally:
+        _profile_lock.release()
+
+
+def profile_memory(seconds: float = 10.0, frames: int = 25) -> str:
+    """Return folded allocation stacks weighted by bytes still allocated.
+
+    If tracemalloc is not running, it is started for ``seconds`` (the result
+    covers allocations made in that window that are still alive) and stopped
+    again; if it is already running, the live heap is snapshotted immediately.
+    Blocking; run it in a thread.
+    """
+    seconds = _bounded(seconds)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already being captured")
+    started_here = False
+    try:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, int(frames)))
+            started_here = True
+            time.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        stacks: Counter = Counter()
+        for stat in snapshot.statistics("traceback"):
+            # tracemalloc frames are most recent first
+            path = ";".join(f"{os.path.basename(f.filename)}:{f.lineno}" for f in reversed(stat.traceback))
+            stacks[path] += stat.size
+        return _render_folded(stacks)
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+
+def profile_filename(process: str, kind: str) -> str:
+    return f"{process}-{kind}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
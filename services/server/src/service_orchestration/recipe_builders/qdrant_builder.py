@@ -1,6 +1,7 @@
 """Qdrant-specific vector database builder.
 
-Extends VectorDbRecipeBuilder with Qdrant-specific storage configuration.
+Extends VectorDbRecipeBuilder with Qdrant-specific storage configuration and
+restoring collections from snapshots at startup.
 """
 
 from typing import Dict, Any, TYPE_CHECKING
@@ -19,16 +20,23 @@ class QdrantVectorDbBuilder(VectorDbRecipeBuilder):
         """Build run block for Qdrant with job-specific storage."""
         project_ws = paths.remote_base_path
         
+        snapshots_dir = f"{project_ws}/qdrant_snapshots"
+        
         # Qdrant uses job-specific storage path (from environment variable)
         # The QDRANT__STORAGE__STORAGE_PATH env var should already be set
         # to something like "/workspace/qdrant_data_${SLURM_JOB_ID}"
+        #
+        # Snapshots live on the shared workspace (QDRANT__STORAGE__SNAPSHOTS_PATH),
+        # so collections snapshotted by an earlier job can be restored here.
+        # QDRANT_RESTORE_SNAPSHOTS is "collection[=snapshot],..."; without a
+        # snapshot the newest one of that collection is used.
         
         return f"""
 echo "Starting Qdrant vector database container..."
 echo "Binding project workspace: {project_ws} -> /workspace"
 
-# Create workspace directory if it doesn't exist
-mkdir -p {project_ws}
+# Create workspace and snapshot directories if they don't exist
+mkdir -p {project_ws} {snapshots_dir}
 
 # Debug: Print Qdrant-specific environment variables
 echo "Qdrant configuration:"
@@ -37,7 +45,33 @@ env | grep '^QDRANT_' || echo "No QDRANT_ vars found"
 # The storage path will be created inside the container at runtime
 # based on QDRANT__STORAGE__STORAGE_PATH environment variable
 
-apptainer run --bind {paths.log_dir}:/app/logs,{project_ws}:/workspace {paths.sif_path} 2>&1
+# Collections to restore from snapshots before Qdrant starts serving
+SNAPSHOT_ARGS=()
+IFS=',' read -ra RESTORE_ENTRIES <<< "${{QDRANT_RESTORE_SNAPSHOTS:-}}"
+for entry in "${{RESTORE_ENTRIES[@]}}"; do
+    entry="$(echo "$entry" | xargs)"
+    [ -z "$entry" ] && continue
+    collection="${{entry%%=*}}"
+    snapshot=""
+    if [ "$collection" != "$entry" ]; then
+        snapshot="${{entry#*=}}"
+    fi
+    case "$snapshot" in
+        "") snapshot="$(ls -t {snapshots_dir}/$collection/*.snapshot 2>/dev/null | head -1)" ;;
+        /workspace/*) snapshot="{project_ws}${{snapshot#/workspace}}" ;;
+        /*) ;;
+        *) snapshot="{snapshots_dir}/$collection/$snapshot" ;;
+    esac
+    if [ -z "$snapshot" ] || [ ! -f "$snapshot" ] || [ "${{snapshot#{project_ws}/}}" = "$snapshot" ]; then
+        echo "WARNING: No snapshot in {project_ws} found for collection '$collection', it will start empty"
+        continue
+    fi
+    snapshot="/workspace/${{snapshot#{project_ws}/}}"
+    echo "Restoring collection '$collection' from snapshot $snapshot"
+    SNAPSHOT_ARGS+=(--snapshot "$snapshot:$collection")
+done
+
+apptainer run --bind {paths.log_dir}:/app/logs,{project_ws}:/workspace {paths.sif_path} "${{SNAPSHOT_ARGS[@]}}" 2>&1
 container_exit_code=$?
 
 echo "Container exited with code: $container_exit_code"
@@ -14,6 +14,7 @@ from .models import (
     RecipeParameter,
     RecipeHealthCheck,
     RecipeDeploymentConfig,
+    RecipeMetricsConfig,
     RecipeCategory,
     DistanceMetric,
     create_recipe,
@@ -36,6 +37,7 @@ __all__ = [
     "RecipeParameter",
     "RecipeHealthCheck",
     "RecipeDeploymentConfig",
+    "RecipeMetricsConfig",
     
     # Enums
     "RecipeCategory",
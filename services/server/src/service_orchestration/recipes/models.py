@@ -122,6 +122,21 @@ class RecipeDeploymentConfig(BaseModel):
         return result
 
 
+class RecipeMetricsConfig(BaseModel):
+    """Filtering applied by the orchestrator to metrics scraped from the service."""
+    include: List[str] = Field(default_factory=list, description="Metric name globs to keep (empty keeps all)")
+    exclude: List[str] = Field(default_factory=list, description="Metric name globs to drop")
+    histogram_buckets: Optional[Union[List[float], Dict[str, List[float]]]] = Field(
+        default=None,
+        description="Histogram bucket bounds (le) to keep, for all histograms or per family-name glob; +Inf is always kept"
+    )
+    max_series: Optional[int] = Field(default=None, ge=1, description="Maximum samples forwarded per scrape")
+    
+    def to_api_response(self) -> Dict[str, Any]:
+        """Convert to simplified API response format."""
+        return self.model_dump(exclude_defaults=True)
+
+
 class Recipe(BaseModel):
     """Base recipe model with common fields and validation."""
     
@@ -138,6 +153,7 @@ class Recipe(BaseModel):
     environment: Dict[str, str] = Field(default_factory=dict, description="Environment variables")
     resources: RecipeResources = Field(default_factory=RecipeResources)
     parameters: Dict[str, RecipeParameter] = Field(default_factory=dict, description="Parameter documentation")
+    metrics: Optional[RecipeMetricsConfig] = Field(default=None, description="Scraped metrics filtering")
     
     # Path information (set by loader)
     path: Optional[str] = Field(default=None, description="Recipe path (category/name)")
@@ -261,6 +277,8 @@ class Recipe(BaseModel):
             result["path"] = self.path
         if self.image:
             result["image"] = self.image
+        if self.metrics:
+            result["metrics"] = self.metrics.to_api_response()
         return result
 
 
@@ -0,0 +1,6 @@
+"""Text embedding backends used for semantic caching and text search."""
+
+from .embedders import Embedder, HashingEmbedder, LocalEmbedder, VllmEmbedder
+from .cache import CachedEmbedder
+
+__all__ = ["Embedder", "HashingEmbedder", "LocalEmbedder", "VllmEmbedder", "CachedEmbedder"]
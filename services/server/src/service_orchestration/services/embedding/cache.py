@@ -0,0 +1,162 @@
+"""Embedding cache and request coalescing.
+
+``CachedEmbedder`` wraps any Embedder with:
+
+- an LRU cache keyed by a hash of the text, so repeated queries (benchmark
+  question sets, retried RAG prompts) skip the model entirely;
+- coalescing of concurrent callers: while one thread is embedding, texts
+  requested by other threads queue up and are embedded together in the next
+  ``embed_batch`` call. An idle embedder adds no delay (unless
+  ``max_wait_ms`` is set to let a batch fill up).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
+
+from .embedders import Embedder
+
+DEFAULT_CACHE_ENTRIES = 10000
+DEFAULT_MAX_BATCH_SIZE = 64
+
+
+class _EmbedRequest:
+    """Texts one caller is waiting for (keyed by text hash)."""
+
+    def __init__(self, texts: Dict[bytes, str]):
+        self.texts = texts
+        self.vectors: Dict[bytes, List[float]] = {}
+        self.error: Optional[BaseException] = None
+        self.promoted = False
+        self.done = threading.Event()
+
+    def result(self) -> Dict[bytes, List[float]]:
+        if self.error is not None:
+            raise self.error
+        return self.vectors
+
+
+class CachedEmbedder(Embedder):
+    """LRU-cached, batch-coalescing wrapper around another embedder."""
+
+    def __init__(self, inner: Embedder, max_entries: int = DEFAULT_CACHE_ENTRIES,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = 0.0):
+        """
+        Args:
+            inner: Embedder that computes the vectors
+            max_entries: Cached vectors kept (least recently used are evicted)
+            max_batch_size: Most texts sent to ``inner`` in one call
+            max_wait_ms: How long the first caller of a batch waits for others to join
+        """
+        self.inner = inner
+        self.max_entries = max_entries
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: List[_EmbedRequest] = []
+        self._leader_active = False
+        self._stats = {"hits": 0, "misses": 0, "batches": 0, "embedded_texts": 0}
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.inner.dimension
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[bytes, str] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[i] = vector
+                else:
+                    missing.setdefault(key, texts[i])
+            hits = len(texts) - sum(1 for v in vectors if v is None)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(texts) - hits
+        ORCHESTRATOR_METRICS.embedding_cache_lookups.inc(hits, embedder=self.name, result="hit")
+        ORCHESTRATOR_METRICS.embedding_cache_lookups.inc(len(texts) - hits, embedder=self.name, result="miss")
+        if missing:
+            computed = self._coalesce(missing)
+            vectors = [v if v is not None else computed[key] for v, key in zip(vectors, keys)]
+        return vectors
+
+    def _coalesce(self, texts: Dict[bytes, str]) -> Dict[bytes, List[float]]:
+        """Embed ``texts`` together with those of concurrent callers.
+
+        One caller at a time (the leader) drains the queue and calls the inner
+        embedder; when it is done, the oldest waiting caller takes over.
+        """
+        request = _EmbedRequest(texts)
+        with self._lock:
+            self._queue.append(request)
+            lead = not self._leader_active
+            self._leader_active = True
+        if not lead:
+            request.done.wait()
+            if not request.promoted:
+                return request.result()
+        elif self.max_wait:
+            time.sleep(self.max_wait)
+
+        with self._lock:
+            batch, self._queue = self._queue, []
+        self._run(batch)
+        with self._lock:
+            if self._queue:
+                successor = self._queue[0]
+                successor.promoted = True
+                successor.done.set()
+            else:
+                self._leader_active = False
+        return request.result()
+
+    def _run(self, batch: List[_EmbedRequest]) -> None:
+        texts: Dict[bytes, str] = {}
+        for request in batch:
+            texts.update(request.texts)
+        keys = list(texts)
+        computed: Dict[bytes, List[float]] = {}
+        try:
+            for start in range(0, len(keys), self.max_batch_size):
+                chunk = keys[start:start + self.max_batch_size]
+                computed.update(zip(chunk, self.inner.embed_batch([texts[k] for k in chunk])))
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+                request.done.set()
+            return
+
+        with self._lock:
+            for key, vector in computed.items():
+                self._cache[key] = vector
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._stats["batches"] += 1
+            self._stats["embedded_texts"] += len(keys)
+        for request in batch:
+            request.vectors = {key: computed[key] for key in request.texts}
+            request.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._cache), "max_entries": self.max_entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,181 @@
+"""Embedding backends.
+
+All embedders turn a batch of texts into fixed-size float vectors:
+
+- ``HashingEmbedder``: deterministic feature hashing, no model and no network.
+  Useful for offline tests and for exact/near-exact matching.
+- ``VllmEmbedder``: calls the OpenAI-compatible ``/v1/embeddings`` endpoint of
+  a vLLM service running an embedding model.
+- ``LocalEmbedder``: runs a sentence-transformers model on the orchestrator's
+  CPU (optional ``sentence-transformers`` package).
+"""
+
+import hashlib
+import math
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import requests
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+DEFAULT_VLLM_PORT = 8001
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(ABC):
+    """Base class for all embedding backends."""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Short identifier of the backend (e.g. 'hashing', 'vllm:3713478')."""
+        pass
+
+    @property
+    @abstractmethod
+    def dimension(self) -> Optional[int]:
+        """Vector size, or None if not known before the first call."""
+        pass
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, preserving order."""
+        pass
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return self.embed_batch([text])[0]
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic bag-of-features embedder (signed feature hashing).
+
+    Features are lower-cased word unigrams and bigrams; vectors are
+    L2-normalized so cosine similarity reflects feature overlap.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self._dimension = dimension
+
+    @property
+    def name(self) -> str:
+        return "hashing"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self._dimension
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vector[(value >> 1) % self._dimension] += sign
+            norm = math.sqrt(sum(v * v for v in vector))
+            vectors.append([v / norm for v in vector] if norm else vector)
+        return vectors
+
+
+class VllmEmbedder(Embedder):
+    """Embeds texts with a vLLM service serving an embedding model."""
+
+    def __init__(self, endpoint_resolver, service_id: str, model: Optional[str] = None, timeout: int = 30):
+        """
+        Args:
+            endpoint_resolver: EndpointResolver used to locate the vLLM service
+            service_id: Service (or replica) ID of the embedding vLLM deployment
+            model: Model name; discovered via /v1/models when omitted
+            timeout: Request timeout in seconds
+        """
+        self.endpoint_resolver = endpoint_resolver
+        self.service_id = service_id
+        self.model = model
+        self.timeout = timeout
+        self._dimension: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"vllm:{self.service_id}"
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._dimension
+
+    def _endpoint(self) -> str:
+        endpoint = self.endpoint_resolver.resolve(self.service_id, default_port=DEFAULT_VLLM_PORT)
+        if not endpoint:
+            raise RuntimeError(f"Embedding service {self.service_id} endpoint not available")
+        return endpoint.rstrip("/")
+
+    def _discover_model(self, endpoint: str) -> str:
+        response = requests.get(f"{endpoint}/v1/models", timeout=self.timeout)
+        response.raise_for_status()
+        models = response.json().get("data", [])
+        if not models:
+            raise RuntimeError(f"Embedding service {self.service_id} serves no models")
+        return models[0]["id"]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        endpoint = self._endpoint()
+        if not self.model:
+            self.model = self._discover_model(endpoint)
+
+        response = requests.post(
+            f"{endpoint}/v1/embeddings",
+            json={"model": self.model, "input": texts},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = sorted(response.json().get("data", []), key=lambda item: item.get("index", 0))
+        vectors = [item["embedding"] for item in data]
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        self._dimension = len(vectors[0])
+        return vectors
+
+
+class LocalEmbedder(Embedder):
+    """Embeds texts with a sentence-transformers model on the local CPU.
+
+    The model is loaded on first use, so creating the embedder is cheap.
+    """
+
+    def __init__(self, model: str = "sentence-transformers/all-MiniLM-L6-v2", device: str = "cpu"):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("sentence-transformers is not installed; install it to use the local embedder")
+        self.model = model
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"local:{self.model}"
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._model.get_sentence_embedding_dimension() if self._model is not None else None
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        with self._lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model, device=self.device)
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).tolist()
@@ -0,0 +1,255 @@
+"""Orchestrator-observed request statistics for inference services.
+
+Every prompt the orchestrator forwards is recorded per replica (or single
+service) and per owning group: latency, time to first token (when the
+request reports it), prompt/completion tokens and outcome.
+
+Recent requests are kept in fixed-size ring buffers (``array`` backed, so
+memory does not grow with traffic) for percentile summaries; cumulative
+histograms and counters are kept alongside for Prometheus.
+"""
+
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Set
+
+DEFAULT_WINDOW = 1024
+
+# Upper bounds (seconds) of the latency / TTFT histogram buckets
+LATENCY_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+OUTCOME_SUCCESS = 0
+OUTCOME_ERROR = 1
+OUTCOMES = ("success", "error")
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    values.sort()
+    return {
+        "p50": round(_percentile(values, 50), 3),
+        "p95": round(_percentile(values, 95), 3),
+        "p99": round(_percentile(values, 99), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "max": round(values[-1], 3),
+    }
+
+
+class RequestRingBuffer:
+    """Fixed-capacity columnar ring buffer of request records plus cumulative histograms.
+
+    Not thread-safe on its own; RequestStats serializes access.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_WINDOW):
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._latency_ms = array("d", bytes(8 * capacity))
+        self._ttft_ms = array("d", [math.nan]) * capacity
+        self._prompt_tokens = array("l", bytes(array("l").itemsize * capacity))
+        self._completion_tokens = array("l", bytes(array("l").itemsize * capacity))
+        self._outcomes = array("B", bytes(capacity))
+        self._next = 0
+        self._size = 0
+
+        # Cumulative (since start) values for Prometheus
+        self.latency_buckets = array("Q", bytes(8 * (len(LATENCY_BUCKETS_S) + 1)))
+        self.latency_sum_s = 0.0
+        self.ttft_buckets = array("Q", bytes(8 * (len(LATENCY_BUCKETS_S) + 1)))
+        self.ttft_sum_s = 0.0
+        self.ttft_count = 0
+        self.outcome_totals = [0] * len(OUTCOMES)
+        self.prompt_tokens_total = 0
+        self.completion_tokens_total = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _observe(buckets: array, value_s: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS_S):
+            if value_s <= bound:
+                buckets[i] += 1
+                return
+        buckets[-1] += 1
+
+    def record(self, latency_ms: float, ttft_ms: Optional[float], prompt_tokens: int,
+               completion_tokens: int, outcome: int, timestamp: float) -> None:
+        i = self._next
+        self._timestamps[i] = timestamp
+        self._latency_ms[i] = latency_ms
+        self._ttft_ms[i] = math.nan if ttft_ms is None else ttft_ms
+        self._prompt_tokens[i] = prompt_tokens
+        self._completion_tokens[i] = completion_tokens
+        self._outcomes[i] = outcome
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+        self._observe(self.latency_buckets, latency_ms / 1000.0)
+        self.latency_sum_s += latency_ms / 1000.0
+        if ttft_ms is not None:
+            self._observe(self.ttft_buckets, ttft_ms / 1000.0)
+            self.ttft_sum_s += ttft_ms / 1000.0
+            self.ttft_count += 1
+        self.outcome_totals[outcome] += 1
+        self.prompt_tokens_total += prompt_tokens
+        self.completion_tokens_total += completion_tokens
+
+    def summary(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize the buffered requests (optionally only those from the last ``window_seconds``)."""
+        since = time.time() - window_seconds if window_seconds else -math.inf
+        latencies: List[float] = []
+        ttfts: List[float] = []
+        outcomes = [0] * len(OUTCOMES)
+        prompt_tokens = completion_tokens = 0
+        oldest = newest = None
+        for i in range(self._size):
+            ts = self._timestamps[i]
+            if ts < since:
+                continue
+            oldest = ts if oldest is None else min(oldest, ts)
+            newest = ts if newest is None else max(newest, ts)
+            outcomes[self._outcomes[i]] += 1
+            # Latency percentiles cover successful requests only (errors are often fast fails or timeouts)
+            if self._outcomes[i] == OUTCOME_SUCCESS:
+                latencies.append(self._latency_ms[i])
+                if not math.isnan(self._ttft_ms[i]):
+                    ttfts.append(self._ttft_ms[i])
+            prompt_tokens += self._prompt_tokens[i]
+            completion_tokens += self._completion_tokens[i]
+
+        count = sum(outcomes)
+        span = (newest - oldest) if count > 1 else 0.0
+        return {
+            "count": count,
+            "success": outcomes[OUTCOME_SUCCESS],
+            "errors": outcomes[OUTCOME_ERROR],
+            "error_rate": round(outcomes[OUTCOME_ERROR] / count, 4) if count else 0.0,
+            "latency_ms": _distribution(latencies),
+            "ttft_ms": _distribution(ttfts),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "completion_tokens_per_second": round(completion_tokens / span, 3) if span else None,
+            "window_start": oldest,
+            "window_end": newest,
+        }
+
+
+class RequestStats:
+    """Per-service/replica request statistics recorded by the orchestrator.
+
+    Configuration (environment):
+    - ``ORCHESTRATOR_STATS_WINDOW``: requests kept per service/replica for percentiles (default 1024)
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is None:
+            capacity = int(os.getenv("ORCHESTRATOR_STATS_WINDOW", DEFAULT_WINDOW))
+        self.capacity = max(1, capacity)
+        self._buffers: Dict[str, RequestRingBuffer] = {}
+        self._replicas_by_group: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, service_id: str, latency_ms: float, success: bool, usage: Optional[Dict[str, Any]] = None,
+               ttft_ms: Optional[float] = None, group_id: Optional[str] = None) -> None:
+        """Record one upstream request for a service/replica (and its group, if any)."""
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        outcome = OUTCOME_SUCCESS if success else OUTCOME_ERROR
+        now = time.time()
+        with self._lock:
+            keys = [service_id]
+            if group_id:
+                keys.append(group_id)
+                self._replicas_by_group.setdefault(group_id, set()).add(service_id)
+            for key in keys:
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = RequestRingBuffer(self.capacity)
+                buffer.record(latency_ms, ttft_ms, prompt_tokens, completion_tokens, outcome, now)
+
+    def summary(self, service_id: str, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Summary (p50/p95/p99 etc.) for a service; groups include a per-replica breakdown."""
+        with self._lock:
+            buffer = self._buffers.get(service_id)
+            result = {
+                "service_id": service_id,
+                "window_size": self.capacity,
+                **(buffer.summary(window_seconds) if buffer else RequestRingBuffer(1).summary()),
+            }
+            replicas = sorted(self._replicas_by_group.get(service_id, ()))
+            if replicas:
+                result["replicas"] = {
+                    replica_id: self._buffers[replica_id].summary(window_seconds) for replica_id in replicas
+                }
+        return result
+
+    # ========== Prometheus ==========
+
+    def render_prometheus(self, service_id: str) -> str:
+        """Render cumulative histograms/counters for a service in Prometheus text format.
+
+        Groups are rendered with ``replica_id="aggregate"`` plus one series per
+        replica, matching the labels used for scraped vLLM metrics.
+        """
+        with self._lock:
+            series = []
+            if service_id in self._replicas_by_group:
+                series.append(('service_id="%s",replica_id="aggregate"' % service_id, self._buffers[service_id]))
+                for replica_id in sorted(self._replicas_by_group[service_id]):
+                    series.append(('service_id="%s",replica_id="%s"' % (service_id, replica_id),
+                                   self._buffers[replica_id]))
+            elif service_id in self._buffers:
+                series.append(('service_id="%s"' % service_id, self._buffers[service_id]))
+            if not series:
+                return ""
+
+            lines: List[str] = []
+            self._render_histogram(
+                lines, "orchestrator_request_latency_seconds",
+                "End-to-end latency of prompts forwarded by the orchestrator.",
+                [(labels, b.latency_buckets, b.latency_sum_s) for labels, b in series],
+            )
+            ttft_series = [(labels, b.ttft_buckets, b.ttft_sum_s) for labels, b in series if b.ttft_count]
+            if ttft_series:
+                self._render_histogram(
+                    lines, "orchestrator_request_ttft_seconds",
+                    "Time to first token of prompts forwarded by the orchestrator.", ttft_series,
+                )
+            lines.append("# HELP orchestrator_requests_total Prompts forwarded by the orchestrator by outcome.")
+            lines.append("# TYPE orchestrator_requests_total counter")
+            for labels, b in series:
+                for outcome, total in zip(OUTCOMES, b.outcome_totals):
+                    lines.append(f'orchestrator_requests_total{{{labels},outcome="{outcome}"}} {total}')
+            for kind in ("prompt", "completion"):
+                name = f"orchestrator_request_{kind}_tokens_total"
+                lines.append(f"# HELP {name} {kind.capitalize()} tokens reported by vLLM usage.")
+                lines.append(f"# TYPE {name} counter")
+                for labels, b in series:
+                    lines.append(f"{name}{{{labels}}} {getattr(b, f'{kind}_tokens_total')}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(lines: List[str], name: str, help_text: str, series) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, buckets, total_s in series:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_S, buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += buckets[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {round(total_s, 6)}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
@@ -0,0 +1,158 @@
+"""Exact-match response cache for deterministic inference requests."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MiB
+DEFAULT_TTL_SECONDS = 600
+
+# Request fields that control caching itself and never affect the generated text
+NON_SAMPLING_FIELDS = ("cache", "semantic_cache")
+
+
+class ResponseCache:
+    """Byte-bounded LRU cache of prompt responses with a TTL.
+
+    Only deterministic requests (``temperature == 0``) are cacheable; with
+    sampling enabled two identical requests legitimately produce different
+    outputs. Entries are scoped to the service they were produced by so that
+    a restarted service (new weights, new engine) can be invalidated on its own.
+
+    Configuration (environment):
+    - ``VLLM_RESPONSE_CACHE_ENABLED``: "1"/"true" to enable for all requests (off by default)
+    - ``VLLM_RESPONSE_CACHE_MAX_BYTES``: memory budget (default 64 MiB)
+    - ``VLLM_RESPONSE_CACHE_TTL``: entry lifetime in seconds (default 600)
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        if enabled is None:
+            enabled = os.getenv("VLLM_RESPONSE_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("VLLM_RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.ttl = ttl if ttl is not None else float(os.getenv("VLLM_RESPONSE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+        # key -> {"service_id", "response", "size", "created_at"}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_service: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @staticmethod
+    def is_cacheable(params: Dict[str, Any]) -> bool:
+        """Return True if the sampling params make the output deterministic."""
+        try:
+            return float(params.get("temperature", 0.7)) == 0.0
+        except (TypeError, ValueError):
+            return False
+
+    def make_key(self, service_id: str, prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        """Build a cache key, or None if the request must not be cached.
+
+        The key covers the service, the requested model, the prompt and every
+        sampling parameter sent to vLLM. A request can opt in (``cache: true``)
+        or out (``cache: false``) regardless of the global setting.
+        """
+        use_cache = params.get("cache")
+        if use_cache is None:
+            use_cache = self.enabled
+        if not use_cache or not self.is_cacheable(params):
+            return None
+        sampling = {k: v for k, v in params.items() if k not in NON_SAMPLING_FIELDS}
+        try:
+            blob = json.dumps([service_id, prompt, sampling], sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response flagged as a cache hit, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            age = time.time() - entry["created_at"]
+            if age >= self.ttl:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return {**entry["response"], "cached": True, "cache_age_seconds": round(age, 3)}
+
+    def put(self, key: str, service_id: str, response: Dict[str, Any]) -> bool:
+        """Store a response. Returns False if it is larger than the whole budget."""
+        try:
+            size = len(json.dumps(response, default=str)) + len(key)
+        except (TypeError, ValueError):
+            return False
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "service_id": service_id,
+                "response": dict(response),
+                "size": size,
+                "created_at": time.time(),
+            }
+            self._keys_by_service.setdefault(service_id, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+        return True
+
+    def invalidate_service(self, service_id: str) -> int:
+        """Drop every entry produced by a service. Returns the number removed."""
+        with self._lock:
+            keys = self._keys_by_service.pop(service_id, set())
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_service.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry["size"]
+        keys = self._keys_by_service.get(entry["service_id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_service[entry["service_id"]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters and current occupancy."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
@@ -0,0 +1,249 @@
+"""Semantic response cache backed by a managed Qdrant service."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_COLLECTION = "semantic_cache"
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL_SECONDS = 3600
+
+# Request fields that shape the generated text, with the defaults VllmService sends to vLLM
+GENERATION_DEFAULTS = {"model": None, "max_tokens": 500, "temperature": 0.7}
+# Request fields that only change how a response is measured or delivered
+NEUTRAL_FIELDS = ("measure_ttft", "relay")
+
+# Upper bounds of the similarity histogram buckets (best match score per lookup)
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 0.99, 1.0)
+
+
+class SemanticCache:
+    """Nearest-neighbour response cache for prompts.
+
+    Prompts are embedded and looked up in a dedicated Qdrant collection; if
+    the best match for the same target service and generation params (see
+    ``params_key``) scores at or above
+    ``threshold`` (cosine similarity), its stored completion is returned
+    instead of calling vLLM. Misses are stored after a successful generation.
+
+    The cache is inactive until a Qdrant service is configured, either via
+    ``configure()`` or the environment:
+    - ``VLLM_SEMANTIC_CACHE_QDRANT_SERVICE_ID``: Qdrant service to use
+    - ``VLLM_SEMANTIC_CACHE_COLLECTION``: collection name (default "semantic_cache")
+    - ``VLLM_SEMANTIC_CACHE_THRESHOLD``: minimum similarity for a hit (default 0.92)
+    - ``VLLM_SEMANTIC_CACHE_TTL``: entry lifetime in seconds (default 3600)
+    """
+
+    def __init__(self, qdrant_service_getter: Callable[[], Any], embedder, logger):
+        """
+        Args:
+            qdrant_service_getter: Callable returning the QdrantService (lazy-loaded by the orchestrator)
+            embedder: Embedder used for prompts
+            logger: The logger instance
+        """
+        self._get_qdrant = qdrant_service_getter
+        self.embedder = embedder
+        self.logger = logger
+
+        self.qdrant_service_id: Optional[str] = os.getenv("VLLM_SEMANTIC_CACHE_QDRANT_SERVICE_ID") or None
+        self.collection_name = os.getenv("VLLM_SEMANTIC_CACHE_COLLECTION", DEFAULT_COLLECTION)
+        self.threshold = float(os.getenv("VLLM_SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+        self.ttl = float(os.getenv("VLLM_SEMANTIC_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+        self._collection_ready = False
+        # service_id -> time of last invalidation; older entries are ignored
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "stored": 0,
+            "lookup_ms_total": 0.0,
+            "latency_saved_ms_total": 0.0,
+            "similarity_buckets": [0] * len(SIMILARITY_BUCKETS),
+        }
+
+    @property
+    def active(self) -> bool:
+        return bool(self.qdrant_service_id)
+
+    def configure(self, qdrant_service_id: Optional[str], collection_name: Optional[str] = None,
+                  threshold: Optional[float] = None, ttl: Optional[float] = None,
+                  embedder=None) -> Dict[str, Any]:
+        """Point the cache at a Qdrant service (None disables it) and reset statistics.
+
+        When switching to an embedder with a different vector size, use a new collection.
+        """
+        with self._lock:
+            self.qdrant_service_id = qdrant_service_id or None
+            if embedder is not None:
+                self.embedder = embedder
+            if collection_name:
+                self.collection_name = collection_name
+            if threshold is not None:
+                self.threshold = float(threshold)
+            if ttl is not None:
+                self.ttl = float(ttl)
+            self._collection_ready = False
+            self._stats = self._empty_stats()
+        return self.get_config()
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "qdrant_service_id": self.qdrant_service_id,
+            "collection_name": self.collection_name,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl,
+            "embedder": self.embedder.name,
+        }
+
+    def invalidate_service(self, service_id: str):
+        """Ignore entries produced by a service before now (e.g. after a restart)."""
+        self._invalidated_at[service_id] = time.time()
+
+    # ========== Lookup / Store ==========
+
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> Optional[str]:
+        """Hash of a request's generation params, or None if the request must bypass the cache.
+
+        The key covers the requested model, ``max_tokens`` and ``temperature``
+        (defaults applied). Whether chat or completions is used is decided per
+        served model, so the model and service scope it. Requests setting any
+        other field may generate differently and are neither looked up nor stored.
+        """
+        if any(key not in GENERATION_DEFAULTS and key not in NEUTRAL_FIELDS for key in params):
+            return None
+        generation = {key: params.get(key, default) for key, default in GENERATION_DEFAULTS.items()}
+        blob = json.dumps(generation, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _ensure_collection(self, vector_size: int) -> bool:
+        if self._collection_ready:
+            return True
+        qdrant = self._get_qdrant()
+        info = qdrant.get_collection_info(self.qdrant_service_id, self.collection_name)
+        if not info.get("success"):
+            created = qdrant.create_collection(self.qdrant_service_id, self.collection_name, vector_size, "Cosine")
+            if not created.get("success"):
+                self.logger.warning(f"Semantic cache: cannot create collection {self.collection_name}: {created.get('error')}")
+                return False
+        self._collection_ready = True
+        return True
+
+    def lookup(self, service_id: str, prompt: str, params_key: str) -> Dict[str, Any]:
+        """Look up a semantically similar cached response generated with the same params.
+
+        Returns a dict with ``vector`` (reusable for ``store``), ``lookup_ms``
+        and, on a hit, ``response`` (the flagged cached response).
+        """
+        start = time.perf_counter()
+        outcome: Dict[str, Any] = {"vector": None, "response": None}
+        try:
+            vector = self.embedder.embed(prompt)
+            outcome["vector"] = vector
+            if not self._ensure_collection(len(vector)):
+                raise RuntimeError("semantic cache collection unavailable")
+            result = self._get_qdrant().search_points(
+                self.qdrant_service_id, self.collection_name, vector, limit=1,
+                query_filter={"must": [
+                    {"key": "service_id", "match": {"value": service_id}},
+                    {"key": "params_key", "match": {"value": params_key}},
+                ]}
+            )
+            if not result.get("success"):
+                raise RuntimeError(result.get("error", "search failed"))
+            best = (result.get("results") or [None])[0]
+        except Exception as e:
+            self.logger.debug(f"Semantic cache lookup failed for {service_id}: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            outcome["lookup_ms"] = (time.perf_counter() - start) * 1000
+            return outcome
+
+        lookup_ms = (time.perf_counter() - start) * 1000
+        outcome["lookup_ms"] = lookup_ms
+        score = best.get("score", 0.0) if best else None
+        payload = best.get("payload", {}) if best else {}
+        created_at = payload.get("created_at", 0.0)
+        fresh = (
+            best is not None
+            and time.time() - created_at < self.ttl
+            and created_at > self._invalidated_at.get(service_id, 0.0)
+        )
+        hit = fresh and score >= self.threshold
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._stats["lookup_ms_total"] += lookup_ms
+            if score is not None:
+                for i, bound in enumerate(SIMILARITY_BUCKETS):
+                    if score <= bound:
+                        self._stats["similarity_buckets"][i] += 1
+                        break
+                else:
+                    # Float rounding can push identical vectors slightly above 1.0
+                    self._stats["similarity_buckets"][-1] += 1
+            if hit:
+                self._stats["hits"] += 1
+                self._stats["latency_saved_ms_total"] += max(0.0, payload.get("latency_ms", 0.0) - lookup_ms)
+            else:
+                self._stats["misses"] += 1
+
+        if hit:
+            outcome["response"] = {
+                **payload.get("response", {}),
+                "cached": True,
+                "cache_type": "semantic",
+                "similarity": score,
+                "cached_prompt": payload.get("prompt"),
+                "cache_age_seconds": round(time.time() - created_at, 3),
+            }
+        return outcome
+
+    def store(self, service_id: str, prompt: str, vector, response: Dict[str, Any], latency_ms: float,
+              params_key: str):
+        """Store a freshly generated response under the prompt's embedding and params key."""
+        if vector is None or not self._collection_ready:
+            return
+        point = {
+            "id": str(uuid.uuid4()),
+            "vector": vector,
+            "payload": {
+                "service_id": service_id,
+                "params_key": params_key,
+                "prompt": prompt,
+                "response": response,
+                "latency_ms": latency_ms,
+                "created_at": time.time(),
+            },
+        }
+        result = self._get_qdrant().upsert_points(self.qdrant_service_id, self.collection_name, [point])
+        with self._lock:
+            if result.get("success"):
+                self._stats["stored"] += 1
+            else:
+                self._stats["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit ratio, similarity distribution and latency saved."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["lookups"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["lookup_ms_avg"] = round(stats["lookup_ms_total"] / lookups, 3) if lookups else 0.0
+            stats["similarity_buckets"] = {
+                str(bound): count for bound, count in zip(SIMILARITY_BUCKETS, stats["similarity_buckets"])
+            }
+        return {**self.get_config(), **stats}
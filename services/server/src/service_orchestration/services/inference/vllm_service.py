@@ -1,10 +1,15 @@
 """vLLM-specific inference service implementation."""
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
 import requests
 import time
 from .inference_service import InferenceService
+from .request_stats import RequestStats
+from .response_cache import ResponseCache
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
 from service_orchestration.networking import LoadBalancer
+from service_orchestration.tracing import TRACER
 
 DEFAULT_VLLM_PORT = 8001
 BASE_TIMEOUT = 30  # Base timeout for single-node setups
@@ -16,8 +21,11 @@ class VllmService(InferenceService):
     
     Features:
     - Model name caching to avoid redundant /v1/models calls
+    - Opt-in exact-match response cache for deterministic (temperature=0) prompts
+    - Optional semantic response cache backed by a Qdrant service
     - Load balancing for service groups (replica groups)
-    - Chat/completions endpoint fallback for base models
+    - Chat/completions endpoint fallback for base models, remembered per service/model
+    - Orchestrator-observed request statistics (latency, tokens, outcome) per replica and group
     - RAG-augmented prompting support
     
     Uses BaseService helpers for HTTP requests and response formatting.
@@ -36,6 +44,23 @@ class VllmService(InferenceService):
         # Shorter TTL since this is for UI responsiveness - 2 minutes is enough
         self._models_list_cache: Dict[str, Dict[str, Any]] = {}
         self._models_list_cache_ttl = 120  # Cache for 2 minutes
+        
+        # Endpoint capability cache: {service_id: {"model": str, "endpoint": str, "api": "chat"|"completions", "timestamp": float}}
+        # Remembers whether a model has a chat template so base models skip the failing chat attempt
+        self._capability_cache: Dict[str, Dict[str, Any]] = {}
+        self._capability_cache_ttl = 3600  # Same lifetime as the model cache
+        
+        # Exact-match response cache (opt-in, see ResponseCache)
+        self.response_cache = ResponseCache()
+        
+        # Orchestrator-observed latency/token statistics per replica and group
+        self.request_stats = RequestStats()
+        
+        # Semantic response cache (attached by the orchestrator, inactive until configured)
+        self.semantic_cache = None
+        
+        # Shared session for streamed generations, so replicas' connections are kept alive
+        self._stream_session = requests.Session()
 
     # ========== BaseService Abstract Properties ==========
     
@@ -91,6 +116,89 @@ class VllmService(InferenceService):
         }
         self.logger.debug(f"Models list cached for {service_id}: {response.get('models', [])}")
 
+    def _capability_entry(self, service_id: str, endpoint: str, model: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get the fresh capability cache entry of a service/model, if any.
+        
+        Entries are dropped when the endpoint or model changed (e.g. service restarted elsewhere).
+        """
+        cache_entry = self._capability_cache.get(service_id)
+        if not cache_entry:
+            return None
+        age = time.time() - cache_entry["timestamp"]
+        if age < self._capability_cache_ttl and cache_entry["endpoint"] == endpoint and cache_entry["model"] == model:
+            return cache_entry
+        self.logger.debug(f"Capability cache STALE for {service_id}")
+        self._capability_cache.pop(service_id, None)
+        return None
+
+    def _get_cached_capability(self, service_id: str, endpoint: str, model: Optional[str]) -> Optional[str]:
+        """Get the cached API flavour ("chat" or "completions") for a service/model, None if unknown."""
+        cache_entry = self._capability_entry(service_id, endpoint, model)
+        return cache_entry["api"] if cache_entry else None
+    
+    def _cache_capability(self, service_id: str, endpoint: str, model: Optional[str], api: Optional[str]):
+        """Remember which API flavour works for a service/model (None: detection unsupported)."""
+        self._capability_cache[service_id] = {
+            "model": model,
+            "endpoint": endpoint,
+            "api": api,
+            "timestamp": time.time()
+        }
+        self.logger.debug(f"Capability cached for {service_id} ({model}): {api}")
+
+    def _detect_capability(self, service_id: str, endpoint: str, model: Optional[str], timeout: int = 5) -> Optional[str]:
+        """Detect whether the model has a chat template without generating tokens.
+        
+        Uses vLLM's /tokenize endpoint with chat messages, which applies the chat
+        template but does not run the model. Returns None if undetermined;
+        a client error (e.g. older vLLM without /tokenize) is cached like a
+        result, so readiness checks do not probe again until it expires.
+        """
+        try:
+            response = requests.post(
+                f"{endpoint}/tokenize",
+                json={"model": model, "messages": [{"role": "user", "content": "ping"}]},
+                timeout=timeout
+            )
+            try:
+                body = response.json()
+            except Exception:
+                body = response.text
+        except Exception as e:
+            self.logger.debug(f"Capability detection failed for {service_id}: {e}")
+            return None
+        
+        if response.ok:
+            api = "chat"
+        elif self._is_chat_template_error(False, response.status_code, body):
+            api = "completions"
+        elif 400 <= response.status_code < 500:
+            api = None
+        else:
+            return None
+        self._cache_capability(service_id, endpoint, model, api)
+        return api
+
+    def invalidate_service(self, service_id: str):
+        """Drop cached responses and capabilities of a service (e.g. after a restart).
+        
+        For replicas, entries cached under the owning group are dropped too,
+        since group prompts may have been served by the restarted replica.
+        """
+        scopes = [service_id]
+        group_id = self.service_manager.get_group_for_replica(service_id) if ":" in service_id else None
+        if group_id:
+            scopes.append(group_id)
+        # Groups can also be prompted via their bare job ID
+        scopes += [scope[3:] for scope in list(scopes) if scope.startswith("sg-")]
+        self._capability_cache.pop(service_id, None)
+        removed = sum(self.response_cache.invalidate_service(scope) for scope in scopes)
+        if self.semantic_cache is not None:
+            for scope in scopes:
+                self.semantic_cache.invalidate_service(scope)
+        if removed:
+            self.logger.info(f"Invalidated {removed} cached responses for {service_id}")
+
     # ========== Service Discovery ==========
 
     def find_services(self) -> List[Dict[str, Any]]:
@@ -190,6 +298,11 @@ class VllmService(InferenceService):
                 except Exception as e:
                     self.logger.debug(f"Failed to parse models from response: {e}")
                 
+                # Detect chat template support once per endpoint/model so the first prompt
+                # to a base model does not need the chat -> completions fallback
+                if model and self._capability_entry(service_id, endpoint, model) is None:
+                    self._detect_capability(service_id, endpoint, model)
+                
                 return True, "running", model
             else:
                 self.logger.debug(f"Service {service_id} returned HTTP {response.status_code}")
@@ -266,7 +379,48 @@ class VllmService(InferenceService):
         - "12345:8001": Replica ID (job_id:port format)
         
         Tries chat endpoint first, falls back to completions for base models.
+        
+        Deterministic requests (temperature=0) are served from the response cache
+        when it is enabled; such responses carry ``"cached": True``. When the
+        semantic cache is configured, similar prompts with the same generation
+        params (``semantic_cache`` not false) are served from it and additionally
+        carry ``"cache_type": "semantic"``.
+        
+        With a ``relay`` callable the generation is streamed from vLLM and each
+        SSE event is handed to ``relay`` as it arrives (see the data-plane prompt
+        route); the reassembled result is returned as usual.
         """
+        cache_key = self.response_cache.make_key(service_id, prompt, kwargs)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug(f"Response cache HIT for {service_id}")
+                return cached
+        kwargs.pop("cache", None)
+        
+        semantic = None
+        params_key = None
+        use_semantic = kwargs.pop("semantic_cache", None) is not False
+        if use_semantic and self.semantic_cache is not None and self.semantic_cache.active:
+            params_key = self.semantic_cache.params_key(kwargs)
+        if params_key is not None:
+            semantic = self.semantic_cache.lookup(service_id, prompt, params_key)
+            if semantic["response"] is not None:
+                self.logger.debug(f"Semantic cache HIT for {service_id} (similarity {semantic['response']['similarity']:.3f})")
+                return semantic["response"]
+        
+        start = time.perf_counter()
+        result = self._dispatch_prompt(service_id, prompt, **kwargs)
+        if result.get("success"):
+            if cache_key:
+                self.response_cache.put(cache_key, service_id, result)
+            if semantic is not None:
+                latency_ms = (time.perf_counter() - start) * 1000
+                self.semantic_cache.store(service_id, prompt, semantic["vector"], result, latency_ms, params_key)
+        return result
+
+    def _dispatch_prompt(self, service_id: str, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Route a prompt to a service group, replica or single service."""
         # Check if it's already a group ID (sg- prefix)
         if self.service_manager.is_group(service_id):
             return self._prompt_service_group(service_id, prompt, **kwargs)
@@ -301,23 +455,30 @@ class VllmService(InferenceService):
             qdrant_service_id: The Qdrant service ID to search
             collection_name: The collection name to search in
             top_k: Number of context chunks to retrieve (default: 3)
-            **kwargs: Additional parameters for vLLM (max_tokens, temperature, etc.)
+            **kwargs: Additional parameters for vLLM (max_tokens, temperature, etc.);
+                ``measure_ttft=True`` streams the generation to time its first token
             
         Returns:
             Dict with:
             - On success: {"success": True, "response": "...", "rag_context": [...], ...}
+              and ``rag_timing``: the embedder, embed, search, augment, TTFT, generation
+              and total milliseconds, plus the number of context chunks and prompt size
             - On failure: {"success": False, "error": "...", ...}
         """
         self.logger.info(f"RAG prompt for service {service_id}, collection {collection_name}, top_k={top_k}")
+        start = time.perf_counter()
         
-        # Step 1: Retrieve relevant context from Qdrant
+        # Step 1: Retrieve relevant context from Qdrant (top_k=0 skips retrieval, as a baseline)
         try:
-            search_result = qdrant_service.search_with_text(
-                service_id=qdrant_service_id,
-                collection_name=collection_name,
-                query_text=prompt,
-                limit=top_k
-            )
+            if top_k > 0:
+                search_result = qdrant_service.search_with_text(
+                    service_id=qdrant_service_id,
+                    collection_name=collection_name,
+                    query_text=prompt,
+                    limit=top_k
+                )
+            else:
+                search_result = {"success": True, "results": []}
             
             if not search_result.get("success"):
                 # Qdrant search failed - decide whether to proceed without context or fail
@@ -338,7 +499,10 @@ class VllmService(InferenceService):
                         "id": result.get("id")
                     })
             
-            self.logger.debug(f"Retrieved {len(retrieved_contexts)} context chunks")
+            self.logger.debug(
+                f"Retrieved {len(retrieved_contexts)} context chunks "
+                f"(embedder={search_result.get('embedder')}, search_ms={search_result.get('search_ms')})"
+            )
             
         except Exception as e:
             self.logger.exception(f"Error during RAG context retrieval: {e}")
@@ -346,16 +510,32 @@ class VllmService(InferenceService):
             return self._prompt_without_rag(service_id, prompt, {"error": str(e)}, **kwargs)
         
         # Step 2: Format augmented prompt
+        augment_start = time.perf_counter()
         augmented_prompt = self._format_rag_prompt(prompt, retrieved_contexts)
+        augment_ms = (time.perf_counter() - augment_start) * 1000
         self.logger.debug(f"Augmented prompt length: {len(augmented_prompt)} chars")
         
         # Step 3: Send augmented prompt to vLLM
+        generation_start = time.perf_counter()
         result = self.prompt(service_id, augmented_prompt, **kwargs)
+        generation_ms = (time.perf_counter() - generation_start) * 1000
         
         # Add RAG metadata to result
         result["rag_enabled"] = True
         result["rag_context"] = retrieved_contexts
         result["rag_collection"] = collection_name
+        result["rag_timing"] = {
+            "embedder": search_result.get("embedder"),
+            "embed_ms": search_result.get("embedding_ms"),
+            "search_ms": search_result.get("search_ms"),
+            "augment_ms": augment_ms,
+            "ttft_ms": result.get("ttft_ms"),
+            "generation_ms": generation_ms,
+            "total_ms": (time.perf_counter() - start) * 1000,
+            "top_k": top_k,
+            "context_chunks": len(retrieved_contexts),
+            "prompt_chars": len(augmented_prompt),
+        }
         result["original_prompt"] = prompt
         
         return result
@@ -537,7 +717,8 @@ Answer:"""
             }
         
         # Try to get the endpoint early
-        endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_VLLM_PORT)
+        with ORCHESTRATOR_METRICS.stage("prompt", "resolve_endpoint"):
+            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_VLLM_PORT)
         if not endpoint:
             return {
                 "success": False,
@@ -558,7 +739,8 @@ Answer:"""
             discovered_model = self._get_cached_model(service_id, endpoint)
         else:
             # SLOW PATH: Do combined readiness check + model discovery (saves ~2s vs separate calls!)
-            is_ready, status, discovered_model = self._check_ready_and_discover_model(service_id, service_info)
+            with ORCHESTRATOR_METRICS.stage("prompt", "readiness_check"):
+                is_ready, status, discovered_model = self._check_ready_and_discover_model(service_id, service_info)
             if not is_ready:
                 return {
                     "success": False,
@@ -590,20 +772,48 @@ Answer:"""
 
         self.logger.debug("Preparing prompt for service %s at %s with model %s", service_id, endpoint, model)
         
+        start = time.perf_counter()
+        result = self._send_prompt(service_id, endpoint, model, prompt, **kwargs)
+        self.request_stats.record(
+            service_id,
+            (time.perf_counter() - start) * 1000,
+            success=bool(result.get("success")),
+            usage=result.get("usage"),
+            group_id=self.service_manager.get_group_for_replica(service_id) if is_replica else None,
+        )
+        return result
+
+    def _send_prompt(self, service_id: str, endpoint: str, model: Optional[str], prompt: str, **kwargs) -> Dict[str, Any]:
+        """Send a prompt to a resolved endpoint (chat first, completions fallback) and update health."""
         try:
-            # Try chat endpoint first (works for instruction-tuned models)
-            ok, status_code, body = self._try_chat_endpoint(endpoint, model, prompt, service_id=service_id, **kwargs)
-            
-            # Check if we got a chat template error
-            if self._is_chat_template_error(ok, status_code, body):
-                self.logger.info("Chat template error detected, retrying with completions endpoint")
-                
-                # Retry with completions endpoint (works for base models)
-                ok, status_code, body = self._try_completions_endpoint(endpoint, model, prompt, service_id=service_id, **kwargs)
-                result = self._parse_completions_response(ok, status_code, body, endpoint, service_id)
+            capability = self._get_cached_capability(service_id, endpoint, model)
+            if capability == "completions":
+                # Known base model: go straight to the completions endpoint
+                with ORCHESTRATOR_METRICS.stage("prompt", "upstream_request"):
+                    ok, status_code, body = self._try_completions_endpoint(endpoint, model, prompt, service_id=service_id, **kwargs)
+                with ORCHESTRATOR_METRICS.stage("prompt", "parse_response"):
+                    result = self._parse_completions_response(ok, status_code, body, endpoint, service_id)
             else:
-                # No chat template error - parse as chat response
-                result = self._parse_chat_response(ok, status_code, body, endpoint, service_id)
+                # Try chat endpoint first (works for instruction-tuned models)
+                with ORCHESTRATOR_METRICS.stage("prompt", "upstream_request"):
+                    ok, status_code, body = self._try_chat_endpoint(endpoint, model, prompt, service_id=service_id, **kwargs)
+                
+                # Check if we got a chat template error
+                if self._is_chat_template_error(ok, status_code, body):
+                    self.logger.info("Chat template error detected, retrying with completions endpoint")
+                    self._cache_capability(service_id, endpoint, model, "completions")
+                    
+                    # Retry with completions endpoint (works for base models)
+                    with ORCHESTRATOR_METRICS.stage("prompt", "upstream_request"):
+                        ok, status_code, body = self._try_completions_endpoint(endpoint, model, prompt, service_id=service_id, **kwargs)
+                    with ORCHESTRATOR_METRICS.stage("prompt", "parse_response"):
+                        result = self._parse_completions_response(ok, status_code, body, endpoint, service_id)
+                else:
+                    # No chat template error - parse as chat response
+                    if ok and capability is None:
+                        self._cache_capability(service_id, endpoint, model, "chat")
+                    with ORCHESTRATOR_METRICS.stage("prompt", "parse_response"):
+                        result = self._parse_chat_response(ok, status_code, body, endpoint, service_id)
             
             # Mark service as healthy on successful response
             if result.get("success"):
@@ -702,10 +912,15 @@ Answer:"""
         
         self.logger.debug("Trying chat endpoint: http://%s:%s%s (timeout=%ds)", remote_host, remote_port, path, timeout)
         
-        # Direct HTTP request to compute node
+        if kwargs.get("measure_ttft") or kwargs.get("relay"):
+            return self._stream_and_collect(f"http://{remote_host}:{remote_port}{path}", request_data, timeout,
+                                            chat=True, relay=kwargs.get("relay"))
+        
+        # Direct HTTP request to compute node (traceparent lets vLLM join the request's trace)
         response = requests.post(
             f"http://{remote_host}:{remote_port}{path}",
             json=request_data,
+            headers=TRACER.inject(),
             timeout=timeout
         )
         
@@ -745,10 +960,15 @@ Answer:"""
         
         self.logger.debug("Trying completions endpoint: http://%s:%s%s (timeout=%ds)", remote_host, remote_port, path, timeout)
         
-        # Direct HTTP request to compute node
+        if kwargs.get("measure_ttft") or kwargs.get("relay"):
+            return self._stream_and_collect(f"http://{remote_host}:{remote_port}{path}", request_data, timeout,
+                                            chat=False, relay=kwargs.get("relay"))
+        
+        # Direct HTTP request to compute node (traceparent lets vLLM join the request's trace)
         response = requests.post(
             f"http://{remote_host}:{remote_port}{path}",
             json=request_data,
+            headers=TRACER.inject(),
             timeout=timeout
         )
         
@@ -762,6 +982,60 @@ Answer:"""
         
         return ok, status_code, body
 
+    def _stream_and_collect(self, url: str, request_data: Dict[str, Any], timeout: int, chat: bool,
+                            relay: Optional[Callable[[bytes], None]] = None) -> tuple:
+        """Send a request with ``stream: true`` and reassemble the response, timing the first token.
+        
+        ``relay``, if given, is called with every SSE event from vLLM (except the
+        final ``[DONE]``) as it arrives, to pass the stream on to the client.
+        Chunks that are not valid JSON objects are logged and skipped.
+        
+        Returns:
+            Tuple of (ok, status_code, body) like the non-streaming calls; on success body is
+            shaped like a non-streamed response plus ``ttft_ms``
+        """
+        request_data = {**request_data, "stream": True, "stream_options": {"include_usage": True}}
+        start = time.perf_counter()
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        ttft_ms = None
+        with self._stream_session.post(url, json=request_data, headers=TRACER.inject(), timeout=timeout,
+                                       stream=True) as response:
+            if not response.ok:
+                try:
+                    body = response.json()
+                except Exception:
+                    body = response.text
+                return response.ok, response.status_code, body
+            
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    self.logger.warning("Skipping malformed stream chunk from %s: %r", url, data[:200])
+                    continue
+                if not isinstance(chunk, dict):
+                    continue
+                if relay is not None:
+                    relay(line + b"\n\n")
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content") if chat else choice.get("text")
+                    if text:
+                        if ttft_ms is None:
+                            ttft_ms = (time.perf_counter() - start) * 1000
+                        parts.append(text)
+            status_code = response.status_code
+        
+        content = "".join(parts)
+        choice = {"message": {"content": content}} if chat else {"text": content}
+        return True, status_code, {"choices": [choice], "usage": usage, "ttft_ms": ttft_ms}
+
     def _is_chat_template_error(self, ok: bool, status_code: int, body: Any) -> bool:
         """Check if response indicates a chat template error."""
         if ok or status_code != 400:
@@ -793,7 +1067,7 @@ Answer:"""
         
         if "choices" in body and len(body["choices"]) > 0:
             content = body["choices"][0]["message"]["content"]
-            return {
+            result = {
                 "success": True,
                 "response": content,
                 "service_id": service_id,
@@ -801,6 +1075,9 @@ Answer:"""
                 "endpoint_used": "chat",
                 "usage": body.get("usage", {})
             }
+            if body.get("ttft_ms") is not None:
+                result["ttft_ms"] = body["ttft_ms"]
+            return result
         
         return {
             "success": False,
@@ -822,7 +1099,7 @@ Answer:"""
         
         if "choices" in body and len(body["choices"]) > 0:
             content = body["choices"][0]["text"]
-            return {
+            result = {
                 "success": True,
                 "response": content,
                 "service_id": service_id,
@@ -830,6 +1107,9 @@ Answer:"""
                 "endpoint_used": "completions",
                 "usage": body.get("usage", {})
             }
+            if body.get("ttft_ms") is not None:
+                result["ttft_ms"] = body["ttft_ms"]
+            return result
         
         return {
             "success": False,
@@ -0,0 +1,183 @@
+"""Bulk ingestion of streamed points into a vector DB collection.
+
+The request body (NDJSON points, or binary vectors, see vector_codec) is read
+incrementally, cut into batches and upserted with
+bounded parallelism (``wait=false``), so memory stays at roughly
+``parallelism`` batches regardless of the corpus size. Progress and throughput
+are exported through ORCHESTRATOR_METRICS while the ingest runs.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
+
+from .vector_codec import VectorReader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_PARALLELISM = 4
+MAX_REPORTED_ERRORS = 5
+# Longest NDJSON line accepted; a point with a few thousand dimensions and a
+# text payload is far below, a body without newlines is not buffered forever
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+class LineTooLongError(ValueError):
+    """An NDJSON line is longer than the accepted maximum (the body is rejected)."""
+
+
+class IngestStats:
+    """Running totals of one bulk ingestion."""
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self.started = time.perf_counter()
+        self.points = 0
+        self.failed_points = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.invalid_lines = 0
+        self.errors: List[str] = []
+
+    @property
+    def points_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.points / elapsed if elapsed > 0 else 0.0
+
+    def record_batch(self, size: int, result: Dict[str, Any], duration_s: float) -> None:
+        self.batches += 1
+        ORCHESTRATOR_METRICS.vector_ingest_batch_seconds.observe(duration_s, collection=self.collection_name)
+        if result.get("success"):
+            self.points += size
+            ORCHESTRATOR_METRICS.vector_ingest_points.inc(size, collection=self.collection_name, outcome="ok")
+        else:
+            self.failed_batches += 1
+            self.failed_points += size
+            ORCHESTRATOR_METRICS.vector_ingest_points.inc(size, collection=self.collection_name, outcome="error")
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append(str(result.get("error")))
+        ORCHESTRATOR_METRICS.vector_ingest_rate.set(round(self.points_per_second, 1), collection=self.collection_name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = time.perf_counter() - self.started
+        return {
+            "num_points": self.points,
+            "failed_points": self.failed_points,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "invalid_lines": self.invalid_lines,
+            "errors": self.errors,
+            "duration_seconds": round(duration, 3),
+            "points_per_second": round(self.points / duration, 1) if duration > 0 else 0.0,
+        }
+
+
+async def iter_ndjson_points(chunks: AsyncIterator[bytes], stats: IngestStats,
+                             max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one point per NDJSON line of a streamed body (lines that are not points are counted and skipped).
+
+    Raises LineTooLongError once a line exceeds ``max_line_bytes`` (points before it are still yielded).
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        end = buffer.rfind(b"\n") + 1
+        lines = bytes(buffer[:end]).split(b"\n")[:-1]
+        del buffer[:end]
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise LineTooLongError(f"NDJSON line longer than {max_line_bytes} bytes")
+            point = _parse_line(line, stats)
+            if point is not None:
+                yield point
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"NDJSON line longer than {max_line_bytes} bytes")
+    point = _parse_line(bytes(buffer), stats)
+    if point is not None:
+        yield point
+
+
+async def iter_binary_points(chunks: AsyncIterator[bytes], reader: VectorReader,
+                             id_offset: int = 0) -> AsyncIterator[Dict[str, Any]]:
+    """Yield ``{"id", "vector"}`` points for the rows of a binary vector body; ids count up from ``id_offset``.
+
+    Raises ValueError if the body is malformed (points decoded before that are still yielded).
+    """
+    next_id = id_offset
+    async for chunk in chunks:
+        for vector in reader.feed(chunk):
+            yield {"id": next_id, "vector": vector}
+            next_id += 1
+    reader.close()
+
+
+def _parse_line(line: bytes, stats: IngestStats):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        point = json.loads(line)
+    except ValueError:
+        point = None
+    if not isinstance(point, dict) or "id" not in point or "vector" not in point:
+        stats.invalid_lines += 1
+        return None
+    return point
+
+
+async def bulk_ingest(qdrant_service, service_id: str, collection_name: str,
+                      points: AsyncIterator[Dict[str, Any]], stats: IngestStats,
+                      batch_size: int = DEFAULT_BATCH_SIZE, parallelism: int = DEFAULT_PARALLELISM,
+                      timeout: float = 60) -> Dict[str, Any]:
+    """Upsert ``points`` in batches of ``batch_size`` with at most ``parallelism`` batches in flight.
+
+    Reading the body pauses while all slots are busy, which propagates
+    backpressure to the sender instead of buffering the corpus.
+    """
+    slots = asyncio.Semaphore(parallelism)
+    pending = set()
+
+    async def upsert(batch: List[Dict[str, Any]]) -> None:
+        try:
+            start = time.perf_counter()
+            result = await qdrant_service.upsert_points_async(
+                service_id, collection_name, batch, timeout=timeout, wait=False
+            )
+            stats.record_batch(len(batch), result, time.perf_counter() - start)
+        finally:
+            slots.release()
+
+    async def submit(batch: List[Dict[str, Any]]) -> None:
+        await slots.acquire()
+        task = asyncio.create_task(upsert(batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    batch: List[Dict[str, Any]] = []
+    submitted = 0
+    try:
+        async for point in points:
+            batch.append(point)
+            if len(batch) >= batch_size:
+                await submit(batch)
+                batch = []
+                submitted += 1
+                if submitted % 100 == 0:
+                    logger.info(f"Ingesting into {collection_name}: {stats.points} points, "
+                                f"{stats.points_per_second:.0f} points/s")
+    finally:
+        # Points read before a malformed part of the body are still upserted
+        if batch:
+            await submit(batch)
+        if pending:
+            await asyncio.gather(*pending)
+
+    summary = stats.to_dict()
+    logger.info(f"Ingested {summary['num_points']} points into {collection_name} in {summary['duration_seconds']}s "
+                f"({summary['points_per_second']} points/s, {summary['failed_batches']} failed batches)")
+    return summary
@@ -0,0 +1,119 @@
+"""Optional gRPC transport to Qdrant for the async data plane.
+
+Searches and upserts sent over Qdrant's gRPC port avoid JSON encoding of
+vectors and HTTP/1.1 request overhead. Requires the optional ``qdrant-client``
+package (with its gRPC extra); without it the service falls back to REST.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from qdrant_client import AsyncQdrantClient, models
+    QDRANT_CLIENT_AVAILABLE = True
+except ImportError:
+    QDRANT_CLIENT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QDRANT_GRPC_PORT = 6334
+
+
+class QdrantGrpcTransport:
+    """One pooled gRPC channel per Qdrant node, shared by all requests to it.
+
+    Timeouts are applied per call, so callers with different budgets can share
+    a node's channel.
+    """
+
+    def __init__(self, grpc_port: int = DEFAULT_QDRANT_GRPC_PORT):
+        if not QDRANT_CLIENT_AVAILABLE:
+            raise RuntimeError("qdrant-client is not installed; install qdrant-client[grpc] to use QDRANT_TRANSPORT=grpc")
+        self.grpc_port = grpc_port
+        self._clients: Dict[str, "AsyncQdrantClient"] = {}
+        # Channels dropped by forget(), closed on the next async call
+        self._forgotten: List["AsyncQdrantClient"] = []
+
+    async def _client(self, host: str) -> "AsyncQdrantClient":
+        if self._forgotten:
+            forgotten, self._forgotten = self._forgotten, []
+            await _close(forgotten)
+        client = self._clients.get(host)
+        if client is None:
+            client = AsyncQdrantClient(host=host, grpc_port=self.grpc_port, prefer_grpc=True)
+            self._clients[host] = client
+        return client
+
+    async def search(self, host: str, collection_name: str, query_vector: List[float], limit: int,
+                     query_filter: Optional[Dict[str, Any]], timeout: float,
+                     params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search a collection; results have the same shape as the REST API's."""
+        points = await (await self._client(host)).search(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            limit=limit,
+            query_filter=models.Filter(**query_filter) if query_filter else None,
+            search_params=models.SearchParams(**params) if params else None,
+            with_payload=True,
+            with_vectors=False,
+            timeout=int(timeout),
+        )
+        return [_scored(point) for point in points]
+
+    async def search_batch(self, host: str, collection_name: str, searches: List[Dict[str, Any]],
+                           timeout: float) -> List[List[Dict[str, Any]]]:
+        """Run REST-style search requests (``vector``, ``limit``, optional ``filter``/``params``) in one call."""
+        batches = await (await self._client(host)).search_batch(
+            collection_name=collection_name,
+            requests=[
+                models.SearchRequest(
+                    vector=search["vector"],
+                    limit=search["limit"],
+                    filter=models.Filter(**search["filter"]) if search.get("filter") else None,
+                    params=models.SearchParams(**search["params"]) if search.get("params") else None,
+                    with_payload=True,
+                    with_vector=False,
+                )
+                for search in searches
+            ],
+            timeout=int(timeout),
+        )
+        return [[_scored(point) for point in points] for points in batches]
+
+    async def upsert(self, host: str, collection_name: str, points: List[Dict[str, Any]], timeout: float,
+                     wait: bool = True) -> None:
+        """Upsert REST-style point dicts (``id``, ``vector``, optional ``payload``)."""
+        client = await self._client(host)
+        # The client's upsert has no per-call timeout
+        await asyncio.wait_for(client.upsert(
+            collection_name=collection_name,
+            points=[models.PointStruct(id=p["id"], vector=p["vector"], payload=p.get("payload")) for p in points],
+            wait=wait,
+        ), timeout)
+
+    def forget(self, host: str) -> None:
+        """Drop the channel to a node (e.g. after its job ended); it is recreated on next use.
+
+        Safe to call from synchronous code: the channel is closed on the next async call.
+        """
+        client = self._clients.pop(host, None)
+        if client is not None:
+            self._forgotten.append(client)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values()) + self._forgotten
+        self._clients, self._forgotten = {}, []
+        await _close(clients)
+
+
+async def _close(clients: List["AsyncQdrantClient"]) -> None:
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Error closing Qdrant gRPC client: {e}")
+
+
+def _scored(point) -> Dict[str, Any]:
+    return {"id": point.id, "version": point.version, "score": point.score, "payload": point.payload}
@@ -1,24 +1,155 @@
-"""Qdrant-specific vector database service implementation."""
+"""Qdrant-specific vector database service implementation.
 
-from typing import Dict, List, Optional, Any
+Requests to Qdrant reuse pooled keep-alive connections: a shared
+``requests.Session`` for the synchronous methods (semantic cache, RAG) and an
+``httpx.AsyncClient`` for the ``*_async`` methods used by the data-plane
+routes. A successful readiness check is remembered for
+``QDRANT_READY_TTL_SECONDS``, so steady-state calls make one round trip to
+Qdrant. With ``QDRANT_TRANSPORT=grpc`` the async search and upsert go to
+Qdrant's gRPC port instead (see qdrant_grpc); the channel to a node is
+dropped when the ServiceManager reports that its job stopped running.
+
+Text search (``search_with_text``, used by RAG) embeds the query with
+``text_embedder``, set by the orchestrator, and then runs a vector search.
+The two stages are timed separately.
+
+Collection snapshots are written to ``QDRANT_SNAPSHOTS_PATH`` on the shared
+workspace (see the qdrant recipe), so a collection ingested once can be
+restored by later deployments instead of being re-ingested.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from service_orchestration.instrumentation import ORCHESTRATOR_METRICS
+from service_orchestration.networking.endpoint_resolver import ALLOCATED_STATUSES
+
+from .ingestion import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PARALLELISM,
+    IngestStats,
+    LineTooLongError,
+    bulk_ingest,
+    iter_binary_points,
+    iter_ndjson_points,
+)
+from .qdrant_grpc import DEFAULT_QDRANT_GRPC_PORT, QdrantGrpcTransport
+from .qdrant_tuning import deployment_defaults, hnsw_config, payload_index, quantization_config, search_params
+from .vector_codec import VectorReader
 from .vector_db_service import VectorDbService
 
 DEFAULT_QDRANT_PORT = 6333
+QDRANT_MAX_CONNECTIONS = int(os.getenv("QDRANT_MAX_CONNECTIONS", "64"))
+QDRANT_READY_TTL_SECONDS = float(os.getenv("QDRANT_READY_TTL_SECONDS", "30"))
+# Container path of QDRANT__STORAGE__SNAPSHOTS_PATH in the qdrant recipe
+QDRANT_SNAPSHOTS_PATH = "/workspace/qdrant_snapshots"
+
+
+class _Operation(NamedTuple):
+    """One Qdrant REST call and how its outcome is reported."""
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]]
+    ok_status: Tuple[int, ...]
+    # Fields included in every response (service_id, collection_name, empty result lists)
+    context: Dict[str, Any]
+    # Used in error responses: "HTTP 404 from <label>" / failure.format(status=404)
+    label: str
+    failure: str
+    exception_message: str
+    # (response JSON) -> success fields
+    on_success: Callable[[Dict[str, Any]], Dict[str, Any]]
+
 
 class QdrantService(VectorDbService):
     """Handles all Qdrant-specific vector database operations."""
 
+    def __init__(self, deployer, service_manager, endpoint_resolver, logger):
+        super().__init__(deployer, service_manager, endpoint_resolver, logger)
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=QDRANT_MAX_CONNECTIONS))
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # service_id -> monotonic time until which the service is known to be ready
+        self._ready_until: Dict[str, float] = {}
+        self._grpc = self._create_grpc_transport()
+        # service_id -> node its gRPC channel goes to
+        self._grpc_hosts: Dict[str, str] = {}
+        if self._grpc is not None:
+            add_listener = getattr(service_manager, "add_status_listener", None)
+            if callable(add_listener):
+                add_listener(self._on_status_change)
+        # Embedder for search_with_text (see ServiceOrchestrator._create_text_search_embedder)
+        self.text_embedder = None
+        # service_id -> default search params from the deployment (QDRANT_SEARCH_HNSW_EF)
+        self._search_defaults: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    # ========== BaseService Abstract Properties ==========
+
+    @property
+    def default_port(self) -> int:
+        return DEFAULT_QDRANT_PORT
+
+    @property
+    def service_type_name(self) -> str:
+        return "Qdrant"
+
+    # ========== Transports ==========
+
+    def _create_grpc_transport(self) -> Optional[QdrantGrpcTransport]:
+        """gRPC transport if QDRANT_TRANSPORT=grpc and qdrant-client is installed, else None (REST)."""
+        if os.getenv("QDRANT_TRANSPORT", "http").lower() != "grpc":
+            return None
+        try:
+            return QdrantGrpcTransport(int(os.getenv("QDRANT_GRPC_PORT", str(DEFAULT_QDRANT_GRPC_PORT))))
+        except RuntimeError as e:
+            self.logger.warning(f"{e}; falling back to the Qdrant REST API")
+            return None
+
+    def _on_status_change(self, service_id: str, status: str) -> None:
+        """ServiceManager listener: drop the gRPC channel to the node of a job that stopped running."""
+        if status in ALLOCATED_STATUSES:
+            return
+        host = self._grpc_hosts.pop(service_id.split(":", 1)[0], None)
+        if host is not None and host not in self._grpc_hosts.values():
+            self._grpc.forget(host)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=QDRANT_MAX_CONNECTIONS,
+                max_keepalive_connections=QDRANT_MAX_CONNECTIONS,
+            ))
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called when the orchestrator stops)."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._grpc is not None:
+            await self._grpc.aclose()
+        self._session.close()
+
+    # ========== Discovery and Readiness ==========
+
     def find_services(self) -> List[Dict[str, Any]]:
         """Find running vector database services and their endpoints."""
         def is_vector_db(service):
             recipe_name = service.get("recipe_name", "").lower()
             # Match vector-db category
             return "vector-db" in recipe_name or recipe_name in ["qdrant", "chroma", "faiss"]
-        
+
         services = self._filter_services(is_vector_db)
         self.logger.debug(f"Found {len(services)} vector DB services after filtering")
         vector_db_services = []
-        
+
         for service in services:
             job_id = service.get("id")
             endpoint = self.endpoint_resolver.resolve(job_id, default_port=DEFAULT_QDRANT_PORT)
@@ -26,14 +157,14 @@ class QdrantService(VectorDbService):
                 self.logger.debug("Resolved endpoint for vector-db job %s -> %s", job_id, endpoint)
             else:
                 self.logger.debug("No endpoint yet for vector-db job %s (status: %s)", job_id, service.get("status"))
-            
+
             # Get detailed service-specific status instead of basic SLURM status
             try:
                 is_ready, status = self._check_service_ready(job_id, service)
             except Exception as e:
                 self.logger.warning(f"Failed to check readiness for service {job_id}: {e}")
                 status = service.get("status", "unknown")
-            
+
             vector_db_services.append({
                 "id": job_id,
                 "name": service.get("name"),
@@ -41,20 +172,22 @@ class QdrantService(VectorDbService):
                 "endpoint": endpoint,
                 "status": status
             })
-        
+
         return vector_db_services
 
     def _check_service_ready(self, service_id: str, service_info: Dict[str, Any]) -> tuple[bool, str]:
         """Check if a vector DB service is ready to accept requests.
-        
+
         Uses a hybrid approach:
         1. Check SLURM status first (fast filter for pending/building jobs)
         2. For RUNNING jobs, test HTTP connection to /collections endpoint
-        
+
+        A positive result is remembered for QDRANT_READY_TTL_SECONDS (see _is_known_ready).
+
         Args:
             service_id: The service ID to check
             service_info: The service information dict
-            
+
         Returns:
             Tuple of (is_ready: bool, status: str) where status is the current LIVE status
         """
@@ -64,12 +197,13 @@ class QdrantService(VectorDbService):
         except Exception as e:
             self.logger.warning(f"Failed to get status for service {service_id}: {e}")
             basic_status = service_info.get("status", "unknown").lower()
-        
+
         # If not running yet, return basic status (no need to test connection)
         if basic_status != "running":
+            self._ready_until.pop(service_id, None)
             is_ready = basic_status not in ["pending", "building", "starting"]
             return is_ready, basic_status
-        
+
         # For RUNNING jobs, test actual HTTP connection to confirm Qdrant is ready
         # This replaces log parsing with a definitive connection test
         endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
@@ -77,566 +211,805 @@ class QdrantService(VectorDbService):
             # Job is running but endpoint not available yet
             self.logger.debug(f"Service {service_id} is RUNNING but endpoint not resolved yet")
             return False, "starting"
-        
+
         # Try lightweight HTTP GET to /collections with short timeout
         try:
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            path = "/collections"
-            
-            self.logger.debug(f"Testing readiness via connection to {remote_host}:{remote_port}{path}")
-            
-            # Direct HTTP request to compute node
-            response = requests.get(
-                f"http://{remote_host}:{remote_port}{path}",
-                timeout=8
-            )
-            
+            self.logger.debug(f"Testing readiness via connection to {endpoint}{self.HEALTH_CHECK_PATH}")
+            response = self._session.get(f"{endpoint}{self.HEALTH_CHECK_PATH}", timeout=8)
+
             # Connection succeeded and got valid HTTP response
             if response.status_code >= 200 and response.status_code < 300:
                 self.logger.debug(f"Service {service_id} is ready (HTTP {response.status_code})")
+                self._ready_until[service_id] = time.monotonic() + QDRANT_READY_TTL_SECONDS
                 return True, "running"
             else:
                 # Connected but got error response - likely still initializing
                 self.logger.debug(f"Service {service_id} connected but returned HTTP {response.status_code}")
                 return False, "starting"
-                
+
         except Exception as e:
             # Connection failed - service not ready yet
             self.logger.debug(f"Service {service_id} connection test failed: {e}")
             return False, "starting"
 
+    def _is_known_ready(self, service_id: str) -> bool:
+        return self._ready_until.get(service_id, 0.0) > time.monotonic()
+
+    def _prepare(self, service_id: str, op: _Operation) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Check that the service exists and is ready and resolve its endpoint.
+
+        Returns:
+            (endpoint, None) on success, or (None, error response)
+        """
+        if self._is_known_ready(service_id):
+            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
+            if endpoint:
+                return endpoint, None
+
+        service_info = self.service_manager.get_service(service_id)
+        if not service_info:
+            return None, self._error_response(
+                f"Service {service_id} not found",
+                "The requested vector DB service could not be found.",
+                **op.context
+            )
+
+        is_ready, status = self._check_service_ready(service_id, service_info)
+        if not is_ready:
+            return None, self._error_response(
+                f"Service is not ready yet (status: {status})",
+                f"The vector DB service is still starting up (status: {status}). Please wait a moment and try again.",
+                status=status,
+                **op.context
+            )
+
+        endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
+        if not endpoint:
+            return None, self._error_response(
+                "Service endpoint not available",
+                "The vector DB service endpoint is not available yet.",
+                status=status,
+                **op.context
+            )
+        return endpoint, None
+
+    async def _prepare_async(self, service_id: str, op: _Operation) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Like _prepare; only runs in a worker thread when the readiness check has to hit SLURM/Qdrant."""
+        if self._is_known_ready(service_id):
+            return self._prepare(service_id, op)
+        return await asyncio.to_thread(self._prepare, service_id, op)
+
+    # ========== Request Execution ==========
+
+    def _outcome(self, op: _Operation, endpoint: str, status_code: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        if status_code not in op.ok_status:
+            return self._error_response(
+                f"HTTP {status_code} from {op.label}",
+                op.failure.format(status=status_code),
+                **{**op.context, "endpoint": endpoint}
+            )
+        return self._success_response(**{**op.context, "endpoint": endpoint, **op.on_success(data)})
+
+    def _failed(self, service_id: str, op: _Operation, e: Exception) -> Dict[str, Any]:
+        # The node may be gone; check readiness again on the next call
+        self._ready_until.pop(service_id, None)
+        self.logger.exception("Qdrant %s %s failed for service %s", op.method, op.path, service_id)
+        return self._error_response(f"Exception: {str(e)}", op.exception_message, **op.context)
+
+    def _execute(self, service_id: str, op: _Operation, timeout: float) -> Dict[str, Any]:
+        """Run an operation over the pooled synchronous session."""
+        try:
+            endpoint, error = self._prepare(service_id, op)
+            if error:
+                return error
+            response = self._session.request(op.method, f"{endpoint}{op.path}", json=op.body, timeout=timeout)
+            data = response.json() if response.status_code in op.ok_status and response.content else {}
+            return self._outcome(op, endpoint, response.status_code, data)
+        except Exception as e:
+            return self._failed(service_id, op, e)
+
+    async def _execute_async(self, service_id: str, op: _Operation, timeout: float,
+                             grpc_call: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """Run an operation over the pooled async client, or ``grpc_call(host)`` when gRPC is enabled."""
+        try:
+            endpoint, error = await self._prepare_async(service_id, op)
+            if error:
+                return error
+            if grpc_call is not None and self._grpc is not None:
+                host = urlparse(endpoint).hostname
+                self._grpc_hosts[service_id] = host
+                data = await grpc_call(host)
+                return self._outcome(op, endpoint, op.ok_status[0], data)
+            response = await self._get_async_client().request(
+                op.method, f"{endpoint}{op.path}", json=op.body, timeout=timeout
+            )
+            data = response.json() if response.status_code in op.ok_status and response.content else {}
+            return self._outcome(op, endpoint, response.status_code, data)
+        except Exception as e:
+            return self._failed(service_id, op, e)
+
+    # ========== Operations ==========
+
+    def _get_collections_op(self, service_id: str) -> _Operation:
+        def on_success(data):
+            # Qdrant returns {"result": {"collections": [...]}}
+            collections = [col["name"] for col in data.get("result", {}).get("collections", [])]
+            return {"collections": collections}
+        return _Operation(
+            "GET", "/collections", None, (200,),
+            {"service_id": service_id, "collections": []},
+            "collections endpoint",
+            "Failed to query collections from vector DB service (HTTP {status}).",
+            "An error occurred while querying the vector DB service for collections.",
+            on_success,
+        )
+
+    def _get_collection_info_op(self, service_id: str, collection_name: str) -> _Operation:
+        return _Operation(
+            "GET", f"/collections/{collection_name}", None, (200,),
+            {"service_id": service_id, "collection_name": collection_name},
+            "collection info endpoint",
+            "Failed to get collection info (HTTP {status}). Collection may not exist.",
+            "An error occurred while querying collection information.",
+            lambda data: {"collection_info": data.get("result", {})},
+        )
+
+    def _create_collection_op(self, service_id: str, collection_name: str, vector_size: int,
+                              distance: str, tuning: Optional[Dict[str, Any]] = None) -> _Operation:
+        tuning = tuning or {}
+        vectors = {"size": vector_size, "distance": distance}
+        if tuning.get("on_disk") is not None:
+            vectors["on_disk"] = tuning["on_disk"]
+        body = {"vectors": vectors}
+        for key in ("hnsw_config", "quantization_config"):
+            if tuning.get(key):
+                body[key] = tuning[key]
+        return _Operation(
+            "PUT", f"/collections/{collection_name}", body, (200, 201),
+            {"service_id": service_id, "collection_name": collection_name},
+            "create collection endpoint",
+            "Failed to create collection (HTTP {status}).",
+            "An error occurred while creating the collection.",
+            lambda data: {
+                "message": f"Collection '{collection_name}' created successfully",
+                "vector_size": vector_size,
+                "distance": distance,
+                **{key: value for key, value in tuning.items() if value is not None},
+            },
+        )
+
+    def _update_collection_op(self, service_id: str, collection_name: str, body: Dict[str, Any]) -> _Operation:
+        return _Operation(
+            "PATCH", f"/collections/{collection_name}", body, (200,),
+            {"service_id": service_id, "collection_name": collection_name},
+            "update collection endpoint",
+            "Failed to update collection (HTTP {status}). Collection may not exist.",
+            "An error occurred while updating the collection.",
+            lambda data: {"message": f"Collection '{collection_name}' updated", "updated": sorted(body)},
+        )
+
+    def _payload_index_op(self, service_id: str, collection_name: str, field_name: str,
+                          field_schema: str) -> _Operation:
+        return _Operation(
+            "PUT", f"/collections/{collection_name}/index", payload_index(field_name, field_schema), (200,),
+            {"service_id": service_id, "collection_name": collection_name, "field_name": field_name},
+            "payload index endpoint",
+            "Failed to create payload index (HTTP {status}).",
+            "An error occurred while creating the payload index.",
+            lambda data: {"message": f"Payload index on '{field_name}' ({field_schema}) created",
+                          "field_schema": field_schema},
+        )
+
+    def _delete_collection_op(self, service_id: str, collection_name: str) -> _Operation:
+        return _Operation(
+            "DELETE", f"/collections/{collection_name}", None, (200, 204),
+            {"service_id": service_id, "collection_name": collection_name},
+            "delete collection endpoint",
+            "Failed to delete collection (HTTP {status}). Collection may not exist.",
+            "An error occurred while deleting the collection.",
+            lambda data: {"message": f"Collection '{collection_name}' deleted successfully"},
+        )
+
+    def _create_snapshot_op(self, service_id: str, collection_name: str) -> _Operation:
+        def on_success(data):
+            snapshot = data.get("result") or {}
+            return {
+                "message": f"Snapshot of collection '{collection_name}' created",
+                "snapshot": snapshot,
+                "path": f"{QDRANT_SNAPSHOTS_PATH}/{collection_name}/{snapshot.get('name')}",
+            }
+
+        return _Operation(
+            "POST", f"/collections/{collection_name}/snapshots?wait=true", None, (200,),
+            {"service_id": service_id, "collection_name": collection_name},
+            "create snapshot endpoint",
+            "Failed to create snapshot (HTTP {status}). Collection may not exist.",
+            "An error occurred while creating the snapshot.",
+            on_success,
+        )
+
+    def _list_snapshots_op(self, service_id: str, collection_name: str) -> _Operation:
+        return _Operation(
+            "GET", f"/collections/{collection_name}/snapshots", None, (200,),
+            {"service_id": service_id, "collection_name": collection_name},
+            "list snapshots endpoint",
+            "Failed to list snapshots (HTTP {status}). Collection may not exist.",
+            "An error occurred while listing snapshots.",
+            lambda data: {"snapshots": sorted(data.get("result") or [],
+                                              key=lambda snapshot: snapshot.get("creation_time") or "")},
+        )
+
+    def _recover_snapshot_op(self, service_id: str, collection_name: str, snapshot: str) -> _Operation:
+        if not snapshot or "/" in snapshot or snapshot.startswith("."):
+            raise ValueError("snapshot must be the file name of a snapshot of the collection")
+        location = f"file://{QDRANT_SNAPSHOTS_PATH}/{collection_name}/{snapshot}"
+        return _Operation(
+            "PUT", f"/collections/{collection_name}/snapshots/recover?wait=true", {"location": location}, (200,),
+            {"service_id": service_id, "collection_name": collection_name, "snapshot": snapshot},
+            "recover snapshot endpoint",
+            "Failed to recover snapshot (HTTP {status}). Snapshot may not exist.",
+            "An error occurred while recovering the snapshot.",
+            lambda data: {"message": f"Collection '{collection_name}' recovered from snapshot '{snapshot}'"},
+        )
+
+    def _upsert_points_op(self, service_id: str, collection_name: str, points: List[Dict[str, Any]],
+                          wait: bool = True) -> _Operation:
+        path = f"/collections/{collection_name}/points" + ("" if wait else "?wait=false")
+        return _Operation(
+            "PUT", path, {"points": points}, (200, 201),
+            {"service_id": service_id, "collection_name": collection_name},
+            "upsert points endpoint",
+            "Failed to upsert points (HTTP {status}).",
+            "An error occurred while upserting points.",
+            lambda data: {
+                "message": f"Upserted {len(points)} points to collection '{collection_name}'",
+                "num_points": len(points),
+            },
+        )
+
+    def _search_points_op(self, service_id: str, collection_name: str, query_vector: List[float],
+                          limit: int, query_filter: Optional[Dict[str, Any]],
+                          params: Optional[Dict[str, Any]] = None) -> _Operation:
+        body = {
+            "vector": query_vector,
+            "limit": limit,
+            "with_payload": True,
+            "with_vector": False
+        }
+        if query_filter:
+            body["filter"] = query_filter
+        if params:
+            body["params"] = params
+
+        def on_success(data):
+            results = data.get("result", [])
+            return {"results": results, "num_results": len(results)}
+        return _Operation(
+            "POST", f"/collections/{collection_name}/points/search", body, (200,),
+            {"service_id": service_id, "collection_name": collection_name, "results": []},
+            "search endpoint",
+            "Failed to search points (HTTP {status}).",
+            "An error occurred while searching points.",
+            on_success,
+        )
+
+    def _search_batch_op(self, service_id: str, collection_name: str, searches: List[Dict[str, Any]]) -> _Operation:
+        body = {"searches": [
+            {**search, "with_payload": True, "with_vector": False} for search in searches
+        ]}
+
+        def on_success(data):
+            results = data.get("result", [])
+            timing = {"qdrant_time_ms": round(data["time"] * 1000, 3)} if "time" in data else {}
+            return {"results": results, "num_queries": len(results), **timing}
+        return _Operation(
+            "POST", f"/collections/{collection_name}/points/search/batch", body, (200,),
+            {"service_id": service_id, "collection_name": collection_name, "results": []},
+            "batch search endpoint",
+            "Failed to run batch search (HTTP {status}).",
+            "An error occurred while running the batch search.",
+            on_success,
+        )
+
+    @staticmethod
+    def _batch_searches(searches: List[Dict[str, Any]], limit: int, query_filter: Optional[Dict[str, Any]],
+                        params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fill in the shared ``limit``/``filter``/``params`` for searches that do not set their own."""
+        normalized = []
+        for search in searches:
+            entry = {"vector": search["vector"], "limit": search.get("limit", limit)}
+            search_filter = search.get("filter", query_filter)
+            if search_filter:
+                entry["filter"] = search_filter
+            entry_params = search.get("params", params)
+            if entry_params:
+                entry["params"] = entry_params
+            normalized.append(entry)
+        return normalized
+
+    def _search_params(self, service_id: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """``params`` if given, else the deployment's default (QDRANT_SEARCH_HNSW_EF), looked up once per service."""
+        if params is not None:
+            return params
+        if service_id not in self._search_defaults:
+            defaults = deployment_defaults(self.service_manager.get_service(service_id))
+            self._search_defaults[service_id] = search_params(ef=defaults.get("ef"))
+        return self._search_defaults[service_id]
+
+    def _collection_tuning(self, service_id: str, hnsw: Optional[Dict[str, Any]], quantization,
+                           on_disk: Optional[bool]) -> Dict[str, Any]:
+        """Qdrant settings for a new collection; unset fields fall back to the deployment defaults.
+
+        Raises:
+            ValueError: If a setting is invalid
+        """
+        defaults = deployment_defaults(self.service_manager.get_service(service_id))
+        if quantization is None:
+            quantization = defaults.get("quantization")
+        return {
+            "hnsw_config": hnsw_config(hnsw),
+            "quantization_config": quantization_config(quantization),
+            "on_disk": on_disk if on_disk is not None else defaults.get("on_disk"),
+        }
+
+    @staticmethod
+    def _update_body(hnsw: Optional[Dict[str, Any]], quantization, on_disk: Optional[bool],
+                     optimizers: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """PATCH body for a collection update (raises ValueError on invalid or empty settings)."""
+        body: Dict[str, Any] = {}
+        if hnsw:
+            body["hnsw_config"] = hnsw_config(hnsw)
+        if quantization is not None:
+            body["quantization_config"] = quantization_config(quantization, update=True)
+        if on_disk is not None:
+            # "" is the default (unnamed) vector
+            body["vectors"] = {"": {"on_disk": bool(on_disk)}}
+        if optimizers:
+            body["optimizers_config"] = dict(optimizers)
+        if not body:
+            raise ValueError("Nothing to update: set hnsw_config, quantization, on_disk or optimizers_config")
+        return body
+
+    @staticmethod
+    def _with_batch_timing(result: Dict[str, Any], num_queries: int, started: float) -> Dict[str, Any]:
+        duration = time.perf_counter() - started
+        result["duration_ms"] = round(duration * 1000, 3)
+        if result.get("success"):
+            result["queries_per_second"] = round(num_queries / duration, 1) if duration > 0 else 0.0
+        return result
+
+    # ========== Collections ==========
+
     def get_collections(self, service_id: str, timeout: int = 5) -> Dict[str, Any]:
         """Get list of collections from a Qdrant service.
-        
+
         Args:
             service_id: The service ID
             timeout: Request timeout in seconds
-            
+
         Returns:
             Dict with either:
             - {"success": True, "collections": [list of collection names]}
             - {"success": False, "error": "...", "message": "...", "collections": []}
         """
-        try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found.",
-                    "collections": []
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}). Please wait a moment and try again.",
-                    "service_id": service_id,
-                    "status": status,
-                    "collections": []
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id,
-                    "status": status,
-                    "collections": []
-                }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.get(
-                f"http://{remote_host}:{remote_port}/collections",
-                timeout=timeout
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from collections endpoint",
-                    "message": f"Failed to query collections from vector DB service (HTTP {response.status_code}).",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collections": []
-                }
-            
-            data = response.json()
-            
-            # Qdrant returns {"result": {"collections": [...]}}
-            collections = []
-            if "result" in body and "collections" in body["result"]:
-                collections = [col["name"] for col in body["result"]["collections"]]
-            
-            return {
-                "success": True,
-                "collections": collections,
-                "service_id": service_id,
-                "endpoint": endpoint
-            }
-            
-        except Exception as e:
-            self.logger.exception("Failed to get collections for service %s", service_id)
-            return {
-                "success": False,
-                "error": f"Exception during collection discovery: {str(e)}",
-                "message": "An error occurred while querying the vector DB service for collections.",
-                "service_id": service_id,
-                "collections": []
-            }
+        return self._execute(service_id, self._get_collections_op(service_id), timeout)
+
+    async def get_collections_async(self, service_id: str, timeout: int = 5) -> Dict[str, Any]:
+        """Async variant of get_collections."""
+        return await self._execute_async(service_id, self._get_collections_op(service_id), timeout)
 
     def get_collection_info(self, service_id: str, collection_name: str, timeout: int = 5) -> Dict[str, Any]:
         """Get detailed information about a specific collection.
-        
+
         Args:
             service_id: The service ID
             collection_name: Name of the collection
             timeout: Request timeout in seconds
-            
+
         Returns:
             Dict with collection details or error
         """
-        try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found."
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}).",
-                    "service_id": service_id,
-                    "status": status
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id
-                }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.get(
-                f"http://{remote_host}:{remote_port}/collections/{collection_name}",
-                timeout=timeout
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from collection info endpoint",
-                    "message": f"Failed to get collection info (HTTP {response.status_code}). Collection may not exist.",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collection_name": collection_name
-                }
-            
-            data = response.json()
-            
-            return {
-                "success": True,
-                "collection_info": body.get("result", {}),
-                "service_id": service_id,
-                "endpoint": endpoint,
-                "collection_name": collection_name
-            }
-            
-        except Exception as e:
-            self.logger.exception("Failed to get collection info for %s in service %s", collection_name, service_id)
-            return {
-                "success": False,
-                "error": f"Exception: {str(e)}",
-                "message": "An error occurred while querying collection information.",
-                "service_id": service_id,
-                "collection_name": collection_name
-            }
+        return self._execute(service_id, self._get_collection_info_op(service_id, collection_name), timeout)
 
-    def create_collection(self, service_id: str, collection_name: str, vector_size: int, 
-                         distance: str = "Cosine", timeout: int = 10) -> Dict[str, Any]:
+    async def get_collection_info_async(self, service_id: str, collection_name: str,
+                                        timeout: int = 5) -> Dict[str, Any]:
+        """Async variant of get_collection_info."""
+        return await self._execute_async(service_id, self._get_collection_info_op(service_id, collection_name), timeout)
+
+    def create_collection(self, service_id: str, collection_name: str, vector_size: int,
+                         distance: str = "Cosine", timeout: int = 10,
+                         hnsw: Optional[Dict[str, Any]] = None, quantization=None, on_disk: Optional[bool] = None,
+                         payload_indexes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Create a new collection in Qdrant.
-        
+
         Args:
             service_id: The service ID
             collection_name: Name for the new collection
             vector_size: Dimension of vectors
             distance: Distance metric ("Cosine", "Euclid", "Dot")
             timeout: Request timeout in seconds
-            
+            hnsw: HNSW settings (m, ef_construct, full_scan_threshold, on_disk)
+            quantization: "scalar", "product", "binary" or a dict with "type" and options
+                (see qdrant_tuning.quantization_config); defaults to the deployment's setting
+            on_disk: Keep original vectors on disk; defaults to the deployment's setting
+            payload_indexes: Payload fields to index, {field name: schema type}
+
         Returns:
             Dict with creation result
+
+        Raises:
+            ValueError: If a tuning setting is invalid
         """
-        try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found."
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}).",
-                    "service_id": service_id,
-                    "status": status
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id
-                }
-            
-            # Prepare request body
-            request_body = {
-                "vectors": {
-                    "size": vector_size,
-                    "distance": distance
-                }
-            }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.put(
-                f"http://{remote_host}:{remote_port}/collections/{collection_name}",
-                json=request_body,
-                timeout=timeout
-            )
-            
-            if response.status_code not in [200, 201]:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from create collection endpoint",
-                    "message": f"Failed to create collection (HTTP {response.status_code}).",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collection_name": collection_name
-                }
-            
-            return {
-                "success": True,
-                "message": f"Collection '{collection_name}' created successfully",
-                "service_id": service_id,
-                "endpoint": endpoint,
-                "collection_name": collection_name,
-                "vector_size": vector_size,
-                "distance": distance
-            }
-            
-        except Exception as e:
-            self.logger.exception("Failed to create collection %s in service %s", collection_name, service_id)
-            return {
-                "success": False,
-                "error": f"Exception: {str(e)}",
-                "message": "An error occurred while creating the collection.",
-                "service_id": service_id,
-                "collection_name": collection_name
-            }
+        tuning = self._collection_tuning(service_id, hnsw, quantization, on_disk)
+        op = self._create_collection_op(service_id, collection_name, vector_size, distance, tuning)
+        result = self._execute(service_id, op, timeout)
+        if result.get("success") and payload_indexes:
+            for field_name, field_schema in payload_indexes.items():
+                op = self._payload_index_op(service_id, collection_name, field_name, field_schema)
+                self._record_payload_index(result, field_name, self._execute(service_id, op, timeout))
+        return result
+
+    async def create_collection_async(self, service_id: str, collection_name: str, vector_size: int,
+                                      distance: str = "Cosine", timeout: int = 10,
+                                      hnsw: Optional[Dict[str, Any]] = None, quantization=None,
+                                      on_disk: Optional[bool] = None,
+                                      payload_indexes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Async variant of create_collection."""
+        tuning = self._collection_tuning(service_id, hnsw, quantization, on_disk)
+        op = self._create_collection_op(service_id, collection_name, vector_size, distance, tuning)
+        result = await self._execute_async(service_id, op, timeout)
+        if result.get("success") and payload_indexes:
+            for field_name, field_schema in payload_indexes.items():
+                op = self._payload_index_op(service_id, collection_name, field_name, field_schema)
+                self._record_payload_index(result, field_name, await self._execute_async(service_id, op, timeout))
+        return result
+
+    @staticmethod
+    def _record_payload_index(result: Dict[str, Any], field_name: str, index_result: Dict[str, Any]) -> None:
+        if index_result.get("success"):
+            result.setdefault("payload_indexes", []).append(field_name)
+        else:
+            result.setdefault("payload_index_errors", {})[field_name] = index_result.get("error")
+
+    def update_collection(self, service_id: str, collection_name: str, hnsw: Optional[Dict[str, Any]] = None,
+                          quantization=None, on_disk: Optional[bool] = None,
+                          optimizers: Optional[Dict[str, Any]] = None, timeout: int = 30) -> Dict[str, Any]:
+        """Change the index, quantization or storage settings of an existing collection.
+
+        Qdrant rebuilds the affected index segments in the background; the
+        collection stays searchable meanwhile (its status is "yellow").
+
+        Args:
+            service_id: The service ID
+            collection_name: Name of the collection
+            hnsw: HNSW settings to change
+            quantization: New quantization ("none" disables it)
+            on_disk: Move original vectors to disk (True) or RAM (False)
+            optimizers: Qdrant optimizers_config fields (e.g. indexing_threshold)
+            timeout: Request timeout in seconds
+
+        Returns:
+            Dict with update result
+
+        Raises:
+            ValueError: If a setting is invalid or nothing is to be changed
+        """
+        body = self._update_body(hnsw, quantization, on_disk, optimizers)
+        return self._execute(service_id, self._update_collection_op(service_id, collection_name, body), timeout)
+
+    async def update_collection_async(self, service_id: str, collection_name: str,
+                                      hnsw: Optional[Dict[str, Any]] = None, quantization=None,
+                                      on_disk: Optional[bool] = None, optimizers: Optional[Dict[str, Any]] = None,
+                                      timeout: int = 30) -> Dict[str, Any]:
+        """Async variant of update_collection."""
+        body = self._update_body(hnsw, quantization, on_disk, optimizers)
+        return await self._execute_async(service_id, self._update_collection_op(service_id, collection_name, body),
+                                         timeout)
+
+    async def create_payload_index_async(self, service_id: str, collection_name: str, field_name: str,
+                                         field_schema: str, timeout: int = 30) -> Dict[str, Any]:
+        """Index a payload field so filtered searches do not scan payloads.
+
+        Raises:
+            ValueError: If the field name or schema type is invalid
+        """
+        op = self._payload_index_op(service_id, collection_name, field_name, field_schema)
+        return await self._execute_async(service_id, op, timeout)
 
     def delete_collection(self, service_id: str, collection_name: str, timeout: int = 10) -> Dict[str, Any]:
         """Delete a collection from Qdrant.
-        
+
         Args:
             service_id: The service ID
             collection_name: Name of the collection to delete
             timeout: Request timeout in seconds
-            
+
         Returns:
             Dict with deletion result
         """
-        try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found."
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}).",
-                    "service_id": service_id,
-                    "status": status
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id
-                }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.delete(
-                f"http://{remote_host}:{remote_port}/collections/{collection_name}",
-                timeout=timeout
-            )
-            
-            if response.status_code not in [200, 204]:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from delete collection endpoint",
-                    "message": f"Failed to delete collection (HTTP {response.status_code}). Collection may not exist.",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collection_name": collection_name
-                }
-            
-            return {
-                "success": True,
-                "message": f"Collection '{collection_name}' deleted successfully",
-                "service_id": service_id,
-                "endpoint": endpoint,
-                "collection_name": collection_name
-            }
-            
-        except Exception as e:
-            self.logger.exception("Failed to delete collection %s in service %s", collection_name, service_id)
-            return {
-                "success": False,
-                "error": f"Exception: {str(e)}",
-                "message": "An error occurred while deleting the collection.",
-                "service_id": service_id,
-                "collection_name": collection_name
-            }
+        return self._execute(service_id, self._delete_collection_op(service_id, collection_name), timeout)
+
+    async def delete_collection_async(self, service_id: str, collection_name: str,
+                                      timeout: int = 10) -> Dict[str, Any]:
+        """Async variant of delete_collection."""
+        return await self._execute_async(service_id, self._delete_collection_op(service_id, collection_name), timeout)
+
+    # ========== Points ==========
 
-    def upsert_points(self, service_id: str, collection_name: str, points: List[Dict[str, Any]], 
+    def upsert_points(self, service_id: str, collection_name: str, points: List[Dict[str, Any]],
                      timeout: int = 30) -> Dict[str, Any]:
         """Insert or update points (vectors with payloads) in a collection.
-        
+
         Args:
             service_id: The service ID
             collection_name: Name of the collection
             points: List of points, each with 'id', 'vector', and optional 'payload'
                    Example: [{"id": 1, "vector": [0.1, 0.2, ...], "payload": {"text": "..."}}]
             timeout: Request timeout in seconds
-            
+
         Returns:
             Dict with upsert result
         """
+        return self._execute(service_id, self._upsert_points_op(service_id, collection_name, points), timeout)
+
+    async def upsert_points_async(self, service_id: str, collection_name: str, points: List[Dict[str, Any]],
+                                  timeout: int = 30, wait: bool = True) -> Dict[str, Any]:
+        """Async variant of upsert_points (over gRPC when enabled).
+
+        With ``wait=False`` Qdrant acknowledges once the points are in its
+        write-ahead log, without waiting for them to be applied (bulk ingestion).
+        """
+        async def grpc_call(host):
+            await self._grpc.upsert(host, collection_name, points, timeout, wait=wait)
+            return {}
+        op = self._upsert_points_op(service_id, collection_name, points, wait)
+        return await self._execute_async(service_id, op, timeout, grpc_call)
+
+    async def ingest_ndjson_async(self, service_id: str, collection_name: str, chunks: AsyncIterator[bytes],
+                                  batch_size: int = DEFAULT_BATCH_SIZE, parallelism: int = DEFAULT_PARALLELISM,
+                                  timeout: int = 60) -> Dict[str, Any]:
+        """Bulk-load a streamed NDJSON body (one point per line) into a collection.
+
+        Points are upserted in batches of ``batch_size`` with up to
+        ``parallelism`` batches in flight and ``wait=false``; see ingestion.
+
+        Returns:
+            Dict with the ingestion summary (points, batches, failures, points/s)
+
+        Raises:
+            LineTooLongError: If a line exceeds the maximum line length
+        """
+        return await self._ingest_async(
+            service_id, collection_name, lambda stats: iter_ndjson_points(chunks, stats),
+            batch_size, parallelism, timeout
+        )
+
+    async def ingest_vectors_async(self, service_id: str, collection_name: str, chunks: AsyncIterator[bytes],
+                                   content_type: str, id_offset: int = 0,
+                                   batch_size: int = DEFAULT_BATCH_SIZE, parallelism: int = DEFAULT_PARALLELISM,
+                                   timeout: int = 60) -> Dict[str, Any]:
+        """Bulk-load a streamed binary vector body (see vector_codec) into a collection.
+
+        Row ``i`` becomes point ``id_offset + i`` without payload. A malformed
+        body stops the ingest; rows decoded before the error are still upserted
+        and reported in the summary.
+
+        Returns:
+            Dict with the ingestion summary (points, batches, failures, points/s)
+        """
+        reader = VectorReader(content_type)
+        return await self._ingest_async(
+            service_id, collection_name, lambda stats: iter_binary_points(chunks, reader, id_offset),
+            batch_size, parallelism, timeout
+        )
+
+    async def _ingest_async(self, service_id: str, collection_name: str,
+                            points_for: Callable[[IngestStats], AsyncIterator[Dict[str, Any]]],
+                            batch_size: int, parallelism: int, timeout: int) -> Dict[str, Any]:
+        context = {"service_id": service_id, "collection_name": collection_name}
+        op = self._upsert_points_op(service_id, collection_name, [], wait=False)
+        endpoint, error = await self._prepare_async(service_id, op)
+        if error:
+            return error
+        stats = IngestStats(collection_name)
         try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found."
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}).",
-                    "service_id": service_id,
-                    "status": status
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id
-                }
-            
-            # Prepare request body
-            request_body = {
-                "points": points
-            }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.put(
-                f"http://{remote_host}:{remote_port}/collections/{collection_name}/points",
-                json=request_body,
-                timeout=timeout
+            summary = await bulk_ingest(
+                self, service_id, collection_name, points_for(stats), stats,
+                batch_size=batch_size, parallelism=parallelism, timeout=timeout,
             )
-            
-            if response.status_code not in [200, 201]:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from upsert points endpoint",
-                    "message": f"Failed to upsert points (HTTP {response.status_code}).",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collection_name": collection_name
-                }
-            
-            return {
-                "success": True,
-                "message": f"Upserted {len(points)} points to collection '{collection_name}'",
-                "service_id": service_id,
-                "endpoint": endpoint,
-                "collection_name": collection_name,
-                "num_points": len(points)
-            }
-            
-        except Exception as e:
-            self.logger.exception("Failed to upsert points in collection %s, service %s", collection_name, service_id)
-            return {
-                "success": False,
-                "error": f"Exception: {str(e)}",
-                "message": "An error occurred while upserting points.",
-                "service_id": service_id,
-                "collection_name": collection_name
-            }
+        except LineTooLongError:
+            # Rejected by the route as a bad request rather than reported as a partial ingest
+            raise
+        except ValueError as e:
+            return self._error_response(
+                f"Malformed request body: {e}",
+                "Bulk ingestion stopped at a malformed part of the body.",
+                endpoint=endpoint, **context, **stats.to_dict()
+            )
+        if summary["failed_batches"] and not summary["num_points"]:
+            return self._error_response(
+                summary["errors"][0] if summary["errors"] else "All batches failed",
+                "Bulk ingestion failed.",
+                endpoint=endpoint, **context, **summary
+            )
+        return self._success_response(
+            message=f"Ingested {summary['num_points']} points into collection '{collection_name}'",
+            endpoint=endpoint, **context, **summary
+        )
 
-    def search_points(self, service_id: str, collection_name: str, query_vector: List[float], 
-                     limit: int = 10, timeout: int = 10) -> Dict[str, Any]:
+    def search_points(self, service_id: str, collection_name: str, query_vector: List[float],
+                     limit: int = 10, timeout: int = 10,
+                     query_filter: Optional[Dict[str, Any]] = None,
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Search for similar vectors in a collection.
-        
+
         Args:
             service_id: The service ID
             collection_name: Name of the collection
             query_vector: The query vector
             limit: Maximum number of results to return
             timeout: Request timeout in seconds
-            
+            query_filter: Optional Qdrant payload filter (e.g. {"must": [...]})
+            params: Qdrant search params (hnsw_ef, exact, quantization; see qdrant_tuning.search_params);
+                defaults to the deployment's QDRANT_SEARCH_HNSW_EF
+
         Returns:
             Dict with search results
         """
+        params = self._search_params(service_id, params)
+        op = self._search_points_op(service_id, collection_name, query_vector, limit, query_filter, params)
+        return self._execute(service_id, op, timeout)
+
+    async def search_points_async(self, service_id: str, collection_name: str, query_vector: List[float],
+                                  limit: int = 10, timeout: int = 10,
+                                  query_filter: Optional[Dict[str, Any]] = None,
+                                  params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of search_points (over gRPC when enabled)."""
+        params = self._search_params(service_id, params)
+
+        async def grpc_call(host):
+            return {"result": await self._grpc.search(host, collection_name, query_vector, limit, query_filter, timeout,
+                                                      params)}
+        op = self._search_points_op(service_id, collection_name, query_vector, limit, query_filter, params)
+        return await self._execute_async(service_id, op, timeout, grpc_call)
+
+    def search_batch(self, service_id: str, collection_name: str, searches: List[Dict[str, Any]],
+                     limit: int = 10, timeout: int = 30,
+                     query_filter: Optional[Dict[str, Any]] = None,
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run many searches against a collection in one Qdrant request.
+
+        Args:
+            service_id: The service ID
+            collection_name: Name of the collection
+            searches: One dict per query with 'vector' and optional 'limit' / 'filter' / 'params'
+            limit: Limit for searches that do not set their own
+            timeout: Request timeout in seconds
+            query_filter: Filter for searches that do not set their own
+            params: Search params for searches that do not set their own
+
+        Returns:
+            Dict with per-query result lists (in request order) and batch timing
+        """
+        started = time.perf_counter()
+        searches = self._batch_searches(searches, limit, query_filter, self._search_params(service_id, params))
+        op = self._search_batch_op(service_id, collection_name, searches)
+        return self._with_batch_timing(self._execute(service_id, op, timeout), len(searches), started)
+
+    async def search_batch_async(self, service_id: str, collection_name: str, searches: List[Dict[str, Any]],
+                                 limit: int = 10, timeout: int = 30,
+                                 query_filter: Optional[Dict[str, Any]] = None,
+                                 params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of search_batch (over gRPC when enabled)."""
+        started = time.perf_counter()
+        searches = self._batch_searches(searches, limit, query_filter, self._search_params(service_id, params))
+
+        async def grpc_call(host):
+            return {"result": await self._grpc.search_batch(host, collection_name, searches, timeout)}
+        op = self._search_batch_op(service_id, collection_name, searches)
+        result = await self._execute_async(service_id, op, timeout, grpc_call)
+        return self._with_batch_timing(result, len(searches), started)
+
+    # ========== Snapshots ==========
+
+    def create_snapshot(self, service_id: str, collection_name: str, timeout: int = 600) -> Dict[str, Any]:
+        """Snapshot a collection to the shared snapshot directory.
+
+        The snapshot can be restored by later deployments of the recipe
+        (``QDRANT_RESTORE_SNAPSHOTS``) or with recover_snapshot.
+
+        Args:
+            service_id: The service ID
+            collection_name: Name of the collection
+            timeout: Request timeout in seconds (Qdrant answers once the snapshot is written)
+
+        Returns:
+            Dict with the snapshot description and its path in the container
+        """
+        return self._execute(service_id, self._create_snapshot_op(service_id, collection_name), timeout)
+
+    async def create_snapshot_async(self, service_id: str, collection_name: str,
+                                    timeout: int = 600) -> Dict[str, Any]:
+        """Async variant of create_snapshot."""
+        return await self._execute_async(service_id, self._create_snapshot_op(service_id, collection_name), timeout)
+
+    async def list_snapshots_async(self, service_id: str, collection_name: str, timeout: int = 10) -> Dict[str, Any]:
+        """List the snapshots of a collection, oldest first."""
+        return await self._execute_async(service_id, self._list_snapshots_op(service_id, collection_name), timeout)
+
+    async def recover_snapshot_async(self, service_id: str, collection_name: str, snapshot: str,
+                                     timeout: int = 600) -> Dict[str, Any]:
+        """Replace a collection with the contents of one of its snapshots.
+
+        Raises:
+            ValueError: If the snapshot is not a plain file name
+        """
+        op = self._recover_snapshot_op(service_id, collection_name, snapshot)
+        return await self._execute_async(service_id, op, timeout)
+
+    # ========== Text Search ==========
+
+    def _embed_query(self, query_text: str) -> Tuple[List[float], float]:
+        start = time.perf_counter()
+        with ORCHESTRATOR_METRICS.stage("text_search", "embed"):
+            vector = self.text_embedder.embed(query_text)
+        return vector, (time.perf_counter() - start) * 1000
+
+    def _text_search_error(self, service_id: str, collection_name: str,
+                           error: Optional[Exception] = None) -> Dict[str, Any]:
+        context = {"service_id": service_id, "collection_name": collection_name, "results": []}
+        if error is None:
+            return self._error_response("No text embedder configured",
+                                        "Text search needs an embedder; see TEXT_SEARCH_EMBEDDER.", **context)
+        self.logger.exception("Embedding the query for %s/%s failed", service_id, collection_name)
+        return self._error_response(f"Embedding failed: {error}", "Could not embed the query text.", **context)
+
+    def _with_text_timing(self, result: Dict[str, Any], embedding_ms: float, started: float) -> Dict[str, Any]:
+        result["embedder"] = self.text_embedder.name
+        result["embedding_ms"] = round(embedding_ms, 3)
+        result["search_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def search_with_text(self, service_id: str, collection_name: str, query_text: str,
+                         limit: int = 10, timeout: int = 10,
+                         query_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Embed ``query_text`` with ``text_embedder`` and search for similar vectors.
+
+        The collection must hold vectors from the same embedder (same dimension).
+
+        Args:
+            service_id: The service ID
+            collection_name: Name of the collection
+            query_text: Text to search for
+            limit: Maximum number of results to return
+            timeout: Request timeout in seconds
+            query_filter: Optional Qdrant payload filter
+
+        Returns:
+            Dict with search results plus embedder, embedding_ms and search_ms
+        """
+        if self.text_embedder is None:
+            return self._text_search_error(service_id, collection_name)
         try:
-            # Check if service exists and is ready
-            service_info = self.service_manager.get_service(service_id)
-            if not service_info:
-                return {
-                    "success": False,
-                    "error": f"Service {service_id} not found",
-                    "message": "The requested vector DB service could not be found.",
-                    "results": []
-                }
-            
-            is_ready, status = self._check_service_ready(service_id, service_info)
-            if not is_ready:
-                return {
-                    "success": False,
-                    "error": f"Service is not ready yet (status: {status})",
-                    "message": f"The vector DB service is still starting up (status: {status}).",
-                    "service_id": service_id,
-                    "status": status,
-                    "results": []
-                }
-            
-            endpoint = self.endpoint_resolver.resolve(service_id, default_port=DEFAULT_QDRANT_PORT)
-            if not endpoint:
-                return {
-                    "success": False,
-                    "error": "Service endpoint not available",
-                    "message": "The vector DB service endpoint is not available yet.",
-                    "service_id": service_id,
-                    "results": []
-                }
-            
-            # Prepare request body
-            request_body = {
-                "vector": query_vector,
-                "limit": limit,
-                "with_payload": True,
-                "with_vector": False
-            }
-            
-            # Make direct HTTP request to compute node
-            from urllib.parse import urlparse
-            parsed = urlparse(endpoint)
-            remote_host = parsed.hostname
-            remote_port = parsed.port or DEFAULT_QDRANT_PORT
-            
-            response = requests.post(
-                f"http://{remote_host}:{remote_port}/collections/{collection_name}/points/search",
-                json=request_body,
-                timeout=timeout
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code} from search endpoint",
-                    "message": f"Failed to search points (HTTP {response.status_code}).",
-                    "service_id": service_id,
-                    "endpoint": endpoint,
-                    "collection_name": collection_name,
-                    "results": []
-                }
-            
-            data = response.json()
-            results = data.get("result", [])
-            
-            return {
-                "success": True,
-                "results": results,
-                "service_id": service_id,
-                "endpoint": endpoint,
-                "collection_name": collection_name,
-                "num_results": len(results)
-            }
-            
+            vector, embedding_ms = self._embed_query(query_text)
         except Exception as e:
-            self.logger.exception("Failed to search points in collection %s, service %s", collection_name, service_id)
-            return {
-                "success": False,
-                "error": f"Exception: {str(e)}",
-                "message": "An error occurred while searching points.",
-                "service_id": service_id,
-                "collection_name": collection_name,
-                "results": []
-            }
+            return self._text_search_error(service_id, collection_name, e)
+        started = time.perf_counter()
+        with ORCHESTRATOR_METRICS.stage("text_search", "search"):
+            result = self.search_points(service_id, collection_name, vector, limit, timeout, query_filter)
+        return self._with_text_timing(result, embedding_ms, started)
 
+    async def search_with_text_async(self, service_id: str, collection_name: str, query_text: str,
+                                     limit: int = 10, timeout: int = 10,
+                                     query_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of search_with_text (embedding runs in a worker thread)."""
+        if self.text_embedder is None:
+            return self._text_search_error(service_id, collection_name)
+        try:
+            vector, embedding_ms = await asyncio.to_thread(self._embed_query, query_text)
+        except Exception as e:
+            return self._text_search_error(service_id, collection_name, e)
+        started = time.perf_counter()
+        with ORCHESTRATOR_METRICS.stage("text_search", "search"):
+            result = await self.search_points_async(service_id, collection_name, vector, limit, timeout, query_filter)
+        return self._with_text_timing(result, embedding_ms, started)
@@ -0,0 +1,113 @@
+"""Qdrant collection tuning: index, storage and quantization settings.
+
+Translates the data plane's compact tuning fields into Qdrant's collection
+config, and reads per-deployment defaults from the environment a Qdrant
+service was started with (``config.environment`` of the service, documented
+as parameters of the ``vector-db/qdrant`` recipe):
+
+- ``QDRANT_COLLECTION_QUANTIZATION``: ``none``, ``scalar``, ``product`` or ``binary``
+- ``QDRANT_COLLECTION_ON_DISK``: keep original vectors on disk (``true``/``false``)
+- ``QDRANT_SEARCH_HNSW_EF``: search-time ``ef`` when a query does not set one
+
+HNSW ``m``/``ef_construct`` defaults are Qdrant's own settings
+(``QDRANT__STORAGE__HNSW_INDEX__M``, ``QDRANT__STORAGE__HNSW_INDEX__EF_CONSTRUCT``)
+and are applied by Qdrant itself.
+"""
+
+from typing import Any, Dict, Optional, Union
+
+HNSW_FIELDS = ("m", "ef_construct", "full_scan_threshold", "on_disk", "max_indexing_threads")
+PAYLOAD_SCHEMA_TYPES = ("keyword", "integer", "float", "bool", "geo", "text", "datetime")
+PRODUCT_COMPRESSIONS = ("x4", "x8", "x16", "x32", "x64")
+
+QuantizationSpec = Union[str, Dict[str, Any], None]
+
+
+def hnsw_config(spec: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Validated HNSW settings (``m``, ``ef_construct``, ``full_scan_threshold``, ``on_disk``, ...)."""
+    if not spec:
+        return None
+    unknown = set(spec) - set(HNSW_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown HNSW settings: {', '.join(sorted(unknown))} (allowed: {', '.join(HNSW_FIELDS)})")
+    for key in ("m", "ef_construct", "full_scan_threshold", "max_indexing_threads"):
+        if key in spec and (not isinstance(spec[key], int) or spec[key] < 0):
+            raise ValueError(f"HNSW {key} must be a non-negative integer")
+    return dict(spec)
+
+
+def quantization_config(spec: QuantizationSpec, update: bool = False) -> Optional[Union[str, Dict[str, Any]]]:
+    """Qdrant ``quantization_config`` for ``spec``.
+
+    ``spec`` is a type name (``"scalar"``) or a dict with ``type`` and options:
+    ``quantile`` (scalar), ``compression`` (product, default ``x16``) and
+    ``always_ram`` (all). ``"none"`` disables quantization when updating a
+    collection and is a no-op when creating one.
+    """
+    if spec is None:
+        return None
+    options = {"type": spec} if isinstance(spec, str) else dict(spec)
+    kind = str(options.pop("type", "")).lower()
+    if kind in ("none", "disabled", ""):
+        return "Disabled" if update else None
+
+    settings: Dict[str, Any] = {}
+    if "always_ram" in options:
+        settings["always_ram"] = bool(options.pop("always_ram"))
+    if kind == "scalar":
+        settings["type"] = "int8"
+        if "quantile" in options:
+            quantile = float(options.pop("quantile"))
+            if not 0.5 <= quantile <= 1.0:
+                raise ValueError("Scalar quantization quantile must be between 0.5 and 1.0")
+            settings["quantile"] = quantile
+    elif kind == "product":
+        compression = options.pop("compression", "x16")
+        if compression not in PRODUCT_COMPRESSIONS:
+            raise ValueError(f"Product quantization compression must be one of {', '.join(PRODUCT_COMPRESSIONS)}")
+        settings["compression"] = compression
+    elif kind != "binary":
+        raise ValueError(f"Unknown quantization type '{kind}' (use scalar, product, binary or none)")
+    if options:
+        raise ValueError(f"Unknown {kind} quantization options: {', '.join(sorted(options))}")
+    return {kind: settings}
+
+
+def search_params(ef: Optional[int] = None, exact: Optional[bool] = None,
+                  rescore: Optional[bool] = None, oversampling: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Qdrant search ``params``: HNSW ``ef``, exact (brute force) search and quantization rescoring."""
+    params: Dict[str, Any] = {}
+    if ef is not None:
+        params["hnsw_ef"] = int(ef)
+    if exact is not None:
+        params["exact"] = bool(exact)
+    quantization = {}
+    if rescore is not None:
+        quantization["rescore"] = bool(rescore)
+    if oversampling is not None:
+        quantization["oversampling"] = float(oversampling)
+    if quantization:
+        params["quantization"] = quantization
+    return params or None
+
+
+def payload_index(field_name: str, field_schema: str) -> Dict[str, Any]:
+    """Body of a payload index creation request."""
+    if not field_name:
+        raise ValueError("field_name required")
+    if field_schema not in PAYLOAD_SCHEMA_TYPES:
+        raise ValueError(f"field_schema must be one of {', '.join(PAYLOAD_SCHEMA_TYPES)}")
+    return {"field_name": field_name, "field_schema": field_schema}
+
+
+def deployment_defaults(service_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Tuning defaults from the environment a Qdrant service was deployed with."""
+    environment = ((service_info or {}).get("config") or {}).get("environment") or {}
+    defaults: Dict[str, Any] = {}
+    if environment.get("QDRANT_COLLECTION_QUANTIZATION"):
+        defaults["quantization"] = environment["QDRANT_COLLECTION_QUANTIZATION"]
+    if environment.get("QDRANT_COLLECTION_ON_DISK"):
+        defaults["on_disk"] = str(environment["QDRANT_COLLECTION_ON_DISK"]).lower() in ("1", "true", "yes")
+    if environment.get("QDRANT_SEARCH_HNSW_EF"):
+        defaults["ef"] = int(environment["QDRANT_SEARCH_HNSW_EF"])
+    return defaults
@@ -283,11 +283,7 @@ class TestServiceOrchestratorCore:
     def test_get_service_group_status_counts(self, orchestrator, mock_service_manager):
         """Group status summary should aggregate replica states"""
         mock_service_manager.get_group_info.return_value = {"id": "sg-1"}
-        mock_service_manager.get_all_replicas_flat.return_value = [
-            {"id": "r1", "status": "running"},
-            {"id": "r2", "status": "starting"},
-            {"id": "r3", "status": "failed"}
-        ]
+        mock_service_manager.get_group_status_counts.return_value = {"running": 1, "starting": 1, "failed": 1}
         orchestrator.service_manager = mock_service_manager
         
         result = orchestrator.get_service_group_status("sg-1")
@@ -0,0 +1,391 @@
+"""
+Lightweight distributed tracing with W3C Trace Context propagation.
+
+A benchmark request crosses the client load generator, the gateway
+(OrchestratorProxy and the SSH SOCKS tunnel), the orchestrator API,
+VllmService and the vLLM replica. Each hop reads the incoming
+``traceparent`` header, records its own spans and forwards a
+``traceparent`` naming its span as the parent, so all hops share one
+trace ID (vLLM joins the trace when started with an OTLP endpoint).
+
+Entry points (HTTP middleware) start or continue a trace with
+``TRACER.start_trace()``; inner stages use ``TRACER.span()``, which only
+records something inside a sampled trace, so untraced requests pay one
+context-variable lookup per stage.
+
+Sampling (environment):
+- ``TRACING_SAMPLE_RATIO``: fraction of new traces sampled at this hop (default 0.01)
+- ``TRACING_MAX_TRACES_PER_SECOND``: cap on traces recorded per second, including
+  traces sampled upstream, to bound overhead under load (default 10)
+
+Export (environment):
+- ``TRACING_EXPORTER``: ``otlp``, ``log`` or ``none`` (default: ``otlp`` when
+  ``TRACING_OTLP_ENDPOINT`` is set, ``log`` otherwise)
+- ``TRACING_OTLP_ENDPOINT``: OTLP/HTTP JSON traces URL, e.g. the local Alloy
+  collector ``http://alloy:4318/v1/traces``
+- ``TRACING_SERVICE_NAME``: ``service.name`` of exported spans
+
+The ``log`` exporter writes one JSON line per span to the ``tracing`` logger;
+on MeluXina this ends up in the orchestrator job's output, which is shipped
+to Loki with the other logs.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+span_logger = logging.getLogger("tracing")
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class SpanContext:
+    """Identity of a span as propagated in ``traceparent``."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    @classmethod
+    def from_traceparent(cls, header: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a W3C ``traceparent`` header; None when absent or invalid."""
+        if not header:
+            return None
+        match = _TRACEPARENT.match(header.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 0x01))
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class Span:
+    """A timed operation within a sampled trace."""
+
+    __slots__ = ("name", "context", "parent_span_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, context: SpanContext, parent_span_id: Optional[str], kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: Any) -> None:
+        self.error = str(error) or type(error).__name__
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self, service_name: str) -> Dict[str, Any]:
+        """Flat JSON form written by the log exporter."""
+        return {
+            "service": service_name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Innermost active span (sampled) or SpanContext (unsampled trace) of the current task/thread
+_current: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+class Sampler:
+    """Ratio sampling for new traces plus a per-second cap on recorded traces."""
+
+    def __init__(self, ratio: float = 0.01, max_per_second: float = 10.0):
+        self.ratio = max(0.0, min(1.0, ratio))
+        self.max_per_second = max_per_second
+        self._tokens = max_per_second
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def should_sample(self, parent_sampled: Optional[bool] = None) -> bool:
+        """Decide for a new local root: follow the upstream decision if any, else the ratio; then apply the cap."""
+        wanted = parent_sampled if parent_sampled is not None else random.random() < self.ratio
+        if not wanted:
+            return False
+        if self.max_per_second <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_per_second, self._tokens + (now - self._last_refill) * self.max_per_second)
+            self._last_refill = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+# ========== Exporters ==========
+
+class LogSpanExporter:
+    """Writes each finished span as one JSON line to the ``tracing`` logger."""
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+
+    def export(self, span: Span) -> None:
+        span_logger.info(json.dumps(span.to_dict(self.service_name), default=str, separators=(",", ":")))
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpHttpSpanExporter:
+    """Batches finished spans and POSTs them as OTLP/HTTP JSON from a background thread.
+
+    The queue is bounded: when the collector is slow or down, spans are
+    dropped (and counted) instead of growing memory or blocking requests.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, max_queue: int = 4096, batch_size: int = 256,
+                 flush_interval: float = 2.0, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="otlp-span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=self.timeout)
+
+    def _run(self) -> None:
+        import requests
+
+        session = requests.Session()
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if not batch:
+                continue
+            try:
+                session.post(self.endpoint, json=self.encode(batch), timeout=self.timeout)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.debug(f"Failed to export {len(batch)} spans to {self.endpoint}: {e}")
+
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        """OTLP ``ExportTraceServiceRequest`` in its JSON encoding."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "benchmarking-ai-factories"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items() if v is not None],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+    }
+    if span.parent_span_id:
+        encoded["parentSpanId"] = span.parent_span_id
+    return encoded
+
+
+# ========== Tracer ==========
+
+class Tracer:
+    """Creates spans, tracks the current span per task/thread and hands finished spans to an exporter."""
+
+    def __init__(self, service_name: str = "orchestrator", sampler: Optional[Sampler] = None, exporter=None):
+        self.service_name = service_name
+        self.sampler = sampler or Sampler()
+        self.exporter = exporter
+
+    @classmethod
+    def from_env(cls, service_name: Optional[str] = None) -> "Tracer":
+        service_name = os.getenv("TRACING_SERVICE_NAME", service_name or "orchestrator")
+        endpoint = os.getenv("TRACING_OTLP_ENDPOINT")
+        kind = os.getenv("TRACING_EXPORTER", "otlp" if endpoint else "log").lower()
+        if kind == "otlp" and endpoint:
+            exporter = OtlpHttpSpanExporter(endpoint, service_name)
+        elif kind == "log":
+            exporter = LogSpanExporter(service_name)
+        else:
+            exporter = None
+        sampler = Sampler(
+            ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "0.01")),
+            max_per_second=float(os.getenv("TRACING_MAX_TRACES_PER_SECOND", "10")),
+        )
+        return cls(service_name, sampler, exporter)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, service_name: Optional[str] = None) -> None:
+        """Re-read the environment (e.g. in the gateway, to export as ``server``)."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+        configured = Tracer.from_env(service_name)
+        self.service_name, self.sampler, self.exporter = configured.service_name, configured.sampler, configured.exporter
+
+    # ========== Context ==========
+
+    @staticmethod
+    def current_context() -> Optional[SpanContext]:
+        current = _current.get()
+        return current.context if isinstance(current, Span) else current
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        current = _current.get()
+        return current if isinstance(current, Span) else None
+
+    def inject(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Return ``headers`` (or a new dict) with the current ``traceparent`` added, if in a trace."""
+        headers = dict(headers) if headers else {}
+        context = self.current_context()
+        if context is not None:
+            headers[TRACEPARENT_HEADER] = context.to_traceparent()
+        return headers
+
+    # ========== Spans ==========
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: Optional[str] = None, kind: str = "server",
+                    attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        """Entry point of a hop: continue the incoming trace (or start one) and record a span if sampled.
+
+        Unsampled requests still get a context so downstream hops see the
+        same trace ID and the "not sampled" decision.
+        """
+        parent = SpanContext.from_traceparent(traceparent)
+        sampled = self.enabled and self.sampler.should_sample(parent.sampled if parent else None)
+        trace_id = parent.trace_id if parent else _new_trace_id()
+        if not sampled:
+            token = _current.set(SpanContext(trace_id, parent.span_id if parent else _new_span_id(), False))
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+        span = Span(name, SpanContext(trace_id, _new_span_id(), True), parent.span_id if parent else None,
+                    kind, attributes)
+        yield from self._run_span(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal",
+             attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        """Child span of the current span; a no-op (yields None) outside a sampled trace."""
+        parent = _current.get()
+        if not isinstance(parent, Span):
+            yield None
+            return
+        span = Span(name, SpanContext(parent.context.trace_id, _new_span_id(), True), parent.context.span_id,
+                    kind, attributes)
+        yield from self._run_span(span)
+
+    def _run_span(self, span: Span) -> Iterator[Span]:
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            exporter = self.exporter
+            if exporter is not None:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    logger.debug(f"Failed to export span {span.name}: {e}")
+
+
+TRACER = Tracer.from_env()
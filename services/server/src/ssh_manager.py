@@ -14,6 +14,22 @@ from pathlib import Path
 from typing import Optional, Tuple, Dict
 
 
+def _server_timing_ms(header: Optional[str]) -> Optional[float]:
+    """Sum the ``dur`` values (milliseconds) of a ``Server-Timing`` header, None if it has none."""
+    if not header:
+        return None
+    total = None
+    for metric in header.split(","):
+        for param in metric.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "dur":
+                try:
+                    total = (total or 0.0) + float(value.strip('"'))
+                except ValueError:
+                    pass
+    return total
+
+
 class SSHManager:
     """Manages SSH connections and operations from local to MeluXina HPC cluster.
     """
@@ -411,7 +427,8 @@ class SSHManager:
     
     def http_request_via_ssh(self, remote_host: str, remote_port: int, method: str, path: str, 
                              headers: dict = None, json_data: dict = None, timeout: int = 30,
-                             json_body: bool = True) -> Tuple[bool, int, str]:
+                             json_body: bool = True, timing: Optional[dict] = None,
+                             data=None) -> Tuple[bool, int, str]:
         """Make an HTTP request to a remote host through the SSH SOCKS proxy.
         
         This allows making HTTP requests to internal MeluXina nodes that aren't
@@ -426,6 +443,10 @@ class SSHManager:
             json_data: Optional JSON body for POST requests
             timeout: Request timeout in seconds
             json_body: Whether the expected response is JSON (default: True)
+            timing: Optional dict filled with ``total_s`` (request through the tunnel,
+                including reading the body) and, when the remote reports a
+                ``Server-Timing`` header, ``remote_s`` (time spent in the remote handler)
+            data: Optional raw body (bytes or a file object, streamed) instead of ``json_data``
             
         Returns:
             Tuple of (success: bool, status_code: int, response_body: str)
@@ -444,9 +465,10 @@ class SSHManager:
                 # Try even if SOCKS proxy failed to start, might be a leftover
         
         url = f"http://{remote_host}:{remote_port}{path}"
+        start = time.perf_counter()
         
         try:
-            resp = self._session.request(method, url, timeout=timeout, headers=headers, json=json_data)
+            resp = self._session.request(method, url, timeout=timeout, headers=headers, json=json_data, data=data)
             status_code = resp.status_code
             is_json = 'application/json' in resp.headers.get('Content-Type', '')
             
@@ -458,6 +480,11 @@ class SSHManager:
                 body = resp.text
                 
             self.logger.debug(f"HTTP {method} {remote_host}:{remote_port}{path} -> {status_code} ({len(str(body))} chars) took {resp.elapsed.total_seconds()*1000:.2f}ms")
+            if timing is not None:
+                timing["total_s"] = time.perf_counter() - start
+                remote_ms = _server_timing_ms(resp.headers.get("Server-Timing"))
+                if remote_ms is not None:
+                    timing["remote_s"] = remote_ms / 1000.0
 
             if not resp.ok:
                 self.logger.warning(f"HTTP request via SSH failed to {remote_host}:{remote_port}{path}: {status_code} - {body}")
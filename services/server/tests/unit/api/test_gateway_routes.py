@@ -18,6 +18,8 @@ from fastapi import status, HTTPException
 
 from main import app
 from api.routes import get_orchestrator_proxy, get_orchestrator_proxy_optional
+from orchestrator_proxy import OrchestratorHTTPError
+from service_orchestration.services.vector_db.vector_codec import FLOAT32_CONTENT_TYPE, encode_vectors
 
 
 class TestGatewayAPI:
@@ -319,6 +321,23 @@ class TestGatewayAPI:
         assert response.status_code == 500
         assert "VLLM service unavailable" in response.json()["detail"]
     
+    def test_rag_prompt_vllm_service(self, mock_proxy, client):
+        """Test RAG prompts are forwarded with the retrieval settings"""
+        mock_proxy.rag_prompt_vllm_service.return_value = {"success": True, "rag_timing": {"ttft_ms": 50.0}}
+        
+        response = client.post("/api/v1/vllm/vllm-123/rag", json={
+            "prompt": "How do I reset my password?",
+            "qdrant_service_id": "qd-1",
+            "collection": "docs",
+            "top_k": 5,
+            "measure_ttft": True
+        })
+        assert response.status_code == 200
+        assert response.json()["rag_timing"]["ttft_ms"] == 50.0
+        mock_proxy.rag_prompt_vllm_service.assert_called_once_with(
+            "vllm-123", "How do I reset my password?", "qd-1", "docs", top_k=5, measure_ttft=True
+        )
+    
     def test_get_vllm_models(self, mock_proxy, client):
         """Test getting models from vLLM service"""
         mock_proxy.get_vllm_models.return_value = {
@@ -792,6 +811,22 @@ class TestGatewayAPI:
         assert response.status_code == 400
         assert "vector_size" in response.json()["detail"]
 
+    def test_snapshot_routes_proxy_to_orchestrator(self, mock_proxy, client):
+        """Snapshot creation and recovery go to the orchestrator; recovery needs a snapshot"""
+        mock_proxy.create_snapshot.return_value = {"success": True, "path": "/workspace/qdrant_snapshots/docs/a"}
+        mock_proxy.recover_snapshot.return_value = {"success": True}
+
+        created = client.post("/api/v1/vector-db/qdrant-1/collections/docs/snapshots")
+        recovered = client.put("/api/v1/vector-db/qdrant-1/collections/docs/snapshots/recover",
+                               json={"snapshot": "a"})
+        missing = client.put("/api/v1/vector-db/qdrant-1/collections/docs/snapshots/recover", json={})
+
+        assert created.status_code == 200 and recovered.status_code == 200
+        assert created.json()["path"] == "/workspace/qdrant_snapshots/docs/a"
+        mock_proxy.create_snapshot.assert_called_once_with("qdrant-1", "docs")
+        mock_proxy.recover_snapshot.assert_called_once_with("qdrant-1", "docs", "a")
+        assert missing.status_code == 400
+
     def test_upsert_points_validates_payload(self, client):
         """Upsert endpoint should enforce non-empty point list"""
         response = client.put(
@@ -821,6 +856,121 @@ class TestGatewayAPI:
         assert response.status_code == 200
         assert response.json()["endpoint"].startswith("http://meluxina")
 
+    def test_traceparent_is_continued(self, mock_proxy, client):
+        """Gateway continues the caller's W3C trace and echoes its context"""
+        mock_proxy.get_orchestrator_url.return_value = "http://meluxina:8003"
+        traceparent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00"
+
+        response = client.get("/api/v1/orchestrator/endpoint", headers={"traceparent": traceparent})
+
+        assert response.status_code == 200
+        assert response.headers["traceparent"].startswith("00-0af7651916cd43dd8448eb211c80319c-")
+
+    def test_orchestrator_metrics_include_proxy_timing(self, mock_proxy, client):
+        """Orchestrator self-metrics are combined with the gateway's tunnel/remote split"""
+        from orchestrator_proxy import OrchestratorProxy
+
+        mock_proxy.get_prometheus_metrics.return_value = "orchestrator_event_loop_lag_seconds 0.001"
+        OrchestratorProxy._record_timing("GET", "/api/services/3712345", {"total_s": 0.25, "remote_s": 0.05})
+
+        response = client.get("/api/v1/orchestrator/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "orchestrator_event_loop_lag_seconds 0.001\n" in response.text
+        assert (
+            'orchestrator_proxy_request_duration_seconds_count{method="GET",endpoint="/api/services/{id}",segment="tunnel"}'
+            in response.text
+        )
+
+    def test_bulk_upsert_streams_body_to_orchestrator(self, mock_proxy, client):
+        """Bulk NDJSON uploads are forwarded as one streamed request with the batching parameters"""
+        received = {}
+
+        def bulk_upsert_points(service_id, collection_name, body, params):
+            received["body"] = body.read()
+            received["params"] = params
+            return {"success": True, "num_points": 2}
+
+        mock_proxy.bulk_upsert_points.side_effect = bulk_upsert_points
+        body = b'{"id": 1, "vector": [0.1]}\n{"id": 2, "vector": [0.2]}\n'
+
+        response = client.post("/api/v1/vector-db/qdrant-1/collections/docs/points/bulk?batch_size=1000",
+                               content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert response.json()["num_points"] == 2
+        assert received == {"body": body, "params": {"batch_size": 1000, "parallelism": 4, "timeout": 60}}
+
+    def test_batch_search_expands_shared_vectors(self, mock_proxy, client):
+        """Shared query vectors become one search per vector; shared filter and search params are forwarded"""
+        mock_proxy.search_points_batch.return_value = {"success": True, "results": [[], []], "num_queries": 2}
+
+        response = client.post("/api/v1/vector-db/qdrant-1/collections/docs/points/search/batch",
+                               json={"query_vectors": [[0.1], [0.2]], "limit": 4, "filter": {"must": []},
+                                     "ef": 64, "exact": True})
+
+        assert response.status_code == 200
+        assert response.json()["num_queries"] == 2
+        mock_proxy.search_points_batch.assert_called_once_with(
+            "qdrant-1", "docs", [{"vector": [0.1]}, {"vector": [0.2]}], 4, 30,
+            filter={"must": []}, ef=64, exact=True
+        )
+
+    def test_batch_search_forwards_per_query_params_unchanged(self, mock_proxy, client):
+        """Per-query ef/exact/params reach the orchestrator as sent"""
+        mock_proxy.search_points_batch.return_value = {"success": True, "results": [[], []], "num_queries": 2}
+        searches = [{"vector": [0.1], "ef": 32}, {"vector": [0.2], "exact": True, "params": {"hnsw_ef": 8}}]
+
+        response = client.post("/api/v1/vector-db/qdrant-1/collections/docs/points/search/batch",
+                               json={"searches": searches, "params": {"hnsw_ef": 128}})
+
+        assert response.status_code == 200
+        mock_proxy.search_points_batch.assert_called_once_with(
+            "qdrant-1", "docs", searches, 10, 30, params={"hnsw_ef": 128}
+        )
+
+    def test_binary_search_forwards_body_undecoded(self, mock_proxy, client):
+        """Binary query vectors are passed to the orchestrator as-is with limit/timeout"""
+        mock_proxy.search_points_binary.return_value = {"success": True, "results": [], "num_results": 0}
+        body = encode_vectors([[0.1, 0.2, 0.3]])
+
+        response = client.post("/api/v1/vector-db/qdrant-1/collections/docs/points/search/binary?limit=3",
+                               content=body, headers={"Content-Type": FLOAT32_CONTENT_TYPE})
+        rejected = client.post("/api/v1/vector-db/qdrant-1/collections/docs/points/search/binary",
+                               content=b"[0.1]", headers={"Content-Type": "application/json"})
+
+        assert response.status_code == 200
+        mock_proxy.search_points_binary.assert_called_once_with("qdrant-1", "docs", body, FLOAT32_CONTENT_TYPE, 3, 10)
+        assert rejected.status_code == 415
+
+    def test_orchestrator_profile_forwards_token(self, mock_proxy, client):
+        """Orchestrator profiles are proxied with the caller's token and returned as a download"""
+        mock_proxy.get_profile.return_value = b"MainThread;main (app.py:1) 12\n"
+
+        response = client.get("/api/v1/orchestrator/profile/cpu", params={"seconds": 2},
+                              headers={"X-Profiling-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.text == "MainThread;main (app.py:1) 12\n"
+        assert 'filename="orchestrator-cpu-' in response.headers["content-disposition"]
+        mock_proxy.get_profile.assert_called_once_with("cpu", {"seconds": 2.0, "interval_ms": 10.0}, "secret")
+        assert client.get("/api/v1/orchestrator/profile/disk").status_code == 404
+
+    @pytest.mark.parametrize("status_code, detail", [
+        (403, "Invalid profiling token"),
+        (404, "Profiling is disabled"),
+        (409, "A cpu profile is already running"),
+    ])
+    def test_orchestrator_profile_passes_upstream_errors_through(self, mock_proxy, client, status_code, detail):
+        """Orchestrator profiling errors keep their status code and detail"""
+        mock_proxy.get_profile.side_effect = OrchestratorHTTPError(status_code, {"detail": detail})
+
+        response = client.get("/api/v1/orchestrator/profile/cpu")
+
+        assert response.status_code == status_code
+        assert response.json()["detail"] == detail
+
     @patch('api.routes.get_architecture_info')
     def test_list_available_vllm_models(self, mock_arch, client):
         """Available models endpoint relays architecture catalog"""
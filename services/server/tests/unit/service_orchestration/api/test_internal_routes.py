@@ -10,11 +10,16 @@ Mock: ServiceOrchestrator (core business logic)
 Do NOT test SLURM/business logic here - only Internal API <-> Core translation.
 """
 
+import asyncio
+import json
+
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from fastapi.testclient import TestClient
 
 from service_orchestration.api import create_app
+from service_orchestration.networking.request_scheduler import RequestScheduler
+from service_orchestration.services.vector_db.vector_codec import FLOAT32_CONTENT_TYPE, encode_vectors
 
 
 class TestOrchestratorInternalAPI:
@@ -220,6 +225,95 @@ class TestOrchestratorInternalAPI:
         assert result["response"] == "hello"
         mock_core_orchestrator.vllm_service.prompt.assert_called_once()
 
+    def test_stream_prompt_relays_events_then_result(self, client, mock_core_orchestrator):
+        """Streamed prompts relay vLLM's SSE events, then the result without the text"""
+        def prompt(service_id, prompt, **kwargs):
+            kwargs["relay"](b'data: {"choices": [{"text": "Hel"}]}\n\n')
+            kwargs["relay"](b'data: {"choices": [{"text": "lo"}]}\n\n')
+            return {"success": True, "response": "Hello", "usage": {"completion_tokens": 2}}
+
+        mock_core_orchestrator.vllm_service.prompt.side_effect = prompt
+
+        response = client.post("/api/services/vllm/123/prompt", json={"prompt": "hi", "stream": True})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line[6:] for line in response.text.split("\n\n") if line]
+        assert events[:2] == ['{"choices": [{"text": "Hel"}]}', '{"choices": [{"text": "lo"}]}']
+        assert json.loads(events[2]) == {"result": {"success": True, "usage": {"completion_tokens": 2}}}
+        assert events[3] == "[DONE]"
+        kwargs = mock_core_orchestrator.vllm_service.prompt.call_args.kwargs
+        assert kwargs["cache"] is False and "stream" not in kwargs
+
+    def test_stream_prompt_releases_slot_when_client_disconnects(self, mock_core_orchestrator):
+        """A client that goes away mid-stream does not keep its scheduler slot"""
+        scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+        mock_core_orchestrator.request_scheduler = scheduler
+
+        def prompt(service_id, prompt, **kwargs):
+            kwargs["relay"](b'data: {"choices": [{"text": "Hel"}]}\n\n')
+            return {"success": True, "response": "Hel"}
+
+        mock_core_orchestrator.vllm_service.prompt.side_effect = prompt
+        app = create_app(mock_core_orchestrator)
+        body = json.dumps({"prompt": "hi", "stream": True}).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/api/services/vllm/123/prompt", "raw_path": b"/api/services/vllm/123/prompt",
+            "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+        }
+
+        async def run():
+            messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop(0)
+                await asyncio.sleep(3600)
+
+            async def send(message):
+                raise OSError("client disconnected")
+
+            with pytest.raises(OSError):
+                await app(scope, receive, send)
+            for _ in range(100):
+                if scheduler.get_stats()["inflight"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            return scheduler.get_stats()["inflight"]
+
+        assert asyncio.run(run()) == 0
+
+    def test_stream_prompt_without_generation_returns_json(self, client, mock_core_orchestrator):
+        mock_core_orchestrator.vllm_service.prompt.return_value = {"success": False, "error": "Service not available"}
+
+        response = client.post("/api/services/vllm/123/prompt", json={"prompt": "hi", "stream": True})
+
+        assert response.json() == {"success": False, "error": "Service not available"}
+
+    def test_rag_prompt(self, client, mock_core_orchestrator):
+        """RAG requests pass the Qdrant service and generation options to rag_prompt"""
+        mock_core_orchestrator.vllm_service.rag_prompt.return_value = {
+            "success": True, "response": "In Settings.", "rag_timing": {"total_ms": 120.0}
+        }
+
+        response = client.post("/api/services/vllm/123/rag", json={
+            "prompt": "How do I reset my password?", "qdrant_service_id": "456",
+            "collection": "docs", "top_k": 5, "max_tokens": 64, "measure_ttft": True,
+        })
+
+        assert response.status_code == 200
+        assert response.json()["rag_timing"] == {"total_ms": 120.0}
+        mock_core_orchestrator.vllm_service.rag_prompt.assert_called_once_with(
+            "123", "How do I reset my password?", mock_core_orchestrator.qdrant_service, "456", "docs",
+            top_k=5, max_tokens=64, measure_ttft=True
+        )
+
+    def test_rag_prompt_requires_collection(self, client):
+        response = client.post("/api/services/vllm/123/rag", json={"prompt": "hi", "qdrant_service_id": "456"})
+
+        assert response.status_code == 400
+
     def test_get_available_recipes(self, client, mock_core_orchestrator):
         """Test internal get recipes endpoint"""
         mock_core_orchestrator.list_recipes.return_value = [
@@ -252,20 +346,20 @@ class TestOrchestratorInternalAPI:
         mock_core_orchestrator.qdrant_service.find_services.assert_called_once()
 
     def test_vector_db_collections(self, client, mock_core_orchestrator):
-        """Collections route should delegate to qdrant_service.get_collections"""
-        mock_core_orchestrator.qdrant_service.get_collections.return_value = {
+        """Collections route should delegate to the async qdrant_service.get_collections"""
+        mock_core_orchestrator.qdrant_service.get_collections_async = AsyncMock(return_value={
             "collections": ["docs"]
-        }
+        })
 
         response = client.get("/api/services/vector-db/qdrant-1/collections")
 
         assert response.status_code == 200
         assert response.json()["collections"] == ["docs"]
-        mock_core_orchestrator.qdrant_service.get_collections.assert_called_once_with("qdrant-1", 5)
+        mock_core_orchestrator.qdrant_service.get_collections_async.assert_awaited_once_with("qdrant-1", 5)
 
     def test_vector_db_create_collection(self, client, mock_core_orchestrator):
         """Collection creation should send vector size to qdrant service"""
-        mock_core_orchestrator.qdrant_service.create_collection.return_value = {"success": True}
+        mock_core_orchestrator.qdrant_service.create_collection_async = AsyncMock(return_value={"success": True})
 
         response = client.put(
             "/api/services/vector-db/qdrant-1/collections/new",
@@ -273,10 +367,76 @@ class TestOrchestratorInternalAPI:
         )
 
         assert response.status_code == 200
-        mock_core_orchestrator.qdrant_service.create_collection.assert_called_once_with(
+        mock_core_orchestrator.qdrant_service.create_collection_async.assert_awaited_once_with(
             "qdrant-1", "new", 384, "Cosine", 10
         )
 
+    def test_vector_db_snapshots(self, client, mock_core_orchestrator):
+        """Snapshots are created with a long timeout; recovery needs a snapshot file name"""
+        qdrant = mock_core_orchestrator.qdrant_service
+        qdrant.create_snapshot_async = AsyncMock(return_value={"success": True})
+        qdrant.recover_snapshot_async = AsyncMock(side_effect=ValueError("snapshot must be the file name"))
+
+        created = client.post("/api/services/vector-db/qdrant-1/collections/docs/snapshots")
+        recovered = client.put("/api/services/vector-db/qdrant-1/collections/docs/snapshots/recover", json={})
+
+        assert created.status_code == 200
+        qdrant.create_snapshot_async.assert_awaited_once_with("qdrant-1", "docs", 600)
+        assert recovered.status_code == 400
+        qdrant.recover_snapshot_async.assert_awaited_once_with("qdrant-1", "docs", None, timeout=600)
+
+    def test_vector_db_binary_search_validates_query_params(self, client, mock_core_orchestrator):
+        """A binary query vector takes limit, timeout and ef from validated query parameters"""
+        mock_core_orchestrator.qdrant_service.search_points_async = AsyncMock(return_value={"success": True})
+        url = "/api/services/vector-db/qdrant-1/collections/docs/search"
+        headers = {"Content-Type": FLOAT32_CONTENT_TYPE}
+
+        response = client.post(url + "?limit=3&ef=64", content=encode_vectors([[0.5, 0.25]]), headers=headers)
+        invalid = client.post(url + "?limit=abc", content=encode_vectors([[0.5, 0.25]]), headers=headers)
+        zero_timeout = client.post(url + "?timeout=0", content=encode_vectors([[0.5, 0.25]]), headers=headers)
+
+        assert response.status_code == 200
+        assert (invalid.status_code, zero_timeout.status_code) == (422, 422)
+        mock_core_orchestrator.qdrant_service.search_points_async.assert_awaited_once_with(
+            "qdrant-1", "docs", [0.5, 0.25], 3, 10, params={"hnsw_ef": 64}
+        )
+
+    def test_vector_db_batch_search(self, client, mock_core_orchestrator):
+        """Batch search accepts shared query vectors (JSON) or one binary row per query"""
+        mock_core_orchestrator.qdrant_service.search_batch_async = AsyncMock(return_value={"success": True})
+
+        json_response = client.post(
+            "/api/services/vector-db/qdrant-1/collections/docs/search/batch",
+            json={"query_vectors": [[0.1, 0.2], [0.3, 0.4]], "limit": 3, "filter": {"must": []}}
+        )
+        binary_response = client.post(
+            "/api/services/vector-db/qdrant-1/collections/docs/search/batch?limit=2",
+            content=encode_vectors([[0.5, 0.25]]), headers={"Content-Type": FLOAT32_CONTENT_TYPE}
+        )
+        per_query_response = client.post(
+            "/api/services/vector-db/qdrant-1/collections/docs/search/batch",
+            json={"searches": [{"vector": [0.1], "ef": 32}, {"vector": [0.2], "exact": True}, {"vector": [0.3]}],
+                  "ef": 128}
+        )
+        empty_response = client.post("/api/services/vector-db/qdrant-1/collections/docs/search/batch", json={})
+        bad_limit_response = client.post(
+            "/api/services/vector-db/qdrant-1/collections/docs/search/batch?limit=0",
+            content=encode_vectors([[0.5, 0.25]]), headers={"Content-Type": FLOAT32_CONTENT_TYPE}
+        )
+
+        assert json_response.status_code == 200 and binary_response.status_code == 200
+        assert per_query_response.status_code == 200
+        assert empty_response.status_code == 400
+        assert bad_limit_response.status_code == 422
+        first, second, third = mock_core_orchestrator.qdrant_service.search_batch_async.await_args_list
+        assert first.args == ("qdrant-1", "docs", [{"vector": [0.1, 0.2]}, {"vector": [0.3, 0.4]}])
+        assert first.kwargs == {"limit": 3, "timeout": 30, "query_filter": {"must": []}, "params": None}
+        assert second.args[2] == [{"vector": [0.5, 0.25]}]
+        assert second.kwargs == {"limit": 2, "timeout": 30, "query_filter": None, "params": None}
+        # Per-query ef/exact become that query's params; the others keep the shared ones
+        assert [search.get("params") for search in third.args[2]] == [{"hnsw_ef": 32}, {"exact": True}, None]
+        assert third.kwargs["params"] == {"hnsw_ef": 128}
+
     def test_management_configure_load_balancer(self, client, mock_core_orchestrator):
         """Management configure route should invoke orchestrator.configure_load_balancer"""
         mock_core_orchestrator.configure_load_balancer.return_value = {
@@ -313,6 +473,43 @@ class TestOrchestratorInternalAPI:
         assert response.text.startswith("# TYPE")
         assert response.headers["content-type"].startswith("text/plain")
 
+    def test_service_request_stats(self, client, mock_core_orchestrator):
+        """Stats endpoint should pass the optional window through to the core"""
+        mock_core_orchestrator.get_service_request_stats.return_value = {"service_id": "sg-1", "count": 3}
+
+        response = client.get("/api/services/sg-1/stats?window_seconds=60")
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 3
+        mock_core_orchestrator.get_service_request_stats.assert_called_once_with("sg-1", window_seconds=60.0)
+
+    def test_self_metrics_prometheus_and_server_timing(self, client, mock_core_orchestrator):
+        """Handlers are timed per route and reported via Server-Timing and the self-metrics endpoint"""
+        mock_core_orchestrator.get_service_request_stats.return_value = {"service_id": "sg-1", "count": 0}
+
+        stats = client.get("/api/services/sg-1/stats")
+        response = client.get("/api/metrics/prometheus")
+
+        assert stats.headers["server-timing"].startswith("orchestrator;dur=")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert '# TYPE orchestrator_stage_duration_seconds histogram' in response.text
+        assert 'orchestrator_http_request_duration_seconds_count{method="GET",route="/api/services/{service_id}/stats"}' in response.text
+
+    def test_profiling_is_guarded(self, client, monkeypatch):
+        """Profiling endpoints are off by default and require the token when enabled"""
+        monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+        assert client.get("/api/admin/profile/cpu", params={"seconds": 0.1}).status_code == 404
+
+        monkeypatch.setenv("PROFILING_ENABLED", "true")
+        monkeypatch.setenv("PROFILING_TOKEN", "secret")
+        assert client.get("/api/admin/profile/cpu", params={"seconds": 0.1}).status_code == 403
+
+        response = client.get("/api/admin/profile/cpu", params={"seconds": 0.1},
+                              headers={"X-Profiling-Token": "secret"})
+        assert response.status_code == 200
+        assert 'filename="orchestrator-cpu-' in response.headers["content-disposition"]
+
     def test_client_completions_runtime_error(self, client, mock_core_orchestrator):
         """Client completion route should map orchestrator runtime errors to HTTP"""
         mock_core_orchestrator.forward_completion.side_effect = RuntimeError("No healthy vLLM services available")
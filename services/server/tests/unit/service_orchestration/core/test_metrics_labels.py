@@ -0,0 +1,321 @@
+"""LabelInjector / MetricsFilter unit tests.
+
+Focus: Prometheus text-format edge cases (escaped quotes, "}" inside label
+values, exemplars, empty label sets), chunked streaming, recipe-driven
+filtering (allow/deny lists, bucket downsampling, series limit), the
+orchestrator's status-gauge wrapper and a microbenchmark on realistic vLLM
+payloads.
+"""
+
+import gc
+import random
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from service_orchestration.core.metrics_filter import MetricsFilter
+from service_orchestration.core.metrics_labels import LabelInjector
+from service_orchestration.core.service_orchestrator import ServiceOrchestrator
+from service_orchestration.recipes import RecipeLoader, RecipeMetricsConfig
+
+RECIPES_DIR = Path(__file__).resolve().parents[4] / "src" / "recipes"
+
+SUFFIX = 'service_id="sg-1",replica_id="node1:8001"'
+
+
+@pytest.fixture
+def injector():
+    return LabelInjector({"service_id": "sg-1", "replica_id": "node1:8001"})
+
+
+# Bucket bounds used by vLLM's own histograms
+TTFT_BUCKETS = [0.001, 0.005, 0.01, 0.02, 0.04, 0.06, 0.08, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+                20.0, 40.0, 80.0, 160.0, 640.0, 2560.0]
+LATENCY_BUCKETS = [0.3, 0.5, 0.8, 1.0, 1.5, 2.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 40.0, 50.0, 60.0, 120.0,
+                   240.0, 480.0, 960.0, 1920.0, 7680.0]
+TPOT_BUCKETS = [0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+                20.0, 40.0, 80.0]
+TOKEN_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000]
+
+
+def vllm_metrics_payload(engines: int = 2, models: int = 1) -> str:
+    """Synthetic /metrics body shaped like vLLM's (mostly labelled histogram buckets)."""
+    rng = random.Random(0)
+    histograms = {
+        "vllm:time_to_first_token_seconds": TTFT_BUCKETS,
+        "vllm:e2e_request_latency_seconds": LATENCY_BUCKETS,
+        "vllm:request_queue_time_seconds": LATENCY_BUCKETS,
+        "vllm:request_inference_time_seconds": LATENCY_BUCKETS,
+        "vllm:request_prefill_time_seconds": LATENCY_BUCKETS,
+        "vllm:request_decode_time_seconds": LATENCY_BUCKETS,
+        "vllm:time_per_output_token_seconds": TPOT_BUCKETS,
+        "vllm:request_prompt_tokens": TOKEN_BUCKETS,
+        "vllm:request_generation_tokens": TOKEN_BUCKETS,
+        "vllm:request_params_n": [1, 2, 5, 10, 20],
+        "vllm:request_params_max_tokens": TOKEN_BUCKETS,
+        "vllm:iteration_tokens_total": TOKEN_BUCKETS,
+    }
+    lines = []
+    for metric, buckets in histograms.items():
+        lines.append(f"# HELP {metric} Histogram of {metric.split(':')[1]}.")
+        lines.append(f"# TYPE {metric} histogram")
+        for engine in range(engines):
+            for model in range(models):
+                labels = f'engine="{engine}",model_name="meta-llama/Llama-3.1-8B-Instruct-{model}"'
+                total = 0
+                for bound in buckets:
+                    total += rng.randint(0, 500)
+                    lines.append(f'{metric}_bucket{{{labels},le="{float(bound)}"}} {float(total)}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {float(total)}')
+                lines.append(f"{metric}_count{{{labels}}} {float(total)}")
+                lines.append(f"{metric}_sum{{{labels}}} {rng.random() * 1000}")
+    for counter in ("vllm:prompt_tokens_total", "vllm:generation_tokens_total"):
+        lines.append(f"# HELP {counter} Number of tokens processed.")
+        lines.append(f"# TYPE {counter} counter")
+        for engine in range(engines):
+            lines.append(f'{counter}{{engine="{engine}",model_name="meta-llama/Llama-3.1-8B-Instruct-0"}} 1234.0')
+    lines.append("# TYPE vllm:num_requests_running gauge")
+    for engine in range(engines):
+        lines.append(f'vllm:num_requests_running{{engine="{engine}",model_name="meta-llama/Llama-3.1-8B-Instruct-0"}} 3.0')
+    lines.append("# HELP python_gc_objects_collected_total Objects collected during gc")
+    lines.append("# TYPE python_gc_objects_collected_total counter")
+    for generation in range(3):
+        lines.append(f'python_gc_objects_collected_total{{generation="{generation}"}} {rng.randint(0, 10000)}.0')
+    lines.append("process_resident_memory_bytes 4.2e+09")
+    lines.append("process_start_time_seconds 1.7e+09")
+    return "\n".join(lines) + "\n"
+
+
+def split_and_rebuild(metrics_text: str, labels_str: str = SUFFIX) -> str:
+    """The previous str-based relabelling, kept as the benchmark baseline."""
+    enriched_lines = []
+    for line in metrics_text.split("\n"):
+        if not line.strip() or line.startswith("#"):
+            enriched_lines.append(line)
+            continue
+        if "{" in line:
+            metric_name, rest = line.split("{", 1)
+            existing_labels, value_part = rest.split("}", 1)
+            enriched_lines.append(f"{metric_name}{{{existing_labels},{labels_str}}}{value_part}")
+        else:
+            parts = line.split(" ", 1)
+            enriched_lines.append(f"{parts[0]}{{{labels_str}}} {parts[1]}" if len(parts) == 2 else line)
+    return "\n".join(enriched_lines)
+
+
+class TestLabelInjector:
+
+    def test_labelled_and_unlabelled_samples(self, injector):
+        payload = b'# HELP up Up.\n# TYPE up gauge\nup 1\nreqs{method="GET"} 3 1700000000\n\n'
+
+        assert injector.inject(payload) == (
+            b'# HELP up Up.\n# TYPE up gauge\n'
+            b'up{' + SUFFIX.encode() + b'} 1\n'
+            b'reqs{method="GET",' + SUFFIX.encode() + b'} 3 1700000000\n\n'
+        )
+
+    def test_empty_label_set(self, injector):
+        assert injector.inject(b"metric{} 1") == b"metric{" + SUFFIX.encode() + b"} 1"
+
+    def test_escaped_quotes_and_braces_in_values(self, injector):
+        line = rb'http_requests{path="/v1/{id}",msg="say \"hi}\" \\"} 7'
+
+        assert injector.inject(line) == (
+            rb'http_requests{path="/v1/{id}",msg="say \"hi}\" \\",' + SUFFIX.encode() + b"} 7"
+        )
+
+    def test_exemplars_are_left_intact(self, injector):
+        payload = (
+            b'latency_bucket{le="0.5"} 10 # {trace_id="abc}"} 0.42 1700000000\n'
+            b'latency_count 10 # {trace_id="abc"} 0.42\n'
+        )
+
+        assert injector.inject(payload) == (
+            b'latency_bucket{le="0.5",' + SUFFIX.encode() + b'} 10 # {trace_id="abc}"} 0.42 1700000000\n'
+            b'latency_count{' + SUFFIX.encode() + b'} 10 # {trace_id="abc"} 0.42\n'
+        )
+
+    @pytest.mark.parametrize("line, expected", [
+        (b'latency_count 10 # {trace_id="abc"} 0.42', b'latency_count{%s} 10 # {trace_id="abc"} 0.42'),
+        (b'reqs{path="/a#b"} 1', b'reqs{path="/a#b",%s} 1'),
+        (b'odd}name{x="1"} 2', b'odd}name{x="1",%s} 2'),
+        (b'empty{} 3', b'empty{%s} 3'),
+    ])
+    def test_unusual_lines_leave_the_fast_path(self, injector, line, expected):
+        # Alongside ordinary samples, which alone would take the bytes.replace fast path
+        payload = b'# HELP up Up.\nup{job="a"} 1\n' + line + b"\n"
+
+        assert injector.inject(payload) == (
+            b'# HELP up Up.\nup{job="a",' + SUFFIX.encode() + b'} 1\n' + expected % SUFFIX.encode() + b"\n"
+        )
+
+    def test_malformed_lines_are_kept(self, injector):
+        assert injector.inject(b'broken{le="1" 3\nnovalue\n') == b'broken{le="1" 3\nnovalue\n'
+
+    def test_label_values_are_escaped_and_none_skipped(self):
+        injector = LabelInjector({"service_id": 'a"b\\c', "replica_id": None})
+
+        assert injector.suffix == b'service_id="a\\"b\\\\c"'
+
+    def test_stream_handles_lines_split_across_chunks(self, injector):
+        payload = vllm_metrics_payload(engines=1).encode()
+        expected = injector.inject(payload)
+
+        for size in (1, 7, 64, 1024):
+            chunks = [payload[i:i + size] for i in range(0, len(payload), size)]
+            out = list(injector.stream(chunks))
+            assert b"".join(out) == expected
+            # Every chunk but the last ends on a line boundary
+            assert all(chunk.endswith(b"\n") for chunk in out[:-1])
+
+    def test_matches_previous_output_on_vllm_payload(self, injector):
+        payload = vllm_metrics_payload()
+
+        assert injector.inject(payload).decode() == split_and_rebuild(payload)
+
+
+class TestMetricsFilter:
+
+    def test_exclude_drops_whole_family_with_comments(self):
+        metrics_filter = MetricsFilter(exclude=["python_gc_*", "vllm:request_params_*"])
+        out = metrics_filter.filter_lines(vllm_metrics_payload(engines=1).encode().split(b"\n"))
+
+        assert not any(b"python_gc_" in line or b"vllm:request_params_" in line for line in out)
+        assert b"# TYPE vllm:time_to_first_token_seconds histogram" in out
+        assert metrics_filter.dropped_by_name > 0
+
+    def test_include_keeps_matching_families_only(self):
+        metrics_filter = MetricsFilter(include=["vllm:time_to_first_token_seconds", "process_*"])
+        lines = vllm_metrics_payload(engines=1).encode().split(b"\n")
+
+        kept = [line for line in metrics_filter.filter_lines(lines) if line and not line.startswith(b"#")]
+
+        assert {line.split(b"{")[0].split(b" ")[0] for line in kept} == {
+            b"vllm:time_to_first_token_seconds_bucket", b"vllm:time_to_first_token_seconds_count",
+            b"vllm:time_to_first_token_seconds_sum", b"process_resident_memory_bytes",
+            b"process_start_time_seconds",
+        }
+
+    def test_bucket_downsampling_keeps_listed_bounds_and_inf(self):
+        metrics_filter = MetricsFilter(histogram_buckets={"vllm:*_seconds": [0.1, 1, 10]})
+        lines = [
+            b'vllm:e2e_request_latency_seconds_bucket{le="0.5"} 1.0',
+            b'vllm:e2e_request_latency_seconds_bucket{le="1.0"} 2.0',
+            b'vllm:e2e_request_latency_seconds_bucket{le="10.0"} 3.0',
+            b'vllm:e2e_request_latency_seconds_bucket{le="+Inf"} 4.0',
+            b"vllm:e2e_request_latency_seconds_count 4.0",
+            b'vllm:request_prompt_tokens_bucket{le="5.0"} 1.0',
+        ]
+
+        assert metrics_filter.filter_lines(lines) == [lines[1], lines[2], lines[3], lines[4], lines[5]]
+        assert metrics_filter.dropped_buckets == 1
+
+    def test_bucket_list_applies_to_every_histogram(self):
+        metrics_filter = MetricsFilter(histogram_buckets=[5])
+        lines = [b'a_bucket{le="5"} 1', b'a_bucket{le="6"} 1', b'b_bucket{x="1",le="5.0"} 1']
+
+        assert metrics_filter.filter_lines(lines) == [lines[0], lines[2]]
+
+    def test_series_limit_drops_excess_and_emits_warning_metric(self):
+        metrics_filter = MetricsFilter(max_series=2)
+        injector = LabelInjector({"service_id": "svc-1"}, metrics_filter=metrics_filter)
+
+        lines = injector.inject(b"# TYPE a gauge\na 1\nb 2\nc 3\nd 4").decode().splitlines()
+
+        assert lines[:3] == ["# TYPE a gauge", 'a{service_id="svc-1"} 1', 'b{service_id="svc-1"} 2']
+        assert lines[-1] == 'service_metrics_series_limit_exceeded{limit="2",service_id="svc-1"} 2'
+        assert len(lines) == 6
+        assert metrics_filter.get_stats() == {
+            "series": 2, "dropped_by_name": 0, "dropped_buckets": 0, "dropped_over_limit": 2,
+        }
+
+    def test_from_config_without_rules_is_none(self):
+        assert MetricsFilter.from_config(None) is None
+        assert MetricsFilter.from_config(RecipeMetricsConfig()) is None
+
+    def test_vllm_recipe_config_shrinks_payload(self):
+        config = RecipeLoader(RECIPES_DIR).load("inference/vllm-replicas").metrics
+        payload = vllm_metrics_payload(engines=2).encode()
+        injector = LabelInjector({"service_id": "sg-1"}, metrics_filter=MetricsFilter.from_config(config))
+
+        filtered = injector.inject(payload)
+
+        assert len(filtered) < 0.5 * len(LabelInjector({"service_id": "sg-1"}).inject(payload))
+        # Dashboard series survive: quantiles need +Inf, _count and _sum; counters are untouched
+        assert b'vllm:time_to_first_token_seconds_bucket{engine="0"' in filtered
+        assert filtered.count(b'vllm:e2e_request_latency_seconds_bucket{') == 2 * 8
+        assert filtered.count(b'le="+Inf"') == 2 * 9
+        assert b"vllm:e2e_request_latency_seconds_sum{" in filtered
+        assert b"vllm:prompt_tokens_total{" in filtered
+        assert b"python_gc_" not in filtered
+
+
+class TestEnrichMetricsWithLabels:
+
+    def test_prepends_status_gauge_and_accepts_chunks(self):
+        orchestrator = ServiceOrchestrator.__new__(ServiceOrchestrator)
+        response = Mock()
+        response.iter_content.return_value = iter([b'vllm:num_requests_running{engine="0"} 2', b".0\nup 1\n"])
+
+        text = orchestrator._enrich_metrics_with_labels(
+            response.iter_content(65536), service_id="sg-1", status="running", replica_id="node1:8001"
+        )
+
+        lines = text.split("\n")
+        assert lines[2] == f"service_status_info{{{SUFFIX}}} 2"
+        assert lines[3] == f'vllm:num_requests_running{{engine="0",{SUFFIX}}} 2.0'
+        assert lines[4] == f"up{{{SUFFIX}}} 1"
+
+    def test_accepts_text(self):
+        orchestrator = ServiceOrchestrator.__new__(ServiceOrchestrator)
+
+        text = orchestrator._enrich_metrics_with_labels("up 1", service_id="svc-1", status="pending")
+
+        assert text.endswith('\nup{service_id="svc-1"} 1')
+
+    def test_applies_recipe_metrics_config(self):
+        orchestrator = ServiceOrchestrator.__new__(ServiceOrchestrator)
+        orchestrator.recipe_loader = RecipeLoader(RECIPES_DIR)
+
+        config = orchestrator._recipe_metrics_config("inference/vllm-single-node")
+        text = orchestrator._enrich_metrics_with_labels(
+            vllm_metrics_payload(engines=1), service_id="123", status="running", metrics_config=config
+        )
+
+        assert isinstance(config, RecipeMetricsConfig)
+        assert text.startswith("# HELP service_status_info")
+        assert "python_gc_" not in text
+        assert orchestrator._recipe_metrics_config("") is None
+        assert orchestrator._recipe_metrics_config("inference/does-not-exist") is None
+
+
+@pytest.mark.benchmark
+def test_microbenchmark_vllm_payload(injector):
+    """Relabelling a multi-replica-sized vLLM payload is no slower than the old str path."""
+    text = vllm_metrics_payload(engines=8, models=2)
+    payload = text.encode()
+    chunks = [payload[i:i + 65536] for i in range(0, len(payload), 65536)]
+
+    def timed(fn):
+        # Like timeit, keep the collector from landing in one path's timing
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            return time.perf_counter() - start
+        finally:
+            gc.enable()
+
+    # Interleave the two paths so load spikes on shared CI runners hit both alike;
+    # the baseline includes the decode the old path needed (response.text)
+    baseline, streaming = [], []
+    for _ in range(30):
+        baseline.append(timed(lambda: split_and_rebuild(payload.decode())))
+        streaming.append(timed(lambda: b"".join(injector.stream(chunks))))
+
+    assert len(payload) > 250_000
+    assert b"".join(injector.stream(chunks)).decode() == split_and_rebuild(text)
+    assert min(streaming) <= min(baseline)
+    assert len(payload) / min(streaming) > 10_000_000  # > 10 MB/s
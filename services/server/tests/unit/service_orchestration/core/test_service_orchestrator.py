@@ -320,11 +320,7 @@ class TestServiceOrchestratorCore:
     def test_get_service_group_status_counts(self, orchestrator, mock_service_manager):
         """Group status summary should aggregate replica states"""
         mock_service_manager.get_group_info.return_value = {"id": "sg-1"}
-        mock_service_manager.get_all_replicas_flat.return_value = [
-            {"id": "r1", "status": "running"},
-            {"id": "r2", "status": "starting"},
-            {"id": "r3", "status": "failed"}
-        ]
+        mock_service_manager.get_group_status_counts.return_value = {"running": 1, "starting": 1, "failed": 1}
         orchestrator.service_manager = mock_service_manager
 
         result = orchestrator.get_service_group_status("sg-1")
@@ -426,6 +422,41 @@ class TestServiceOrchestratorCore:
         assert "123" in metrics["services"]
         assert metrics["services"]["123"]["status"] == "healthy"
 
+    def test_reconcile_with_slurm_uses_single_bulk_query(self, orchestrator, mock_slurm_client, mock_service_manager):
+        """Restored services are reconciled with one /jobs query"""
+        mock_service_manager.list_services.return_value = [
+            {"id": "111", "status": "running"},
+            {"id": "222", "status": "pending"},
+            {"id": "333", "status": "running"},
+            {"id": "444", "status": "completed"},
+        ]
+        mock_service_manager.list_groups.return_value = [
+            {"id": "sg-555", "status": "running", "node_jobs": [{"job_id": "555"}]},
+        ]
+        mock_service_manager.get_all_replica_ids.return_value = ["555:8001"]
+        mock_slurm_client.get_jobs_status.return_value = {
+            "111": "running", "222": "running", "333": "unknown", "555": "timeout",
+        }
+
+        updated = orchestrator._reconcile_with_slurm()
+
+        mock_slurm_client.get_jobs_status.assert_called_once_with(["111", "222", "333", "555"])
+        mock_slurm_client.get_job_status.assert_not_called()
+        assert updated == {"services": 2, "groups": 1}
+        mock_service_manager.update_service_status.assert_any_call("222", "starting")
+        mock_service_manager.update_service_status.assert_any_call("333", "completed")
+        mock_service_manager.invalidate_service_health.assert_any_call("333")
+        mock_service_manager.update_replica_status.assert_called_once_with("555:8001", "timeout")
+        mock_service_manager.update_group_status.assert_called_once_with("sg-555", "timeout")
+
+    def test_reconcile_with_slurm_skipped_when_query_fails(self, orchestrator, mock_slurm_client, mock_service_manager):
+        mock_service_manager.list_services.return_value = [{"id": "111", "status": "running"}]
+        mock_service_manager.list_groups.return_value = []
+        mock_slurm_client.get_jobs_status.return_value = {}
+
+        assert orchestrator._reconcile_with_slurm() == {"services": 0, "groups": 0}
+        mock_service_manager.update_service_status.assert_not_called()
+
     def test_get_service_returns_group_info(self, orchestrator, mock_service_manager):
         """Test get_service returns group info when service_id is a group"""
         mock_service_manager.is_group.return_value = True
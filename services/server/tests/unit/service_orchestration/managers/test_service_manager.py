@@ -5,10 +5,13 @@ These tests verify ServiceManager functionality including replica group
 management and the get_replica_info method.
 """
 
+import time
+
 import pytest
 from unittest.mock import Mock
 
 from service_orchestration.managers.service_manager import ServiceManager
+from service_orchestration.managers.state_store import StateStore
 
 
 class TestServiceManagerReplicaHandling:
@@ -250,6 +253,48 @@ class TestServiceManagerReplicaHandling:
         result = service_manager.get_group_for_replica("99999:8001")
         assert result is None
 
+    def test_group_status_counters_follow_replica_updates(self, service_manager):
+        """Group status is derived from incrementally maintained replica counters."""
+        group_id = service_manager.create_replica_group(
+            recipe_name="inference/vllm-single-node",
+            num_nodes=1,
+            replicas_per_node=3,
+            total_replicas=3
+        )
+        for i in range(3):
+            service_manager.add_replica(group_id, "12345", 0, i, 8001 + i, i)
+
+        assert service_manager.get_group_status_counts(group_id) == {"pending": 3}
+
+        service_manager.update_replica_status("12345:8001", "running")
+        service_manager.update_replica_status("12345:8002", "starting")
+        assert service_manager.get_group_status_counts(group_id) == {"running": 1, "starting": 1, "pending": 1}
+        assert service_manager.get_group_info(group_id)["status"] == "starting"
+
+        service_manager.update_replica_status("12345:8002", "ready")
+        service_manager.update_replica_status("12345:8003", "running")
+        assert service_manager.get_group_info(group_id)["status"] == "running"
+        assert service_manager.get_replica_info("12345:8002")["status"] == "ready"
+
+        for port in (8001, 8002, 8003):
+            service_manager.update_replica_status(f"12345:{port}", "cancelled")
+        assert service_manager.get_group_info(group_id)["status"] == "completed"
+
+    def test_delete_group_clears_replica_index(self, service_manager):
+        """Deleted groups leave no replica index entries or counters behind."""
+        group_id = service_manager.create_replica_group(
+            recipe_name="inference/vllm-single-node",
+            num_nodes=1,
+            replicas_per_node=1,
+            total_replicas=1
+        )
+        service_manager.add_replica(group_id, "12345", 0, 0, 8001, 0)
+
+        service_manager.delete_group(group_id)
+
+        assert service_manager.get_replica_info("12345:8001") is None
+        assert service_manager.get_group_status_counts(group_id) == {}
+
 
 class TestServiceManagerServiceHandling:
     """Test ServiceManager individual service (non-replica) functionality."""
@@ -315,3 +360,208 @@ class TestServiceManagerServiceHandling:
         replica_info = service_manager.get_replica_info("12345:8001")
         assert replica_info is not None
         assert replica_info["id"] == "12345:8001"
+
+
+class TestServiceManagerSnapshots:
+    """Test the copy-on-write snapshots used by lock-free readers."""
+
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self):
+        """Reset ServiceManager singleton before each test."""
+        ServiceManager._instance = None
+        yield
+        ServiceManager._instance = None
+
+    @pytest.fixture
+    def service_manager(self):
+        return ServiceManager()
+
+    def test_writes_publish_new_versions(self, service_manager):
+        version = service_manager.get_snapshot().version
+        service_manager.register_service({"id": "111", "recipe_name": "vector-db/qdrant", "status": "pending"})
+        service_manager.update_service_status("111", "running")
+
+        assert service_manager.get_snapshot().version == version + 2
+        assert [s["id"] for s in service_manager.list_services(status_filter="running")] == ["111"]
+        assert service_manager.list_services(status_filter="pending") == []
+
+    def test_old_snapshot_is_unaffected_by_later_writes(self, service_manager):
+        group_id = service_manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="222")
+        service_manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+        before = service_manager.get_snapshot()
+
+        service_manager.update_replica_status("222:8001", "running")
+
+        assert before.groups[group_id]["node_jobs"][0]["replicas"][0]["status"] == "pending"
+        assert service_manager.get_replica_info("222:8001")["status"] == "running"
+        assert service_manager.get_healthy_replicas(group_id) == ["222:8001"]
+
+    def test_returned_records_do_not_leak_mutations(self, service_manager):
+        service_manager.register_service({"id": "111", "recipe_name": "vector-db/qdrant", "status": "running"})
+        group_id = service_manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="222")
+        service_manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+
+        service_manager.get_service("111")["endpoint"] = "http://node:6333"
+        service_manager.get_all_replicas_flat(group_id)[0]["recipe_name"] = "x"
+
+        assert "endpoint" not in service_manager.get_service("111")
+        assert "recipe_name" not in service_manager.get_all_replicas_flat(group_id)[0]
+
+    def test_unchanged_status_is_not_republished(self, service_manager):
+        group_id = service_manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="222")
+        service_manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+        service_manager.register_service({"id": "222:8001", "recipe_name": "inference/vllm-single-node",
+                                          "status": "running"})
+        service_manager.update_replica_status("222:8001", "running")
+        class Recorder:
+            calls = []
+
+            def on_status(self, service_id, status):
+                self.calls.append((service_id, status))
+
+        listener = Recorder()
+        service_manager.add_status_listener(listener.on_status)
+        version = service_manager.get_snapshot().version
+
+        service_manager.update_replica_status("222:8001", "running")
+        service_manager.update_service_status("222:8001", "running")
+
+        assert service_manager.get_snapshot().version == version
+        assert listener.calls == []
+        assert service_manager.get_group_status_counts(group_id) == {"running": 1}
+
+    def test_group_views_are_read_only(self, service_manager):
+        group_id = service_manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="222")
+        service_manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+        group = service_manager.get_group_info(group_id)
+
+        with pytest.raises(TypeError):
+            group["status"] = "running"
+        with pytest.raises(TypeError):
+            group["node_jobs"][0]["replicas"][0]["status"] = "running"
+        with pytest.raises(TypeError):
+            service_manager.list_groups()[0]["config"]["model"] = "x"
+        assert service_manager.get_replica_info("222:8001")["status"] == "pending"
+
+    def test_unchanged_replicas_are_shared_between_snapshots(self, service_manager):
+        group_id = service_manager.create_replica_group("inference/vllm-single-node", 1, 2, 2, job_id="222")
+        service_manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+        service_manager.add_replica(group_id, "222", 0, 1, 8002, 1)
+        before = service_manager.get_snapshot()
+
+        service_manager.update_replica_status("222:8001", "running")
+        after = service_manager.get_snapshot()
+
+        assert after.replicas["222:8002"][0] is before.replicas["222:8002"][0]
+        assert after.replicas["222:8001"][0]["status"] == "running"
+        assert before.replicas["222:8001"][0]["status"] == "pending"
+
+
+def _manager_with_other_groups(groups: int, replicas_per_group: int = 32) -> ServiceManager:
+    """Fresh ServiceManager with a one-replica group "sg-1" plus ``groups`` unrelated replica groups."""
+    ServiceManager._instance = None
+    manager = ServiceManager()
+    manager.add_replica(manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="1"),
+                        "1", 0, 0, 8000, 0)
+    for g in range(groups):
+        job_id = str(1000 + g)
+        group_id = manager.create_replica_group("inference/vllm-single-node", 1, replicas_per_group,
+                                                replicas_per_group, job_id=job_id)
+        for r in range(replicas_per_group):
+            manager.add_replica(group_id, job_id, 0, r, 8000 + r, r)
+    return manager
+
+
+@pytest.mark.benchmark
+def test_microbenchmark_replica_write_cost_does_not_grow_with_registry():
+    """A replica status write only replaces the records it touches, whatever the registry size."""
+    def per_op(groups, rounds=5, ops=200):
+        manager = _manager_with_other_groups(groups)
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for i in range(ops):
+                manager.update_replica_status("1:8000", "running" if i % 2 else "ready")
+            timings.append((time.perf_counter() - start) / ops)
+        ServiceManager._instance = None
+        return min(timings)
+
+    alone = per_op(groups=0)
+    crowded = per_op(groups=40)
+
+    # Rescanning every replica on each write made this ratio ~4; what remains
+    # is the shallow copy of the top-level mappings. Loose for noisy runners.
+    assert crowded < 2.5 * alone
+
+
+class TestServiceManagerPersistence:
+    """Test that ServiceManager state survives a restart through a StateStore."""
+
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self):
+        """Reset ServiceManager singleton before and after each test."""
+        ServiceManager._instance = None
+        yield
+        if ServiceManager._instance is not None:
+            ServiceManager._instance.detach_store()
+        ServiceManager._instance = None
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "state" / "orchestrator_state.db")
+
+    def _restart(self, db_path):
+        """Simulate an orchestrator restart: flush, drop the singleton, reload."""
+        ServiceManager._instance.detach_store()
+        ServiceManager._instance = None
+        manager = ServiceManager()
+        restored = manager.attach_store(StateStore(db_path, flush_interval=60))
+        return manager, restored
+
+    def test_services_groups_and_health_restored(self, db_path):
+        manager = ServiceManager()
+        manager.attach_store(StateStore(db_path, flush_interval=60))
+        manager.register_service({"id": "111", "recipe_name": "vector-db/qdrant", "status": "pending"})
+        manager.update_service_status("111", "running")
+        group_id = manager.create_replica_group("inference/vllm-single-node", 1, 2, 2, job_id="222")
+        manager.add_replica(group_id, "222", 0, 0, 8001, 0)
+        manager.add_replica(group_id, "222", 0, 1, 8002, 1)
+        manager.update_node_info(group_id, "222", "mel2001", node_index=0)
+        manager.update_replica_status("222:8001", "ready")
+        manager.mark_service_healthy("222:8001")
+
+        manager, restored = self._restart(db_path)
+
+        assert restored == {"service": 1, "group": 1, "health": 1}
+        assert manager.list_services(status_filter="running")[0]["id"] == "111"
+        assert manager.get_group_for_replica("222:8002") == group_id
+        replica = manager.get_replica_info("222:8001")
+        assert replica["status"] == "ready" and replica["node"] == "mel2001"
+        assert manager.is_service_recently_healthy("222:8001")
+
+    def test_removals_are_persisted(self, db_path):
+        manager = ServiceManager()
+        manager.attach_store(StateStore(db_path, flush_interval=60))
+        manager.register_service({"id": "111", "recipe_name": "vector-db/qdrant", "status": "running"})
+        group_id = manager.create_replica_group("inference/vllm-single-node", 1, 1, 1, job_id="222")
+        manager.mark_service_healthy("111")
+        manager.remove_service("111")
+        manager.delete_group(group_id)
+        manager.invalidate_service_health("111")
+
+        manager, restored = self._restart(db_path)
+
+        assert restored == {"service": 0, "group": 0, "health": 0}
+
+    def test_writes_are_batched(self, db_path):
+        manager = ServiceManager()
+        store = StateStore(db_path, flush_interval=60)
+        manager.attach_store(store)
+        manager.register_service({"id": "111", "recipe_name": "vector-db/qdrant", "status": "pending"})
+        for status in ("starting", "running", "completed"):
+            manager.update_service_status("111", status)
+
+        assert store.get_stats()["pending"] == 1
+        assert store.flush() == 1
+        assert store.load()["service"]["111"]["status"] == "completed"
+        assert store.get_stats()["flushes"] == 1
@@ -55,3 +55,56 @@ def test_resolve_prefers_registered_endpoint(mock_deployer, mock_service_manager
 
     assert resolver.resolve("12345:8002") == "http://registered-host:9000"
     mock_deployer.get_job_details.assert_not_called()
+
+
+def test_running_job_node_is_cached_until_job_leaves_running(mock_deployer, mock_service_manager, mock_recipe_loader):
+    mock_deployer.get_job_details.return_value = {"nodes": ["node-a"], "state": ["RUNNING"]}
+    resolver = EndpointResolver(mock_deployer, mock_service_manager, mock_recipe_loader)
+
+    assert resolver.resolve("12345") == "http://node-a:8001"
+    assert resolver.resolve("12345") == "http://node-a:8001"
+    assert mock_deployer.get_job_details.call_count == 1
+
+    resolver._on_status_change("12345", "running")
+    resolver.resolve("12345")
+    assert mock_deployer.get_job_details.call_count == 1
+
+    resolver._on_status_change("12345", "completed")
+    resolver.resolve("12345")
+    assert mock_deployer.get_job_details.call_count == 2
+
+
+def test_nodes_of_pending_jobs_are_not_cached(mock_deployer, mock_service_manager, mock_recipe_loader):
+    mock_deployer.get_job_details.return_value = {"nodes": ["node-a"], "state": "PENDING"}
+    resolver = EndpointResolver(mock_deployer, mock_service_manager, mock_recipe_loader)
+
+    resolver.resolve("12345")
+    resolver.resolve("12345")
+
+    assert mock_deployer.get_job_details.call_count == 2
+
+
+def test_recipe_port_is_loaded_on_first_resolve_not_in_listener(mock_deployer, mock_recipe_loader):
+    from service_orchestration.managers.service_manager import ServiceManager
+
+    ServiceManager._instance = None
+    try:
+        service_manager = ServiceManager()
+        resolver = EndpointResolver(mock_deployer, service_manager, mock_recipe_loader)
+        mock_deployer.get_job_details.return_value = {"nodes": ["node-a", "node-b"], "state": ["RUNNING"]}
+
+        service_manager.register_service({"id": "12345", "recipe_name": "inference/vllm-single-node", "status": "pending"})
+        assert mock_recipe_loader.get_recipe_port.call_count == 0
+
+        service_manager.update_service_status("12345", "running")
+        assert resolver.resolve("12345") == "http://node-a:8001"
+        assert resolver.resolve("12345") == "http://node-a:8001"
+        assert mock_recipe_loader.get_recipe_port.call_count == 1
+        assert mock_deployer.get_job_details.call_count == 1
+
+        # Cancelling the job drops the cached node
+        service_manager.update_service_status("12345", "cancelled")
+        resolver.resolve("12345")
+        assert mock_deployer.get_job_details.call_count == 2
+    finally:
+        ServiceManager._instance = None
@@ -0,0 +1,166 @@
+"""RequestScheduler unit tests.
+
+Focus: admission order when the orchestrator is saturated (strict priority
+across classes, weighted fair queuing across tenants) and queue delay stats.
+"""
+
+import asyncio
+
+import pytest
+
+from service_orchestration.networking.request_scheduler import (
+    RequestScheduler,
+    classify_request,
+    parse_tenant_weights,
+)
+
+
+async def _run_saturated(scheduler, requests):
+    """Block the single slot, enqueue `requests` (tenant, priority), then release.
+
+    Returns the order in which the queued requests were admitted.
+    """
+    order = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("blocker", "interactive"):
+            await gate.wait()
+
+    async def request(tenant, priority, tag):
+        async with scheduler.slot(tenant, priority):
+            order.append(tag)
+            await asyncio.sleep(0)
+
+    blocker_task = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(request(t, p, f"{t}:{i}")) for i, (t, p) in enumerate(requests)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker_task, *tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_passes_through_below_limit():
+    scheduler = RequestScheduler(max_concurrent=2, tenant_weights={})
+
+    async with scheduler.slot("a", "benchmark") as delay:
+        assert delay < 0.1
+        assert scheduler.get_stats()["inflight"] == 1
+
+    stats = scheduler.get_stats()
+    assert stats["inflight"] == 0
+    assert stats["classes"]["benchmark"]["dispatched"] == 1
+    assert stats["classes"]["benchmark"]["queued_total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_served_before_benchmark_backlog():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+
+    order = await _run_saturated(scheduler, [
+        ("loadtest", "benchmark"),
+        ("loadtest", "benchmark"),
+        ("grafana", "interactive"),
+        ("batch", "background"),
+    ])
+
+    assert order == ["grafana:2", "loadtest:0", "loadtest:1", "batch:3"]
+
+
+@pytest.mark.asyncio
+async def test_tenants_interleaved_within_class():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+
+    order = await _run_saturated(scheduler, [("a", "benchmark")] * 3 + [("b", "benchmark")] * 3)
+
+    assert [tag.split(":")[0] for tag in order] == ["a", "b", "a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_tenant_weights_skew_share():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={"heavy": 2.0})
+
+    order = await _run_saturated(scheduler, [("heavy", "benchmark")] * 4 + [("light", "benchmark")] * 2)
+
+    assert [tag.split(":")[0] for tag in order[:3]].count("heavy") == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("a", "benchmark"):
+            await gate.wait()
+
+    async def waiter():
+        async with scheduler.slot("b", "benchmark"):
+            pass
+
+    blocker_task = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    waiter_task = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    waiter_task.cancel()
+    gate.set()
+    await blocker_task
+    with pytest.raises(asyncio.CancelledError):
+        await waiter_task
+
+    assert scheduler.get_stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_delay_recorded_per_class():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+
+    await _run_saturated(scheduler, [("a", "background")])
+
+    background = scheduler.get_stats()["classes"]["background"]
+    assert background["dispatched"] == 1
+    assert background["queued_total"] == 1
+    assert background["queue_delay_ms_buckets"]["+Inf"] == 1
+
+
+def test_classify_request_precedence():
+    headers = {"x-client-group-id": "3713478", "x-request-priority": "Background"}
+    assert classify_request(headers, {"priority": "interactive"}) == ("3713478", "background")
+    assert classify_request({}, {"client_group_id": 42, "priority": "bogus"}) == ("42", "interactive")
+    assert classify_request({}, None) == ("default", "interactive")
+
+
+def test_parse_tenant_weights_ignores_invalid_entries():
+    assert parse_tenant_weights("grafana=4, 123=0.5,bad,neg=-1,x=abc") == {"grafana": 4.0, "123": 0.5}
+    assert parse_tenant_weights(None) == {}
+
+
+@pytest.mark.asyncio
+async def test_idle_tenants_are_forgotten():
+    scheduler = RequestScheduler(max_concurrent=1, tenant_weights={})
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("a", "benchmark"):
+            await gate.wait()
+
+    async def waiter(tenant):
+        async with scheduler.slot(tenant, "benchmark"):
+            pass
+
+    blocker_task = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(waiter(t)) for t in ("a", "b", "3713478")]
+    await asyncio.sleep(0)
+    waiters[1].cancel()
+
+    assert set(scheduler.get_stats()["tenants"]) == {"a", "b", "3713478"}
+    assert scheduler.get_stats()["tenants"]["a"]["active"] == 2
+
+    gate.set()
+    await asyncio.gather(blocker_task, *waiters, return_exceptions=True)
+
+    assert scheduler.get_stats()["tenants"] == {}
+    assert scheduler._last_finish == {} and scheduler._tenant_dispatched == {}
@@ -0,0 +1,137 @@
+"""
+Embedder Tests
+
+These tests verify the embedding backends used by the semantic cache and
+text search.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from service_orchestration.services.embedding import CachedEmbedder, HashingEmbedder, VllmEmbedder
+
+
+class TestHashingEmbedder:
+
+    def test_deterministic_and_normalized(self):
+        embedder = HashingEmbedder(dimension=64)
+
+        first, second = embedder.embed_batch(["Hello world", "Hello world"])
+
+        assert first == second
+        assert len(first) == 64
+        assert sum(v * v for v in first) == pytest.approx(1.0)
+
+    def test_similar_texts_score_higher(self):
+        embedder = HashingEmbedder()
+        base, near, far = embedder.embed_batch([
+            "how do I reset my password",
+            "How do I reset my password?",
+            "GPU memory bandwidth of the A100",
+        ])
+
+        def cosine(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        assert cosine(base, near) == pytest.approx(1.0)
+        assert cosine(base, far) < 0.5
+
+    def test_empty_text_gives_zero_vector(self):
+        assert HashingEmbedder(dimension=8).embed("") == [0.0] * 8
+
+
+class TestVllmEmbedder:
+
+    @patch("service_orchestration.services.embedding.embedders.requests")
+    def test_embed_batch_orders_by_index_and_discovers_model(self, mock_requests):
+        resolver = Mock()
+        resolver.resolve.return_value = "http://node-a:8001"
+        models = Mock()
+        models.json.return_value = {"data": [{"id": "BAAI/bge-small-en"}]}
+        embeddings = Mock()
+        embeddings.json.return_value = {"data": [
+            {"index": 1, "embedding": [0.0, 1.0]},
+            {"index": 0, "embedding": [1.0, 0.0]},
+        ]}
+        mock_requests.get.return_value = models
+        mock_requests.post.return_value = embeddings
+
+        embedder = VllmEmbedder(resolver, "3713478")
+        vectors = embedder.embed_batch(["a", "b"])
+
+        assert vectors == [[1.0, 0.0], [0.0, 1.0]]
+        assert embedder.dimension == 2
+        assert mock_requests.post.call_args.kwargs["json"] == {"model": "BAAI/bge-small-en", "input": ["a", "b"]}
+        assert mock_requests.post.call_args.args[0] == "http://node-a:8001/v1/embeddings"
+
+    def test_unresolved_endpoint_raises(self):
+        resolver = Mock()
+        resolver.resolve.return_value = None
+
+        with pytest.raises(RuntimeError):
+            VllmEmbedder(resolver, "3713478").embed("a")
+
+
+class _CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that records the batches it was asked to embed."""
+
+    def __init__(self, delay=0.0):
+        super().__init__(dimension=16)
+        self.delay = delay
+        self.calls = []
+
+    def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        return super().embed_batch(texts)
+
+
+class TestCachedEmbedder:
+
+    def test_repeated_texts_are_served_from_cache(self):
+        inner = _CountingEmbedder()
+        embedder = CachedEmbedder(inner)
+
+        first = embedder.embed_batch(["alpha", "beta", "alpha"])
+        second = embedder.embed("beta")
+
+        assert inner.calls == [["alpha", "beta"]]
+        assert first[0] == first[2] == inner.embed_batch(["alpha"])[0]
+        assert second == first[1]
+        # The duplicate in the first batch is embedded once but was not in the cache
+        assert (embedder.stats()["hits"], embedder.stats()["misses"]) == (1, 3)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        inner = _CountingEmbedder()
+        embedder = CachedEmbedder(inner, max_entries=2)
+
+        embedder.embed("a")
+        embedder.embed("b")
+        embedder.embed("a")
+        embedder.embed("c")
+        embedder.embed("a")
+        embedder.embed("b")
+
+        assert inner.calls == [["a"], ["b"], ["c"], ["b"]]
+
+    def test_concurrent_queries_are_embedded_together(self):
+        inner = _CountingEmbedder(delay=0.05)
+        embedder = CachedEmbedder(inner)
+        texts = [f"question {i}" for i in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            vectors = list(pool.map(embedder.embed, texts))
+
+        assert vectors == HashingEmbedder(dimension=16).embed_batch(texts)
+        assert sorted(t for call in inner.calls for t in call) == sorted(texts)
+        assert len(inner.calls) < len(texts)
+
+    def test_errors_reach_every_waiting_caller(self):
+        embedder = CachedEmbedder(Mock(name="inner", embed_batch=Mock(side_effect=RuntimeError("down"))))
+
+        with pytest.raises(RuntimeError, match="down"):
+            embedder.embed("a")
+        assert embedder.stats()["entries"] == 0
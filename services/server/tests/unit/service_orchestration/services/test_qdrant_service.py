@@ -0,0 +1,418 @@
+"""
+QdrantService Tests
+
+These tests verify the Qdrant data-plane paths: pooled sync/async requests,
+the cached readiness check and the transport selection.
+"""
+
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import httpx
+import pytest
+
+from service_orchestration.services.embedding import CachedEmbedder, HashingEmbedder
+from service_orchestration.services.vector_db.qdrant_service import QdrantService
+from service_orchestration.services.vector_db.vector_codec import FLOAT32_CONTENT_TYPE, encode_vectors
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    monkeypatch.delenv("QDRANT_TRANSPORT", raising=False)
+    deployer = MagicMock()
+    deployer.get_job_status.return_value = "running"
+    service_manager = MagicMock()
+    service_manager.get_service.return_value = {"id": "3713500", "status": "running", "recipe_name": "vector-db/qdrant"}
+    endpoint_resolver = MagicMock()
+    endpoint_resolver.resolve.return_value = "http://mel2079:6333"
+    return QdrantService(deployer, service_manager, endpoint_resolver, logging.getLogger("test"))
+
+
+def _response(status_code, payload):
+    response = Mock(status_code=status_code, content=b"{}")
+    response.json.return_value = payload
+    return response
+
+
+class TestQdrantService:
+
+    def test_readiness_is_checked_once_then_cached(self, qdrant):
+        qdrant._session = MagicMock()
+        qdrant._session.get.return_value = _response(200, {"result": {"collections": []}})
+        qdrant._session.request.return_value = _response(200, {"result": [{"id": 1, "score": 0.9}]})
+
+        first = qdrant.search_points("3713500", "docs", [0.1, 0.2], limit=1)
+        second = qdrant.search_points("3713500", "docs", [0.1, 0.2], limit=1)
+
+        assert first["success"] and second["success"]
+        assert second["results"] == [{"id": 1, "score": 0.9}]
+        assert second["num_results"] == 1
+        assert qdrant.deployer.get_job_status.call_count == 1
+        assert qdrant._session.get.call_count == 1
+        method, url = qdrant._session.request.call_args[0]
+        assert (method, url) == ("POST", "http://mel2079:6333/collections/docs/points/search")
+
+    def test_failed_request_drops_cached_readiness(self, qdrant):
+        qdrant._session = MagicMock()
+        qdrant._session.get.return_value = _response(200, {})
+        qdrant._session.request.side_effect = ConnectionError("node gone")
+
+        result = qdrant.upsert_points("3713500", "docs", [{"id": 1, "vector": [0.1]}])
+
+        assert result["success"] is False
+        assert result["error"] == "Exception: node gone"
+        assert not qdrant._is_known_ready("3713500")
+
+    def test_not_ready_service_is_reported(self, qdrant):
+        qdrant.deployer.get_job_status.return_value = "pending"
+
+        result = qdrant.get_collections("3713500")
+
+        assert result["success"] is False
+        assert result["status"] == "pending"
+        assert result["collections"] == []
+
+    @pytest.mark.asyncio
+    async def test_async_search_uses_pooled_client(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"result": [{"id": 7, "score": 0.8, "payload": {"text": "hi"}}]})
+
+        qdrant._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await qdrant.search_points_async("3713500", "docs", [0.1, 0.2], limit=3,
+                                                      query_filter={"must": []})
+        finally:
+            await qdrant.aclose()
+
+        assert result["success"] is True
+        assert result["results"][0]["payload"] == {"text": "hi"}
+        assert str(requests_seen[0].url) == "http://mel2079:6333/collections/docs/points/search"
+        qdrant.deployer.get_job_status.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_search_is_one_request_with_per_query_results(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"result": [[{"id": 1, "score": 0.9}], []], "time": 0.0015})
+
+        qdrant._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await qdrant.search_batch_async(
+                "3713500", "docs", [{"vector": [0.1, 0.2]}, {"vector": [0.3, 0.4], "limit": 1}],
+                limit=5, query_filter={"must": []}
+            )
+        finally:
+            await qdrant.aclose()
+
+        assert len(requests_seen) == 1
+        assert str(requests_seen[0].url) == "http://mel2079:6333/collections/docs/points/search/batch"
+        searches = json.loads(requests_seen[0].content)["searches"]
+        assert [(s["limit"], s["filter"]) for s in searches] == [(5, {"must": []}), (1, {"must": []})]
+        assert result["results"] == [[{"id": 1, "score": 0.9}], []]
+        assert result["num_queries"] == 2
+        assert result["qdrant_time_ms"] == 1.5
+        assert result["duration_ms"] > 0 and result["queries_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_async_http_error_is_reported(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant._async_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+        try:
+            result = await qdrant.delete_collection_async("3713500", "missing")
+        finally:
+            await qdrant.aclose()
+
+        assert result["success"] is False
+        assert result["error"] == "HTTP 404 from delete collection endpoint"
+        assert result["collection_name"] == "missing"
+
+    def test_grpc_transport_falls_back_without_qdrant_client(self, qdrant, monkeypatch):
+        from service_orchestration.services.vector_db import qdrant_grpc
+
+        monkeypatch.setenv("QDRANT_TRANSPORT", "grpc")
+        monkeypatch.setattr(qdrant_grpc, "QDRANT_CLIENT_AVAILABLE", False)
+
+        assert qdrant._create_grpc_transport() is None
+
+    @pytest.mark.asyncio
+    async def test_grpc_transport_routes_calls_and_forgets_stopped_nodes(self, monkeypatch):
+        from service_orchestration.services.vector_db import qdrant_grpc
+
+        clients = []
+
+        class StubClient:
+            def __init__(self, **kwargs):
+                self.kwargs, self.calls, self.closed = kwargs, [], False
+                clients.append(self)
+
+            async def search(self, **kwargs):
+                self.calls.append(("search", kwargs))
+                return [SimpleNamespace(id=1, version=0, score=0.9, payload={"text": "a"})]
+
+            async def upsert(self, **kwargs):
+                self.calls.append(("upsert", kwargs))
+
+            async def close(self):
+                self.closed = True
+
+        monkeypatch.setenv("QDRANT_TRANSPORT", "grpc")
+        monkeypatch.setattr(qdrant_grpc, "QDRANT_CLIENT_AVAILABLE", True)
+        monkeypatch.setattr(qdrant_grpc, "AsyncQdrantClient", StubClient, raising=False)
+        monkeypatch.setattr(qdrant_grpc, "models", SimpleNamespace(
+            Filter=dict, SearchParams=dict, PointStruct=dict, SearchRequest=dict
+        ), raising=False)
+        service_manager = MagicMock()
+        endpoint_resolver = MagicMock()
+        endpoint_resolver.resolve.return_value = "http://mel2079:6333"
+        qdrant = QdrantService(MagicMock(), service_manager, endpoint_resolver, logging.getLogger("test"))
+        listener = service_manager.add_status_listener.call_args[0][0]
+        qdrant._ready_until["3713500"] = float("inf")
+
+        found = await qdrant.search_points_async("3713500", "docs", [0.1, 0.2], limit=1, timeout=5)
+        stored = await qdrant.upsert_points_async("3713500", "docs", [{"id": 2, "vector": [0.3, 0.4]}])
+        listener("3713500", "running")
+        assert qdrant._grpc._clients
+        listener("3713500", "completed")
+        await qdrant.search_points_async("3713500", "docs", [0.1, 0.2], limit=1, timeout=2)
+        closed_before_shutdown = clients[0].closed
+        await qdrant.aclose()
+
+        assert found["success"] and stored["success"]
+        assert found["results"] == [{"id": 1, "version": 0, "score": 0.9, "payload": {"text": "a"}}]
+        first, second = clients
+        assert first.kwargs == {"host": "mel2079", "grpc_port": 6334, "prefer_grpc": True}
+        assert [(name, call.get("timeout")) for name, call in first.calls] == [("search", 5), ("upsert", None)]
+        assert first.calls[1][1]["points"] == [{"id": 2, "vector": [0.3, 0.4], "payload": None}]
+        # The stopped job's channel was closed and a new one opened, with the new call's timeout
+        assert closed_before_shutdown and second.closed
+        assert second.calls[0][1]["timeout"] == 2
+
+
+class TestCollectionTuning:
+
+    def test_create_applies_tuning_deployment_defaults_and_payload_indexes(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant.service_manager.get_service.return_value = {
+            "id": "3713500", "config": {"environment": {"QDRANT_COLLECTION_QUANTIZATION": "binary",
+                                                        "QDRANT_COLLECTION_ON_DISK": "true"}},
+        }
+        qdrant._session = MagicMock()
+        qdrant._session.request.return_value = _response(200, {"result": True})
+
+        result = qdrant.create_collection("3713500", "docs", 768, hnsw={"m": 32, "ef_construct": 200},
+                                          payload_indexes={"category": "keyword"})
+
+        create, index = qdrant._session.request.call_args_list
+        assert create.kwargs["json"] == {
+            "vectors": {"size": 768, "distance": "Cosine", "on_disk": True},
+            "hnsw_config": {"m": 32, "ef_construct": 200},
+            "quantization_config": {"binary": {}},
+        }
+        assert index.args == ("PUT", "http://mel2079:6333/collections/docs/index")
+        assert index.kwargs["json"] == {"field_name": "category", "field_schema": "keyword"}
+        assert result["success"] is True
+        assert result["payload_indexes"] == ["category"]
+
+    def test_update_body_and_validation(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant._session = MagicMock()
+        qdrant._session.request.return_value = _response(200, {"result": True})
+
+        result = qdrant.update_collection("3713500", "docs", quantization="none", on_disk=False,
+                                          optimizers={"indexing_threshold": 0})
+
+        method, url = qdrant._session.request.call_args.args
+        assert (method, url) == ("PATCH", "http://mel2079:6333/collections/docs")
+        assert qdrant._session.request.call_args.kwargs["json"] == {
+            "quantization_config": "Disabled",
+            "vectors": {"": {"on_disk": False}},
+            "optimizers_config": {"indexing_threshold": 0},
+        }
+        assert result["updated"] == ["optimizers_config", "quantization_config", "vectors"]
+        with pytest.raises(ValueError, match="Nothing to update"):
+            qdrant.update_collection("3713500", "docs")
+        with pytest.raises(ValueError, match="compression"):
+            qdrant.create_collection("3713500", "docs", 8, quantization={"type": "product", "compression": "x3"})
+
+    def test_search_uses_deployment_ef_unless_overridden(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant.service_manager.get_service.return_value = {"config": {"environment": {"QDRANT_SEARCH_HNSW_EF": "128"}}}
+        qdrant._session = MagicMock()
+        qdrant._session.request.return_value = _response(200, {"result": []})
+
+        qdrant.search_points("3713500", "docs", [0.1])
+        default_params = qdrant._session.request.call_args.kwargs["json"]["params"]
+        qdrant.search_points("3713500", "docs", [0.1], params={"exact": True})
+
+        assert default_params == {"hnsw_ef": 128}
+        assert qdrant._session.request.call_args.kwargs["json"]["params"] == {"exact": True}
+
+
+class TestSnapshots:
+
+    def test_snapshot_is_written_to_the_shared_directory(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant._session = MagicMock()
+        qdrant._session.request.return_value = _response(200, {"result": {
+            "name": "docs-2026-10-18.snapshot", "size": 1024, "creation_time": "2026-10-18T09:12:44",
+        }})
+
+        result = qdrant.create_snapshot("3713500", "docs")
+
+        assert qdrant._session.request.call_args.args == (
+            "POST", "http://mel2079:6333/collections/docs/snapshots?wait=true"
+        )
+        assert result["snapshot"]["size"] == 1024
+        assert result["path"] == "/workspace/qdrant_snapshots/docs/docs-2026-10-18.snapshot"
+
+    @pytest.mark.asyncio
+    async def test_recover_reads_snapshot_from_shared_directory(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"result": True})
+
+        qdrant._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await qdrant.recover_snapshot_async("3713500", "docs", "docs-2026-10-18.snapshot")
+        finally:
+            await qdrant.aclose()
+
+        assert result["success"] is True
+        assert str(requests_seen[0].url) == "http://mel2079:6333/collections/docs/snapshots/recover?wait=true"
+        assert json.loads(requests_seen[0].content) == {
+            "location": "file:///workspace/qdrant_snapshots/docs/docs-2026-10-18.snapshot"
+        }
+        with pytest.raises(ValueError, match="file name"):
+            await qdrant.recover_snapshot_async("3713500", "docs", "../other/x.snapshot")
+
+
+class TestTextSearch:
+
+    def test_query_is_embedded_then_searched_with_stage_timing(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        qdrant.text_embedder = CachedEmbedder(HashingEmbedder(dimension=8))
+        qdrant._session = MagicMock()
+        qdrant._session.request.return_value = _response(200, {"result": [{"id": 3, "score": 0.7}]})
+
+        result = qdrant.search_with_text("3713500", "docs", "reset my password", limit=2)
+
+        assert result["success"] is True
+        assert result["results"] == [{"id": 3, "score": 0.7}]
+        assert result["embedder"] == "hashing"
+        assert result["embedding_ms"] >= 0 and result["search_ms"] >= 0
+        body = qdrant._session.request.call_args.kwargs["json"]
+        assert body["vector"] == HashingEmbedder(dimension=8).embed("reset my password")
+        assert body["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_embedder_is_reported(self, qdrant):
+        result = await qdrant.search_with_text_async("3713500", "docs", "hello")
+
+        assert result["success"] is False
+        assert result["error"] == "No text embedder configured"
+        assert result["results"] == []
+
+
+class TestBulkIngestion:
+
+    @staticmethod
+    async def _chunks(lines, chunk_size=7):
+        body = "".join(line + "\n" for line in lines).encode()
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_is_batched_with_bounded_parallelism(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        in_flight = {"now": 0, "max": 0}
+        batches = []
+
+        async def upsert_points_async(service_id, collection_name, points, timeout=30, wait=True):
+            assert wait is False
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            batches.append([p["id"] for p in points])
+            return {"success": True}
+
+        qdrant.upsert_points_async = upsert_points_async
+        lines = ['{"id": %d, "vector": [0.1, 0.2]}' % i for i in range(10)] + ["not json", '{"id": 99}']
+
+        result = await qdrant.ingest_ndjson_async("3713500", "docs", self._chunks(lines), batch_size=3, parallelism=2)
+
+        assert result["success"] is True
+        assert result["num_points"] == 10
+        assert result["batches"] == 4
+        assert result["invalid_lines"] == 2
+        assert sorted(i for batch in batches for i in batch) == list(range(10))
+        assert in_flight["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_reported(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+
+        async def upsert_points_async(service_id, collection_name, points, timeout=30, wait=True):
+            return {"success": False, "error": "HTTP 404 from upsert points endpoint"}
+
+        qdrant.upsert_points_async = upsert_points_async
+        lines = ['{"id": %d, "vector": [0.1]}' % i for i in range(4)]
+
+        result = await qdrant.ingest_ndjson_async("3713500", "missing", self._chunks(lines), batch_size=2)
+
+        assert result["success"] is False
+        assert result["failed_batches"] == 2
+        assert result["failed_points"] == 4
+        assert result["error"] == "HTTP 404 from upsert points endpoint"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [7, 4096])
+    async def test_overlong_line_stops_the_reader(self, chunk_size):
+        from service_orchestration.services.vector_db.ingestion import IngestStats, LineTooLongError, iter_ndjson_points
+
+        lines = ['{"id": 1, "vector": [0.1]}', '{"id": 2, "vector": [%s]}' % ", ".join(["0.5"] * 20)]
+        points = []
+        with pytest.raises(LineTooLongError):
+            async for point in iter_ndjson_points(self._chunks(lines, chunk_size), IngestStats("docs"),
+                                                  max_line_bytes=64):
+                points.append(point["id"])
+        # Split across chunks the line is caught while buffered, in one chunk once complete
+        assert points == [1]
+
+    @pytest.mark.asyncio
+    async def test_binary_vectors_are_ingested_with_sequential_ids(self, qdrant):
+        qdrant._ready_until["3713500"] = float("inf")
+        upserted = []
+
+        async def upsert_points_async(service_id, collection_name, points, timeout=30, wait=True):
+            upserted.extend(points)
+            return {"success": True}
+
+        async def chunks(body, chunk_size=5):
+            for i in range(0, len(body), chunk_size):
+                yield body[i:i + chunk_size]
+
+        qdrant.upsert_points_async = upsert_points_async
+        body = encode_vectors([[0.5, 1.0], [1.5, 2.0], [2.5, 3.0]])
+
+        result = await qdrant.ingest_vectors_async("3713500", "docs", chunks(body + b"\x00"), FLOAT32_CONTENT_TYPE,
+                                                   id_offset=100, batch_size=2)
+
+        assert upserted == [{"id": 100, "vector": [0.5, 1.0]}, {"id": 101, "vector": [1.5, 2.0]},
+                            {"id": 102, "vector": [2.5, 3.0]}]
+        assert result["success"] is False
+        assert result["num_points"] == 3
+        assert "middle of a 2-dimensional vector" in result["error"]
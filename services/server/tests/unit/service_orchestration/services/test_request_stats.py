@@ -0,0 +1,106 @@
+"""RequestStats unit tests.
+
+Focus: fixed-size ring buffers, percentile summaries, group/replica roll-up
+and the Prometheus rendering of orchestrator-observed requests.
+"""
+
+from unittest.mock import Mock
+
+from service_orchestration.services.inference import VllmService
+from service_orchestration.services.inference.request_stats import RequestStats
+
+
+def test_summary_percentiles_and_tokens():
+    stats = RequestStats(capacity=100)
+    for latency in range(1, 101):
+        stats.record("123", float(latency), success=True, usage={"prompt_tokens": 2, "completion_tokens": 5})
+
+    summary = stats.summary("123")
+
+    assert summary["count"] == 100
+    assert summary["latency_ms"]["p50"] == 50.0
+    assert summary["latency_ms"]["p95"] == 95.0
+    assert summary["latency_ms"]["p99"] == 99.0
+    assert summary["prompt_tokens"] == 200
+    assert summary["completion_tokens"] == 500
+    assert summary["ttft_ms"] is None
+
+
+def test_ring_buffer_keeps_only_most_recent_requests():
+    stats = RequestStats(capacity=4)
+    for latency in (1000.0, 1000.0, 1.0, 2.0, 3.0, 4.0):
+        stats.record("123", latency, success=True)
+
+    summary = stats.summary("123")
+
+    assert summary["count"] == 4
+    assert summary["latency_ms"]["max"] == 4.0
+
+
+def test_errors_counted_but_excluded_from_latency():
+    stats = RequestStats(capacity=10)
+    stats.record("123", 10.0, success=True)
+    stats.record("123", 30000.0, success=False)
+
+    summary = stats.summary("123")
+
+    assert summary["errors"] == 1
+    assert summary["error_rate"] == 0.5
+    assert summary["latency_ms"]["max"] == 10.0
+
+
+def test_group_summary_includes_replicas():
+    stats = RequestStats(capacity=10)
+    stats.record("123:8001", 10.0, success=True, group_id="sg-123")
+    stats.record("123:8002", 20.0, success=True, group_id="sg-123")
+    stats.record("123:8002", 30.0, success=False, group_id="sg-123")
+
+    summary = stats.summary("sg-123")
+
+    assert summary["count"] == 3
+    assert summary["replicas"]["123:8001"]["count"] == 1
+    assert summary["replicas"]["123:8002"]["errors"] == 1
+
+
+def test_unknown_service_has_empty_summary():
+    summary = RequestStats(capacity=10).summary("nope")
+
+    assert summary["count"] == 0
+    assert summary["latency_ms"] is None
+
+
+def test_render_prometheus_histograms():
+    stats = RequestStats(capacity=10)
+    stats.record("123:8001", 80.0, success=True, usage={"completion_tokens": 7}, group_id="sg-123")
+    stats.record("123:8001", 3000.0, success=False, group_id="sg-123")
+
+    text = stats.render_prometheus("sg-123")
+
+    assert "# TYPE orchestrator_request_latency_seconds histogram" in text
+    assert 'orchestrator_request_latency_seconds_bucket{service_id="sg-123",replica_id="aggregate",le="0.1"} 1' in text
+    assert 'orchestrator_request_latency_seconds_count{service_id="sg-123",replica_id="123:8001"} 2' in text
+    assert 'orchestrator_requests_total{service_id="sg-123",replica_id="aggregate",outcome="error"} 1' in text
+    assert 'orchestrator_request_completion_tokens_total{service_id="sg-123",replica_id="123:8001"} 7' in text
+    assert "ttft" not in text
+    assert stats.render_prometheus("other") == ""
+
+
+def test_vllm_service_records_routed_replica():
+    service_manager = Mock()
+    service_manager.get_replica_info.return_value = {"id": "123:8001", "recipe_name": "inference/vllm-single-node"}
+    service_manager.is_service_recently_healthy.return_value = True
+    service_manager.get_group_for_replica.return_value = "sg-123"
+    endpoint_resolver = Mock()
+    endpoint_resolver.resolve.return_value = "http://node01:8001"
+    service = VllmService(Mock(), service_manager, endpoint_resolver, Mock())
+    service._cache_model("123:8001", "http://node01:8001", "gpt2")
+    service._try_chat_endpoint = Mock(return_value=(
+        True, 200, {"choices": [{"message": {"content": "hi"}}], "usage": {"prompt_tokens": 3, "completion_tokens": 1}}
+    ))
+
+    service._prompt_single_service("123:8001", "hello")
+
+    summary = service.request_stats.summary("sg-123")
+    assert summary["count"] == 1
+    assert summary["prompt_tokens"] == 3
+    assert list(summary["replicas"]) == ["123:8001"]
@@ -0,0 +1,78 @@
+"""
+Binary vector codec tests
+
+These tests verify the float32 and .npy body formats, incremental decoding
+across arbitrary chunk boundaries and the errors raised for malformed bodies.
+"""
+
+import struct
+from array import array
+
+import pytest
+
+from service_orchestration.services.vector_db.vector_codec import (
+    FLOAT32_CONTENT_TYPE,
+    NPY_CONTENT_TYPE,
+    VectorReader,
+    decode_vectors,
+    encode_vectors,
+    is_binary_vector_content,
+)
+
+VECTORS = [[0.5, -1.0, 2.25], [3.0, 0.0, -0.125]]
+
+
+def _npy(values, shape, descr="<f4"):
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape}).encode("latin1")
+    header += b" " * (63 - (10 + len(header)) % 64) + b"\n"
+    typecode = "f" if descr == "<f4" else "d"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header + array(typecode, values).tobytes()
+
+
+class TestVectorCodec:
+
+    def test_float32_round_trip(self):
+        body = encode_vectors(VECTORS)
+
+        assert body[:4] == b"VF32"
+        assert len(body) == 8 + 2 * 3 * 4
+        assert decode_vectors(body, FLOAT32_CONTENT_TYPE) == VECTORS
+
+    def test_rows_are_decoded_across_chunk_boundaries(self):
+        body = encode_vectors(VECTORS)
+        reader = VectorReader(FLOAT32_CONTENT_TYPE + "; charset=binary")
+
+        rows = []
+        for i in range(0, len(body), 5):
+            rows.extend(reader.feed(body[i:i + 5]))
+        reader.close()
+
+        assert rows == VECTORS
+        assert (reader.dim, reader.rows) == (3, 2)
+
+    @pytest.mark.parametrize("descr", ["<f4", "<f8"])
+    def test_npy_matrix_is_decoded(self, descr):
+        body = _npy([v for row in VECTORS for v in row], (2, 3), descr)
+
+        assert decode_vectors(body, NPY_CONTENT_TYPE) == VECTORS
+
+    def test_npy_single_vector(self):
+        assert decode_vectors(_npy(VECTORS[0], (3,)), NPY_CONTENT_TYPE) == [VECTORS[0]]
+
+    @pytest.mark.parametrize("body, content_type, message", [
+        (encode_vectors(VECTORS)[:-2], FLOAT32_CONTENT_TYPE, "middle of a 3-dimensional vector"),
+        (b"JSON" + encode_vectors(VECTORS)[4:], FLOAT32_CONTENT_TYPE, "Missing VF32 header"),
+        (b"VF", FLOAT32_CONTENT_TYPE, "before the vector header"),
+        (b"VF32" + struct.pack("<I", 2 ** 32 - 1), FLOAT32_CONTENT_TYPE, "exceeds the maximum of 65536"),
+        (_npy([1, 2, 3], (3,), "<f8")[:-8], NPY_CONTENT_TYPE, "middle of a 3-dimensional vector"),
+        (_npy([1, 2, 3, 4], (2, 2))[:-8], NPY_CONTENT_TYPE, "header declares 2"),
+        (_npy([1, 2, 3, 4, 5, 6, 7, 8], (2, 2, 2)), NPY_CONTENT_TYPE, "1-D or 2-D"),
+    ])
+    def test_malformed_bodies_are_rejected(self, body, content_type, message):
+        with pytest.raises(ValueError, match=message):
+            decode_vectors(body, content_type)
+
+    def test_content_type_detection(self):
+        assert is_binary_vector_content("Application/X-NPY")
+        assert not is_binary_vector_content("application/json")
+        assert not is_binary_vector_content(None)
@@ -5,11 +5,14 @@ These tests verify the VllmService helper that performs inference-specific
 operations.
 """
 
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
 from service_orchestration.services.inference import VllmService
+from service_orchestration.services.inference.response_cache import ResponseCache
+from service_orchestration.services.inference.semantic_cache import SemanticCache
+from service_orchestration.services.embedding import HashingEmbedder
 
 
 class TestVLLMServiceLogic:
@@ -542,3 +545,396 @@ class TestVllmServiceModelsListCache:
         
         # Cache should still be empty (errors not cached)
         assert vllm_service._get_cached_models_list(service_id) is None
+
+
+class TestVllmServiceResponseCache:
+    """Tests for the opt-in exact-match response cache in prompt()."""
+
+    @pytest.fixture
+    def mock_service_manager(self):
+        return Mock()
+
+    @pytest.fixture
+    def vllm_service(self, mock_service_manager):
+        service = VllmService(Mock(), mock_service_manager, Mock(), Mock())
+        service.response_cache = ResponseCache(enabled=True, max_bytes=1024 * 1024, ttl=60)
+        return service
+
+    def test_deterministic_prompt_served_from_cache(self, vllm_service):
+        vllm_service._dispatch_prompt = Mock(return_value={"success": True, "response": "4", "service_id": "123"})
+
+        first = vllm_service.prompt("123", "2+2?", temperature=0, max_tokens=5)
+        second = vllm_service.prompt("123", "2+2?", temperature=0, max_tokens=5)
+
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert second["response"] == "4"
+        vllm_service._dispatch_prompt.assert_called_once()
+        stats = vllm_service.response_cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_sampling_params_are_part_of_key(self, vllm_service):
+        vllm_service._dispatch_prompt = Mock(return_value={"success": True, "response": "x"})
+
+        vllm_service.prompt("123", "hi", temperature=0, max_tokens=5)
+        vllm_service.prompt("123", "hi", temperature=0, max_tokens=6)
+
+        assert vllm_service._dispatch_prompt.call_count == 2
+
+    def test_non_deterministic_and_failed_prompts_not_cached(self, vllm_service):
+        vllm_service._dispatch_prompt = Mock(return_value={"success": False, "error": "boom"})
+        vllm_service.prompt("123", "hi", temperature=0)
+        vllm_service.prompt("123", "hi", temperature=0)
+
+        vllm_service._dispatch_prompt = Mock(return_value={"success": True, "response": "x"})
+        vllm_service.prompt("123", "hi", temperature=0.7)
+        vllm_service.prompt("123", "hi")
+
+        assert vllm_service.response_cache.get_stats()["entries"] == 0
+
+    def test_cache_flag_not_forwarded_and_can_opt_out(self, vllm_service):
+        vllm_service._dispatch_prompt = Mock(return_value={"success": True, "response": "x"})
+
+        vllm_service.prompt("123", "hi", temperature=0, cache=False)
+
+        assert "cache" not in vllm_service._dispatch_prompt.call_args.kwargs
+        assert vllm_service.response_cache.get_stats()["entries"] == 0
+
+    def test_replica_restart_invalidates_group_entries(self, vllm_service, mock_service_manager):
+        vllm_service._dispatch_prompt = Mock(return_value={"success": True, "response": "x"})
+        mock_service_manager.get_group_for_replica.return_value = "sg-123"
+        vllm_service.prompt("sg-123", "hi", temperature=0)
+        vllm_service.prompt("123", "hi", temperature=0)
+        vllm_service.prompt("999", "hi", temperature=0)
+
+        vllm_service.invalidate_service("123:8001")
+
+        assert vllm_service.response_cache.get_stats()["entries"] == 1
+
+
+class TestVllmServiceCapabilityCache:
+    """Tests for remembering chat vs completions support per service/model."""
+
+    CHAT_TEMPLATE_ERROR = {"error": {"message": "As of transformers v4.44, default chat template is no longer allowed"}}
+
+    @pytest.fixture
+    def mock_service_manager(self):
+        manager = Mock()
+        manager.get_service.return_value = {"id": "123", "recipe_name": "inference/vllm-single-node"}
+        manager.is_service_recently_healthy.return_value = True
+        return manager
+
+    @pytest.fixture
+    def mock_endpoint_resolver(self):
+        resolver = Mock()
+        resolver.resolve.return_value = "http://node01:8001"
+        return resolver
+
+    @pytest.fixture
+    def vllm_service(self, mock_service_manager, mock_endpoint_resolver):
+        service = VllmService(Mock(), mock_service_manager, mock_endpoint_resolver, Mock())
+        service._cache_model("123", "http://node01:8001", "gpt2")
+        service._try_chat_endpoint = Mock(return_value=(False, 400, self.CHAT_TEMPLATE_ERROR))
+        service._try_completions_endpoint = Mock(
+            return_value=(True, 200, {"choices": [{"text": " world"}], "usage": {}})
+        )
+        return service
+
+    def test_base_model_skips_chat_after_first_fallback(self, vllm_service):
+        first = vllm_service._prompt_single_service("123", "hello")
+        second = vllm_service._prompt_single_service("123", "hello")
+
+        assert first["success"] is True and second["success"] is True
+        assert vllm_service._try_chat_endpoint.call_count == 1
+        assert vllm_service._try_completions_endpoint.call_count == 2
+
+    def test_endpoint_change_forgets_capability(self, vllm_service, mock_endpoint_resolver):
+        vllm_service._prompt_single_service("123", "hello")
+
+        mock_endpoint_resolver.resolve.return_value = "http://node02:8001"
+        vllm_service._cache_model("123", "http://node02:8001", "gpt2")
+        vllm_service._prompt_single_service("123", "hello")
+
+        assert vllm_service._try_chat_endpoint.call_count == 2
+
+    def test_invalidate_service_forgets_capability(self, vllm_service, mock_service_manager):
+        mock_service_manager.get_group_for_replica.return_value = None
+        vllm_service._prompt_single_service("123", "hello")
+
+        vllm_service.invalidate_service("123")
+
+        assert vllm_service._get_cached_capability("123", "http://node01:8001", "gpt2") is None
+
+    @patch('service_orchestration.services.inference.vllm_service.requests')
+    def test_readiness_check_detects_capability(self, mock_requests, vllm_service):
+        vllm_service._resolve_endpoint_parts = Mock(return_value=("node01", 8001))
+        models_response = Mock(status_code=200)
+        models_response.json.return_value = {"data": [{"id": "gpt2"}]}
+        mock_requests.get.return_value = models_response
+        tokenize_response = Mock(ok=False, status_code=400)
+        tokenize_response.json.return_value = self.CHAT_TEMPLATE_ERROR
+        mock_requests.post.return_value = tokenize_response
+
+        is_ready, _, model = vllm_service._check_ready_and_discover_model("123:8001", {"status": "starting"})
+
+        assert is_ready is True and model == "gpt2"
+        assert mock_requests.post.call_args.args[0] == "http://node01:8001/tokenize"
+        assert vllm_service._get_cached_capability("123:8001", "http://node01:8001", "gpt2") == "completions"
+
+    @patch('service_orchestration.services.inference.vllm_service.requests')
+    def test_unsupported_tokenize_is_not_probed_again(self, mock_requests, vllm_service):
+        vllm_service._resolve_endpoint_parts = Mock(return_value=("node01", 8001))
+        models_response = Mock(status_code=200)
+        models_response.json.return_value = {"data": [{"id": "gpt2"}]}
+        mock_requests.get.return_value = models_response
+        tokenize_response = Mock(ok=False, status_code=404)
+        tokenize_response.json.return_value = {"detail": "Not Found"}
+        mock_requests.post.return_value = tokenize_response
+
+        vllm_service._check_ready_and_discover_model("123:8001", {"status": "starting"})
+        vllm_service._check_ready_and_discover_model("123:8001", {"status": "starting"})
+
+        assert mock_requests.post.call_count == 1
+        assert vllm_service._get_cached_capability("123:8001", "http://node01:8001", "gpt2") is None
+
+        # The negative result expires like a detected one
+        vllm_service._capability_cache["123:8001"]["timestamp"] -= vllm_service._capability_cache_ttl
+        vllm_service._check_ready_and_discover_model("123:8001", {"status": "starting"})
+
+        assert mock_requests.post.call_count == 2
+
+
+class TestResponseCache:
+    """Tests for ResponseCache eviction and expiry."""
+
+    def test_lru_eviction_is_bounded_by_bytes(self):
+        cache = ResponseCache(enabled=True, max_bytes=400, ttl=60)
+        payload = {"success": True, "response": "y" * 100}
+        keys = [cache.make_key("svc", f"p{i}", {"temperature": 0}) for i in range(3)]
+
+        cache.put(keys[0], "svc", payload)
+        cache.put(keys[1], "svc", payload)
+        cache.get(keys[0])  # keys[0] becomes most recently used
+        cache.put(keys[2], "svc", payload)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 400
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResponseCache(enabled=True, ttl=0)
+        key = cache.make_key("svc", "p", {"temperature": 0})
+        cache.put(key, "svc", {"success": True})
+
+        assert cache.get(key) is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_disabled_cache_allows_per_request_opt_in(self):
+        cache = ResponseCache(enabled=False)
+
+        assert cache.make_key("svc", "p", {"temperature": 0}) is None
+        assert cache.make_key("svc", "p", {"temperature": 0, "cache": True}) is not None
+
+
+class TestVllmServiceRag:
+
+    def test_retrieved_context_and_timing_are_attached(self):
+        vllm_service = VllmService(Mock(), Mock(), Mock(), Mock())
+        qdrant = Mock()
+        qdrant.search_with_text.return_value = {
+            "success": True,
+            "results": [{"id": 1, "score": 0.8, "payload": {"text": "Passwords are reset in Settings."}}],
+            "embedder": "hashing", "embedding_ms": 0.2, "search_ms": 3.1,
+        }
+
+        with patch.object(vllm_service, "prompt", return_value={"success": True, "response": "In Settings."}) as prompt:
+            result = vllm_service.rag_prompt("svc-1", "How do I reset my password?", qdrant, "qdrant-1", "docs", top_k=1)
+
+        qdrant.search_with_text.assert_called_once_with(
+            service_id="qdrant-1", collection_name="docs", query_text="How do I reset my password?", limit=1
+        )
+        assert "Passwords are reset in Settings." in prompt.call_args[0][1]
+        assert result["rag_context"][0]["id"] == 1
+        assert "rag_retrieval" not in result
+        timing = result["rag_timing"]
+        assert (timing["embedder"], timing["embed_ms"], timing["search_ms"]) == ("hashing", 0.2, 3.1)
+        assert timing["context_chunks"] == 1
+        assert timing["ttft_ms"] is None
+        assert timing["total_ms"] >= timing["generation_ms"] >= 0
+
+    def test_top_k_zero_skips_retrieval(self):
+        vllm_service = VllmService(Mock(), Mock(), Mock(), Mock())
+        qdrant = Mock()
+
+        with patch.object(vllm_service, "prompt", return_value={"success": True, "ttft_ms": 12.5}) as prompt:
+            result = vllm_service.rag_prompt("svc-1", "Hi?", qdrant, "qdrant-1", "docs", top_k=0, measure_ttft=True)
+
+        qdrant.search_with_text.assert_not_called()
+        prompt.assert_called_once_with("svc-1", "Hi?", measure_ttft=True)
+        assert result["rag_timing"]["ttft_ms"] == 12.5
+        assert result["rag_timing"]["context_chunks"] == 0
+
+    @staticmethod
+    def _streamed_response(mock_requests, lines):
+        """Mock a streamed vLLM response returned by the service's shared session."""
+        response = MagicMock(ok=True, status_code=200)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = lines
+        mock_requests.Session.return_value.post.return_value = response
+        return response
+
+    @patch('service_orchestration.services.inference.vllm_service.requests')
+    def test_measure_ttft_streams_and_reassembles_chat_response(self, mock_requests):
+        vllm_service = VllmService(Mock(), Mock(), Mock(), Mock())
+        response = self._streamed_response(mock_requests, [
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+            b"",
+            b'data: {"choices": [{"delta": {"content": "In "}}]}',
+            b'data: {"choices": [{"delta": {"content": "Settings."}}]}',
+            b'data: {"choices": [], "usage": {"prompt_tokens": 40, "completion_tokens": 2}}',
+            b"data: [DONE]",
+        ])
+
+        ok, status, body = vllm_service._try_chat_endpoint("http://node01:8001", "m", "Hi?", measure_ttft=True)
+        result = vllm_service._parse_chat_response(ok, status, body, "http://node01:8001", "svc-1")
+
+        request = mock_requests.Session.return_value.post.call_args.kwargs
+        assert request["stream"] is True and request["json"]["stream"] is True
+        response.__exit__.assert_called_once()
+        assert result["response"] == "In Settings."
+        assert result["usage"] == {"prompt_tokens": 40, "completion_tokens": 2}
+        assert result["ttft_ms"] >= 0
+
+
+    @patch('service_orchestration.services.inference.vllm_service.requests')
+    def test_relay_receives_each_streamed_event(self, mock_requests):
+        vllm_service = VllmService(Mock(), Mock(), Mock(), Mock())
+        self._streamed_response(mock_requests, [
+            b'data: {"choices": [{"text": "Hi"}]}',
+            b'data: {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 1}}',
+            b"data: [DONE]",
+        ])
+        relayed = []
+
+        ok, _, body = vllm_service._try_completions_endpoint("http://node01:8001", "m", "Hi?", relay=relayed.append)
+
+        assert ok is True and body["choices"] == [{"text": "Hi"}]
+        assert relayed == [
+            b'data: {"choices": [{"text": "Hi"}]}\n\n',
+            b'data: {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 1}}\n\n',
+        ]
+
+    @patch('service_orchestration.services.inference.vllm_service.requests')
+    def test_malformed_stream_chunks_are_skipped(self, mock_requests):
+        vllm_service = VllmService(Mock(), Mock(), Mock(), Mock())
+        self._streamed_response(mock_requests, [
+            b'data: {"choices": [{"text": "Hi"}]}',
+            b'data: {"choices": [{"text": ',
+            b'data: {"choices": [{"text": " there"}]}',
+            b"data: [DONE]",
+        ])
+        relayed = []
+
+        ok, _, body = vllm_service._try_completions_endpoint("http://node01:8001", "m", "Hi?", relay=relayed.append)
+
+        assert ok is True and body["choices"] == [{"text": "Hi there"}]
+        assert len(relayed) == 2
+
+
+class FakeQdrant:
+    """In-memory stand-in for QdrantService search/upsert used by the semantic cache."""
+
+    def __init__(self):
+        self.collections = {}
+
+    def get_collection_info(self, service_id, collection_name):
+        return {"success": collection_name in self.collections}
+
+    def create_collection(self, service_id, collection_name, vector_size, distance):
+        self.collections[collection_name] = []
+        return {"success": True}
+
+    def upsert_points(self, service_id, collection_name, points):
+        self.collections[collection_name].extend(points)
+        return {"success": True}
+
+    def search_points(self, service_id, collection_name, query_vector, limit=10, query_filter=None):
+        wanted = {clause["key"]: clause["match"]["value"] for clause in query_filter["must"]}
+        scored = [
+            {"id": p["id"], "score": sum(a * b for a, b in zip(query_vector, p["vector"])), "payload": p["payload"]}
+            for p in self.collections[collection_name]
+            if all(p["payload"].get(key) == value for key, value in wanted.items())
+        ]
+        return {"success": True, "results": sorted(scored, key=lambda r: -r["score"])[:limit]}
+
+
+class TestVllmServiceSemanticCache:
+    """Tests for the Qdrant-backed semantic cache in prompt()."""
+
+    @pytest.fixture
+    def qdrant(self):
+        return FakeQdrant()
+
+    @pytest.fixture
+    def vllm_service(self, qdrant):
+        service = VllmService(Mock(), Mock(), Mock(), Mock())
+        service.semantic_cache = SemanticCache(lambda: qdrant, HashingEmbedder(), Mock())
+        service.semantic_cache.configure("qdrant-1", threshold=0.8)
+        service._dispatch_prompt = Mock(return_value={"success": True, "response": "Paris", "service_id": "123"})
+        return service
+
+    def test_similar_prompt_served_from_cache(self, vllm_service):
+        vllm_service.prompt("123", "What is the capital of France?")
+        hit = vllm_service.prompt("123", "what is the capital of france")
+
+        assert hit["cached"] is True
+        assert hit["cache_type"] == "semantic"
+        assert hit["similarity"] >= 0.8
+        assert hit["response"] == "Paris"
+        vllm_service._dispatch_prompt.assert_called_once()
+        stats = vllm_service.semantic_cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["stored"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_dissimilar_prompt_or_other_service_misses(self, vllm_service):
+        vllm_service.prompt("123", "What is the capital of France?")
+        vllm_service.prompt("123", "Explain transformer attention in detail")
+        vllm_service.prompt("456", "What is the capital of France?")
+
+        assert vllm_service._dispatch_prompt.call_count == 3
+
+    def test_different_generation_params_do_not_share_entries(self, vllm_service):
+        vllm_service.prompt("123", "What is the capital of France?", max_tokens=16)
+        vllm_service.prompt("123", "What is the capital of France?", max_tokens=256)
+        vllm_service.prompt("123", "What is the capital of France?", max_tokens=256, temperature=0.7)
+
+        assert vllm_service._dispatch_prompt.call_count == 2
+        stats = vllm_service.semantic_cache.get_stats()
+        assert stats["hits"] == 1 and stats["stored"] == 2
+
+    def test_params_outside_the_key_bypass_the_cache(self, vllm_service, qdrant):
+        vllm_service.prompt("123", "What is the capital of France?", top_p=0.5)
+        vllm_service.prompt("123", "What is the capital of France?", top_p=0.5)
+
+        assert vllm_service._dispatch_prompt.call_count == 2
+        assert vllm_service.semantic_cache.get_stats()["lookups"] == 0
+        assert qdrant.collections == {}
+
+    def test_restart_invalidation_and_opt_out(self, vllm_service):
+        vllm_service.service_manager.get_group_for_replica.return_value = None
+        vllm_service.prompt("123", "What is the capital of France?")
+        vllm_service.prompt("123", "What is the capital of France?", semantic_cache=False)
+        assert vllm_service._dispatch_prompt.call_count == 2
+        assert "semantic_cache" not in vllm_service._dispatch_prompt.call_args.kwargs
+
+        vllm_service.invalidate_service("123")
+        vllm_service.prompt("123", "What is the capital of France?")
+        assert vllm_service._dispatch_prompt.call_count == 3
+
+    def test_inactive_cache_is_bypassed(self, vllm_service, qdrant):
+        vllm_service.semantic_cache.configure(None)
+        vllm_service.prompt("123", "hi")
+
+        assert qdrant.collections == {}
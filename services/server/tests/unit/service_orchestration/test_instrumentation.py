@@ -0,0 +1,118 @@
+"""Unit tests for the orchestrator's self-instrumentation primitives and wiring."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from service_orchestration.instrumentation import (
+    Counter,
+    Gauge,
+    Histogram,
+    ORCHESTRATOR_METRICS,
+    OrchestratorMetrics,
+    Registry,
+    normalize_path,
+)
+
+
+def _sample(text: str, prefix: str) -> float:
+    """Value of the single line starting with ``prefix``."""
+    lines = [line for line in text.splitlines() if line.startswith(prefix)]
+    assert len(lines) == 1, lines
+    return float(lines[0].rsplit(" ", 1)[1])
+
+
+class TestPrimitives:
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("h_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+        histogram.observe(5.0, stage="a")
+
+        text = "\n".join(histogram.render())
+        assert "# TYPE h_seconds histogram" in text
+        assert _sample(text, 'h_seconds_bucket{stage="a",le="0.1"}') == 1
+        assert _sample(text, 'h_seconds_bucket{stage="a",le="1.0"}') == 2
+        assert _sample(text, 'h_seconds_bucket{stage="a",le="+Inf"}') == 3
+        assert _sample(text, 'h_seconds_count{stage="a"}') == 3
+        assert _sample(text, 'h_seconds_sum{stage="a"}') == pytest.approx(5.55)
+        assert histogram.count(stage="a") == 3
+
+    def test_histogram_time_observes_on_exception(self):
+        histogram = Histogram("h_seconds", "Test.", ("stage",))
+        with pytest.raises(ValueError):
+            with histogram.time(stage="boom"):
+                raise ValueError()
+        assert histogram.count(stage="boom") == 1
+
+    def test_counter_gauge_and_label_escaping(self):
+        registry = Registry()
+        counter = registry.register(Counter("c_total", "Test.", ("path",)))
+        gauge = registry.register(Gauge("g", "Test."))
+        counter.inc(path='a"b')
+        counter.inc(2, path='a"b')
+        gauge.set(0.25)
+
+        text = registry.render()
+        assert _sample(text, 'c_total{path="a\\"b"}') == 3
+        assert _sample(text, "g ") == 0.25
+        assert text.endswith("\n")
+
+    def test_normalize_path_collapses_ids(self):
+        assert normalize_path("/job/3712345") == "/job/{id}"
+        assert normalize_path("/api/services/3712345:8002/metrics?x=1") == "/api/services/{id}/metrics"
+        assert normalize_path("/jobs") == "/jobs"
+        assert normalize_path("/job/submit") == "/job/submit"
+
+
+class TestEventLoopLag:
+    def test_blocking_call_shows_up_as_lag(self):
+        metrics = OrchestratorMetrics()
+
+        async def run():
+            monitor = asyncio.create_task(metrics.monitor_event_loop(interval=0.01))
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # Block the loop
+            await asyncio.sleep(0.03)
+            monitor.cancel()
+
+        asyncio.run(run())
+        assert metrics.event_loop_lag_max.value() >= 0.05
+
+
+class TestWiring:
+    def test_slurm_session_counts_calls_by_endpoint_and_outcome(self):
+        from service_orchestration.core.slurm_client import _InstrumentedSession
+
+        session = _InstrumentedSession("http://slurm:6820/slurm/v0.0.40")
+        response = requests.Response()
+        response.status_code = 404
+        before = ORCHESTRATOR_METRICS.slurm_requests.value(method="GET", endpoint="/job/{id}", outcome="4xx")
+        with patch.object(requests.Session, "request", return_value=response):
+            session.get("http://slurm:6820/slurm/v0.0.40/job/3712345")
+        with patch.object(requests.Session, "request", side_effect=requests.ConnectionError()):
+            with pytest.raises(requests.ConnectionError):
+                session.get("http://slurm:6820/slurm/v0.0.40/job/3712346")
+
+        assert ORCHESTRATOR_METRICS.slurm_requests.value(
+            method="GET", endpoint="/job/{id}", outcome="4xx") == before + 1
+        assert ORCHESTRATOR_METRICS.slurm_requests.value(method="GET", endpoint="/job/{id}", outcome="error") >= 1
+        assert ORCHESTRATOR_METRICS.slurm_seconds.count(method="GET", endpoint="/job/{id}") >= 2
+
+    def test_endpoint_resolution_is_timed_by_source(self):
+        from service_orchestration.networking.endpoint_resolver import EndpointResolver
+
+        deployer = MagicMock()
+        deployer.get_job_details.return_value = {"nodes": ["node-a"]}
+        resolver = EndpointResolver(deployer, MagicMock(), MagicMock())
+        resolver.register("12345:8002", "node-a", 8002)
+        registered = ORCHESTRATOR_METRICS.resolve_seconds.count(source="registered")
+        slurm = ORCHESTRATOR_METRICS.resolve_seconds.count(source="slurm")
+
+        assert resolver.resolve("12345:8002") == "http://node-a:8002"
+        assert resolver.resolve("12345:8003") == "http://node-a:8003"
+        assert ORCHESTRATOR_METRICS.resolve_seconds.count(source="registered") == registered + 1
+        assert ORCHESTRATOR_METRICS.resolve_seconds.count(source="slurm") == slurm + 1
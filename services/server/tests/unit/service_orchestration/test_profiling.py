@@ -0,0 +1,91 @@
+"""Unit tests for the on-demand CPU and memory profilers."""
+
+import threading
+import time
+
+import pytest
+
+from service_orchestration import profiling
+from service_orchestration.profiling import (
+    ProfilerBusyError,
+    ProfilingDisabledError,
+    ProfilingForbiddenError,
+    authorize,
+    profile_cpu,
+    profile_memory,
+)
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _parse_folded(text):
+    stacks = {}
+    for line in text.splitlines():
+        stack, weight = line.rsplit(" ", 1)
+        stacks[stack] = int(weight)
+    return stacks
+
+
+class TestProfilers:
+    def test_cpu_profile_is_folded_per_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            stacks = _parse_folded(profile_cpu(seconds=0.2, interval=0.005))
+        finally:
+            stop.set()
+            worker.join()
+
+        busy = {stack: weight for stack, weight in stacks.items() if stack.startswith("busy-worker;")}
+        assert busy and sum(busy.values()) > 0
+        # Root to leaf: thread, then the thread bootstrap ... down to the spinning function
+        assert any("_spin (test_profiling.py:" in stack for stack in busy)
+
+    def test_memory_profile_weights_by_bytes(self):
+        retained = []
+
+        def allocate():
+            time.sleep(0.05)
+            retained.append([bytearray(1024) for _ in range(200)])
+
+        thread = threading.Thread(target=allocate)
+        thread.start()
+        stacks = _parse_folded(profile_memory(seconds=0.2))
+        thread.join()
+
+        assert sum(weight for stack, weight in stacks.items() if "test_profiling.py:" in stack) >= 200 * 1024
+
+    def test_one_profile_at_a_time(self):
+        assert profiling._profile_lock.acquire(blocking=False)
+        try:
+            with pytest.raises(ProfilerBusyError):
+                profile_cpu(seconds=0.1)
+        finally:
+            profiling._profile_lock.release()
+
+
+class TestAuthorize:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+        monkeypatch.setenv("PROFILING_TOKEN", "secret")
+        with pytest.raises(ProfilingDisabledError):
+            authorize("secret")
+
+    def test_token_required(self, monkeypatch):
+        monkeypatch.setenv("PROFILING_ENABLED", "true")
+        monkeypatch.setenv("PROFILING_TOKEN", "secret")
+        with pytest.raises(ProfilingForbiddenError):
+            authorize(None)
+        with pytest.raises(ProfilingForbiddenError):
+            authorize("wrong")
+        authorize("secret")
+
+    def test_enabled_without_token_stays_closed(self, monkeypatch):
+        monkeypatch.setenv("PROFILING_ENABLED", "true")
+        monkeypatch.delenv("PROFILING_TOKEN", raising=False)
+        with pytest.raises(ProfilingForbiddenError):
+            authorize("")
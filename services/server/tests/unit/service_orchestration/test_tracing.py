@@ -0,0 +1,111 @@
+"""Unit tests for W3C trace context propagation and span recording."""
+
+from service_orchestration.tracing import (
+    OtlpHttpSpanExporter,
+    Sampler,
+    SpanContext,
+    Tracer,
+)
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+def _tracer(ratio=1.0, max_per_second=0.0):
+    return Tracer("test", Sampler(ratio=ratio, max_per_second=max_per_second), RecordingExporter())
+
+
+INCOMING = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class TestTraceparent:
+    def test_round_trip(self):
+        context = SpanContext.from_traceparent(INCOMING)
+        assert context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert context.span_id == "b7ad6b7169203331"
+        assert context.sampled is True
+        assert context.to_traceparent() == INCOMING
+
+    def test_invalid_headers_are_ignored(self):
+        assert SpanContext.from_traceparent(None) is None
+        assert SpanContext.from_traceparent("garbage") is None
+        assert SpanContext.from_traceparent("00-" + "0" * 32 + "-b7ad6b7169203331-01") is None
+        assert SpanContext.from_traceparent("ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01") is None
+
+
+class TestTracer:
+    def test_continues_incoming_trace_and_nests_spans(self):
+        tracer = _tracer(ratio=0.0)
+        with tracer.start_trace("POST /prompt", traceparent=INCOMING) as root:
+            with tracer.span("prompt.upstream_request") as child:
+                headers = tracer.inject({"X-Other": "1"})
+
+        root_span, = [s for s in tracer.exporter.spans if s.name == "POST /prompt"]
+        child_span, = [s for s in tracer.exporter.spans if s.name == "prompt.upstream_request"]
+        assert root is root_span and child is child_span
+        assert root_span.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert root_span.parent_span_id == "b7ad6b7169203331"
+        assert child_span.parent_span_id == root_span.context.span_id
+        # Downstream hops see the innermost span as their parent
+        assert headers == {"X-Other": "1", "traceparent": child_span.context.to_traceparent()}
+        assert tracer.current_context() is None
+
+    def test_unsampled_trace_propagates_without_recording(self):
+        tracer = _tracer()
+        with tracer.start_trace("GET /x", traceparent=INCOMING[:-2] + "00") as root:
+            with tracer.span("stage") as child:
+                headers = tracer.inject()
+
+        assert root is None and child is None
+        assert tracer.exporter.spans == []
+        assert headers["traceparent"].startswith("00-0af7651916cd43dd8448eb211c80319c-")
+        assert headers["traceparent"].endswith("-00")
+
+    def test_spans_outside_a_trace_are_noops(self):
+        tracer = _tracer()
+        with tracer.span("health.cycle") as span:
+            assert span is None
+        assert tracer.inject() == {}
+        assert tracer.exporter.spans == []
+
+    def test_errors_are_recorded(self):
+        tracer = _tracer()
+        try:
+            with tracer.start_trace("GET /boom"):
+                raise RuntimeError("upstream down")
+        except RuntimeError:
+            pass
+        assert tracer.exporter.spans[0].error == "upstream down"
+
+    def test_rate_cap_bounds_recorded_traces(self):
+        tracer = _tracer(ratio=1.0, max_per_second=3)
+        for _ in range(10):
+            with tracer.start_trace("GET /x", traceparent=INCOMING):
+                pass
+        assert len(tracer.exporter.spans) == 3
+
+
+def test_otlp_encoding():
+    tracer = _tracer()
+    with tracer.start_trace("GET /x", traceparent=INCOMING, attributes={"http.status_code": 200}):
+        pass
+    exporter = OtlpHttpSpanExporter.__new__(OtlpHttpSpanExporter)
+    exporter.service_name = "server"
+
+    payload = exporter.encode(tracer.exporter.spans)
+
+    resource_spans = payload["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "server"}}
+    span = resource_spans["scopeSpans"][0]["spans"][0]
+    assert span["traceId"] == "0af7651916cd43dd8448eb211c80319c"
+    assert span["parentSpanId"] == "b7ad6b7169203331"
+    assert span["kind"] == 2
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in span["attributes"]